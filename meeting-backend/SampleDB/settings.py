@@ -372,6 +372,10 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'core.scheduler.tasks.cleanup_old_meetings_task',
         'schedule': 60.0 * 60 * 24,  # Run daily to cleanup old meetings
     },
+    'reconcile-livekit-participants': {
+        'task': 'core.scheduler.tasks.reconcile_livekit_participants_task',
+        'schedule': float(os.getenv("LIVEKIT_RECONCILE_INTERVAL", 300)),  # Webhooks apply joins/leaves; this only catches missed events
+    },
 }
 
 # Internationalization
@@ -6,14 +6,13 @@ import numpy as np
 import base64
 import io
 from PIL import Image
-import mediapipe as mp
 from scipy.spatial.distance import euclidean
 from datetime import datetime, timedelta
 import uuid
 from functools import wraps
 from typing import Optional, Dict, List, Tuple, Any
 import traceback
-import asyncio
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 from django.db import models, connection, transaction
 from django.utils import timezone
@@ -28,6 +27,9 @@ from django.db.models import Avg, Count, Q, Max, Min
 import logging
 from asgiref.sync import sync_to_async
 
+from core.AI_Attendance.inference_pool import get_inference_backend, get_detector_cascade
+from core.AI_Attendance.frame_sampler import recommend_sampling, load_tracker
+
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -164,10 +166,10 @@ class AttendanceSession(models.Model):
 
 # ==================== MEDIAPIPE INITIALIZATION ====================
 
-mp_face = mp.solutions.face_detection.FaceDetection(min_detection_confidence=AttendanceConfig.FACE_DETECTION_CONFIDENCE)
-mp_mesh = mp.solutions.face_mesh.FaceMesh(refine_landmarks=True, min_detection_confidence=0.5, min_tracking_confidence=0.5)
-mp_pose = mp.solutions.pose.Pose(min_detection_confidence=0.5)
-mp_hands = mp.solutions.hands.Hands(min_detection_confidence=0.5)
+# Face / mesh / hands / pose graphs are owned by the inference backend (see
+# inference_pool.py): a pool of worker processes when ATTENDANCE_INFERENCE_WORKERS
+# > 0, otherwise one set of in-process graphs behind a lock. It is created on the
+# first detection request so management commands don't spawn workers.
 
 attendance_sessions = {}
 
@@ -358,32 +360,26 @@ def generate_camera_verification_token(meeting_id: str, user_id: str, timestamp:
 
 def run_async_verification(frame, user_id):
     """
-    Helper function to run async verification in sync context
+    Run async identity verification from sync code on the shared async bridge
+    (one long-lived event loop per process instead of a new loop per frame).
     Returns: (is_verified, similarity)
     """
     try:
-        # Create new event loop for this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            # Import and run verification
-            from core.FaceAuth.unified_face_service import get_unified_face_service
-            face_service = get_unified_face_service()
-            
-            # Run async verification
-            result = loop.run_until_complete(
-                face_service.verify_face(
-                    frame=frame,
-                    user_id=user_id,
-                    threshold=0.6,
-                    method='cosine'
-                )
-            )
-            return result
-        finally:
-            loop.close()
-            
+        from core.FaceAuth.unified_face_service import get_unified_face_service
+        from core.FaceAuth.async_bridge import get_async_bridge
+        face_service = get_unified_face_service()
+
+        return get_async_bridge().run(
+            face_service.verify_face,
+            frame=frame,
+            user_id=user_id,
+            threshold=0.6,
+            method='cosine'
+        )
+
+    except FutureTimeoutError:
+        logger.warning(f"⏱️ Identity verification timed out for {user_id} - skipping frame")
+        return (True, 1.0)  # Skip on timeout
     except Exception as e:
         logger.error(f"Error in async verification: {e}")
         logger.error(traceback.format_exc())
@@ -784,6 +780,7 @@ def stop_attendance_tracking(meeting_id: str, user_id) -> bool:
         
         store_attendance_to_db(meeting_id, user_id)
         del attendance_sessions[session_key]
+        get_detector_cascade().forget(session_key)
         
         remaining_participants = [k for k in attendance_sessions.keys() 
                                 if k.startswith(f"{meeting_id}_")]
@@ -1427,6 +1424,7 @@ def detect_violations(request):
                     "message": "Grace period active - detection paused",
                     "camera_verification_pending": session.get("camera_resume_expected", False),
                     "camera_verified": session.get("camera_verified_at") is not None,
+                    "sampling": recommend_sampling(session, current_time),
                 })
             else:
                 logger.info(f"GRACE PERIOD ENDED for {user_id} - RESUMING DETECTION")
@@ -1485,6 +1483,7 @@ def detect_violations(request):
                 "is_on_break": True,
                 "total_break_time_used": current_total_break_time,
                 "break_time_remaining": max(0, session.get('max_break_time_allowed', 300) - current_total_break_time),
+                "sampling": recommend_sampling(session, current_time),
             })
 
         # ============================================================
@@ -1494,6 +1493,7 @@ def detect_violations(request):
             return JsonResponse({
                 "status": "session_paused", 
                 "message": "Session is paused",
+                "sampling": recommend_sampling(session, current_time),
             })
 
         # ============================================================
@@ -1565,10 +1565,31 @@ def detect_violations(request):
         # ============================================================
         # MEDIAPIPE PROCESSING
         # ============================================================
-        face_detections = mp_face.process(rgb).detections
-        mesh_results = mp_mesh.process(rgb)
-        hands_results = mp_hands.process(rgb)
-        pose_results = mp_pose.process(rgb)
+        # Cascade: face detection every frame; mesh / hands / pose only when the face
+        # moved, a violation is open, a refresh is due or the baseline is sampling.
+        vision = get_detector_cascade().infer(
+            session_key, rgb, force=not session.get("baseline_established", False)
+        )
+        if vision is None:
+            # Shed by the inference pool: a newer frame from this user superseded
+            # it or it waited too long. Nothing is scored for this frame.
+            load_tracker.record_shed()
+            return JsonResponse({
+                "status": "ok",
+                "skipped": True,
+                "message": "Frame skipped - newer frame in progress",
+                "popup": "",
+                "violations": [],
+                "immediate_violations": [],
+                "baseline_violations": [],
+                "attendance_percentage": max(0, 100 - session.get("attendance_penalty", 0)),
+                "baseline_established": session.get("baseline_established", False),
+                "face_detected": session.get("face_detected", False),
+                "frame_count": session["frame_processing_count"],
+                "is_on_break": False,
+                "sampling": recommend_sampling(session, current_time),
+            })
+        load_tracker.record(vision.queue_ms + vision.compute_ms)
         
         popup = ""
         face_changed = False
@@ -1576,25 +1597,25 @@ def detect_violations(request):
         # ============================================================
         # IMMEDIATE VIOLATIONS
         # ============================================================
-        if not face_detections:
+        if vision.face_count == 0:
             immediate_violations.append("Face not visible")
-        elif len(face_detections) > 1:
+        elif vision.face_count > 1:
             immediate_violations.append("Multiple faces detected")
 
         # HAND NEAR FACE
-        if hands_results.multi_hand_landmarks and mesh_results.multi_face_landmarks:
-            lm = mesh_results.multi_face_landmarks[0].landmark
+        if vision.hands and vision.mesh:
+            lm = vision.mesh
             face_pts = [lm[i] for i in [1, 2, 4, 5, 9, 10]]
-            for hand in hands_results.multi_hand_landmarks:
-                for hpt in [hand.landmark[i] for i in [0, 4, 5, 8, 12, 16, 20]]:
+            for hand in vision.hands:
+                for hpt in [hand[i] for i in [0, 4, 5, 8, 12, 16, 20]]:
                     for fpt in face_pts:
                         if np.linalg.norm([hpt.x - fpt.x, hpt.y - fpt.y]) < AttendanceConfig.HAND_FACE_DISTANCE:
                             immediate_violations.append("Hand near face")
                             break
 
         # LYING DOWN
-        if pose_results.pose_landmarks:
-            if is_fully_lying_down(pose_results.pose_landmarks.landmark):
+        if vision.pose:
+            if is_fully_lying_down(vision.pose):
                 immediate_violations.append("Lying down")
 
         baseline_violations = []
@@ -1602,9 +1623,9 @@ def detect_violations(request):
         # ============================================================
         # EYE AND HEAD TRACKING - WITH PROPER BASELINE HANDLING
         # ============================================================
-        if mesh_results.multi_face_landmarks:
+        if vision.mesh:
             session["face_detected"] = True
-            lm = mesh_results.multi_face_landmarks[0].landmark
+            lm = vision.mesh
             
             left_eye = [lm[i] for i in [362, 385, 387, 263, 373, 380]]
             right_eye = [lm[i] for i in [33, 160, 158, 133, 153, 144]]
@@ -1902,6 +1923,8 @@ def detect_violations(request):
             
             session["violation_start_times"].clear()
 
+        get_detector_cascade().mark_outcome(session_key, bool(violations) or bool(popup))
+
         # ============================================================
         # CALCULATE ATTENDANCE PERCENTAGE
         # ============================================================
@@ -1994,6 +2017,7 @@ def detect_violations(request):
             "camera_verified": session.get("camera_verified_at") is not None,
             "user_isolation_verified": True,
             "concurrent_participants": len(concurrent_sessions),
+            "sampling": recommend_sampling(session, now, violations_open=bool(violations)),
         })
         
     except json.JSONDecodeError:
@@ -2442,6 +2466,23 @@ def stop_attendance_tracking_api(request):
         logger.error(traceback.format_exc())
         return JsonResponse({'error': 'Internal server error'}, status=500)
 
+@require_http_methods(["GET"])
+def get_inference_stats(request):
+    """Inference backend and per-stage cascade run/skip counters for this process"""
+    try:
+        from core.FaceAuth.async_bridge import get_async_bridge
+        return JsonResponse({
+            'success': True,
+            'backend': get_inference_backend().get_stats(),
+            'verification_bridge': get_async_bridge().get_stats(),
+            'cascade': get_detector_cascade().get_stats(),
+            'load': {'local': round(load_tracker.local_load(), 2), 'effective': round(load_tracker.load(), 2)},
+            'active_sessions': len(attendance_sessions),
+        })
+    except Exception as e:
+        logger.error(f"Error getting inference stats: {e}")
+        return JsonResponse({'error': 'Internal server error'}, status=500)
+
 # ==================== URL PATTERNS ====================
 
 urlpatterns = [
@@ -2452,4 +2493,5 @@ urlpatterns = [
     path('api/attendance/status/', get_attendance_status, name='attendance_get_status'),
     path('api/attendance/pause-resume/', pause_resume_attendance, name='attendance_pause_resume'),
     path('api/attendance/verify-camera/', verify_camera_resumed, name='attendance_verify_camera'),
+    path('api/attendance/inference-stats/', get_inference_stats, name='attendance_inference_stats'),
 ]
\ No newline at end of file
@@ -0,0 +1,162 @@
+# frame_sampler.py - Server-driven adaptive frame cadence for attendance monitoring
+#
+# Each detect_violations response tells the client when to send its next frame
+# and at what resolution. Users mid-violation, sampling their baseline or just
+# back from a break are sampled fast at full resolution; users who have been
+# clean for a while back off gradually to a slow, low-resolution cadence. When
+# the inference tier is loaded (local latency or the cluster-wide average
+# published through Redis), clean users back off further first so large
+# meetings degrade gracefully instead of queueing every frame.
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SamplerConfig:
+    """Adaptive sampling settings (env overridable)"""
+    ENABLED = os.getenv("ATTENDANCE_ADAPTIVE_SAMPLING", "True") == "True"
+
+    FAST_INTERVAL_MS = int(os.getenv("ATTENDANCE_FAST_INTERVAL_MS", 1000))      # violation / baseline / grace
+    CLEAN_INTERVAL_MS = int(os.getenv("ATTENDANCE_CLEAN_INTERVAL_MS", 2000))    # just became clean
+    MAX_CLEAN_INTERVAL_MS = int(os.getenv("ATTENDANCE_MAX_CLEAN_INTERVAL_MS", 5000))  # stays under INACTIVITY_WARNING_TIME
+    PAUSED_INTERVAL_MS = int(os.getenv("ATTENDANCE_PAUSED_INTERVAL_MS", 5000))  # break / paused
+    MAX_LOADED_INTERVAL_MS = int(os.getenv("ATTENDANCE_MAX_LOADED_INTERVAL_MS", 9000))
+    CLEAN_RAMP_SECONDS = int(os.getenv("ATTENDANCE_CLEAN_RAMP_SECONDS", 300))   # clean time to reach max interval
+
+    FULL_RESOLUTION = (640, 480)
+    REDUCED_RESOLUTION = (480, 360)
+    LOW_RESOLUTION = (320, 240)
+
+    TARGET_LATENCY_MS = float(os.getenv("ATTENDANCE_TARGET_LATENCY_MS", 150))  # inference latency at load 1.0
+    LATENCY_EWMA_ALPHA = 0.1
+    LOAD_PUBLISH_SECONDS = 5
+    LOAD_KEY = "attendance:load"   # hash: pod -> "load:published_at"
+    LOAD_KEY_TTL = 30              # pods silent this long are pruned from the hash
+
+
+class InferenceLoadTracker:
+    """
+    Exponentially weighted inference latency for this process, published to
+    Redis so every pod can read the cluster average. Load 1.0 means frames take
+    TARGET_LATENCY_MS end to end; shed frames count as a saturated sample.
+    """
+
+    def __init__(self, config=SamplerConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self._latency_ms = 0.0
+        self._published_at = 0.0
+        self._cluster_load: Optional[float] = None
+        self._pod_field = f"{socket.gethostname()}:{os.getpid()}"
+
+    def record(self, latency_ms: float):
+        with self._lock:
+            a = self.config.LATENCY_EWMA_ALPHA
+            self._latency_ms = (1 - a) * self._latency_ms + a * latency_ms
+        self._maybe_publish()
+
+    def record_shed(self):
+        self.record(self.config.TARGET_LATENCY_MS * 3)
+
+    def local_load(self) -> float:
+        return self._latency_ms / self.config.TARGET_LATENCY_MS
+
+    def _maybe_publish(self):
+        now = time.time()
+        if now - self._published_at < self.config.LOAD_PUBLISH_SECONDS:
+            return
+        self._published_at = now
+        try:
+            from core.WebSocketConnection.participants import get_redis
+            r = get_redis()
+            if not r:
+                return
+            # One hash for all pods: a single HGETALL instead of a keyspace SCAN
+            key = self.config.LOAD_KEY
+            pipe = r.pipeline()
+            pipe.hset(key, self._pod_field, f"{self.local_load():.3f}:{now:.0f}")
+            pipe.expire(key, self.config.LOAD_KEY_TTL)
+            pipe.hgetall(key)
+            entries = pipe.execute()[-1]
+
+            values, stale = [], []
+            for field, value in entries.items():
+                try:
+                    load, published_at = (value.decode() if isinstance(value, bytes) else value).split(":")
+                    if now - float(published_at) > self.config.LOAD_KEY_TTL:
+                        stale.append(field)
+                    else:
+                        values.append(float(load))
+                except ValueError:
+                    stale.append(field)
+            if stale:
+                r.hdel(key, *stale)
+            self._cluster_load = sum(values) / len(values) if values else None
+        except Exception as e:
+            logger.debug(f"Could not publish inference load: {e}")
+
+    def load(self) -> float:
+        """Higher of this pod's load and the cluster average"""
+        local = self.local_load()
+        return max(local, self._cluster_load) if self._cluster_load is not None else local
+
+
+load_tracker = InferenceLoadTracker()
+
+
+def _response(interval_ms: int, resolution, reason: str, load: float) -> Dict:
+    return {
+        "next_frame_interval_ms": int(interval_ms),
+        "target_width": resolution[0],
+        "target_height": resolution[1],
+        "reason": reason,
+        "load": round(load, 2),
+    }
+
+
+def recommend_sampling(session: Dict, now: float, violations_open: bool = False,
+                       config=SamplerConfig) -> Dict:
+    """
+    Next frame interval and resolution for one user, from their session state
+    (break / pause / grace / baseline / recent violations) and current load.
+    Updates session['clean_since'] to track the user's clean streak.
+    """
+    load = load_tracker.load()
+    if not config.ENABLED:
+        return _response(config.FAST_INTERVAL_MS, config.FULL_RESOLUTION, "fixed", load)
+
+    if session.get('is_currently_on_break') or not session.get('session_active', True):
+        return _response(config.PAUSED_INTERVAL_MS, config.LOW_RESOLUTION, "paused", load)
+
+    if session.get('grace_period_active') and now < (session.get('grace_period_until') or 0):
+        session['clean_since'] = None
+        return _response(config.FAST_INTERVAL_MS, config.FULL_RESOLUTION, "grace_period", load)
+
+    if violations_open or session.get('continuous_violation_start_time') is not None:
+        session['clean_since'] = None
+        return _response(config.FAST_INTERVAL_MS, config.FULL_RESOLUTION, "violation", load)
+
+    if not session.get('baseline_established', False):
+        return _response(config.FAST_INTERVAL_MS, config.FULL_RESOLUTION, "baseline", load)
+
+    # Clean: ramp from CLEAN to MAX_CLEAN interval over CLEAN_RAMP_SECONDS
+    if not session.get('clean_since'):
+        session['clean_since'] = now
+    clean_for = now - session['clean_since']
+    ramp = min(1.0, clean_for / max(1, config.CLEAN_RAMP_SECONDS))
+    interval = config.CLEAN_INTERVAL_MS + ramp * (config.MAX_CLEAN_INTERVAL_MS - config.CLEAN_INTERVAL_MS)
+    resolution = config.REDUCED_RESOLUTION if ramp < 1.0 else config.LOW_RESOLUTION
+    reason = "clean"
+
+    # Under load, clean users absorb the back-off
+    if load > 1.0:
+        interval = min(config.MAX_LOADED_INTERVAL_MS, interval * load)
+        resolution = config.LOW_RESOLUTION
+        reason = "clean_under_load"
+
+    return _response(interval, resolution, reason, load)
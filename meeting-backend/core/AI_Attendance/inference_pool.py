@@ -0,0 +1,713 @@
+# inference_pool.py - Process-pool MediaPipe inference for attendance behavior detection
+#
+# MediaPipe graphs are not safe to share between threads and their Python-side
+# work holds the GIL, so running them inside web worker threads caps a pod at a
+# few frames per second. This pool runs N worker processes, each owning its own
+# face / mesh / hands / pose graphs. Frames are copied into shared-memory slots
+# (no pickling of pixel data) and workers return only the landmarks the
+# attendance rules read.
+#
+# Backpressure: at most one frame per user waits for a worker. A newer frame
+# from the same user replaces the waiting one, and frames older than
+# MAX_FRAME_AGE are dropped instead of being analysed late.
+#
+# Worker crashes: every worker has its own task queue and result pipe, so a
+# monitor thread watching the process sentinels knows which jobs a dead worker
+# held. It fails their futures, returns their frame slots and respawns the
+# worker. Results are sent synchronously on the pipe (no queue feeder thread),
+# so a crash cannot leave a lock held on a channel other workers use.
+#
+# Cascade: DetectorCascade runs the cheap face detector on every frame and the
+# mesh / hands / pose graphs only when the face box moved, a violation is open
+# or a periodic refresh is due; other frames reuse the user's last landmarks.
+import atexit
+import logging
+import multiprocessing as mp_proc
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait as wait_for_sentinels
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class InferencePoolConfig:
+    """Inference pool settings (env overridable)"""
+    WORKERS = int(os.getenv("ATTENDANCE_INFERENCE_WORKERS", 0))  # 0 = run in-process
+    MAX_IN_FLIGHT_PER_WORKER = int(os.getenv("ATTENDANCE_INFERENCE_IN_FLIGHT", 2))
+    MAX_WAITING_USERS = int(os.getenv("ATTENDANCE_INFERENCE_MAX_WAITING", 256))
+    MAX_FRAME_AGE = float(os.getenv("ATTENDANCE_INFERENCE_MAX_FRAME_AGE", 2.0))
+    RESULT_TIMEOUT = float(os.getenv("ATTENDANCE_INFERENCE_TIMEOUT", 5.0))
+    RESPAWN_BACKOFF = 1.0          # seconds before replacing a dead worker
+    MAX_FRAME_WIDTH = int(os.getenv("ATTENDANCE_INFERENCE_MAX_WIDTH", 1280))
+    MAX_FRAME_HEIGHT = int(os.getenv("ATTENDANCE_INFERENCE_MAX_HEIGHT", 720))
+
+    FACE_DETECTION_CONFIDENCE = 0.7
+    MESH_DETECTION_CONFIDENCE = 0.5
+    MESH_TRACKING_CONFIDENCE = 0.5
+    HAND_DETECTION_CONFIDENCE = 0.5
+    POSE_DETECTION_CONFIDENCE = 0.5
+
+
+class CascadeConfig:
+    """Cascaded detector settings: face detection every frame, the rest on demand"""
+    ENABLED = os.getenv("ATTENDANCE_CASCADE_ENABLED", "True") == "True"
+    FACE_SHIFT_THRESHOLD = float(os.getenv("ATTENDANCE_CASCADE_FACE_SHIFT", 0.08))   # of face box size
+    FACE_AREA_THRESHOLD = float(os.getenv("ATTENDANCE_CASCADE_FACE_AREA", 0.15))     # relative area change
+    REFRESH_FRAMES = int(os.getenv("ATTENDANCE_CASCADE_REFRESH_FRAMES", 5))
+    REFRESH_SECONDS = float(os.getenv("ATTENDANCE_CASCADE_REFRESH_SECONDS", 3.0))    # well under INACTIVITY_WARNING_TIME
+    ROI_MARGIN = float(os.getenv("ATTENDANCE_CASCADE_ROI_MARGIN", 0.5))              # mesh crop padding per side
+
+
+# Landmarks the attendance rules actually read
+MESH_INDICES = (1, 2, 4, 5, 9, 10, 33, 133, 144, 153, 158, 160, 263, 362, 373, 380, 385, 387)
+HAND_INDICES = (0, 4, 5, 8, 12, 16, 20)
+POSE_INDICES = (11, 12, 23, 24, 25, 26)
+ALL_STAGES = ('face', 'mesh', 'hands', 'pose')
+DEPENDENT_STAGES = ('mesh', 'hands', 'pose')
+
+
+class Point(NamedTuple):
+    x: float
+    y: float
+
+
+class VisionResult:
+    """
+    Compact detector output. mesh / pose / each hand are dicts of landmark index
+    -> Point, so rule code can keep indexing them like MediaPipe landmark lists.
+    """
+    __slots__ = ('faces', 'mesh', 'hands', 'pose', 'stages', 'compute_ms', 'queue_ms')
+
+    def __init__(self, faces=None, mesh=None, hands=None, pose=None, stages=ALL_STAGES,
+                 compute_ms=0.0, queue_ms=0.0):
+        self.faces = faces or []
+        self.mesh = mesh
+        self.hands = hands or []
+        self.pose = pose
+        self.stages = tuple(stages)
+        self.compute_ms = compute_ms
+        self.queue_ms = queue_ms
+
+    @property
+    def face_count(self) -> int:
+        return len(self.faces)
+
+    @classmethod
+    def from_compact(cls, compact: Dict, compute_ms=0.0, queue_ms=0.0):
+        def points(d):
+            return {i: Point(*xy) for i, xy in d.items()} if d is not None else None
+        return cls(
+            faces=compact.get('faces'),
+            mesh=points(compact.get('mesh')),
+            hands=[points(h) for h in compact.get('hands', [])],
+            pose=points(compact.get('pose')),
+            stages=compact.get('stages', ALL_STAGES),
+            compute_ms=compute_ms,
+            queue_ms=queue_ms,
+        )
+
+
+class FrameShed(Exception):
+    """Frame was dropped by backpressure (replaced by a newer frame or too old)"""
+
+
+class WorkerDied(RuntimeError):
+    """The worker process analysing the frame exited before returning a result"""
+
+
+# ==================== GRAPH EXECUTION (shared by workers and in-process path) ====================
+
+def create_graphs(config=InferencePoolConfig) -> Dict:
+    """Build one set of MediaPipe graphs; each process/thread owner needs its own"""
+    import mediapipe as mp
+    return {
+        'face': mp.solutions.face_detection.FaceDetection(
+            min_detection_confidence=config.FACE_DETECTION_CONFIDENCE),
+        'mesh': mp.solutions.face_mesh.FaceMesh(
+            refine_landmarks=True,
+            min_detection_confidence=config.MESH_DETECTION_CONFIDENCE,
+            min_tracking_confidence=config.MESH_TRACKING_CONFIDENCE),
+        'hands': mp.solutions.hands.Hands(min_detection_confidence=config.HAND_DETECTION_CONFIDENCE),
+        'pose': mp.solutions.pose.Pose(min_detection_confidence=config.POSE_DETECTION_CONFIDENCE),
+    }
+
+
+def run_graphs(graphs: Dict, rgb: np.ndarray, stages=ALL_STAGES, mesh_roi=None) -> Dict:
+    """
+    Run the requested stages on an RGB frame and return compact landmarks.
+    mesh_roi (x, y, w, h normalized) crops the mesh input to the tracked face
+    region; its landmarks are mapped back to full-frame coordinates.
+    """
+    compact = {'faces': [], 'mesh': None, 'hands': [], 'pose': None, 'stages': tuple(stages)}
+
+    if 'face' in stages:
+        detections = graphs['face'].process(rgb).detections or []
+        for det in detections:
+            box = det.location_data.relative_bounding_box
+            compact['faces'].append((box.xmin, box.ymin, box.width, box.height, float(det.score[0])))
+
+    if 'mesh' in stages:
+        mesh_input, (ox, oy, sx, sy) = rgb, (0.0, 0.0, 1.0, 1.0)
+        if mesh_roi is not None:
+            h, w = rgb.shape[:2]
+            x0, y0 = int(mesh_roi[0] * w), int(mesh_roi[1] * h)
+            x1, y1 = int((mesh_roi[0] + mesh_roi[2]) * w), int((mesh_roi[1] + mesh_roi[3]) * h)
+            if x1 - x0 >= 32 and y1 - y0 >= 32:
+                mesh_input = np.ascontiguousarray(rgb[y0:y1, x0:x1])
+                ox, oy, sx, sy = x0 / w, y0 / h, (x1 - x0) / w, (y1 - y0) / h
+        mesh_results = graphs['mesh'].process(mesh_input)
+        if mesh_results.multi_face_landmarks:
+            lm = mesh_results.multi_face_landmarks[0].landmark
+            compact['mesh'] = {i: (ox + lm[i].x * sx, oy + lm[i].y * sy) for i in MESH_INDICES}
+
+    if 'hands' in stages:
+        hands_results = graphs['hands'].process(rgb)
+        for hand in hands_results.multi_hand_landmarks or []:
+            compact['hands'].append({i: (hand.landmark[i].x, hand.landmark[i].y) for i in HAND_INDICES})
+
+    if 'pose' in stages:
+        pose_results = graphs['pose'].process(rgb)
+        if pose_results.pose_landmarks:
+            lm = pose_results.pose_landmarks.landmark
+            compact['pose'] = {i: (lm[i].x, lm[i].y) for i in POSE_INDICES}
+
+    return compact
+
+
+def expand_box(box, margin: float):
+    """Face box padded by margin (fraction of its size) per side, clipped to the frame"""
+    x, y, w, h = box[:4]
+    x0, y0 = max(0.0, x - w * margin), max(0.0, y - h * margin)
+    x1, y1 = min(1.0, x + w * (1 + margin)), min(1.0, y + h * (1 + margin))
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+def face_box_moved(prev_box, box, config=CascadeConfig) -> bool:
+    """True if the face box shifted or resized enough that cached landmarks are stale"""
+    px, py, pw, ph = prev_box[:4]
+    x, y, w, h = box[:4]
+    size = max(pw, ph, 1e-6)
+    shift = max(abs((x + w / 2) - (px + pw / 2)), abs((y + h / 2) - (py + ph / 2))) / size
+    area_change = abs(w * h - pw * ph) / max(pw * ph, 1e-6)
+    return shift > config.FACE_SHIFT_THRESHOLD or area_change > config.FACE_AREA_THRESHOLD
+
+
+def run_cascade(graphs: Dict, rgb: np.ndarray, plan: Dict, config=CascadeConfig) -> Dict:
+    """
+    Cheap face detection first; mesh / hands / pose only when the plan forces a
+    refresh, there isn't exactly one face, or the face box moved since the last
+    full pass. The mesh runs on the face ROI rather than the full frame.
+    """
+    compact = run_graphs(graphs, rgb, ('face',))
+    faces = compact['faces']
+    prev_box = plan.get('prev_box')
+
+    if not plan.get('force') and len(faces) == 1 and prev_box is not None \
+            and not face_box_moved(prev_box, faces[0], config):
+        return compact
+
+    roi = expand_box(faces[0], config.ROI_MARGIN) if len(faces) == 1 else None
+    rest = run_graphs(graphs, rgb, DEPENDENT_STAGES, mesh_roi=roi)
+    compact.update(mesh=rest['mesh'], hands=rest['hands'], pose=rest['pose'], stages=ALL_STAGES)
+    return compact
+
+
+def fit_frame(rgb: np.ndarray, max_width: int, max_height: int) -> np.ndarray:
+    """Downscale frames that don't fit a slot; landmarks are normalized so results are unchanged in kind"""
+    h, w = rgb.shape[:2]
+    if w <= max_width and h <= max_height:
+        return np.ascontiguousarray(rgb)
+    import cv2
+    scale = min(max_width / w, max_height / h)
+    return cv2.resize(rgb, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+def _worker_main(worker_index, task_queue, result_conn, slot_names):
+    """Worker process: owns its graphs, reads frames out of shared memory"""
+    graphs = create_graphs()
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+    result_conn.send(('ready', worker_index, None, None, 0.0))
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            job_id, slot_index, shape, stages, plan = task
+            started = time.perf_counter()
+            try:
+                frame = np.ndarray(shape, dtype=np.uint8, buffer=slots[slot_index].buf)
+                compact = run_cascade(graphs, frame, plan) if plan is not None else run_graphs(graphs, frame, stages)
+                result = ('done', job_id, compact, None, (time.perf_counter() - started) * 1000)
+            except Exception as e:
+                result = ('done', job_id, None, str(e), (time.perf_counter() - started) * 1000)
+            result_conn.send(result)
+    finally:
+        for shm in slots:
+            shm.close()
+        result_conn.close()
+
+
+# ==================== POOL ====================
+
+class _Job:
+    __slots__ = ('job_id', 'key', 'frame', 'stages', 'plan', 'future', 'submitted_at', 'dispatched_at', 'slot',
+                 'worker')
+
+    def __init__(self, job_id, key, frame, stages, plan=None):
+        self.job_id = job_id
+        self.key = key
+        self.frame = frame
+        self.stages = tuple(stages)
+        self.plan = plan
+        self.future = Future()
+        self.submitted_at = time.monotonic()
+        self.dispatched_at = None
+        self.slot = None
+        self.worker = None
+
+
+class VisionInferencePool:
+    """N MediaPipe worker processes fed through shared-memory frame slots"""
+
+    def __init__(self, workers: int, config=InferencePoolConfig):
+        self.config = config
+        self.workers = max(1, workers)
+        self.per_worker = max(1, config.MAX_IN_FLIGHT_PER_WORKER)
+        self.slot_count = self.workers * self.per_worker
+        self.slot_bytes = config.MAX_FRAME_WIDTH * config.MAX_FRAME_HEIGHT * 3
+
+        self._ctx = mp_proc.get_context('spawn')
+        self._slots: List[shared_memory.SharedMemory] = []
+        self._free_slots: List[int] = []
+        self._slot_names: List[str] = []
+        self._processes = []
+        self._task_queues = []
+        self._worker_load: List[int] = []       # jobs dispatched to each worker and not yet returned
+        self._worker_up: List[bool] = []
+        self._result_conns = []
+
+        self._lock = threading.Condition()
+        self._waiting: "OrderedDict[str, _Job]" = OrderedDict()  # key -> newest undispatched frame
+        self._in_flight: Dict[int, _Job] = {}
+        self._dispatching = set()   # job ids whose frame is still being copied into their slot
+        self._next_job_id = 0
+        self._running = False
+
+        self.stats = {
+            'submitted': 0, 'completed': 0, 'errors': 0,
+            'shed_replaced': 0, 'shed_stale': 0, 'shed_overflow': 0,
+            'compute_ms_total': 0.0, 'queue_ms_total': 0.0,
+            'worker_deaths': 0, 'failed_by_worker_death': 0,
+        }
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        if self._running:
+            return self
+        for _ in range(self.slot_count):
+            self._slots.append(shared_memory.SharedMemory(create=True, size=self.slot_bytes))
+        self._free_slots = list(range(self.slot_count))
+        self._slot_names = [shm.name for shm in self._slots]
+
+        self._processes = [None] * self.workers
+        self._task_queues = [None] * self.workers
+        self._worker_load = [0] * self.workers
+        self._worker_up = [False] * self.workers
+        self._result_conns = [None] * self.workers
+        for i in range(self.workers):
+            self._spawn_worker(i)
+
+        self._running = True
+        threading.Thread(target=self._collect_loop, name="inference-collector", daemon=True).start()
+        threading.Thread(target=self._dispatch_loop, name="inference-dispatcher", daemon=True).start()
+        threading.Thread(target=self._monitor_loop, name="inference-monitor", daemon=True).start()
+        logger.info(f"✅ Attendance inference pool started: {self.workers} workers, {self.slot_count} frame slots")
+        return self
+
+    def _spawn_worker(self, index: int):
+        """Start worker `index` on a fresh task queue (a dead worker's queue may hold orphaned tasks)"""
+        task_queue = self._ctx.Queue()
+        result_conn, worker_conn = self._ctx.Pipe(duplex=False)
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(index, task_queue, worker_conn, self._slot_names),
+            name=f"attendance-inference-{index}",
+            daemon=True,
+        )
+        proc.start()
+        worker_conn.close()     # only the worker holds the write end, so its exit reads as EOF
+        with self._lock:
+            self._task_queues[index] = task_queue
+            self._result_conns[index] = result_conn
+            self._processes[index] = proc
+            self._worker_up[index] = True
+            self._lock.notify_all()
+
+    def shutdown(self):
+        if not self._running:
+            return
+        with self._lock:
+            self._running = False
+            for job in self._waiting.values():
+                job.future.set_exception(FrameShed("pool shutting down"))
+            self._waiting.clear()
+            self._lock.notify_all()
+        for task_queue in self._task_queues:
+            task_queue.put(None)
+        for proc in self._processes:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        for conn in self._result_conns:
+            if conn is not None:
+                conn.close()
+        for shm in self._slots:
+            shm.close()
+            shm.unlink()
+        self._slots = []
+        logger.info("Attendance inference pool stopped")
+
+    # ---------- submission ----------
+
+    def submit(self, key: str, rgb: np.ndarray, stages=ALL_STAGES, plan: Optional[Dict] = None) -> Future:
+        """
+        Queue a frame for a user. Resolves to a VisionResult, or raises FrameShed
+        if a newer frame for the same user replaced it or it aged out. With a
+        cascade plan the worker decides which stages run (see run_cascade).
+        """
+        frame = fit_frame(rgb, self.config.MAX_FRAME_WIDTH, self.config.MAX_FRAME_HEIGHT)
+        with self._lock:
+            self._next_job_id += 1
+            job = _Job(self._next_job_id, key, frame, stages, plan)
+            self.stats['submitted'] += 1
+
+            previous = self._waiting.pop(key, None)
+            if previous is not None:
+                self.stats['shed_replaced'] += 1
+                previous.future.set_exception(FrameShed("replaced by newer frame"))
+
+            if len(self._waiting) >= self.config.MAX_WAITING_USERS:
+                _, oldest = self._waiting.popitem(last=False)
+                self.stats['shed_overflow'] += 1
+                oldest.future.set_exception(FrameShed("pool saturated"))
+
+            self._waiting[key] = job
+            self._lock.notify_all()
+        return job.future
+
+    def infer(self, key: str, rgb: np.ndarray, stages=ALL_STAGES, plan: Optional[Dict] = None,
+              timeout: Optional[float] = None) -> Optional[VisionResult]:
+        """Blocking submit; None if the frame was shed, timed out or its worker died"""
+        future = self.submit(key, rgb, stages, plan)
+        try:
+            return future.result(timeout=timeout or self.config.RESULT_TIMEOUT)
+        except (FrameShed, FutureTimeoutError, WorkerDied):
+            return None
+
+    # ---------- background threads ----------
+
+    def _pick_worker(self) -> Optional[int]:
+        """Least-loaded live worker with spare capacity (call with the lock held)"""
+        candidates = [i for i in range(self.workers)
+                      if self._worker_up[i] and self._worker_load[i] < self.per_worker]
+        return min(candidates, key=lambda i: self._worker_load[i]) if candidates else None
+
+    def _dispatch_loop(self):
+        while True:
+            with self._lock:
+                while self._running and (not self._waiting or not self._free_slots or self._pick_worker() is None):
+                    self._lock.wait(timeout=0.5)
+                if not self._running:
+                    return
+                _, job = self._waiting.popitem(last=False)
+                if time.monotonic() - job.submitted_at > self.config.MAX_FRAME_AGE:
+                    self.stats['shed_stale'] += 1
+                    job.future.set_exception(FrameShed("frame too old"))
+                    continue
+                job.slot = self._free_slots.pop()
+                job.worker = self._pick_worker()
+                job.dispatched_at = time.monotonic()
+                self._worker_load[job.worker] += 1
+                self._in_flight[job.job_id] = job
+                self._dispatching.add(job.job_id)
+
+            # The slot stays ours until the copy is done: a worker death in the
+            # meantime fails the job but leaves the slot for us to return
+            shape = job.frame.shape
+            self._write_frame(job)
+            with self._lock:
+                self._dispatching.discard(job.job_id)
+                if job.job_id in self._in_flight and self._worker_up[job.worker]:
+                    self._task_queues[job.worker].put((job.job_id, job.slot, shape, job.stages, job.plan))
+                else:
+                    self._free_slots.append(job.slot)
+                    self._lock.notify_all()
+
+    def _write_frame(self, job: _Job):
+        """Copy the job's frame into its shared-memory slot (dispatcher thread, lock not held)"""
+        view = np.ndarray(job.frame.shape, dtype=np.uint8, buffer=self._slots[job.slot].buf)
+        view[...] = job.frame
+        job.frame = None
+
+    def _monitor_loop(self):
+        """Fail a dead worker's jobs, reclaim their slots and respawn it"""
+        while self._running:
+            with self._lock:
+                sentinels = {proc.sentinel: i for i, proc in enumerate(self._processes)
+                             if proc is not None and self._worker_up[i]}
+            ready = wait_for_sentinels(list(sentinels), timeout=1.0)
+            if not self._running:
+                return
+            for sentinel in ready:
+                index = sentinels[sentinel]
+                self._on_worker_death(index)
+                time.sleep(self.config.RESPAWN_BACKOFF)
+                if not self._running:
+                    return
+                self._spawn_worker(index)
+
+    def _on_worker_death(self, index: int):
+        proc = self._processes[index]
+        proc.join(timeout=1)
+        with self._lock:
+            exitcode = proc.exitcode
+            self._worker_up[index] = False
+            lost = [job for job in self._in_flight.values() if job.worker == index]
+            for job in lost:
+                del self._in_flight[job.job_id]
+                if job.job_id not in self._dispatching:
+                    self._free_slots.append(job.slot)
+            self._worker_load[index] = 0
+            dead_conn, self._result_conns[index] = self._result_conns[index], None
+            self.stats['worker_deaths'] += 1
+            self.stats['failed_by_worker_death'] += len(lost)
+            self._lock.notify_all()
+        if dead_conn is not None:
+            dead_conn.close()   # anything still buffered belongs to the jobs failed here
+        logger.error(f"❌ Inference worker {index} exited ({exitcode}); failing {len(lost)} in-flight frames, respawning")
+        for job in lost:
+            job.future.set_exception(WorkerDied(f"inference worker {index} exited with {exitcode}"))
+
+    def _collect_loop(self):
+        while self._running:
+            with self._lock:
+                conns = [conn for conn in self._result_conns if conn is not None]
+            for conn in wait_for_sentinels(conns, timeout=0.5):
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    # Worker gone; the monitor fails its jobs and replaces the pipe
+                    with self._lock:
+                        if conn in self._result_conns:
+                            self._result_conns[self._result_conns.index(conn)] = None
+                    conn.close()
+                    continue
+                self._handle_result(*message)
+
+    def _handle_result(self, kind, job_id, compact, error, compute_ms):
+        if kind == 'ready':
+            return
+        with self._lock:
+            job = self._in_flight.pop(job_id, None)
+            if job is None:
+                return
+            self._free_slots.append(job.slot)
+            self._worker_load[job.worker] -= 1
+            queue_ms = (job.dispatched_at - job.submitted_at) * 1000
+            self.stats['completed'] += 1
+            self.stats['compute_ms_total'] += compute_ms
+            self.stats['queue_ms_total'] += queue_ms
+            if error:
+                self.stats['errors'] += 1
+            self._lock.notify_all()
+        if error:
+            job.future.set_exception(RuntimeError(error))
+        else:
+            job.future.set_result(VisionResult.from_compact(compact, compute_ms, queue_ms))
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            completed = max(1, stats['completed'])
+            stats.update({
+                'workers': self.workers,
+                'workers_up': sum(self._worker_up),
+                'in_flight': len(self._in_flight),
+                'waiting': len(self._waiting),
+                'avg_compute_ms': round(stats['compute_ms_total'] / completed, 2),
+                'avg_queue_ms': round(stats['queue_ms_total'] / completed, 2),
+            })
+        return stats
+
+
+class InProcessInference:
+    """
+    Fallback when no worker pool is configured: one set of graphs per process,
+    serialized by a lock because MediaPipe graphs are not thread-safe.
+    """
+
+    def __init__(self, graphs: Optional[Dict] = None):
+        self._graphs = graphs
+        self._lock = threading.Lock()
+        self.stats = {'completed': 0, 'compute_ms_total': 0.0, 'queue_ms_total': 0.0}
+
+    def warm(self):
+        """Build the graphs now instead of on the first frame"""
+        with self._lock:
+            if self._graphs is None:
+                self._graphs = create_graphs()
+        return self
+
+    def infer(self, key: str, rgb: np.ndarray, stages=ALL_STAGES, plan: Optional[Dict] = None,
+              timeout: Optional[float] = None) -> Optional[VisionResult]:
+        submitted = time.perf_counter()
+        with self._lock:
+            if self._graphs is None:
+                self._graphs = create_graphs()
+            started = time.perf_counter()
+            compact = run_cascade(self._graphs, rgb, plan) if plan is not None else run_graphs(self._graphs, rgb, stages)
+            compute_ms = (time.perf_counter() - started) * 1000
+            queue_ms = (started - submitted) * 1000
+            self.stats['completed'] += 1
+            self.stats['compute_ms_total'] += compute_ms
+            self.stats['queue_ms_total'] += queue_ms
+        return VisionResult.from_compact(compact, compute_ms, queue_ms)
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        completed = max(1, stats['completed'])
+        stats.update({
+            'workers': 0,
+            'avg_compute_ms': round(stats['compute_ms_total'] / completed, 2),
+            'avg_queue_ms': round(stats['queue_ms_total'] / completed, 2),
+        })
+        return stats
+
+
+_inference_backend = None
+_inference_backend_lock = threading.Lock()
+
+
+def get_inference_backend(graphs: Optional[Dict] = None):
+    """
+    Process-wide inference backend: a worker pool when ATTENDANCE_INFERENCE_WORKERS
+    > 0, otherwise lock-guarded in-process graphs.
+    """
+    global _inference_backend
+    if _inference_backend is None:
+        with _inference_backend_lock:
+            if _inference_backend is None:
+                if InferencePoolConfig.WORKERS > 0:
+                    pool = VisionInferencePool(InferencePoolConfig.WORKERS).start()
+                    atexit.register(pool.shutdown)
+                    _inference_backend = pool
+                else:
+                    _inference_backend = InProcessInference(graphs)
+    return _inference_backend
+
+
+def warm_inference_backend():
+    """Warm-up hook: start the pool workers, or build the in-process graphs"""
+    backend = get_inference_backend()
+    if isinstance(backend, InProcessInference):
+        backend.warm()
+    return backend
+
+
+class DetectorCascade:
+    """
+    Per-(meeting, user) cascade state on top of an inference backend. Keeps the
+    last face box (the mesh ROI) and the last full-pass landmarks; frames where
+    only the face detector ran reuse those landmarks.
+    """
+
+    def __init__(self, backend, config=CascadeConfig):
+        self.backend = backend
+        self.config = config
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict] = {}
+        self.counters = {stage: {'run': 0, 'skipped': 0} for stage in ALL_STAGES}
+
+    def _plan(self, key: str, force: bool) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                return {'prev_box': None, 'force': True}
+            refresh_due = (
+                state['frames_since_refresh'] >= self.config.REFRESH_FRAMES
+                or now - state['refreshed_at'] >= self.config.REFRESH_SECONDS
+            )
+            return {
+                'prev_box': state['box'],
+                'force': force or state['violation_open'] or refresh_due or not self.config.ENABLED,
+            }
+
+    def infer(self, key: str, rgb: np.ndarray, force: bool = False,
+              timeout: Optional[float] = None) -> Optional[VisionResult]:
+        """
+        Run the cascade for one frame. force=True runs every stage (e.g. while
+        the user's baseline is being sampled). None if the frame was shed.
+        """
+        result = self.backend.infer(key, rgb, plan=self._plan(key, force), timeout=timeout)
+        if result is None:
+            return None
+
+        full_pass = 'mesh' in result.stages
+        with self._lock:
+            for stage in ALL_STAGES:
+                self.counters[stage]['run' if stage in result.stages else 'skipped'] += 1
+
+            state = self._state.setdefault(key, {
+                'box': None, 'mesh': None, 'hands': [], 'pose': None,
+                'frames_since_refresh': 0, 'refreshed_at': 0.0, 'violation_open': False,
+            })
+            state['box'] = tuple(result.faces[0][:4]) if result.face_count == 1 else None
+            if full_pass:
+                state.update(mesh=result.mesh, hands=result.hands, pose=result.pose,
+                             frames_since_refresh=0, refreshed_at=time.monotonic())
+            else:
+                state['frames_since_refresh'] += 1
+                result.mesh, result.hands, result.pose = state['mesh'], state['hands'], state['pose']
+        return result
+
+    def mark_outcome(self, key: str, violation_open: bool):
+        """Record whether the frame left a violation open; open violations force full passes"""
+        with self._lock:
+            state = self._state.get(key)
+            if state is not None:
+                state['violation_open'] = violation_open
+
+    def forget(self, key: str):
+        with self._lock:
+            self._state.pop(key, None)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stages = {}
+            for stage, c in self.counters.items():
+                total = c['run'] + c['skipped']
+                stages[stage] = dict(c, skip_rate=round(c['skipped'] / total, 3) if total else 0.0)
+            return {'enabled': self.config.ENABLED, 'tracked_users': len(self._state), 'stages': stages}
+
+
+_detector_cascade = None
+
+
+def get_detector_cascade() -> DetectorCascade:
+    """Process-wide cascade over the configured inference backend"""
+    global _detector_cascade
+    if _detector_cascade is None:
+        backend = get_inference_backend()
+        with _inference_backend_lock:
+            if _detector_cascade is None:
+                _detector_cascade = DetectorCascade(backend)
+    return _detector_cascade
@@ -0,0 +1,217 @@
+"""
+Async Bridge - Persistent event loop for sync callers of face verification
+===========================================================================
+
+Sync Django views used to spin up (and tear down) a fresh asyncio event loop
+per frame just to await UnifiedFaceService.verify_face. That pays loop setup
+on every call and breaks anything bound to a loop (connection pools, clients).
+
+This module keeps ONE long-lived event loop on a daemon thread per process.
+Sync code submits coroutines (or blocking callables, which run on the loop's
+bounded executor) and gets a concurrent.futures.Future back, with a per-call
+timeout and queue-wait vs compute timing.
+
+Shared by:
+- AI Attendance (identity check inside detect_violations)
+- ContinuousVerifyFace / EnhancedAttendanceDetection (embedding extraction)
+
+Usage:
+    bridge = get_async_bridge()
+    is_verified, similarity = bridge.run(service.verify_face, frame, user_id, timeout=5)
+    embedding = bridge.call(face_model.extract_embedding, image, timeout=5)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("async_bridge")
+
+
+class AsyncBridgeConfig:
+    """Bridge configuration"""
+    EXECUTOR_WORKERS = int(os.getenv("FACE_VERIFY_WORKERS", 2))   # concurrent blocking model calls
+    DEFAULT_TIMEOUT = float(os.getenv("FACE_VERIFY_TIMEOUT", 5.0))
+    START_TIMEOUT = 5.0
+
+
+class AsyncBridge:
+    """
+    Long-lived event loop on a background thread
+
+    submit() / submit_call() return futures; run() / call() block with a timeout.
+    """
+
+    def __init__(self, name: str = "face-verify", workers: int = AsyncBridgeConfig.EXECUTOR_WORKERS):
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=f"{name}-worker")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'timed_out': 0,
+            'in_flight': 0,
+            'queue_wait_ms_total': 0.0,
+            'compute_ms_total': 0.0,
+            'max_queue_wait_ms': 0.0,
+        }
+
+    # ========================================================================
+    # LIFECYCLE
+    # ========================================================================
+
+    def start(self):
+        """Start the loop thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._started.clear()
+            self._thread = threading.Thread(target=self._run_loop, name=f"{self.name}-loop", daemon=True)
+            self._thread.start()
+        if not self._started.wait(AsyncBridgeConfig.START_TIMEOUT):
+            raise RuntimeError(f"Async bridge '{self.name}' failed to start")
+        logger.info(f"✅ Async bridge '{self.name}' started")
+        return self
+
+    def _run_loop(self):
+        loop = asyncio.new_event_loop()
+        loop.set_default_executor(self._executor)
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._started.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def stop(self):
+        """Stop the loop and executor"""
+        with self._lock:
+            if self._loop is not None and self._loop.is_running():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+            if self._thread is not None:
+                self._thread.join(timeout=5)
+            self._thread = None
+            self._loop = None
+        self._executor.shutdown(wait=False)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None or not self._loop.is_running():
+            self.start()
+        return self._loop
+
+    # ========================================================================
+    # SUBMISSION
+    # ========================================================================
+
+    def _record(self, submitted_at: float, started: float):
+        wait_ms = (started - submitted_at) * 1000
+        compute_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats['queue_wait_ms_total'] += wait_ms
+            self._stats['compute_ms_total'] += compute_ms
+            self._stats['max_queue_wait_ms'] = max(self._stats['max_queue_wait_ms'], wait_ms)
+
+    async def _timed(self, submitted_at: float, coro_fn: Callable, args, kwargs):
+        started = time.perf_counter()
+        try:
+            return await coro_fn(*args, **kwargs)
+        finally:
+            self._record(submitted_at, started)
+
+    def _track(self, future: Future) -> Future:
+        with self._lock:
+            self._stats['submitted'] += 1
+            self._stats['in_flight'] += 1
+
+        def _done(f):
+            with self._lock:
+                self._stats['in_flight'] -= 1
+                if f.cancelled():
+                    self._stats['timed_out'] += 1
+                elif f.exception() is not None:
+                    self._stats['failed'] += 1
+                else:
+                    self._stats['completed'] += 1
+
+        future.add_done_callback(_done)
+        return future
+
+    def submit(self, coro_fn: Callable, *args, **kwargs) -> Future:
+        """Schedule coro_fn(*args, **kwargs) on the bridge loop"""
+        coro = self._timed(time.perf_counter(), coro_fn, args, kwargs)
+        return self._track(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def submit_call(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Schedule a blocking callable on the bridge's executor (via the loop).
+        Queue wait here is the time spent waiting for a free executor worker.
+        """
+        submitted_at = time.perf_counter()
+
+        def _timed_call():
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._record(submitted_at, started)
+
+        async def _in_executor():
+            return await asyncio.get_running_loop().run_in_executor(None, _timed_call)
+
+        return self._track(asyncio.run_coroutine_threadsafe(_in_executor(), self.loop))
+
+    def _wait(self, future: Future, timeout: Optional[float]):
+        try:
+            return future.result(timeout=timeout if timeout is not None else AsyncBridgeConfig.DEFAULT_TIMEOUT)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def run(self, coro_fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Blocking run of a coroutine function; raises FutureTimeoutError after timeout"""
+        return self._wait(self.submit(coro_fn, *args, **kwargs), timeout)
+
+    def call(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Blocking run of a sync callable on the shared executor; raises FutureTimeoutError after timeout"""
+        return self._wait(self.submit_call(fn, *args, **kwargs), timeout)
+
+    # ========================================================================
+    # METRICS
+    # ========================================================================
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        finished = max(1, stats['completed'] + stats['failed'])
+        stats['avg_queue_wait_ms'] = round(stats['queue_wait_ms_total'] / finished, 2)
+        stats['avg_compute_ms'] = round(stats['compute_ms_total'] / finished, 2)
+        stats['running'] = self._loop is not None and self._loop.is_running()
+        return stats
+
+
+# ============================================================================
+# SINGLETON
+# ============================================================================
+
+_bridge_instance: Optional[AsyncBridge] = None
+_bridge_lock = threading.Lock()
+
+
+def get_async_bridge() -> AsyncBridge:
+    """Get the process-wide async bridge (started on first use)"""
+    global _bridge_instance
+    if _bridge_instance is None:
+        with _bridge_lock:
+            if _bridge_instance is None:
+                _bridge_instance = AsyncBridge().start()
+    return _bridge_instance
@@ -0,0 +1,362 @@
+"""
+Embedding Store - Meeting-scoped face embedding prefetch shared through Redis
+============================================================================
+
+Every worker used to load a user's embeddings from Mongo on its first
+verification (UnifiedFaceService cache miss, MeetingContinuousVerifier
+init), so a large meeting starting stampeded Mongo with the same cold
+lookups from every process.
+
+Now:
+- prefetch_meeting() resolves a meeting's host, invitees and participants,
+  loads all their embeddings with one $in query and writes them to Redis as
+  packed float32 (one key per user, TTL'd, empty users cached briefly too)
+- get_embeddings() reads Redis first and only falls back to Mongo for a miss
+  (then writes the result back for the other workers)
+- invalidate() drops a user's key and bumps their generation so process-local
+  caches (EmbeddingCache) holding the old templates drop them on next check
+- a Mongo fallback is written back only if the user's generation is still
+  the one read before the load (Lua compare-and-set), so a reader racing an
+  invalidate() cannot re-publish the old templates for the whole TTL
+
+Value layout:  !II (meta_len, dim) | JSON {ids, det_scores} | float32 rows
+"""
+
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("embedding_store")
+
+
+class EmbeddingStoreConfig:
+    """Shared embedding store configuration"""
+    ENABLED = os.getenv("FACE_EMBEDDING_STORE_ENABLED", "True") == "True"
+    KEY_PREFIX = "face:emb"
+    GENERATION_KEY = "face:emb:gen"          # hash user_id -> generation
+    PREFETCHED_KEY_PREFIX = "face:emb:prefetched"
+    PREFETCH_ONCE_TTL = 3600                 # one prefetch per meeting per hour
+    TTL = int(os.getenv("FACE_EMBEDDING_STORE_TTL", 4 * 3600))
+    EMPTY_TTL = int(os.getenv("FACE_EMBEDDING_STORE_EMPTY_TTL", 300))   # users with no embeddings
+    PREFETCH_CHUNK = 500                     # users per $in query / Redis pipeline
+
+
+_HEADER = struct.Struct("!II")
+
+# KEYS: generation hash, embedding key. ARGV: user_id, expected generation, ttl, value
+_SET_IF_GENERATION_LUA = """
+local current = redis.call('HGET', KEYS[1], ARGV[1]) or '0'
+if current == ARGV[2] then
+    redis.call('SETEX', KEYS[2], ARGV[3], ARGV[4])
+    return 1
+end
+return 0
+"""
+
+
+def pack_embeddings(embeddings: List[Dict]) -> bytes:
+    """[{'embedding', 'embedding_id', 'det_score'}] -> packed bytes"""
+    if not embeddings:
+        return _HEADER.pack(0, 0)
+    matrix = np.ascontiguousarray(
+        np.stack([np.asarray(e['embedding'], dtype=np.float32).ravel() for e in embeddings]),
+        dtype='<f4'
+    )
+    meta = json.dumps({
+        'ids': [str(e.get('embedding_id')) for e in embeddings],
+        'det_scores': [float(e.get('det_score') or 0.0) for e in embeddings],
+    }).encode('utf-8')
+    return _HEADER.pack(len(meta), matrix.shape[1]) + meta + matrix.tobytes()
+
+
+def unpack_embeddings(data: bytes) -> List[Dict]:
+    """Inverse of pack_embeddings; rows are read-only views into one buffer"""
+    meta_len, dim = _HEADER.unpack_from(data, 0)
+    if not meta_len:
+        return []
+    meta = json.loads(data[_HEADER.size:_HEADER.size + meta_len].decode('utf-8'))
+    matrix = np.frombuffer(data, dtype='<f4', offset=_HEADER.size + meta_len).reshape(-1, dim)
+    return [
+        {'embedding': matrix[i], 'embedding_id': embedding_id, 'det_score': meta['det_scores'][i]}
+        for i, embedding_id in enumerate(meta['ids'])
+    ]
+
+
+def _standardize(docs: List[Dict]) -> List[Dict]:
+    """Mongo embedding documents -> the dicts the verifiers use"""
+    return [
+        {
+            'embedding': np.asarray(doc['embedding'], dtype=np.float32),
+            'embedding_id': str(doc['_id']),
+            'det_score': doc.get('det_score', 0.0),
+        }
+        for doc in docs if doc.get('embedding')
+    ]
+
+
+class SharedEmbeddingStore:
+    """Redis-backed embedding store shared by every worker, Mongo behind it"""
+
+    def __init__(self):
+        self._redis = None
+        self._redis_lock = threading.Lock()
+        self._set_if_generation = None
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'redis_hits': 0,
+            'redis_misses': 0,
+            'mongo_queries': 0,
+            'users_prefetched': 0,
+            'invalidations': 0,
+            'stale_writes_skipped': 0,
+        }
+
+    def _bump(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _key(self, user_id) -> str:
+        return f"{EmbeddingStoreConfig.KEY_PREFIX}:{int(user_id)}"
+
+    def _client(self):
+        """Binary-safe client on the same Redis the rest of the app found"""
+        if self._redis is None:
+            with self._redis_lock:
+                if self._redis is None:
+                    try:
+                        import redis
+                        from core.WebSocketConnection import participants
+                        if participants.get_redis() is None:
+                            return None
+                        self._redis = redis.StrictRedis(**{**participants.REDIS_CONFIG, 'decode_responses': False})
+                    except Exception as e:
+                        logger.warning(f"⚠️  Embedding store Redis unavailable: {e}")
+                        return None
+        return self._redis
+
+    # ========================================================================
+    # READ
+    # ========================================================================
+
+    def get_embeddings(self, user_id: int) -> List[Dict]:
+        """User's embeddings from Redis, else Mongo (written back to Redis)"""
+        return self.get_many([user_id]).get(int(user_id), [])
+
+    def get_many(self, user_ids: Iterable[int]) -> Dict[int, List[Dict]]:
+        """Embeddings for many users: one MGET, then one $in query for the misses"""
+        user_ids = sorted({int(u) for u in user_ids})
+        result: Dict[int, List[Dict]] = {}
+        r = self._client() if EmbeddingStoreConfig.ENABLED else None
+
+        missing = user_ids
+        if r is not None and user_ids:
+            try:
+                values = r.mget([self._key(u) for u in user_ids])
+                missing = []
+                for user_id, value in zip(user_ids, values):
+                    if value is None:
+                        missing.append(user_id)
+                    else:
+                        result[user_id] = unpack_embeddings(value)
+                self._bump('redis_hits', len(user_ids) - len(missing))
+                self._bump('redis_misses', len(missing))
+            except Exception as e:
+                logger.warning(f"⚠️  Embedding store read failed, using Mongo: {e}")
+                missing = [u for u in user_ids if u not in result]
+
+        if missing:
+            # Read the generations before Mongo: an invalidate() landing during
+            # the load bumps them, and the stale result is then not written back
+            generations = self._generations(r, missing) if r is not None else None
+            loaded = self._load_from_mongo(missing)
+            result.update(loaded)
+            if generations is not None:
+                self._write(loaded, generations)
+        return result
+
+    def _generations(self, r, user_ids: List[int]) -> Optional[Dict[int, int]]:
+        try:
+            values = r.hmget(EmbeddingStoreConfig.GENERATION_KEY, user_ids)
+            return {u: int(v) if v else 0 for u, v in zip(user_ids, values)}
+        except Exception as e:
+            logger.warning(f"⚠️  Embedding generations unavailable, not caching the Mongo load: {e}")
+            return None
+
+    def _load_from_mongo(self, user_ids: List[int]) -> Dict[int, List[Dict]]:
+        from core.UserDashBoard.face_embeddings import get_embeddings_for_users
+        loaded = {}
+        chunk = EmbeddingStoreConfig.PREFETCH_CHUNK
+        for i in range(0, len(user_ids), chunk):
+            docs_by_user = get_embeddings_for_users(user_ids[i:i + chunk])
+            self._bump('mongo_queries')
+            for user_id, docs in docs_by_user.items():
+                loaded[user_id] = _standardize(docs)
+        return loaded
+
+    def _write(self, embeddings_by_user: Dict[int, List[Dict]], generations: Dict[int, int]):
+        """SETEX each user's embeddings unless their generation moved past generations[user]"""
+        r = self._client() if EmbeddingStoreConfig.ENABLED else None
+        if r is None or not embeddings_by_user:
+            return
+        try:
+            if self._set_if_generation is None:
+                self._set_if_generation = r.register_script(_SET_IF_GENERATION_LUA)
+            pipe = r.pipeline(transaction=False)
+            for user_id, embeddings in embeddings_by_user.items():
+                ttl = EmbeddingStoreConfig.TTL if embeddings else EmbeddingStoreConfig.EMPTY_TTL
+                self._set_if_generation(
+                    keys=[EmbeddingStoreConfig.GENERATION_KEY, self._key(user_id)],
+                    args=[int(user_id), generations.get(user_id, 0), ttl, pack_embeddings(embeddings)],
+                    client=pipe
+                )
+            written = sum(pipe.execute())
+            if written < len(embeddings_by_user):
+                self._bump('stale_writes_skipped', len(embeddings_by_user) - written)
+        except Exception as e:
+            logger.warning(f"⚠️  Embedding store write failed: {e}")
+
+    # ========================================================================
+    # PREFETCH / INVALIDATION
+    # ========================================================================
+
+    def prefetch_users(self, user_ids: Iterable[int]) -> Dict:
+        """Bulk-load users into Redis, skipping the ones already there"""
+        started = time.perf_counter()
+        user_ids = sorted({int(u) for u in user_ids if u is not None})
+        loaded = self.get_many(user_ids)
+        with_embeddings = sum(1 for v in loaded.values() if v)
+        self._bump('users_prefetched', len(user_ids))
+        summary = {
+            'users': len(user_ids),
+            'with_embeddings': with_embeddings,
+            'seconds': round(time.perf_counter() - started, 3),
+        }
+        logger.info(f"✅ Prefetched embeddings: {summary}")
+        return summary
+
+    def prefetch_meeting(self, meeting_id: str) -> Dict:
+        """Prefetch the host, invitees and current participants of a meeting"""
+        from django.db import connection
+        user_ids = set()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT Host_ID FROM tbl_Meetings WHERE ID = %s", [meeting_id])
+            row = cursor.fetchone()
+            if row and row[0]:
+                user_ids.add(row[0])
+            for query in (
+                "SELECT DISTINCT User_ID FROM tbl_Meeting_Invitations WHERE Meeting_ID = %s AND User_ID IS NOT NULL",
+                "SELECT DISTINCT User_ID FROM tbl_Participants WHERE Meeting_ID = %s AND User_ID IS NOT NULL",
+            ):
+                try:
+                    cursor.execute(query, [meeting_id])
+                    user_ids.update(r[0] for r in cursor.fetchall())
+                except Exception as e:
+                    logger.warning(f"⚠️  Prefetch lookup failed for meeting {meeting_id}: {e}")
+
+        numeric = []
+        for user_id in user_ids:
+            try:
+                numeric.append(int(user_id))
+            except (TypeError, ValueError):
+                continue
+        return {'meeting_id': str(meeting_id), **self.prefetch_users(numeric)}
+
+    def generation(self, user_id: int) -> int:
+        """Current generation for a user (bumped on every invalidate)"""
+        r = self._client()
+        if r is None:
+            return 0
+        try:
+            value = r.hget(EmbeddingStoreConfig.GENERATION_KEY, int(user_id))
+            return int(value) if value else 0
+        except Exception:
+            return 0
+
+    def invalidate(self, user_id: int):
+        """Drop a user's shared embeddings after they change"""
+        self._bump('invalidations')
+        r = self._client()
+        if r is None:
+            return
+        try:
+            # MULTI: no compare-and-set write can land between the bump and the delete
+            pipe = r.pipeline(transaction=True)
+            pipe.hincrby(EmbeddingStoreConfig.GENERATION_KEY, int(user_id), 1)
+            pipe.delete(self._key(user_id))
+            pipe.execute()
+            logger.info(f"🧹 Invalidated shared embeddings for user {user_id}")
+        except Exception as e:
+            logger.warning(f"⚠️  Embedding invalidation failed for user {user_id}: {e}")
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats['redis_hits'] + stats['redis_misses']
+        stats['redis_hit_rate'] = f"{(stats['redis_hits'] / lookups * 100) if lookups else 0:.1f}%"
+        stats['redis_connected'] = self._redis is not None
+        return stats
+
+
+_store_instance: Optional[SharedEmbeddingStore] = None
+_store_lock = threading.Lock()
+
+
+def get_embedding_store() -> SharedEmbeddingStore:
+    """Process-wide shared embedding store"""
+    global _store_instance
+    if _store_instance is None:
+        with _store_lock:
+            if _store_instance is None:
+                _store_instance = SharedEmbeddingStore()
+    return _store_instance
+
+
+def invalidate_user_embeddings(user_id: int):
+    """Convenience hook for code that changes a user's embeddings"""
+    get_embedding_store().invalidate(user_id)
+
+
+def schedule_meeting_prefetch(meeting_id: str) -> Optional[str]:
+    """
+    Prefetch a meeting's embeddings in the background, once per meeting:
+    safe to call on every join. Runs on Celery when a broker is configured,
+    else on a daemon thread. Returns how it was dispatched, or None if skipped.
+    """
+    if not EmbeddingStoreConfig.ENABLED:
+        return None
+    store = get_embedding_store()
+    r = store._client()
+    if r is not None:
+        try:
+            key = f"{EmbeddingStoreConfig.PREFETCHED_KEY_PREFIX}:{meeting_id}"
+            if not r.set(key, b"1", nx=True, ex=EmbeddingStoreConfig.PREFETCH_ONCE_TTL):
+                return None
+        except Exception as e:
+            logger.debug(f"Prefetch gate unavailable for meeting {meeting_id}: {e}")
+
+    from django.conf import settings
+    if getattr(settings, 'CELERY_BROKER_URL', None):
+        try:
+            from core.scheduler.tasks import prefetch_meeting_embeddings_task
+            prefetch_meeting_embeddings_task.delay(str(meeting_id))
+            return 'celery'
+        except Exception as e:
+            logger.warning(f"⚠️  Celery dispatch failed, prefetching in thread: {e}")
+
+    def _run():
+        from django.db import connection
+        try:
+            store.prefetch_meeting(meeting_id)
+        except Exception as e:
+            logger.error(f"❌ Embedding prefetch failed for meeting {meeting_id}: {e}")
+        finally:
+            connection.close()
+
+    threading.Thread(target=_run, name="embedding-prefetch", daemon=True).start()
+    return 'thread'
@@ -37,10 +37,17 @@ from channels.routing import ProtocolTypeRouter
 from pymongo import MongoClient
 from bson import ObjectId
 from PIL import Image
-from insightface.app import FaceAnalysis
 import logging
 from datetime import datetime, timedelta
 import base64
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from core.utils.lazy_imports import lazy_model
+
+try:
+    from core.FaceAuth.async_bridge import get_async_bridge
+except ImportError:
+    from async_bridge import get_async_bridge
 
 # Configure logging
 logging.basicConfig(
@@ -193,6 +200,7 @@ class FaceModel:
     """Singleton class for InsightFace model management"""
     _instance = None
     _initialized = False
+    _remote = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -201,8 +209,19 @@ class FaceModel:
 
     def __init__(self):
         if not self._initialized:
+            from core.FaceAuth.face_model_server import use_face_model_server, get_face_model_client
+            if use_face_model_server():
+                # Pod runs a face model server; no local weights in this process
+                self.app = None
+                self._remote = get_face_model_client()
+                self._initialized = True
+                logger.info(f"✅ Face auth model using face model server at {self._remote.socket_path}")
+                return
+
+            self._remote = None
             logger.info(f"🔹 Initializing InsightFace model: {FACE_MODEL_NAME}...")
             try:
+                from insightface.app import FaceAnalysis
                 self.app = FaceAnalysis(
                     name=FACE_MODEL_NAME,
                     providers=['CPUExecutionProvider']
@@ -256,7 +275,7 @@ class FaceModel:
                 raise ValueError("Invalid image data type")
             
             # Detect all faces in image
-            faces = self.app.get(np_img)
+            faces = self._remote.analyze(np_img) if self._remote is not None else self.app.get(np_img)
             
             if not faces:
                 raise ValueError("No face detected in the image. Please ensure your face is clearly visible and well-lit.")
@@ -317,7 +336,13 @@ class FaceModel:
             raise ValueError(f"Failed to process image: {str(e)}")
 
 
-face_model = FaceModel()     
+# Constructed on first use so importing this module doesn't load InsightFace
+face_model = lazy_model("face_auth", FaceModel)
+
+
+def get_face_auth_model():
+    """The loaded FaceModel instance (used by the warm-up hook)"""
+    return face_model.lazy_instance()
 # ---------------------------------------------------------------------
 # Utility Functions
 # ---------------------------------------------------------------------
@@ -1052,9 +1077,19 @@ class ContinuousVerifyFace(APIView):
             
             try:
                 logger.info(f"📸 Extracting face embedding for manual continuous verification...")
-                live_embedding = face_model.extract_embedding(image_file)
+                live_embedding = get_async_bridge().call(face_model.extract_embedding, image_file)
                 logger.info(f"✅ Live embedding extracted successfully")
                 
+            except FutureTimeoutError:
+                logger.warning(f"⏱️ Embedding extraction timed out for user {user_id} - verifier busy")
+                return JsonResponse({
+                    "allowed": False,
+                    "error": "Face verification is busy, please retry",
+                    "error_code": "VERIFICATION_BUSY",
+                    "action": "retry",
+                    "violations": violations_count
+                }, status=503)
+                
             except ValueError as ve:
                 violation = {
                     "reason": str(ve),
@@ -1250,7 +1285,7 @@ class EnhancedAttendanceDetection(APIView):
                     logger.info("📸 Extracting face embedding from frame...")
                     
                     # Extract face embedding
-                    live_embedding = face_model.extract_embedding(frame_data)
+                    live_embedding = get_async_bridge().call(face_model.extract_embedding, frame_data)
                     
                     # Get stored embedding
                     user_record = get_user_embedding(user_id)
@@ -1399,6 +1434,19 @@ class EnhancedAttendanceDetection(APIView):
                                 "camera_state": state_info["new_state"]
                             })
                 
+                except FutureTimeoutError:
+                    # Leave pending_reverification set so the next frame retries
+                    logger.warning(f"⏱️ Automatic verification timed out for user {user_id} - verifier busy")
+                    return JsonResponse({
+                        "status": "verification_busy",
+                        "message": "Face verification is busy - retrying with the next frame",
+                        "attendance_percentage": 100,
+                        "engagement_score": 100,
+                        "violations": [],
+                        "session_active": True,
+                        "camera_state": state_info["new_state"]
+                    })
+
                 except Exception as e:
                     logger.error(f"❌ Automatic verification error: {e}", exc_info=True)
                     
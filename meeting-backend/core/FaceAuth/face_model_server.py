@@ -0,0 +1,332 @@
+"""
+Face Model Server - One InsightFace model per pod, shared over a Unix socket
+============================================================================
+
+SharedFaceModel (face_model_shared.py) and FaceModel (face_auth.py) are
+per-process singletons, so with N gunicorn workers a pod holds N or more
+copies of the same weights. When FACE_MODEL_SERVER_ENABLED=True:
+
+- one server process (manage.py run_face_model_server) loads the model once
+  and listens on FACE_MODEL_SERVER_SOCKET
+- worker processes keep calling extract_embedding / detect_face /
+  compare_embeddings as before; only the detector call (app.get) is sent to
+  the server as raw pixels, and faces come back with float32 embeddings
+- the server drains whatever requests are queued (up to MAX_BATCH) on a
+  single model thread, so concurrent requests from all workers share one
+  model without contending for it. FaceAnalysis.get takes one image, so a
+  batch runs back to back rather than as one tensor; nothing waits for a
+  batch to fill.
+
+Wire format (both directions):
+    !II header_len payload_len | JSON header | payload bytes
+"""
+
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("face_model_server")
+
+
+class FaceModelServerConfig:
+    """Face model server configuration"""
+    ENABLED = os.getenv("FACE_MODEL_SERVER_ENABLED", "False") == "True"
+    SOCKET_PATH = os.getenv("FACE_MODEL_SERVER_SOCKET", "/tmp/face_model.sock")
+    MAX_BATCH = int(os.getenv("FACE_MODEL_SERVER_MAX_BATCH", 16))
+    CLIENT_TIMEOUT = float(os.getenv("FACE_MODEL_SERVER_TIMEOUT", 10))
+    EMBEDDING_DIM = 512
+
+
+_HEADER = struct.Struct("!II")
+
+# Set in the server process so get_face_model() there loads the real model
+_SERVING = False
+
+
+def use_face_model_server() -> bool:
+    """True if this process should send model calls to the face model server"""
+    return FaceModelServerConfig.ENABLED and not _SERVING
+
+
+# ============================================================================
+# WIRE PROTOCOL
+# ============================================================================
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("face model server connection closed")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def send_message(sock: socket.socket, header: Dict, payload: bytes = b""):
+    header_bytes = json.dumps(header).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(header_bytes), len(payload)) + header_bytes + payload)
+
+
+def recv_message(sock: socket.socket):
+    header_len, payload_len = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    header = json.loads(_recv_exact(sock, header_len).decode("utf-8"))
+    payload = _recv_exact(sock, payload_len) if payload_len else b""
+    return header, payload
+
+
+def _encode_faces(faces) -> Tuple[List[Dict], bytes]:
+    """InsightFace Face objects -> JSON metadata + concatenated float32 embeddings"""
+    meta, embeddings = [], []
+    for face in faces:
+        meta.append({
+            'bbox': face.bbox.tolist(),
+            'kps': face.kps.tolist() if getattr(face, 'kps', None) is not None else None,
+            'det_score': float(face.det_score),
+            'age': int(face.age) if getattr(face, 'age', None) is not None else None,
+            'gender': int(face.gender) if getattr(face, 'gender', None) is not None else None,
+        })
+        embeddings.append(np.asarray(face.embedding, dtype=np.float32))
+    payload = np.concatenate(embeddings).tobytes() if embeddings else b""
+    return meta, payload
+
+
+class RemoteFace:
+    """
+    Face returned by the server. Mirrors the InsightFace Face attributes the
+    callers read (bbox, kps, det_score, embedding, and age / gender only when
+    the model produced them, since callers test with hasattr).
+    """
+
+    def __init__(self, meta: Dict, embedding: np.ndarray):
+        self.bbox = np.asarray(meta['bbox'], dtype=np.float32)
+        self.det_score = meta['det_score']
+        self.embedding = embedding
+        if meta.get('kps') is not None:
+            self.kps = np.asarray(meta['kps'], dtype=np.float32)
+        if meta.get('age') is not None:
+            self.age = meta['age']
+        if meta.get('gender') is not None:
+            self.gender = meta['gender']
+
+
+def _decode_faces(meta: List[Dict], payload: bytes) -> List[RemoteFace]:
+    dim = FaceModelServerConfig.EMBEDDING_DIM
+    vectors = np.frombuffer(payload, dtype=np.float32).reshape(len(meta), -1) if meta else np.empty((0, dim))
+    return [RemoteFace(m, vectors[i].copy()) for i, m in enumerate(meta)]
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+class _Job:
+    __slots__ = ('image', 'event', 'faces', 'error', 'submitted_at')
+
+    def __init__(self, image):
+        self.image = image
+        self.event = threading.Event()
+        self.faces = None
+        self.error = None
+        self.submitted_at = time.perf_counter()
+
+
+class FaceModelServer:
+    """Owns the model; connection threads enqueue jobs, one model thread runs them"""
+
+    def __init__(self, socket_path: str = FaceModelServerConfig.SOCKET_PATH):
+        self.socket_path = socket_path
+        self._jobs: "queue.Queue[_Job]" = queue.Queue()
+        self._app = None
+        self._server = None
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'errors': 0,
+            'batches': 0,
+            'wait_ms_total': 0.0,
+            'compute_ms_total': 0.0,
+        }
+
+    def _load_model(self):
+        global _SERVING
+        _SERVING = True
+        from core.FaceAuth.face_model_shared import get_face_model
+        self._app = get_face_model().get_app()
+        logger.info("✅ Face model server: model loaded")
+
+    def _model_loop(self):
+        max_batch = FaceModelServerConfig.MAX_BATCH
+        while True:
+            batch = [self._jobs.get()]
+            while len(batch) < max_batch:
+                try:
+                    batch.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+
+            for job in batch:
+                started = time.perf_counter()
+                try:
+                    job.faces = self._app.get(job.image)
+                except Exception as e:
+                    job.error = str(e)
+                compute_ms = (time.perf_counter() - started) * 1000
+                with self._stats_lock:
+                    self.stats['requests'] += 1
+                    self.stats['errors'] += 1 if job.error else 0
+                    self.stats['wait_ms_total'] += (started - job.submitted_at) * 1000
+                    self.stats['compute_ms_total'] += compute_ms
+                job.event.set()
+            with self._stats_lock:
+                self.stats['batches'] += 1
+
+    def analyze(self, image: np.ndarray):
+        job = _Job(image)
+        self._jobs.put(job)
+        job.event.wait()
+        if job.error:
+            raise RuntimeError(job.error)
+        return job.faces
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        requests = max(1, stats['requests'])
+        stats['avg_batch_size'] = round(stats['requests'] / max(1, stats['batches']), 2)
+        stats['avg_wait_ms'] = round(stats['wait_ms_total'] / requests, 2)
+        stats['avg_compute_ms'] = round(stats['compute_ms_total'] / requests, 2)
+        stats['queue_depth'] = self._jobs.qsize()
+        return stats
+
+    def serve_forever(self):
+        self._load_model()
+        threading.Thread(target=self._model_loop, name="face-model", daemon=True).start()
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        owner = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        header, payload = recv_message(self.request)
+                    except (ConnectionError, OSError):
+                        return
+                    op = header.get('op')
+                    try:
+                        if op == 'analyze':
+                            image = np.frombuffer(payload, dtype=header['dtype']).reshape(header['shape'])
+                            meta, out = _encode_faces(owner.analyze(image))
+                            send_message(self.request, {'ok': True, 'faces': meta}, out)
+                        elif op == 'ping':
+                            send_message(self.request, {'ok': True})
+                        elif op == 'stats':
+                            send_message(self.request, {'ok': True, 'stats': owner.get_stats()})
+                        else:
+                            send_message(self.request, {'ok': False, 'error': f"unknown op {op}"})
+                    except Exception as e:
+                        send_message(self.request, {'ok': False, 'error': str(e)})
+
+        socketserver.ThreadingUnixStreamServer.daemon_threads = True
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        os.chmod(self.socket_path, 0o660)
+        logger.info(f"✅ Face model server listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+class FaceModelClient:
+    """Per-thread persistent connections to the face model server"""
+
+    def __init__(self, socket_path: str = FaceModelServerConfig.SOCKET_PATH,
+                 timeout: float = FaceModelServerConfig.CLIENT_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _drop_connection(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+
+    def _request(self, header: Dict, payload: bytes = b""):
+        # One retry on a fresh connection covers server restarts
+        for attempt in (1, 2):
+            try:
+                sock = self._connection()
+                send_message(sock, header, payload)
+                response, body = recv_message(sock)
+                break
+            except (ConnectionError, OSError) as e:
+                self._drop_connection()
+                if attempt == 2:
+                    raise RuntimeError(f"Face model server unavailable: {e}")
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error', 'face model server error'))
+        return response, body
+
+    def analyze(self, image: np.ndarray) -> List[RemoteFace]:
+        """Run the detector + recognizer on a numpy image (same as FaceAnalysis.get)"""
+        image = np.ascontiguousarray(image)
+        response, body = self._request(
+            {'op': 'analyze', 'shape': list(image.shape), 'dtype': str(image.dtype)},
+            image.tobytes()
+        )
+        return _decode_faces(response['faces'], body)
+
+    def ping(self) -> bool:
+        try:
+            self._request({'op': 'ping'})
+            return True
+        except RuntimeError:
+            return False
+
+    def get_stats(self) -> Dict:
+        response, _ = self._request({'op': 'stats'})
+        return response['stats']
+
+
+_client_instance: Optional[FaceModelClient] = None
+_client_lock = threading.Lock()
+
+
+def get_face_model_client() -> FaceModelClient:
+    """Process-wide face model server client"""
+    global _client_instance
+    if _client_instance is None:
+        with _client_lock:
+            if _client_instance is None:
+                _client_instance = FaceModelClient()
+    return _client_instance
@@ -31,7 +31,6 @@ import numpy as np
 from io import BytesIO
 from PIL import Image
 import cv2
-from insightface.app import FaceAnalysis
 import logging
 
 # ============================================================================
@@ -62,6 +61,7 @@ class SharedFaceModel:
     _instance = None
     _initialized = False
     _app = None
+    _remote = None  # FaceModelClient when the pod runs a face model server
 
     def __new__(cls):
         if cls._instance is None:
@@ -74,11 +74,18 @@ class SharedFaceModel:
             self._initialized = True
 
     def _initialize_model(self):
-        """Initialize InsightFace model once"""
+        """Initialize InsightFace model once (or connect to the pod's face model server)"""
+        from core.FaceAuth.face_model_server import use_face_model_server, get_face_model_client
+        if use_face_model_server():
+            self._remote = get_face_model_client()
+            logger.info(f"✅ Shared face model using face model server at {self._remote.socket_path}")
+            return
+
         try:
             logger.info(f"🔹 Initializing Shared InsightFace Model: {FACE_MODEL_NAME}")
             logger.info(f"   Detection Size: {FACE_DETECTION_SIZE}")
             
+            from insightface.app import FaceAnalysis  # heavy; imported on first model load
             self._app = FaceAnalysis(
                 name=FACE_MODEL_NAME,
                 providers=['CUDAExecutionProvider', 'CPUExecutionProvider']
@@ -127,14 +134,24 @@ class SharedFaceModel:
             
     def get_app(self):
         """Get the FaceAnalysis app instance"""
+        if self._remote is not None:
+            raise RuntimeError("FaceAnalysis app lives in the face model server process")
         if self._app is None:
             raise RuntimeError("FaceAnalysis model not initialized")
         return self._app
 
     def is_ready(self):
         """Check if model is ready"""
+        if self._remote is not None:
+            return self._remote.ping()
         return self._app is not None
 
+    def _detect_faces(self, np_img):
+        """Detector + recognizer pass, locally or on the face model server"""
+        if self._remote is not None:
+            return self._remote.analyze(np_img)
+        return self._app.get(np_img)
+
     def extract_embedding(self, image_data, return_face_info=False):
         """
         Extract face embedding from image.
@@ -169,7 +186,7 @@ class SharedFaceModel:
             np_img = self._convert_to_numpy(image_data)
             
             # Detect faces
-            faces = self._app.get(np_img)
+            faces = self._detect_faces(np_img)
             
             if not faces:
                 raise ValueError("No face detected. Ensure face is clearly visible and well-lit.")
@@ -269,7 +286,7 @@ class SharedFaceModel:
         """
         try:
             np_img = self._convert_to_numpy(image_data)
-            faces = self._app.get(np_img)
+            faces = self._detect_faces(np_img)
             
             if not faces:
                 return {
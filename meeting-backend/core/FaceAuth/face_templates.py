@@ -0,0 +1,170 @@
+"""
+Face Templates - Vectorized comparison against stored face embeddings
+=====================================================================
+
+A user's stored embeddings ("templates") are stacked once, when they are
+loaded, into a contiguous float32 matrix with L2-normalized rows. Verifying a
+live frame is then a single matrix-vector product instead of one
+compare_embeddings() call (and list -> array conversion) per template.
+
+Similarities match compare_embeddings(): cosine -> 1 - cosine distance,
+euclidean -> 1 - L2 distance. Templates compare_embeddings would reject
+(zero vectors, wrong dimension) are dropped at build time.
+
+Usage:
+    templates = TemplateSet.from_embeddings(embeddings_list)
+    max_similarity, best_id, similarities = templates.best_match(live_embedding)
+
+    index = TemplateIndex({user_id: templates, ...})
+    scores = index.match_batch(live_matrix, [user_id, ...])
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("face_templates")
+
+_EPS = 1e-12
+
+
+def _as_matrix(vectors) -> np.ndarray:
+    return np.ascontiguousarray(np.asarray(vectors, dtype=np.float32))
+
+
+class TemplateSet:
+    """One user's templates as a normalized (k, d) float32 matrix"""
+
+    __slots__ = ('matrix', 'norms', 'embedding_ids', 'dim')
+
+    def __init__(self, matrix: np.ndarray, norms: np.ndarray, embedding_ids: List[str]):
+        self.matrix = matrix
+        self.norms = norms
+        self.embedding_ids = embedding_ids
+        self.dim = matrix.shape[1] if matrix.ndim == 2 else 0
+
+    @classmethod
+    def from_embeddings(cls, embeddings: List[Dict]) -> "TemplateSet":
+        """Build from the [{'embedding', 'embedding_id', ...}] lists the caches hold"""
+        rows, ids = [], []
+        dim = None
+        for entry in embeddings or []:
+            vector = np.asarray(entry.get('embedding'), dtype=np.float32).ravel()
+            if vector.size == 0:
+                continue
+            if dim is None:
+                dim = vector.size
+            elif vector.size != dim:
+                logger.warning(f"⚠️  Skipping template {entry.get('embedding_id')}: dimension {vector.size} != {dim}")
+                continue
+            rows.append(vector)
+            ids.append(entry.get('embedding_id'))
+
+        if not rows:
+            return cls(np.empty((0, 0), dtype=np.float32), np.empty(0, dtype=np.float32), [])
+
+        raw = _as_matrix(rows)
+        norms = np.linalg.norm(raw, axis=1)
+        keep = norms > _EPS
+        if not keep.all():
+            logger.warning(f"⚠️  Skipping {int((~keep).sum())} zero-vector template(s)")
+            raw, norms = raw[keep], norms[keep]
+            ids = [i for i, k in zip(ids, keep) if k]
+
+        matrix = np.ascontiguousarray(raw / norms[:, None], dtype=np.float32)
+        return cls(matrix, norms.astype(np.float32), ids)
+
+    def __len__(self):
+        return len(self.embedding_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + self.norms.nbytes
+
+    def similarities(self, query, method: str = 'cosine') -> np.ndarray:
+        """Similarity of one live embedding to every template (empty on mismatch)"""
+        q = np.asarray(query, dtype=np.float32).ravel()
+        if not len(self) or q.size != self.dim:
+            return np.empty(0, dtype=np.float32)
+        q_norm = float(np.linalg.norm(q))
+        if q_norm <= _EPS:
+            return np.empty(0, dtype=np.float32)
+
+        dots = self.matrix @ (q / q_norm)      # cosine similarity per template
+        if method == 'cosine':
+            return dots
+        if method == 'euclidean':
+            # |q - t|^2 = |q|^2 + |t|^2 - 2|q||t|cos
+            sq = q_norm * q_norm + self.norms * self.norms - 2.0 * q_norm * self.norms * dots
+            return 1.0 - np.sqrt(np.maximum(sq, 0.0))
+        raise ValueError(f"Unknown method: {method}")
+
+    def best_match(self, query, method: str = 'cosine') -> Tuple[float, Optional[str], np.ndarray]:
+        """
+        (max_similarity, best_embedding_id, all_similarities). Like the old
+        per-template loop, max_similarity floors at 0.0 and best_embedding_id
+        is None when nothing scores above it.
+        """
+        sims = self.similarities(query, method)
+        if sims.size == 0:
+            return 0.0, None, sims
+        best = int(np.argmax(sims))
+        if sims[best] <= 0.0:
+            return 0.0, None, sims
+        return float(sims[best]), self.embedding_ids[best], sims
+
+
+class TemplateIndex:
+    """
+    Several users' templates stacked into one matrix, for scoring many live
+    frames in one call: a single (n, d) x (d, K) product, then a per-user max.
+    """
+
+    def __init__(self, template_sets: Dict[int, TemplateSet]):
+        sets = [(user_id, ts) for user_id, ts in template_sets.items() if len(ts)]
+        dims = {ts.dim for _, ts in sets}
+        if len(dims) > 1:
+            raise ValueError(f"Template dimension mismatch across users: {sorted(dims)}")
+
+        self.user_ids = [user_id for user_id, _ in sets]
+        self._column = {user_id: i for i, user_id in enumerate(self.user_ids)}
+        self.dim = dims.pop() if dims else 0
+        self.matrix = _as_matrix(np.vstack([ts.matrix for _, ts in sets])) if sets else np.empty((0, 0), np.float32)
+        counts = [len(ts) for _, ts in sets]
+        self._offsets = np.cumsum([0] + counts[:-1]).astype(np.intp) if sets else np.empty(0, np.intp)
+
+    def __contains__(self, user_id):
+        return user_id in self._column
+
+    def score_all(self, queries) -> np.ndarray:
+        """(n, users) best cosine similarity of each query to each user"""
+        q = _as_matrix(queries)
+        if q.ndim == 1:
+            q = q[None, :]
+        if not self.user_ids or q.shape[1] != self.dim:
+            return np.zeros((q.shape[0], len(self.user_ids)), dtype=np.float32)
+        q = q / np.maximum(np.linalg.norm(q, axis=1, keepdims=True), _EPS)
+        sims = q @ self.matrix.T
+        return np.maximum.reduceat(sims, self._offsets, axis=1)
+
+    def match_batch(self, queries, user_ids: Sequence[int]) -> np.ndarray:
+        """
+        Best cosine similarity of queries[i] against user_ids[i]'s templates.
+        Users not in the index score 0.0.
+        """
+        per_user = self.score_all(queries)
+        out = np.zeros(per_user.shape[0], dtype=np.float32)
+        for i, user_id in enumerate(user_ids):
+            column = self._column.get(user_id)
+            if column is not None:
+                out[i] = max(0.0, float(per_user[i, column]))
+        return out
+
+    def identify(self, queries) -> List[Tuple[Optional[int], float]]:
+        """Closest enrolled user for each query: [(user_id, similarity)]"""
+        per_user = self.score_all(queries)
+        if not self.user_ids:
+            return [(None, 0.0)] * per_user.shape[0]
+        best = np.argmax(per_user, axis=1)
+        return [(self.user_ids[c], float(per_user[i, c])) for i, c in enumerate(best)]
@@ -36,6 +36,7 @@ from datetime import datetime, timedelta
 from typing import Dict, Optional, Callable, List, Tuple, Any
 from enum import Enum
 import json
+import threading
 
 # ============================================================================
 # THIRD-PARTY IMPORTS
@@ -47,7 +48,10 @@ from bson import ObjectId
 # YOUR PROJECT IMPORTS (Already in your project)
 # ============================================================================
 from core.FaceAuth.face_model_shared import get_face_model
-from core.UserDashBoard.face_embeddings import get_user_embeddings, base64_to_numpy
+from core.FaceAuth.face_templates import TemplateSet
+from core.FaceAuth.embedding_store import get_embedding_store
+from core.FaceAuth.verification_scheduler import VerificationScheduler
+from core.UserDashBoard.face_embeddings import base64_to_numpy
 
 # ============================================================================
 # OPTIONAL: DATABASE IMPORTS (Add if available)
@@ -135,6 +139,7 @@ class MeetingVerificationConfig:
     # Database
     SAVE_TO_DATABASE = DATABASE_AVAILABLE  # Save verification events to DB
     DB_COLLECTION = "meeting_verifications"  # Collection name
+    MAX_PENDING_CHECKS = 10000  # Buffered checks kept while the DB is unreachable
     
     # Notifications
     SEND_NOTIFICATIONS = WEBSOCKET_AVAILABLE  # Send WebSocket notifications
@@ -247,6 +252,61 @@ class VerificationDatabase:
         except Exception as e:
             logger.error(f"Error saving verification check: {e}")
     
+    _pending_checks: List[Dict] = []
+    _pending_lock = threading.Lock()
+    
+    @staticmethod
+    def queue_verification_check(
+        user_id: int,
+        meeting_id: str,
+        is_verified: bool,
+        similarity: float,
+        session_id: str
+    ):
+        """Buffer a verification check for the next bulk write"""
+        if not MeetingVerificationConfig.SAVE_TO_DATABASE or not MeetingVerificationConfig.LOG_DETAILED_STATS:
+            return
+        
+        check = {
+            'user_id': user_id,
+            'meeting_id': meeting_id,
+            'session_id': session_id,
+            'event_type': 'verification_check',
+            'is_verified': is_verified,
+            'similarity_score': similarity,
+            'timestamp': datetime.utcnow()
+        }
+        with VerificationDatabase._pending_lock:
+            VerificationDatabase._pending_checks.append(check)
+    
+    @staticmethod
+    async def flush_verification_checks():
+        """
+        Write all buffered verification checks with one insert_many.
+        A failed batch goes back into the buffer for the next flush; the
+        buffer keeps the newest MAX_PENDING_CHECKS checks.
+        """
+        with VerificationDatabase._pending_lock:
+            pending = VerificationDatabase._pending_checks
+            if not pending:
+                return
+            VerificationDatabase._pending_checks = []
+        
+        try:
+            db = get_db()
+            collection = db[MeetingVerificationConfig.DB_COLLECTION]
+            await collection.insert_many(pending, ordered=False)
+            logger.debug(f"Saved {len(pending)} verification checks to database")
+            
+        except Exception as e:
+            logger.error(f"Error saving {len(pending)} verification checks: {e}")
+            with VerificationDatabase._pending_lock:
+                merged = pending + VerificationDatabase._pending_checks
+                dropped = max(0, len(merged) - MeetingVerificationConfig.MAX_PENDING_CHECKS)
+                VerificationDatabase._pending_checks = merged[dropped:]
+            if dropped:
+                logger.warning(f"⚠️  Dropped {dropped} oldest buffered verification checks")
+    
     @staticmethod
     async def get_user_verification_history(user_id: int, meeting_id: str = None) -> List[Dict]:
         """Get verification history for a user"""
@@ -570,8 +630,9 @@ class MeetingContinuousVerifier:
             logger.error(traceback.format_exc())
             self.face_model = None
         
-        # Load stored embeddings
+        # Load stored embeddings (stacked once into a normalized matrix)
         self.stored_embeddings = self._load_user_embeddings()
+        self.templates = TemplateSet.from_embeddings(self.stored_embeddings)
         
         logger.info(
             f"\n{'='*80}\n"
@@ -588,23 +649,14 @@ class MeetingContinuousVerifier:
         )
     
     def _load_user_embeddings(self) -> Optional[List[Dict]]:
-        """Load user's stored embeddings from MongoDB"""
+        """Load user's stored embeddings (shared Redis store, MongoDB on miss)"""
         try:
-            user_embeddings = get_user_embeddings(self.user_id)
+            embeddings_list = get_embedding_store().get_embeddings(self.user_id)
             
-            if not user_embeddings:
+            if not embeddings_list:
                 logger.warning(f"⚠️  No embeddings found for user {self.user_id}")
                 return None
             
-            embeddings_list = []
-            for emb_doc in user_embeddings:
-                if emb_doc.get('embedding'):
-                    embeddings_list.append({
-                        'embedding': np.array(emb_doc['embedding'], dtype=np.float32),
-                        'embedding_id': str(emb_doc['_id']),
-                        'det_score': emb_doc.get('det_score', 0.0)
-                    })
-            
             logger.info(f"✅ Loaded {len(embeddings_list)} embeddings for user {self.user_id}")
             return embeddings_list
             
@@ -651,65 +703,75 @@ class MeetingContinuousVerifier:
             f"{'='*80}\n"
         )
         
-        while self.is_running:
-            try:
-                # Get current interval
-                interval = self._get_current_interval()
-                
-                # Wait for interval before first check
-                logger.debug(f"⏱️  Waiting {interval}s before next check for user {self.user_id}")
-                await asyncio.sleep(interval)
-                
-                # Check if still running
-                if not self.is_running:
-                    break
-                
-                # Skip if blocked without host override
-                if self.is_blocked and not self.host_override:
-                    logger.info(f"⏭️  Skipping check - User {self.user_id} is blocked")
-                    continue
-                
-                # Get frame in background (non-blocking with timeout)
-                try:
-                    frame = await asyncio.wait_for(
-                        get_frame_callback(),
-                        timeout=MeetingVerificationConfig.FRAME_CAPTURE_TIMEOUT
-                    )
-                except asyncio.TimeoutError:
-                    logger.warning(f"⚠️  Frame capture timeout for user {self.user_id}")
-                    continue
-                except Exception as e:
-                    logger.error(f"❌ Error capturing frame: {e}")
-                    continue
-                
-                if frame is None:
-                    logger.warning(f"⚠️  No frame available for user {self.user_id}")
-                    continue
-                
-                # Perform background verification
-                is_verified, similarity = await self._verify_frame(frame)
-                self.last_check_time = datetime.now()
-                
-                # Save verification check to database (if enabled)
-                await VerificationDatabase.save_verification_check(
-                    self.user_id, self.meeting_id, is_verified, similarity, self.session_id
-                )
-                
-                if is_verified:
-                    await self._handle_successful_verification(similarity)
-                else:
-                    await self._handle_failed_verification(similarity)
-                
-            except asyncio.CancelledError:
-                logger.info(f"🛑 Verification cancelled for user {self.user_id}")
-                break
-            except Exception as e:
-                logger.error(f"❌ Error in verification loop: {e}")
-                logger.error(traceback.format_exc())
-                await asyncio.sleep(self._get_current_interval())
+        # Deadlines live in the process-wide timing wheel; this task just parks
+        # until the verifier stops so callers can still await / cancel it.
+        self._get_frame_callback = get_frame_callback
+        self._stopped = asyncio.Event()
+        scheduler = get_verification_scheduler()
+        scheduler.register(self.scheduler_key, self._scheduled_check, self._get_current_interval)
+        try:
+            await self._stopped.wait()
+        except asyncio.CancelledError:
+            logger.info(f"🛑 Verification cancelled for user {self.user_id}")
+        finally:
+            scheduler.unregister(self.scheduler_key, self._scheduled_check)
         
         logger.info(f"🛑 Background verification stopped for user {self.user_id}")
     
+    @property
+    def scheduler_key(self) -> str:
+        return f"{self.meeting_id}_{self.user_id}"
+    
+    def _stop_waiting(self):
+        stopped = getattr(self, '_stopped', None)
+        if stopped is not None:
+            stopped.set()
+    
+    async def _scheduled_check(self):
+        """One verification check, run by the scheduler when this user is due"""
+        if not self.is_running:
+            self._stop_waiting()
+            return
+        
+        # Skip if blocked without host override
+        if self.is_blocked and not self.host_override:
+            logger.info(f"⏭️  Skipping check - User {self.user_id} is blocked")
+            return
+        
+        # Get frame in background (non-blocking with timeout)
+        try:
+            frame = await asyncio.wait_for(
+                self._get_frame_callback(),
+                timeout=MeetingVerificationConfig.FRAME_CAPTURE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️  Frame capture timeout for user {self.user_id}")
+            return
+        except Exception as e:
+            logger.error(f"❌ Error capturing frame: {e}")
+            return
+        
+        if frame is None:
+            logger.warning(f"⚠️  No frame available for user {self.user_id}")
+            return
+        
+        # Perform background verification
+        is_verified, similarity = await self._verify_frame(frame)
+        self.last_check_time = datetime.now()
+        
+        # Buffered; written in bulk by the scheduler's flush
+        VerificationDatabase.queue_verification_check(
+            self.user_id, self.meeting_id, is_verified, similarity, self.session_id
+        )
+        
+        if is_verified:
+            await self._handle_successful_verification(similarity)
+        else:
+            await self._handle_failed_verification(similarity)
+        
+        if not self.is_running:
+            self._stop_waiting()
+    
     async def _verify_frame(self, frame) -> Tuple[bool, float]:
         """
         Verify face in frame (returns verification status and similarity)
@@ -759,29 +821,10 @@ class MeetingContinuousVerifier:
                 logger.warning(f"⚠️  Empty embedding for user {self.user_id}")
                 return True, 1.0
             
-            # Compare with all stored embeddings
-            max_similarity = 0.0
-            best_match_id = None
-            
-            for stored_emb_data in self.stored_embeddings:
-                try:
-                    # Calculate cosine distance
-                    distance = self.face_model.compare_embeddings(
-                        live_embedding,
-                        stored_emb_data['embedding'],
-                        method='cosine'
-                    )
-                    
-                    # Convert distance to similarity
-                    similarity = 1 - distance
-                    
-                    if similarity > max_similarity:
-                        max_similarity = similarity
-                        best_match_id = stored_emb_data['embedding_id']
-                        
-                except Exception as e:
-                    logger.error(f"❌ Error comparing embeddings: {e}")
-                    continue
+            # Compare with all stored embeddings in one matrix-vector product
+            max_similarity, best_match_id, _ = self.templates.best_match(
+                live_embedding, method='cosine'
+            )
             
             # Determine if verified
             threshold = MeetingVerificationConfig.FACE_DISTANCE_THRESHOLD
@@ -993,6 +1036,7 @@ class MeetingContinuousVerifier:
         """Stop verification gracefully"""
         logger.info(f"🛑 Stopping verification for user {self.user_id}")
         self.is_running = False
+        self._stop_waiting()
         
         if self.verification_task and not self.verification_task.done():
             self.verification_task.cancel()
@@ -1057,6 +1101,18 @@ class MeetingContinuousVerifier:
 # ============================================================================
 
 _active_verifiers: Dict[str, MeetingContinuousVerifier] = {}
+_scheduler: Optional[VerificationScheduler] = None
+
+def get_verification_scheduler() -> VerificationScheduler:
+    """Process-wide timing-wheel scheduler that runs every verifier's checks"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = VerificationScheduler(flush_fn=VerificationDatabase.flush_verification_checks)
+    return _scheduler
+
+def get_scheduler_stats() -> Dict:
+    """Scheduler tick lag / batch statistics"""
+    return get_verification_scheduler().get_stats()
 _blocked_users: Dict[str, Dict] = {}  # Track blocked users per session
 
 def get_verifier(meeting_id: str, user_id: int) -> Optional[MeetingContinuousVerifier]:
@@ -1112,6 +1168,13 @@ async def remove_verifier(meeting_id: str, user_id: int):
         
         del _active_verifiers[key]
         logger.info(f"🗑️  Removed verifier for {key}")
+        
+        # Last verifier gone: stop the scheduler (final flush included).
+        # Last one for this meeting: write its buffered checks now.
+        if not _active_verifiers and _scheduler is not None:
+            await _scheduler.stop()
+        elif not any(k.startswith(f"{meeting_id}_") for k in _active_verifiers):
+            await VerificationDatabase.flush_verification_checks()
 
 def get_all_verifiers() -> Dict:
     """Get all active verifiers"""
@@ -1321,6 +1384,8 @@ __all__ = [
     'create_verifier',
     'get_all_verifiers',
     'get_blocked_users',
+    'get_verification_scheduler',
+    'get_scheduler_stats',
 ]
 
 __version__ = "3.0.0"
@@ -31,16 +31,20 @@ USAGE:
 # ============================================================================
 # STANDARD LIBRARY IMPORTS
 # ============================================================================
+import base64
 import logging
 import asyncio
+import functools
 import time
 from typing import Dict, Optional, List, Tuple, Any
 from threading import Lock
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
 # ============================================================================
 # THIRD-PARTY IMPORTS
 # ============================================================================
+import cv2
 import numpy as np
 from bson import ObjectId
 
@@ -61,6 +65,9 @@ except ImportError:
     USER_EMBEDDINGS_AVAILABLE = False
     logging.warning("face_embeddings not available")
 
+from core.FaceAuth.face_templates import TemplateSet, TemplateIndex
+from core.FaceAuth.embedding_store import get_embedding_store, EmbeddingStoreConfig
+
 # ============================================================================
 # LOGGING CONFIGURATION
 # ============================================================================
@@ -89,8 +96,11 @@ class UnifiedFaceServiceConfig:
     # Caching
     FRAME_CACHE_MAX_AGE = 5.0      # Seconds - how long to keep frames
     EMBEDDING_CACHE_MAX_AGE = 300  # Seconds - 5 minutes
-    MAX_CACHED_FRAMES = 100        # Maximum frames in cache
-    MAX_CACHED_EMBEDDINGS = 50     # Maximum user embeddings in cache
+    FRAME_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Compressed frames + memoized decodes
+    FRAME_CACHE_SHARDS = 16        # Independent locks / LRUs
+    FRAME_CACHE_MAX_SIDE = 1280    # Longest side kept for decoded frames (pixels)
+    FRAME_CACHE_JPEG_QUALITY = 90
+    EMBEDDING_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Template bytes (~2 KB per stored embedding)
     
     # Performance
     ENABLE_FRAME_CACHE = True
@@ -109,124 +119,261 @@ class UnifiedFaceServiceConfig:
 # FRAME CACHE
 # ============================================================================
 
+class _FrameShard:
+    """One lock + LRU of frame entries; FrameCache spreads keys over many"""
+    __slots__ = ('lock', 'entries', 'bytes')
+
+    def __init__(self):
+        self.lock = Lock()
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.bytes = 0
+
+
 class FrameCache:
     """
     Manages frame caching for multiple users
     Thread-safe frame storage
+
+    Frames are kept as JPEG bytes (decoded numpy frames are downscaled to
+    max_side and re-encoded on store) and decoded lazily on first get, where
+    compressed input that was stored as-is is downscaled to max_side too.
+    The decoded frame is memoized on the entry with the numpy writeable flag
+    cleared, so every reader gets the same array without a copy; writing to
+    it raises ValueError, so callers that draw on or modify a frame must
+    copy() it first. Memory is bounded by max_bytes in total (compressed +
+    memoized decodes) across all shards; each shard has its own lock and LRU,
+    and eviction never drops the entry that was just stored.
     """
     
-    def __init__(self, max_age: float = 5.0, max_size: int = 100):
-        self.cache: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, max_age: float = 5.0, max_bytes: int = 64 * 1024 * 1024,
+                 shards: int = 16, max_side: int = 1280, jpeg_quality: int = 90):
         self.max_age = max_age
-        self.max_size = max_size
-        self._lock = Lock()
+        self.max_bytes = max_bytes
+        self.max_side = max_side
+        self.jpeg_quality = jpeg_quality
+        self._shards = [_FrameShard() for _ in range(max(1, shards))]
+        self._stats_lock = Lock()
+        self._counters = {
+            'stores': 0,
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evictions': 0,
+            'decodes': 0,
+            'encodes': 0,
+        }
+    
+    def _count(self, name: str, n: int = 1):
+        with self._stats_lock:
+            self._counters[name] += n
     
-    def store(self, meeting_id: str, user_id: int, frame: np.ndarray):
-        """Store a frame in cache"""
+    def _shard(self, key: str) -> _FrameShard:
+        return self._shards[hash(key) % len(self._shards)]
+    
+    @staticmethod
+    def _entry_bytes(entry: Dict[str, Any]) -> int:
+        decoded = entry['decoded']
+        return len(entry['jpeg']) + (decoded.nbytes if decoded is not None else 0)
+    
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        scale = self.max_side / max(h, w)
+        if scale < 1.0:
+            frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+        return frame
+    
+    def _encode(self, frame: np.ndarray) -> bytes:
+        """Downscale to max_side and JPEG-encode a BGR frame (outside any lock)"""
+        frame = self._downscale(frame)
+        ok, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        self._count('encodes')
+        return buf.tobytes()
+    
+    def store(self, meeting_id: str, user_id: int, frame: np.ndarray = None, jpeg: bytes = None):
+        """Store a frame in cache (decoded BGR frame, or already-compressed image bytes)"""
         key = f"{meeting_id}_{user_id}"
+        if jpeg is None:
+            jpeg = self._encode(frame)
         
-        with self._lock:
-            # Check cache size
-            if len(self.cache) >= self.max_size:
-                self._cleanup()
-            
-            self.cache[key] = {
-                'frame': frame,
-                'timestamp': time.time(),
-                'access_count': 0
-            }
-            
-            if UnifiedFaceServiceConfig.LOG_CACHE_HITS:
-                logger.debug(f"Frame stored: {key}")
+        entry = {
+            'jpeg': jpeg,
+            'decoded': None,
+            'timestamp': time.time(),
+            'access_count': 0
+        }
+        shard = self._shard(key)
+        with shard.lock:
+            self._remove(shard, key)
+            shard.entries[key] = entry
+            shard.bytes += self._entry_bytes(entry)
+        self._evict(protect=(shard, entry))
+        self._count('stores')
+        
+        if UnifiedFaceServiceConfig.LOG_CACHE_HITS:
+            logger.debug(f"Frame stored: {key} ({len(jpeg)} bytes)")
     
     def get(self, meeting_id: str, user_id: int) -> Optional[np.ndarray]:
-        """Get a frame from cache"""
+        """
+        Get a frame from cache. The array is shared by all readers and not
+        writeable (writes raise ValueError); copy() it before modifying.
+        """
         key = f"{meeting_id}_{user_id}"
+        shard = self._shard(key)
         
-        with self._lock:
-            if key not in self.cache:
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is None:
+                self._count('misses')
                 if UnifiedFaceServiceConfig.LOG_CACHE_HITS:
                     logger.debug(f"Frame cache MISS: {key}")
                 return None
             
-            entry = self.cache[key]
             age = time.time() - entry['timestamp']
             
             # Check if frame is too old
             if age > self.max_age:
-                del self.cache[key]
+                self._remove(shard, key)
+                self._count('expired')
+                self._count('misses')
                 if UnifiedFaceServiceConfig.LOG_CACHE_HITS:
                     logger.debug(f"Frame expired: {key} (age: {age:.1f}s)")
                 return None
             
             # Update access count
+            shard.entries.move_to_end(key)
             entry['access_count'] += 1
-            
-            if UnifiedFaceServiceConfig.LOG_CACHE_HITS:
-                logger.debug(f"Frame cache HIT: {key} (age: {age:.1f}s)")
-            
-            return entry['frame']
+            decoded = entry['decoded']
+        
+        self._count('hits')
+        if UnifiedFaceServiceConfig.LOG_CACHE_HITS:
+            logger.debug(f"Frame cache HIT: {key} (age: {age:.1f}s)")
+        
+        if decoded is not None:
+            return decoded
+        
+        # Decode outside the lock, then memoize if the entry is still current
+        decoded = cv2.imdecode(np.frombuffer(entry['jpeg'], np.uint8), cv2.IMREAD_COLOR)
+        if decoded is None:
+            return None
+        decoded = self._downscale(decoded)
+        decoded.setflags(write=False)
+        self._count('decodes')
+        with shard.lock:
+            memoized = shard.entries.get(key) is entry and entry['decoded'] is None
+            if memoized:
+                entry['decoded'] = decoded
+                shard.bytes += decoded.nbytes
+        if memoized:
+            self._evict()
+        return decoded
     
     def clear(self, meeting_id: str, user_id: int):
         """Clear a specific frame from cache"""
         key = f"{meeting_id}_{user_id}"
+        shard = self._shard(key)
         
-        with self._lock:
-            if key in self.cache:
-                del self.cache[key]
+        with shard.lock:
+            if self._remove(shard, key):
                 logger.debug(f"Frame cleared: {key}")
     
     def clear_all(self):
         """Clear all frames"""
-        with self._lock:
-            count = len(self.cache)
-            self.cache.clear()
-            logger.info(f"Cleared all frames ({count} entries)")
+        count = 0
+        for shard in self._shards:
+            with shard.lock:
+                count += len(shard.entries)
+                shard.entries.clear()
+                shard.bytes = 0
+        logger.info(f"Cleared all frames ({count} entries)")
     
-    def _cleanup(self):
-        """Remove old frames (called when cache is full)"""
-        current_time = time.time()
-        keys_to_remove = []
-        
-        for key, entry in self.cache.items():
-            age = current_time - entry['timestamp']
-            if age > self.max_age:
-                keys_to_remove.append(key)
+    def _remove(self, shard: _FrameShard, key: str) -> bool:
+        entry = shard.entries.pop(key, None)
+        if entry is None:
+            return False
+        shard.bytes -= self._entry_bytes(entry)
+        return True
+    
+    def _total_bytes(self) -> int:
+        return sum(shard.bytes for shard in self._shards)
+    
+    def _evict(self, protect=None):
+        """
+        Bring the whole cache under max_bytes: drop expired entries, then
+        memoized decodes, then the oldest frames across all shards. Takes one
+        shard lock at a time; protect=(shard, entry) is never evicted.
+        """
+        if self._total_bytes() <= self.max_bytes:
+            return
         
-        for key in keys_to_remove:
-            del self.cache[key]
+        now = time.time()
+        for shard in self._shards:
+            with shard.lock:
+                for key in [k for k, e in shard.entries.items() if now - e['timestamp'] > self.max_age]:
+                    if protect is None or shard.entries[key] is not protect[1]:
+                        self._remove(shard, key)
+                        self._count('expired')
         
-        # If still full, remove least recently used
-        if len(self.cache) >= self.max_size:
-            sorted_entries = sorted(
-                self.cache.items(),
-                key=lambda x: (x[1]['access_count'], x[1]['timestamp'])
-            )
-            
-            # Remove 20% of entries
-            remove_count = max(1, self.max_size // 5)
-            for key, _ in sorted_entries[:remove_count]:
-                del self.cache[key]
+        for shard in self._shards:
+            if self._total_bytes() <= self.max_bytes:
+                return
+            with shard.lock:
+                for entry in shard.entries.values():
+                    if entry['decoded'] is not None:
+                        shard.bytes -= entry['decoded'].nbytes
+                        entry['decoded'] = None
         
-        logger.debug(f"Cache cleanup: removed {len(keys_to_remove)} expired entries")
+        while self._total_bytes() > self.max_bytes:
+            # Oldest LRU head over all shards, skipping the protected entry
+            oldest = None
+            for shard in self._shards:
+                with shard.lock:
+                    for key, entry in shard.entries.items():
+                        if protect is not None and entry is protect[1]:
+                            continue
+                        if oldest is None or entry['timestamp'] < oldest[2]:
+                            oldest = (shard, key, entry['timestamp'])
+                        break
+            if oldest is None:
+                return
+            shard, key, _ = oldest
+            with shard.lock:
+                if self._remove(shard, key):
+                    self._count('evictions')
     
     def get_stats(self) -> Dict:
         """Get cache statistics"""
-        with self._lock:
-            total_entries = len(self.cache)
-            current_time = time.time()
-            
-            ages = [current_time - entry['timestamp'] for entry in self.cache.values()]
-            access_counts = [entry['access_count'] for entry in self.cache.values()]
-            
-            return {
-                'total_entries': total_entries,
-                'max_size': self.max_size,
-                'max_age': self.max_age,
-                'avg_age': sum(ages) / len(ages) if ages else 0,
-                'avg_access_count': sum(access_counts) / len(access_counts) if access_counts else 0,
-                'oldest_frame_age': max(ages) if ages else 0,
-            }
+        current_time = time.time()
+        ages, access_counts = [], []
+        total_bytes = compressed_bytes = decoded_frames = 0
+        for shard in self._shards:
+            with shard.lock:
+                total_bytes += shard.bytes
+                for entry in shard.entries.values():
+                    ages.append(current_time - entry['timestamp'])
+                    access_counts.append(entry['access_count'])
+                    compressed_bytes += len(entry['jpeg'])
+                    decoded_frames += entry['decoded'] is not None
+        with self._stats_lock:
+            counters = dict(self._counters)
+        
+        lookups = counters['hits'] + counters['misses']
+        return {
+            'total_entries': len(ages),
+            'max_bytes': self.max_bytes,
+            'total_bytes': total_bytes,
+            'compressed_bytes': compressed_bytes,
+            'decoded_bytes': total_bytes - compressed_bytes,
+            'decoded_frames': decoded_frames,
+            'shards': len(self._shards),
+            'max_age': self.max_age,
+            'hit_rate': f"{(counters['hits'] / lookups * 100) if lookups else 0:.1f}%",
+            **counters,
+            'avg_age': sum(ages) / len(ages) if ages else 0,
+            'avg_access_count': sum(access_counts) / len(access_counts) if access_counts else 0,
+            'oldest_frame_age': max(ages) if ages else 0,
+        }
 
 # ============================================================================
 # EMBEDDING CACHE
@@ -236,60 +383,107 @@ class EmbeddingCache:
     """
     Manages user embedding caching
     Thread-safe embedding storage
+
+    Each entry also keeps the user's templates as a normalized float32
+    matrix (TemplateSet), built once on store, for vectorized comparison.
+    Bounded by template bytes (LRU), not user count, so a large meeting fits.
+    If generation_fn is given, entries are re-checked against it every
+    check_interval seconds and dropped when the user's embeddings changed.
     """
     
-    def __init__(self, max_age: float = 300, max_size: int = 50):
-        self.cache: Dict[int, Dict[str, Any]] = {}
+    def __init__(self, max_age: float = 300, max_bytes: int = 64 * 1024 * 1024,
+                 generation_fn=None, check_interval: float = 10):
+        self.cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
         self.max_age = max_age
-        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.generation_fn = generation_fn
+        self.check_interval = check_interval
+        self.total_bytes = 0
+        self.evictions = 0
         self._lock = Lock()
     
+    def _generation(self, user_id: int) -> int:
+        if self.generation_fn is None:
+            return 0
+        try:
+            return self.generation_fn(user_id)
+        except Exception:
+            return 0
+    
     def store(self, user_id: int, embeddings: List[Dict]):
         """Store user embeddings in cache"""
+        templates = TemplateSet.from_embeddings(embeddings)
+        generation = self._generation(user_id)
+        now = time.time()
         with self._lock:
-            # Check cache size
-            if len(self.cache) >= self.max_size:
-                self._cleanup()
-            
+            self._remove(user_id)
             self.cache[user_id] = {
                 'embeddings': embeddings,
-                'timestamp': time.time(),
+                'templates': templates,
+                'bytes': templates.nbytes,
+                'generation': generation,
+                'timestamp': now,
+                'checked_at': now,
                 'access_count': 0
             }
+            self.total_bytes += templates.nbytes
+            self._evict()
             
-            logger.debug(f"Embeddings stored: user {user_id} ({len(embeddings)} embeddings)")
+            logger.debug(f"Embeddings stored: user {user_id} ({len(embeddings)} embeddings, {templates.nbytes} bytes)")
     
     def get(self, user_id: int) -> Optional[List[Dict]]:
         """Get user embeddings from cache"""
+        entry = self._get_entry(user_id)
+        return entry['embeddings'] if entry else None
+
+    def get_templates(self, user_id: int) -> Optional[TemplateSet]:
+        """Get user templates (normalized matrix) from cache"""
+        entry = self._get_entry(user_id)
+        return entry['templates'] if entry else None
+
+    def _get_entry(self, user_id: int) -> Optional[Dict[str, Any]]:
         with self._lock:
-            if user_id not in self.cache:
+            entry = self.cache.get(user_id)
+            if entry is None:
                 if UnifiedFaceServiceConfig.LOG_CACHE_HITS:
                     logger.debug(f"Embedding cache MISS: user {user_id}")
                 return None
             
-            entry = self.cache[user_id]
-            age = time.time() - entry['timestamp']
+            now = time.time()
+            age = now - entry['timestamp']
             
             # Check if embeddings are too old
             if age > self.max_age:
-                del self.cache[user_id]
+                self._remove(user_id)
                 if UnifiedFaceServiceConfig.LOG_CACHE_HITS:
                     logger.debug(f"Embeddings expired: user {user_id} (age: {age:.1f}s)")
                 return None
             
+            recheck = self.generation_fn is not None and now - entry['checked_at'] > self.check_interval
+        
+        # Generation lookup may hit Redis - do it outside the lock
+        if recheck:
+            if self._generation(user_id) != entry['generation']:
+                self.clear(user_id)
+                logger.info(f"🔄 Embeddings changed for user {user_id} - dropped cached copy")
+                return None
+            entry['checked_at'] = now
+        
+        with self._lock:
+            if user_id in self.cache:
+                self.cache.move_to_end(user_id)
             # Update access count
             entry['access_count'] += 1
             
             if UnifiedFaceServiceConfig.LOG_CACHE_HITS:
                 logger.debug(f"Embedding cache HIT: user {user_id} (age: {age:.1f}s)")
             
-            return entry['embeddings']
+            return entry
     
     def clear(self, user_id: int):
         """Clear embeddings for a specific user"""
         with self._lock:
-            if user_id in self.cache:
-                del self.cache[user_id]
+            if self._remove(user_id):
                 logger.debug(f"Embeddings cleared: user {user_id}")
     
     def clear_all(self):
@@ -297,34 +491,23 @@ class EmbeddingCache:
         with self._lock:
             count = len(self.cache)
             self.cache.clear()
+            self.total_bytes = 0
             logger.info(f"Cleared all embeddings ({count} users)")
     
-    def _cleanup(self):
-        """Remove old embeddings"""
-        current_time = time.time()
-        keys_to_remove = []
-        
-        for user_id, entry in self.cache.items():
-            age = current_time - entry['timestamp']
-            if age > self.max_age:
-                keys_to_remove.append(user_id)
-        
-        for user_id in keys_to_remove:
-            del self.cache[user_id]
-        
-        # If still full, remove least recently used
-        if len(self.cache) >= self.max_size:
-            sorted_entries = sorted(
-                self.cache.items(),
-                key=lambda x: (x[1]['access_count'], x[1]['timestamp'])
-            )
-            
-            # Remove 20% of entries
-            remove_count = max(1, self.max_size // 5)
-            for user_id, _ in sorted_entries[:remove_count]:
-                del self.cache[user_id]
-        
-        logger.debug(f"Embedding cleanup: removed {len(keys_to_remove)} expired entries")
+    def _remove(self, user_id: int) -> bool:
+        entry = self.cache.pop(user_id, None)
+        if entry is None:
+            return False
+        self.total_bytes -= entry['bytes']
+        return True
+    
+    def _evict(self):
+        """Drop least recently used users until under the byte budget"""
+        while self.total_bytes > self.max_bytes and len(self.cache) > 1:
+            user_id, entry = self.cache.popitem(last=False)
+            self.total_bytes -= entry['bytes']
+            self.evictions += 1
+            logger.debug(f"Embedding cache evicted user {user_id} ({entry['bytes']} bytes)")
     
     def get_stats(self) -> Dict:
         """Get cache statistics"""
@@ -338,7 +521,9 @@ class EmbeddingCache:
             
             return {
                 'total_users': total_users,
-                'max_size': self.max_size,
+                'max_bytes': self.max_bytes,
+                'total_bytes': self.total_bytes,
+                'evictions': self.evictions,
                 'max_age': self.max_age,
                 'avg_age': sum(ages) / len(ages) if ages else 0,
                 'avg_access_count': sum(access_counts) / len(access_counts) if access_counts else 0,
@@ -372,11 +557,16 @@ class UnifiedFaceService:
         self.face_model = None
         self.frame_cache = FrameCache(
             max_age=UnifiedFaceServiceConfig.FRAME_CACHE_MAX_AGE,
-            max_size=UnifiedFaceServiceConfig.MAX_CACHED_FRAMES
+            max_bytes=UnifiedFaceServiceConfig.FRAME_CACHE_MAX_BYTES,
+            shards=UnifiedFaceServiceConfig.FRAME_CACHE_SHARDS,
+            max_side=UnifiedFaceServiceConfig.FRAME_CACHE_MAX_SIDE,
+            jpeg_quality=UnifiedFaceServiceConfig.FRAME_CACHE_JPEG_QUALITY
         )
+        self.embedding_store = get_embedding_store()
         self.embedding_cache = EmbeddingCache(
             max_age=UnifiedFaceServiceConfig.EMBEDDING_CACHE_MAX_AGE,
-            max_size=UnifiedFaceServiceConfig.MAX_CACHED_EMBEDDINGS
+            max_bytes=UnifiedFaceServiceConfig.EMBEDDING_CACHE_MAX_BYTES,
+            generation_fn=self.embedding_store.generation if EmbeddingStoreConfig.ENABLED else None
         )
         self._model_lock = Lock()
         self._stats = {
@@ -424,11 +614,16 @@ class UnifiedFaceService:
             return
         
         try:
-            # Convert frame if needed
+            # Base64 / raw bytes are already compressed: keep them as-is and
+            # decode only if someone reads the frame
             if isinstance(frame, str):
-                frame = base64_to_numpy(frame)
+                if 'base64,' in frame:
+                    frame = frame.split('base64,', 1)[1]
+                frame = base64.b64decode(frame)
             
-            if frame is not None and isinstance(frame, np.ndarray):
+            if isinstance(frame, (bytes, bytearray, memoryview)):
+                self.frame_cache.store(meeting_id, user_id, jpeg=bytes(frame))
+            elif frame is not None and isinstance(frame, np.ndarray):
                 self.frame_cache.store(meeting_id, user_id, frame)
         except Exception as e:
             logger.error(f"Error storing frame: {e}")
@@ -442,7 +637,7 @@ class UnifiedFaceService:
             user_id: User identifier
         
         Returns:
-            numpy.ndarray or None
+            numpy.ndarray (read-only, shared - copy before modifying) or None
         """
         if not UnifiedFaceServiceConfig.ENABLE_FRAME_CACHE:
             return None
@@ -483,24 +678,14 @@ class UnifiedFaceService:
             
             self._stats['embedding_cache_misses'] += 1
         
-        # Load from database
+        # Load from the shared store (Redis, prefetched per meeting; Mongo on miss)
         try:
-            user_embeddings = get_user_embeddings(user_id)
+            embeddings_list = self.embedding_store.get_embeddings(user_id)
             
-            if not user_embeddings:
+            if not embeddings_list:
                 logger.warning(f"⚠️  No embeddings found for user {user_id}")
                 return None
             
-            # Convert to standard format
-            embeddings_list = []
-            for emb_doc in user_embeddings:
-                if emb_doc.get('embedding'):
-                    embeddings_list.append({
-                        'embedding': np.array(emb_doc['embedding'], dtype=np.float32),
-                        'embedding_id': str(emb_doc['_id']),
-                        'det_score': emb_doc.get('det_score', 0.0)
-                    })
-            
             # Store in cache
             if UnifiedFaceServiceConfig.ENABLE_EMBEDDING_CACHE and embeddings_list:
                 self.embedding_cache.store(user_id, embeddings_list)
@@ -512,6 +697,63 @@ class UnifiedFaceService:
             logger.error(f"❌ Error loading embeddings for user {user_id}: {e}")
             return None
     
+    def get_user_templates(self, user_id: int) -> Optional[TemplateSet]:
+        """
+        Get user templates as a normalized float32 matrix (with caching)
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            TemplateSet or None
+        """
+        if UnifiedFaceServiceConfig.ENABLE_EMBEDDING_CACHE:
+            templates = self.embedding_cache.get_templates(user_id)
+            if templates is not None:
+                self._stats['embedding_cache_hits'] += 1
+                return templates
+
+        # Miss: load (and cache) the embeddings, then read the templates back
+        embeddings = self.get_user_embeddings(user_id)
+        if not embeddings:
+            return None
+        if UnifiedFaceServiceConfig.ENABLE_EMBEDDING_CACHE:
+            templates = self.embedding_cache.get_templates(user_id)
+            if templates is not None:
+                return templates
+        return TemplateSet.from_embeddings(embeddings)
+
+    def verify_embeddings_batch(
+        self,
+        live_embeddings,
+        user_ids: List[int],
+        threshold: float = None
+    ) -> List[Tuple[bool, float]]:
+        """
+        Verify many already-extracted live embeddings against their users'
+        templates in one matrix product (cosine)
+
+        Args:
+            live_embeddings: (n, d) array or list of n embeddings
+            user_ids: Expected user for each embedding
+            threshold: Distance threshold (default: from config)
+
+        Returns:
+            List of (is_verified, similarity), one per embedding
+        """
+        if threshold is None:
+            threshold = UnifiedFaceServiceConfig.FACE_DISTANCE_THRESHOLD
+        similarity_threshold = 1 - threshold
+
+        template_sets = {}
+        for user_id in set(user_ids):
+            templates = self.get_user_templates(user_id)
+            if templates is not None:
+                template_sets[user_id] = templates
+
+        scores = TemplateIndex(template_sets).match_batch(live_embeddings, user_ids)
+        return [(float(score) >= similarity_threshold, float(score)) for score in scores]
+
     def clear_user_embeddings(self, user_id: int):
         """Clear cached embeddings for a user"""
         self.embedding_cache.clear(user_id)
@@ -522,6 +764,26 @@ class UnifiedFaceService:
         user_id: int,
         threshold: float = None,
         method: str = None
+    ) -> Tuple[bool, float]:
+        """
+        Async wrapper around verify_face_sync
+
+        Model inference is blocking, so it runs on the event loop's default
+        executor instead of stalling the loop (on the shared async bridge that
+        is the bridge's bounded worker pool).
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(self.verify_face_sync, frame, user_id, threshold, method)
+        )
+
+    def verify_face_sync(
+        self,
+        frame,
+        user_id: int,
+        threshold: float = None,
+        method: str = None
     ) -> Tuple[bool, float]:
         """
         Verify face in frame against stored embeddings
@@ -589,38 +851,18 @@ class UnifiedFaceService:
                 logger.warning("⚠️  Empty embedding extracted")
                 return True, 1.0
             
-            # Get stored embeddings
-            stored_embeddings = self.get_user_embeddings(user_id)
+            # Get stored templates
+            stored_embeddings = self.get_user_templates(user_id)
             if not stored_embeddings:
                 logger.warning(f"⚠️  No stored embeddings for user {user_id}")
                 self._stats['errors'] += 1
                 return False, 0.0
             
-            # Compare with all stored embeddings
-            max_similarity = 0.0
-            best_match_id = None
-            all_similarities = []
-            
-            for stored_emb_data in stored_embeddings:
-                try:
-                    with self._model_lock:
-                        distance = self.face_model.compare_embeddings(
-                            live_embedding,
-                            stored_emb_data['embedding'],
-                            method=method
-                        )
-                    
-                    # Convert distance to similarity
-                    similarity = 1 - distance
-                    all_similarities.append(similarity)
-                    
-                    if similarity > max_similarity:
-                        max_similarity = similarity
-                        best_match_id = stored_emb_data['embedding_id']
-                        
-                except Exception as e:
-                    logger.error(f"Error comparing embeddings: {e}")
-                    continue
+            # Compare with all stored embeddings in one matrix-vector product
+            max_similarity, best_match_id, similarities = stored_embeddings.best_match(
+                live_embedding, method=method
+            )
+            all_similarities = similarities.tolist()
             
             # Determine if verified
             similarity_threshold = 1 - threshold
@@ -810,7 +1052,8 @@ class UnifiedFaceService:
                 'cache_hit_rate': f"{embedding_cache_rate:.1f}%",
                 'total_hits': self._stats['embedding_cache_hits'],
                 'total_misses': self._stats['embedding_cache_misses'],
-            }
+            },
+            'embedding_store': self.embedding_store.get_stats(),
         }
     
     def reset_stats(self):
@@ -0,0 +1,245 @@
+"""
+Verification Scheduler - One timing wheel per process for continuous checks
+===========================================================================
+
+Continuous verification used to run one coroutine per user, each looping on
+asyncio.sleep(interval). With thousands of participants that is thousands of
+timers, all started at join time, so checks fire in synchronized bursts.
+
+VerificationScheduler owns every deadline instead:
+- a hashed timing wheel (TICK_SECONDS slots) holds the next check per key;
+  schedule / cancel are O(1) and each tick only touches its own slot
+- a user's first check lands anywhere in the last FIRST_CHECK_SPREAD of
+  their interval, and later deadlines are jittered (+/- JITTER_FRACTION), so
+  users who joined together don't stay synchronized
+- all checks due on a tick run as one batch, at most MAX_CONCURRENT_CHECKS
+  at a time, and the next deadline is taken from interval_fn() afterwards
+- an optional flush_fn runs every FLUSH_SECONDS (bulk check writes)
+
+The scheduler is generic: a key, an async check coroutine and an interval
+function. MeetingContinuousVerifier registers itself with it.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import random
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger("verification_scheduler")
+
+
+class VerificationSchedulerConfig:
+    """Scheduler configuration"""
+    TICK_SECONDS = float(os.getenv("VERIFY_SCHEDULER_TICK_SECONDS", 1.0))
+    WHEEL_SLOTS = int(os.getenv("VERIFY_SCHEDULER_WHEEL_SLOTS", 512))     # one lap ~8.5 min at 1s ticks
+    JITTER_FRACTION = float(os.getenv("VERIFY_SCHEDULER_JITTER", 0.1))
+    FIRST_CHECK_SPREAD = float(os.getenv("VERIFY_SCHEDULER_FIRST_SPREAD", 0.5))  # first check in [1-spread, 1] x interval
+    MAX_CONCURRENT_CHECKS = int(os.getenv("VERIFY_SCHEDULER_CONCURRENCY", 16))
+    FLUSH_SECONDS = float(os.getenv("VERIFY_SCHEDULER_FLUSH_SECONDS", 5.0))
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel. Deadlines beyond one lap carry a rounds counter that
+    is decremented each time the cursor passes their slot.
+    """
+
+    def __init__(self, tick: float, slots: int, now: float):
+        self.tick = tick
+        self.slots: List[Dict[Hashable, int]] = [dict() for _ in range(slots)]
+        self.cursor = 0
+        self.cursor_time = now          # time the current slot represents
+        self._where: Dict[Hashable, int] = {}
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, key):
+        return key in self._where
+
+    def schedule(self, key: Hashable, deadline: float):
+        self.cancel(key)
+        ticks = max(1, math.ceil((deadline - self.cursor_time) / self.tick))
+        slot = (self.cursor + ticks) % len(self.slots)
+        self.slots[slot][key] = (ticks - 1) // len(self.slots)
+        self._where[key] = slot
+
+    def cancel(self, key: Hashable) -> bool:
+        slot = self._where.pop(key, None)
+        if slot is None:
+            return False
+        self.slots[slot].pop(key, None)
+        return True
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move the cursor up to now; return keys whose deadline passed"""
+        due = []
+        while self.cursor_time + self.tick <= now:
+            self.cursor = (self.cursor + 1) % len(self.slots)
+            self.cursor_time += self.tick
+            bucket = self.slots[self.cursor]
+            if not bucket:
+                continue
+            for key, rounds in list(bucket.items()):
+                if rounds == 0:
+                    del bucket[key]
+                    self._where.pop(key, None)
+                    due.append(key)
+                else:
+                    bucket[key] = rounds - 1
+        return due
+
+
+class _Entry:
+    __slots__ = ('check', 'interval_fn', 'running')
+
+    def __init__(self, check, interval_fn):
+        self.check = check
+        self.interval_fn = interval_fn
+        self.running = False
+
+
+class VerificationScheduler:
+    """Single-loop scheduler for periodic async checks"""
+
+    def __init__(self, config=VerificationSchedulerConfig,
+                 flush_fn: Optional[Callable[[], Awaitable]] = None):
+        self.config = config
+        self.flush_fn = flush_fn
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._wheel: Optional[TimingWheel] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._last_flush = time.monotonic()
+        self.stats = {
+            'ticks': 0,
+            'checks_run': 0,
+            'checks_failed': 0,
+            'max_batch': 0,
+            'max_tick_lag_ms': 0.0,
+            'tick_lag_ms_total': 0.0,
+            'busy_ms_total': 0.0,
+        }
+
+    # ========================================================================
+    # REGISTRATION
+    # ========================================================================
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(max(1, self.config.MAX_CONCURRENT_CHECKS))
+            if self._wheel is None:
+                self._wheel = TimingWheel(self.config.TICK_SECONDS, self.config.WHEEL_SLOTS, time.monotonic())
+            self._task = loop.create_task(self._run())
+            logger.info("✅ Verification scheduler started")
+
+    def _jittered(self, interval: float) -> float:
+        spread = interval * self.config.JITTER_FRACTION
+        return max(self.config.TICK_SECONDS, interval + random.uniform(-spread, spread))
+
+    def register(self, key: Hashable, check: Callable[[], Awaitable],
+                 interval_fn: Callable[[], float], first_delay: Optional[float] = None):
+        """
+        Run check() every interval_fn() seconds (jittered) until unregistered.
+        Must be called from the event loop the scheduler runs on.
+        """
+        self._ensure_running()
+        self._entries[key] = _Entry(check, interval_fn)
+        if first_delay is None:
+            interval = interval_fn()
+            first_delay = max(self.config.TICK_SECONDS,
+                              interval * random.uniform(1 - self.config.FIRST_CHECK_SPREAD, 1.0))
+        delay = first_delay
+        self._wheel.schedule(key, time.monotonic() + delay)
+
+    def unregister(self, key: Hashable, check: Optional[Callable] = None):
+        """Stop checking key; with check given, only if key is still registered to it"""
+        entry = self._entries.get(key)
+        if entry is None or (check is not None and entry.check != check):
+            return
+        del self._entries[key]
+        if self._wheel is not None:
+            self._wheel.cancel(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ========================================================================
+    # LOOP
+    # ========================================================================
+
+    async def _run_check(self, key: Hashable, entry: _Entry):
+        async with self._semaphore:
+            try:
+                await entry.check()
+                self.stats['checks_run'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['checks_failed'] += 1
+                logger.error(f"❌ Scheduled verification check failed for {key}: {e}")
+            finally:
+                entry.running = False
+                if self._entries.get(key) is entry:
+                    self._wheel.schedule(key, time.monotonic() + self._jittered(entry.interval_fn()))
+
+    async def _run(self):
+        tick = self.config.TICK_SECONDS
+        next_tick = time.monotonic() + tick
+        while True:
+            try:
+                await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+                started = time.monotonic()
+                lag_ms = (started - next_tick) * 1000
+                next_tick += tick
+                if started - next_tick > tick:
+                    next_tick = started + tick   # fell far behind; don't spin to catch up
+
+                batch = []
+                for key in self._wheel.advance(started):
+                    entry = self._entries.get(key)
+                    if entry is not None and not entry.running:
+                        entry.running = True
+                        batch.append(self._loop.create_task(self._run_check(key, entry)))
+
+                if self.flush_fn and started - self._last_flush >= self.config.FLUSH_SECONDS:
+                    self._last_flush = started
+                    self._loop.create_task(self.flush_fn())
+
+                self.stats['ticks'] += 1
+                self.stats['max_batch'] = max(self.stats['max_batch'], len(batch))
+                self.stats['tick_lag_ms_total'] += max(0.0, lag_ms)
+                self.stats['max_tick_lag_ms'] = max(self.stats['max_tick_lag_ms'], lag_ms)
+                self.stats['busy_ms_total'] += (time.monotonic() - started) * 1000
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ Verification scheduler tick failed: {e}")
+
+    async def stop(self):
+        """Cancel the tick loop and run a final flush; register() restarts it"""
+        # Detach first so a register() during the await starts a fresh loop
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self.flush_fn:
+            await self.flush_fn()
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        ticks = max(1, stats['ticks'])
+        stats['registered'] = len(self._entries)
+        stats['avg_tick_lag_ms'] = round(stats['tick_lag_ms_total'] / ticks, 3)
+        stats['avg_tick_busy_ms'] = round(stats['busy_ms_total'] / ticks, 3)
+        stats['running'] = self._task is not None and not self._task.done()
+        return stats
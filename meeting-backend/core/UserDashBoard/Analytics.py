@@ -21,6 +21,18 @@ import os
 from textwrap import fill
 from reportlab.platypus import Paragraph
 from reportlab.lib.styles import ParagraphStyle
+from core.UserDashBoard.analytics_rollups import (
+    get_host_rollup_summary,
+    get_user_rollup_summary,
+    count_unique_participants,
+)
+from core.UserDashBoard.report_jobs import (
+    get_report_key,
+    get_report_status,
+    enqueue_report,
+    render_report,
+    serve_cached_report,
+)
 # Configure logging
 logging.basicConfig(filename='analytics_debug.log', level=logging.DEBUG, format='%(asctime)s %(levelname)s %(message)s')
 
@@ -334,6 +346,366 @@ def get_host_report_data(host_id, start_date=None, end_date=None):
         logging.error(f"Error getting host report data: {e}")
         return None
 
+def build_participant_report_pdf(data, output):
+    """Render the participant report for pre-fetched report data into a binary file-like object"""
+    # Create PDF
+    doc = SimpleDocTemplate(output, pagesize=letter, leftMargin=50, rightMargin=50, topMargin=80, bottomMargin=80)
+
+    # Create report generator
+    report_gen = ReportGenerator()
+
+    # Story elements
+    story = []
+
+    # Title
+    title = Paragraph(f"Participant Attendance Report", report_gen.custom_styles['ReportTitle'])
+    story.append(title)
+    story.append(Spacer(1, 20))
+
+    # Participant Information
+    participant_info = data['participant_info']
+    story.append(Paragraph("Participant Information", report_gen.custom_styles['SectionHeader']))
+
+    participant_table_data = [
+        ['Participant ID:', str(participant_info['user_id'])],
+        ['Full Name:', participant_info['full_name']],
+        ['Report Period:', f"{data['date_range']['start'].strftime('%Y-%m-%d')} to {data['date_range']['end'].strftime('%Y-%m-%d')}"],
+    ]
+
+    participant_table = Table(participant_table_data, colWidths=[2*inch, 4*inch])
+    participant_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    story.append(participant_table)
+    story.append(Spacer(1, 20))
+
+    # Overall Statistics
+    overall_stats = data['overall_stats']
+    story.append(Paragraph("Overall Statistics", report_gen.custom_styles['SectionHeader']))
+
+    stats_table_data = [
+        ['Total Meetings Attended:', str(int(overall_stats[0] or 0))],
+        ['Average Participant Attendance:', f"{round(float(overall_stats[1] or 0), 2)}%"],
+        ['Average Overall Attendance:', f"{round(float(overall_stats[2] or 0), 2)}%"],
+        ['Total Duration (Minutes):', f"{round(float(overall_stats[3] or 0), 2)}"],
+        ['Total Duration (Hours):', f"{round(float(overall_stats[3] or 0) / 60, 2)}"],
+        ['Average Engagement Score:', f"{round(float(overall_stats[4] or 0), 2)}"],
+        ['Average Attendance Penalty:', f"{round(float(overall_stats[5] or 0), 2)}"],
+        ['Total Break Time Used (Minutes):', f"{round(float(overall_stats[6] or 0), 2)}"],
+        ['Total Violations/Detections:', str(int(overall_stats[7] or 0))],
+    ]
+
+    stats_table = Table(stats_table_data, colWidths=[3*inch, 3*inch])
+    stats_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightblue),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    story.append(stats_table)
+    story.append(Spacer(1, 20))
+
+    # Detailed Meeting Records
+    story.append(Paragraph("Detailed Meeting Records", report_gen.custom_styles['SectionHeader']))
+
+    if data['meetings_data']:
+        for meeting in data['meetings_data']:
+            # Meeting header
+            meeting_title = f"Meeting: {meeting[1] or 'Unnamed Meeting'}"
+            story.append(Paragraph(meeting_title, report_gen.custom_styles['SubHeader']))
+
+            # Meeting details table
+            meeting_details = [
+                ['Meeting ID:', str(meeting[0])],
+                ['Meeting Type:', meeting[2] or 'N/A'],
+                ['Created Date:', meeting[3].strftime('%Y-%m-%d %H:%M') if meeting[3] else 'N/A'],
+                ['Started Date:', meeting[4].strftime('%Y-%m-%d %H:%M') if meeting[4] else 'N/A'],
+                ['Ended Date:', meeting[5].strftime('%Y-%m-%d %H:%M') if meeting[5] else 'N/A'],
+                ['Host ID:', str(meeting[6])],
+                ['Participant Role:', meeting[7] or 'participant'],
+            ]
+
+            meeting_table = Table(meeting_details, colWidths=[2.5*inch, 3.5*inch])
+            meeting_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]))
+            story.append(meeting_table)
+            story.append(Spacer(1, 10))
+
+            # Attendance and Duration Data
+            attendance_data = [
+                ['Duration (Minutes):', f"{round(float(meeting[10] or 0), 2)}"],
+                ['Total Sessions:', str(int(meeting[11] or 0))],
+                ['Attendance % (Host-based):', f"{round(float(meeting[12] or 0), 2)}%"],
+                ['Participant Attendance:', f"{round(float(meeting[13] or 0), 2)}%"],
+                ['Overall Attendance:', f"{round(float(meeting[14] or 0), 2)}%"],
+                ['Currently Active:', 'Yes' if meeting[15] else 'No'],
+            ]
+
+            attendance_table = Table(attendance_data, colWidths=[2.5*inch, 3.5*inch])
+            attendance_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (0, -1), colors.lightyellow),
+                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]))
+            story.append(attendance_table)
+            story.append(Spacer(1, 10))
+
+            # # Attendance Monitoring Data
+            # monitoring_data = [
+            #     ['Popup Count:', str(int(meeting[16] or 0))],
+            #     ['Detection Counts:', meeting[17] or 'N/A'],
+            #     ['Violation Start Times:', meeting[18] or 'N/A'],
+            #     ['Total Detections:', str(int(meeting[19] or 0))],
+            #     ['Attendance Penalty:', f"{round(float(meeting[20] or 0), 2)}"],
+            #     ['Break Used:', 'Yes' if meeting[21] else 'No'],
+            #     ['Total Break Time (seconds):', str(int(meeting[22] or 0))],
+            #     ['Engagement Score:', str(int(meeting[23] or 0))],
+            #     ['Session Attendance %:', f"{round(float(meeting[24] or 0), 2)}%"],
+            #     ['Focus Score:', f"{round(float(meeting[25] or 0), 2)}"],
+            #     ['Break Count:', str(int(meeting[26] or 0))],
+            #     ['Violation Severity Score:', f"{round(float(meeting[27] or 0), 2)}"],
+            # ]
+
+            # monitoring_table = Table(monitoring_data, colWidths=[2.5*inch, 3.5*inch])
+            # monitoring_table.setStyle(TableStyle([
+            #     ('BACKGROUND', (0, 0), (0, -1), colors.lightcoral),
+            #     ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            #     ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            #     ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            #     ('FONTSIZE', (0, 0), (-1, -1), 9),
+            #     ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            # ]))
+            # story.append(monitoring_table)
+            # story.append(Spacer(1, 15))
+            # Define a paragraph style for wrapped cell text
+            wrapped_style = ParagraphStyle(
+                name="WrappedStyle",
+                fontName="Helvetica",
+                fontSize=8.5,
+                leading=10,
+                wordWrap='CJK'
+            )
+
+            # --- Monitoring data (no truncation, full text displayed) ---
+            monitoring_data = [
+                ['Popup Count:', Paragraph(str(int(meeting[16] or 0)), wrapped_style)],
+                ['Detection Counts:', Paragraph(str(meeting[17] or 'N/A'), wrapped_style)],
+                ['Violation Start Times:', Paragraph(str(meeting[18] or 'N/A'), wrapped_style)],
+                ['Total Detections:', Paragraph(str(int(meeting[19] or 0)), wrapped_style)],
+                ['Attendance Penalty:', Paragraph(f"{round(float(meeting[20] or 0), 2)}", wrapped_style)],
+                ['Break Used:', Paragraph('Yes' if meeting[21] else 'No', wrapped_style)],
+                ['Total Break Time (seconds):', Paragraph(str(int(meeting[22] or 0)), wrapped_style)],
+                ['Engagement Score:', Paragraph(str(int(meeting[23] or 0)), wrapped_style)],
+                ['Session Attendance %:', Paragraph(f"{round(float(meeting[24] or 0), 2)}%", wrapped_style)],
+                ['Focus Score:', Paragraph(f"{round(float(meeting[25] or 0), 2)}", wrapped_style)],
+                ['Break Count:', Paragraph(str(int(meeting[26] or 0)), wrapped_style)],
+                ['Violation Severity Score:', Paragraph(f"{round(float(meeting[27] or 0), 2)}", wrapped_style)],
+            ]
+
+            # Create monitoring table with consistent alignment & wrapping
+            monitoring_table = Table(monitoring_data, colWidths=[2.7*inch, 3.3*inch])
+            monitoring_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (0, -1), colors.lightcoral),
+                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                ('WORDWRAP', (0, 0), (-1, -1), 'CJK'),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 0), (-1, -1), 8.5),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
+            ]))
+            story.append(monitoring_table)
+            story.append(Spacer(1, 15))
+
+
+    else:
+        story.append(Paragraph("No meeting records found for the selected period.", report_gen.styles['Normal']))
+
+    # Build PDF with custom header/footer
+    def add_page_number(canvas, doc):
+        report_gen.create_header_footer(canvas, doc, "Participant Attendance Report")
+
+    doc.build(story, onFirstPage=add_page_number, onLaterPages=add_page_number)
+
+
+def build_host_report_pdf(data, output):
+    """Render the host report for pre-fetched report data into a binary file-like object"""
+    # Create PDF
+    doc = SimpleDocTemplate(output, pagesize=letter, leftMargin=50, rightMargin=50, topMargin=80, bottomMargin=80)
+
+    # Create report generator
+    report_gen = ReportGenerator()
+
+    # Story elements
+    story = []
+
+    # Title
+    title = Paragraph(f"Host Meeting Report", report_gen.custom_styles['ReportTitle'])
+    story.append(title)
+    story.append(Spacer(1, 20))
+
+    # Host Information
+    story.append(Paragraph("Host Information", report_gen.custom_styles['SectionHeader']))
+
+    host_info_data = [
+        ['Host ID:', str(data['host_id'])],
+        ['Report Period:', f"{data['date_range']['start'].strftime('%Y-%m-%d')} to {data['date_range']['end'].strftime('%Y-%m-%d')}"],
+    ]
+
+    host_table = Table(host_info_data, colWidths=[2*inch, 4*inch])
+    host_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    story.append(host_table)
+    story.append(Spacer(1, 20))
+
+    # Host Summary Statistics
+    host_stats = data['host_stats']
+    story.append(Paragraph("Host Summary Statistics", report_gen.custom_styles['SectionHeader']))
+
+    summary_data = [
+        ['Total Meetings Created:', str(int(host_stats[0] or 0))],
+        ['Active Meetings:', str(int(host_stats[1] or 0))],
+        ['Completed Meetings:', str(int(host_stats[2] or 0))],
+        ['Scheduled Meetings:', str(int(host_stats[3] or 0))],
+        ['Total Unique Participants:', str(int(host_stats[4] or 0))],
+        ['Average Participant Attendance:', f"{round(float(host_stats[5] or 0), 2)}%"],
+        ['Average Engagement Score:', f"{round(float(host_stats[6] or 0), 2)}"],
+        ['Total Violations Across Meetings:', str(int(host_stats[7] or 0))],
+    ]
+
+    summary_table = Table(summary_data, colWidths=[3*inch, 3*inch])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightblue),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    story.append(summary_table)
+    story.append(Spacer(1, 20))
+
+    # Detailed Meeting Records with Participants
+    story.append(Paragraph("Detailed Meeting Records with Participants", report_gen.custom_styles['SectionHeader']))
+
+    if data['meetings_data']:
+        # Group meetings data by meeting_id
+        meetings_dict = {}
+        for record in data['meetings_data']:
+            meeting_id = record[0]
+            if meeting_id not in meetings_dict:
+                meetings_dict[meeting_id] = {
+                    'meeting_info': record[:7],  # meeting details
+                    'participants': []
+                }
+
+            # Add participant if exists
+            if record[7]:  # user_id exists
+                meetings_dict[meeting_id]['participants'].append(record[7:])
+
+        for meeting_id, meeting_data in meetings_dict.items():
+            meeting_info = meeting_data['meeting_info']
+            participants = meeting_data['participants']
+
+            # Meeting header
+            meeting_title = f"Meeting: {meeting_info[1] or 'Unnamed Meeting'}"
+            story.append(Paragraph(meeting_title, report_gen.custom_styles['SubHeader']))
+
+            # Meeting details
+            meeting_details = [
+                ['Meeting ID:', str(meeting_info[0])],
+                ['Meeting Type:', meeting_info[2] or 'N/A'],
+                ['Created Date:', meeting_info[3].strftime('%Y-%m-%d %H:%M') if meeting_info[3] else 'N/A'],
+                ['Started Date:', meeting_info[4].strftime('%Y-%m-%d %H:%M') if meeting_info[4] else 'N/A'],
+                ['Ended Date:', meeting_info[5].strftime('%Y-%m-%d %H:%M') if meeting_info[5] else 'N/A'],
+                ['Status:', meeting_info[6] or 'N/A'],
+                ['Total Participants:', str(len(participants))],
+            ]
+
+            meeting_table = Table(meeting_details, colWidths=[2.5*inch, 3.5*inch])
+            meeting_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]))
+            story.append(meeting_table)
+            story.append(Spacer(1, 10))
+
+            # Participants details
+            if participants:
+                story.append(Paragraph("Participants:", report_gen.styles['Heading3']))
+
+                # Create participants table
+                participants_header = [
+                    'Name', 'Role', 'Duration (min)', 'Attendance %', 
+                    'Engagement', 'Penalties', 'Breaks', 'Violations'
+                ]
+                participants_data = [participants_header]
+
+                for participant in participants:
+                    participant_row = [
+                        participant[1] or 'N/A',  # Full_Name
+                        participant[2] or 'participant',  # Role
+                        f"{round(float(participant[3] or 0), 1)}",  # Total_Duration_Minutes
+                        f"{round(float(participant[5] or 0), 1)}%",  # Participant_Attendance
+                        str(int(participant[15] or 0)),  # engagement_score
+                        f"{round(float(participant[12] or 0), 2)}",  # attendance_penalty
+                        str(int(participant[13] or 0)),  # break_used
+                        str(int(participant[11] or 0)),  # total_detections
+                    ]
+                    participants_data.append(participant_row)
+
+                participants_table = Table(participants_data, colWidths=[1*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.6*inch, 0.8*inch])
+                participants_table.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, 0), 8),
+                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                    ('FONTSIZE', (0, 1), (-1, -1), 7),
+                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+                ]))
+                story.append(participants_table)
+            else:
+                story.append(Paragraph("No participants recorded for this meeting.", report_gen.styles['Normal']))
+
+            story.append(Spacer(1, 15))
+    else:
+        story.append(Paragraph("No meeting records found for the selected period.", report_gen.styles['Normal']))
+
+    # Build PDF with custom header/footer
+    def add_page_number(canvas, doc):
+        report_gen.create_header_footer(canvas, doc, "Host Meeting Report")
+
+    doc.build(story, onFirstPage=add_page_number, onLaterPages=add_page_number)
+
 @require_http_methods(["GET"])
 @csrf_exempt
 def get_comprehensive_meeting_analytics(request):
@@ -529,34 +901,19 @@ def get_comprehensive_meeting_analytics(request):
                         }
                     })
 
-            # 2. HOST ANALYTICS
+            # 2. HOST ANALYTICS (status counts live, aggregates from daily rollups)
             if analytics_type in ['all', 'host']:
                 host_analytics_query = """
                     SELECT 
                         m.Host_ID,
                         m.Meeting_Type,
-                        COUNT(DISTINCT m.ID) as total_meetings_hosted,
-                        COUNT(DISTINCT CASE WHEN m.Status = 'active' THEN m.ID END) as active_meetings,
-                        COUNT(DISTINCT CASE WHEN m.Status = 'ended' THEN m.ID END) as ended_meetings,
-                        COUNT(DISTINCT CASE WHEN m.Status = 'scheduled' THEN m.ID END) as scheduled_meetings,
-                        COUNT(DISTINCT p.User_ID) as total_unique_participants,
-                        AVG(p.Total_Duration_Minutes) as avg_meeting_duration_minutes,
-                        AVG(p.Participant_Attendance) as avg_participant_attendance,
-                        AVG(p.Overall_Attendance) as avg_overall_attendance,
-                        SUM(p.Total_Duration_Minutes) as total_hosting_time_minutes,
+                        COUNT(*) as total_meetings_hosted,
+                        COUNT(CASE WHEN m.Status = 'active' THEN 1 END) as active_meetings,
+                        COUNT(CASE WHEN m.Status = 'ended' THEN 1 END) as ended_meetings,
+                        COUNT(CASE WHEN m.Status = 'scheduled' THEN 1 END) as scheduled_meetings,
                         MIN(m.Created_At) as first_meeting_created,
-                        MAX(m.Created_At) as last_meeting_created,
-                        
-                        -- Attendance monitoring averages
-                        AVG(ats.popup_count) as avg_popup_count,
-                        AVG(ats.total_detections) as avg_total_detections,
-                        AVG(ats.attendance_penalty) as avg_attendance_penalty,
-                        AVG(ats.engagement_score) as avg_engagement_score,
-                        COUNT(CASE WHEN ats.break_used = 1 THEN 1 END) as total_breaks_used
-                        
+                        MAX(m.Created_At) as last_meeting_created
                     FROM tbl_Meetings m
-                    LEFT JOIN tbl_Participants p ON m.ID = p.Meeting_ID
-                    LEFT JOIN tbl_Attendance_Sessions ats ON m.ID = ats.Meeting_ID
                     WHERE 1=1
                 """
                 
@@ -574,8 +931,16 @@ def get_comprehensive_meeting_analytics(request):
                 host_analytics_query += " GROUP BY m.Host_ID, m.Meeting_Type ORDER BY total_meetings_hosted DESC"
                 
                 cursor.execute(host_analytics_query, params)
+                host_rollups = {
+                    (r['host_id'], r['meeting_type']): r
+                    for r in get_host_rollup_summary(start_date, end_date, host_id=user_id,
+                                                     meeting_type=meeting_type, group_by_host=True)
+                }
+                host_unique_participants = count_unique_participants(start_date, end_date, host_id=user_id,
+                                                                     meeting_type=meeting_type, group_by_host=True)
                 host_data = []
                 for row in cursor.fetchall():
+                    rollup = host_rollups.get((row[0], row[1])) or {}
                     host_data.append({
                         "host_id": row[0],
                         "meeting_type": row[1],
@@ -587,98 +952,56 @@ def get_comprehensive_meeting_analytics(request):
                             "completion_rate": round((int(row[4] or 0) / int(row[2] or 1) * 100), 2)
                         },
                         "participant_analytics": {
-                            "total_unique_participants": int(row[6] or 0),
-                            "avg_meeting_duration_minutes": round(float(row[7] or 0), 2),
-                            "avg_participant_attendance": round(float(row[8] or 0), 2),
-                            "avg_overall_attendance": round(float(row[9] or 0), 2),
-                            "total_hosting_time_minutes": round(float(row[10] or 0), 2)
+                            "total_unique_participants": host_unique_participants.get((row[0], row[1]), 0),
+                            "avg_meeting_duration_minutes": rollup.get('avg_participant_duration_minutes', 0.0),
+                            "avg_participant_attendance": rollup.get('avg_participant_attendance', 0.0),
+                            "avg_overall_attendance": rollup.get('avg_overall_attendance', 0.0),
+                            "total_hosting_time_minutes": rollup.get('total_participant_duration_minutes', 0.0)
                         },
                         "activity_period": {
-                            "first_meeting_created": row[11].isoformat() if row[11] else None,
-                            "last_meeting_created": row[12].isoformat() if row[12] else None
+                            "first_meeting_created": row[6].isoformat() if row[6] else None,
+                            "last_meeting_created": row[7].isoformat() if row[7] else None
                         },
                         "attendance_monitoring": {
-                            "avg_popup_count": round(float(row[13] or 0), 2),
-                            "avg_total_detections": round(float(row[14] or 0), 2),
-                            "avg_attendance_penalty": round(float(row[15] or 0), 2),
-                            "avg_engagement_score": round(float(row[16] or 0), 2),
-                            "total_breaks_used": int(row[17] or 0)
+                            "avg_popup_count": rollup.get('avg_popup_count', 0.0),
+                            "avg_total_detections": rollup.get('avg_total_detections', 0.0),
+                            "avg_attendance_penalty": rollup.get('avg_attendance_penalty', 0.0),
+                            "avg_engagement_score": rollup.get('avg_engagement_score', 0.0),
+                            "total_breaks_used": rollup.get('total_breaks_used', 0)
                         }
                     })
 
-            # 3. PARTICIPANT SUMMARY ANALYTICS
+            # 3. PARTICIPANT SUMMARY ANALYTICS (daily rollups)
             if analytics_type in ['all', 'participant']:
-                participant_summary_query = """
-                    SELECT 
-                        p.User_ID,
-                        p.Full_Name,
-                        COUNT(DISTINCT p.Meeting_ID) as total_meetings_attended,
-                        SUM(p.Total_Duration_Minutes) as total_participation_time_minutes,
-                        AVG(p.Total_Duration_Minutes) as avg_meeting_duration_minutes,
-                        AVG(p.Participant_Attendance) as avg_participant_attendance,
-                        AVG(p.Overall_Attendance) as avg_overall_attendance,
-                        COUNT(DISTINCT CASE WHEN p.Is_Currently_Active = 1 THEN p.Meeting_ID END) as active_meetings,
-                        AVG(p.Total_Sessions) as avg_sessions_per_meeting,
-                        p.Meeting_Type,
-                        MIN(m.Created_At) as first_meeting_joined,
-                        MAX(m.Created_At) as last_meeting_joined,
-                        
-                        -- Attendance session analytics
-                        AVG(ats.popup_count) as avg_popup_count,
-                        AVG(ats.total_detections) as avg_total_detections,
-                        AVG(ats.attendance_penalty) as avg_attendance_penalty,
-                        AVG(ats.total_break_time_used) as avg_break_time_used,
-                        AVG(ats.engagement_score) as avg_engagement_score,
-                        AVG(ats.focus_score) as avg_focus_score,
-                        COUNT(CASE WHEN ats.break_used = 1 THEN 1 END) as total_breaks_taken
-                        
-                    FROM tbl_Participants p
-                    LEFT JOIN tbl_Attendance_Sessions ats ON p.Meeting_ID = ats.Meeting_ID AND p.User_ID = ats.User_ID
-                    LEFT JOIN tbl_Meetings m ON p.Meeting_ID = m.ID
-                    WHERE p.Role = 'participant'
-                """
-                
-                params = []
-                if user_id:
-                    participant_summary_query += " AND p.User_ID = %s"
-                    params.append(user_id)
-                if meeting_type != 'all':
-                    participant_summary_query += " AND p.Meeting_Type = %s"
-                    params.append(meeting_type)
-                
-                participant_summary_query += " AND m.Created_At BETWEEN %s AND %s"
-                params.extend([start_date, end_date])
-                
-                participant_summary_query += " GROUP BY p.User_ID, p.Full_Name, p.Meeting_Type ORDER BY total_meetings_attended DESC"
-                
-                cursor.execute(participant_summary_query, params)
                 participant_summary_data = []
-                for row in cursor.fetchall():
+                for summary in get_user_rollup_summary(start_date, end_date, user_id=user_id,
+                                                       meeting_type=meeting_type, role='participant',
+                                                       group_by_user=True):
                     participant_summary_data.append({
-                        "user_id": row[0],
-                        "full_name": row[1],
+                        "user_id": summary['user_id'],
+                        "full_name": summary['full_name'],
                         "meeting_participation": {
-                            "total_meetings_attended": int(row[2] or 0),
-                            "total_participation_time_minutes": round(float(row[3] or 0), 2),
-                            "avg_meeting_duration_minutes": round(float(row[4] or 0), 2),
-                            "avg_participant_attendance": round(float(row[5] or 0), 2),
-                            "avg_overall_attendance": round(float(row[6] or 0), 2),
-                            "active_meetings": int(row[7] or 0),
-                            "avg_sessions_per_meeting": round(float(row[8] or 0), 2)
+                            "total_meetings_attended": summary['total_meetings_attended'],
+                            "total_participation_time_minutes": summary['total_participation_time_minutes'],
+                            "avg_meeting_duration_minutes": summary['avg_meeting_duration_minutes'],
+                            "avg_participant_attendance": summary['avg_participant_attendance'],
+                            "avg_overall_attendance": summary['avg_overall_attendance'],
+                            "active_meetings": summary['active_meetings'],
+                            "avg_sessions_per_meeting": summary['avg_sessions_per_meeting']
                         },
-                        "meeting_type": row[9],
+                        "meeting_type": summary['meeting_type'],
                         "activity_period": {
-                            "first_meeting_joined": row[10].isoformat() if row[10] else None,
-                            "last_meeting_joined": row[11].isoformat() if row[11] else None
+                            "first_meeting_joined": summary['first_meeting_at'].isoformat() if summary['first_meeting_at'] else None,
+                            "last_meeting_joined": summary['last_meeting_at'].isoformat() if summary['last_meeting_at'] else None
                         },
                         "attendance_analytics": {
-                            "avg_popup_count": round(float(row[12] or 0), 2),
-                            "avg_total_detections": round(float(row[13] or 0), 2),
-                            "avg_attendance_penalty": round(float(row[14] or 0), 2),
-                            "avg_break_time_used": round(float(row[15] or 0), 2),
-                            "avg_engagement_score": round(float(row[16] or 0), 2),
-                            "avg_focus_score": round(float(row[17] or 0), 2),
-                            "total_breaks_taken": int(row[18] or 0)
+                            "avg_popup_count": summary['avg_popup_count'],
+                            "avg_total_detections": summary['avg_total_detections'],
+                            "avg_attendance_penalty": summary['avg_attendance_penalty'],
+                            "avg_break_time_used": summary['avg_break_time_used'],
+                            "avg_engagement_score": summary['avg_engagement_score'],
+                            "avg_focus_score": summary['avg_focus_score'],
+                            "total_breaks_taken": summary['total_breaks_taken']
                         }
                     })
 
@@ -771,49 +1094,36 @@ def get_comprehensive_meeting_analytics(request):
                         }
                     })
 
-            # 5. OVERALL SUMMARY STATISTICS
+            # 5. OVERALL SUMMARY STATISTICS (live status counts + daily rollups)
             cursor.execute("""
                 SELECT 
-                    COUNT(DISTINCT m.ID) as total_meetings,
+                    COUNT(*) as total_meetings,
                     COUNT(DISTINCT m.Host_ID) as total_hosts,
-                    COUNT(DISTINCT p.User_ID) as total_participants,
-                    AVG(p.Total_Duration_Minutes) as avg_duration_minutes,
-                    AVG(p.Participant_Attendance) as avg_participant_attendance,
-                    AVG(p.Overall_Attendance) as avg_overall_attendance,
-                    SUM(p.Total_Duration_Minutes) as total_duration_minutes,
-                    COUNT(DISTINCT CASE WHEN m.Status = 'ended' THEN m.ID END) as ended_meetings,
-                    COUNT(DISTINCT CASE WHEN m.Status = 'active' THEN m.ID END) as active_meetings,
-                    COUNT(DISTINCT CASE WHEN m.Status = 'scheduled' THEN m.ID END) as scheduled_meetings,
-                    
-                    -- Overall attendance monitoring
-                    AVG(ats.popup_count) as overall_avg_popup_count,
-                    AVG(ats.total_detections) as overall_avg_detections,
-                    AVG(ats.attendance_penalty) as overall_avg_penalty,
-                    AVG(ats.engagement_score) as overall_avg_engagement
-                    
+                    COUNT(CASE WHEN m.Status = 'ended' THEN 1 END) as ended_meetings,
+                    COUNT(CASE WHEN m.Status = 'active' THEN 1 END) as active_meetings,
+                    COUNT(CASE WHEN m.Status = 'scheduled' THEN 1 END) as scheduled_meetings
                 FROM tbl_Meetings m
-                LEFT JOIN tbl_Participants p ON m.ID = p.Meeting_ID
-                LEFT JOIN tbl_Attendance_Sessions ats ON m.ID = ats.Meeting_ID
                 WHERE m.Created_At BETWEEN %s AND %s
             """, [start_date, end_date])
             
             summary_row = cursor.fetchone()
+            overall_rollup = get_host_rollup_summary(start_date, end_date) or {}
             overall_summary = {
                 "total_meetings": int(summary_row[0] or 0),
                 "total_hosts": int(summary_row[1] or 0),
-                "total_participants": int(summary_row[2] or 0),
-                "avg_duration_minutes": round(float(summary_row[3] or 0), 2),
-                "avg_participant_attendance": round(float(summary_row[4] or 0), 2),
-                "avg_overall_attendance": round(float(summary_row[5] or 0), 2),
-                "total_duration_hours": round(float(summary_row[6] or 0) / 60, 2),
-                "ended_meetings": int(summary_row[7] or 0),
-                "active_meetings": int(summary_row[8] or 0),
-                "scheduled_meetings": int(summary_row[9] or 0),
+                "total_participants": count_unique_participants(start_date, end_date),
+                "avg_duration_minutes": overall_rollup.get('avg_participant_duration_minutes', 0.0),
+                "avg_participant_attendance": overall_rollup.get('avg_participant_attendance', 0.0),
+                "avg_overall_attendance": overall_rollup.get('avg_overall_attendance', 0.0),
+                "total_duration_hours": round(overall_rollup.get('total_participant_duration_minutes', 0.0) / 60, 2),
+                "ended_meetings": int(summary_row[2] or 0),
+                "active_meetings": int(summary_row[3] or 0),
+                "scheduled_meetings": int(summary_row[4] or 0),
                 "attendance_monitoring_summary": {
-                    "overall_avg_popup_count": round(float(summary_row[10] or 0), 2),
-                    "overall_avg_detections": round(float(summary_row[11] or 0), 2),
-                    "overall_avg_penalty": round(float(summary_row[12] or 0), 2),
-                    "overall_avg_engagement": round(float(summary_row[13] or 0), 2)
+                    "overall_avg_popup_count": overall_rollup.get('avg_popup_count', 0.0),
+                    "overall_avg_detections": overall_rollup.get('avg_total_detections', 0.0),
+                    "overall_avg_penalty": overall_rollup.get('avg_attendance_penalty', 0.0),
+                    "overall_avg_engagement": overall_rollup.get('avg_engagement_score', 0.0)
                 },
                 "date_range": {
                     "start": start_date.isoformat(),
@@ -1026,6 +1336,8 @@ def get_host_meeting_count_analytics(request):
         else:
             start_date = end_date - timedelta(days=30)
 
+        # Meeting status counts are read live from tbl_Meetings alone; all
+        # participant and attendance figures come from the daily rollups.
         with connection.cursor() as cursor:
             query = """
                 SELECT 
@@ -1035,44 +1347,11 @@ def get_host_meeting_count_analytics(request):
                     COUNT(CASE WHEN m.Status = 'ended' THEN 1 END) as ended_meetings,
                     COUNT(CASE WHEN m.Status = 'active' THEN 1 END) as active_meetings,
                     COUNT(CASE WHEN m.Status = 'scheduled' THEN 1 END) as scheduled_meetings,
-                    
-                    -- Meeting duration analytics (if started and ended times available)
-                    AVG(CASE 
-                        WHEN m.Started_At IS NOT NULL AND m.Ended_At IS NOT NULL 
-                        THEN TIMESTAMPDIFF(MINUTE, m.Started_At, m.Ended_At)
-                        ELSE NULL 
-                    END) as avg_actual_meeting_duration_minutes,
-                    
-                    SUM(CASE 
-                        WHEN m.Started_At IS NOT NULL AND m.Ended_At IS NOT NULL 
-                        THEN TIMESTAMPDIFF(MINUTE, m.Started_At, m.Ended_At)
-                        ELSE 0 
-                    END) as total_actual_hosted_duration_minutes,
-                    
-                    -- Participant analytics
-                    COUNT(DISTINCT p.User_ID) as total_unique_participants,
-                    AVG(p.Participant_Attendance) as avg_participant_attendance,
-                    AVG(p.Overall_Attendance) as avg_overall_attendance,
-                    SUM(p.Total_Duration_Minutes) as total_participant_duration_minutes,
-                    
-                    -- Attendance monitoring
-                    AVG(ats.popup_count) as avg_popup_count,
-                    AVG(ats.total_detections) as avg_total_detections,
-                    AVG(ats.attendance_penalty) as avg_attendance_penalty,
-                    AVG(ats.engagement_score) as avg_engagement_score,
-                    COUNT(CASE WHEN ats.break_used = 1 THEN 1 END) as total_breaks_across_meetings,
-                    
-                    -- Activity dates
                     MIN(m.Created_At) as first_meeting_date,
                     MAX(m.Created_At) as last_meeting_date,
-                    
-                    -- Recording analytics
                     COUNT(CASE WHEN m.Is_Recording_Enabled = 1 THEN 1 END) as meetings_with_recording_enabled,
                     COUNT(CASE WHEN m.Waiting_Room_Enabled = 1 THEN 1 END) as meetings_with_waiting_room
-                    
                 FROM tbl_Meetings m
-                LEFT JOIN tbl_Participants p ON m.ID = p.Meeting_ID
-                LEFT JOIN tbl_Attendance_Sessions ats ON m.ID = ats.Meeting_ID
                 WHERE m.Created_At BETWEEN %s AND %s
             """
             
@@ -1087,58 +1366,70 @@ def get_host_meeting_count_analytics(request):
             query += " GROUP BY m.Host_ID, m.Meeting_Type ORDER BY total_meetings_created DESC"
             
             cursor.execute(query, params)
-            host_analytics = []
+            meeting_rows = cursor.fetchall()
+
+        rollups = {
+            (r['host_id'], r['meeting_type']): r
+            for r in get_host_rollup_summary(start_date, end_date, host_id=host_id,
+                                             meeting_type=meeting_type, group_by_host=True)
+        }
+        unique_participants = count_unique_participants(start_date, end_date, host_id=host_id,
+                                                        meeting_type=meeting_type, group_by_host=True)
+
+        host_analytics = []
+        for row in meeting_rows:
+            total_meetings = int(row[2])
+            ended_meetings = int(row[3])
+            rollup = rollups.get((row[0], row[1])) or {}
+            hosted_minutes = rollup.get('total_actual_hosted_duration_minutes', 0.0)
+            participant_minutes = rollup.get('total_participant_duration_minutes', 0.0)
             
-            for row in cursor.fetchall():
-                total_meetings = int(row[2])
-                ended_meetings = int(row[3])
+            host_analytics.append({
+                "host_id": row[0],
+                "meeting_type": row[1],
                 
-                host_analytics.append({
-                    "host_id": row[0],
-                    "meeting_type": row[1],
-                    
-                    "meeting_counts": {
-                        "total_meetings_created": total_meetings,
-                        "ended_meetings": ended_meetings,
-                        "active_meetings": int(row[4]),
-                        "scheduled_meetings": int(row[5]),
-                        "completion_rate": round((ended_meetings / total_meetings * 100), 2) if total_meetings > 0 else 0
-                    },
-                    
-                    "duration_analytics": {
-                        "avg_actual_meeting_duration_minutes": round(float(row[6] or 0), 2),
-                        "total_actual_hosted_duration_minutes": round(float(row[7] or 0), 2),
-                        "total_actual_hosted_duration_hours": round(float(row[7] or 0) / 60, 2)
-                    },
-                    
-                    "participant_analytics": {
-                        "total_unique_participants": int(row[8] or 0),
-                        "avg_participant_attendance": round(float(row[9] or 0), 2),
-                        "avg_overall_attendance": round(float(row[10] or 0), 2),
-                        "total_participant_duration_minutes": round(float(row[11] or 0), 2),
-                        "total_participant_duration_hours": round(float(row[11] or 0) / 60, 2)
-                    },
-                    
-                    "attendance_monitoring": {
-                        "avg_popup_count": round(float(row[12] or 0), 2),
-                        "avg_total_detections": round(float(row[13] or 0), 2),
-                        "avg_attendance_penalty": round(float(row[14] or 0), 2),
-                        "avg_engagement_score": round(float(row[15] or 0), 2),
-                        "total_breaks_across_meetings": int(row[16] or 0)
-                    },
-                    
-                    "activity_period": {
-                        "first_meeting_date": row[17].isoformat() if row[17] else None,
-                        "last_meeting_date": row[18].isoformat() if row[18] else None
-                    },
-                    
-                    "meeting_features": {
-                        "meetings_with_recording_enabled": int(row[19] or 0),
-                        "meetings_with_waiting_room": int(row[20] or 0),
-                        "recording_enabled_percentage": round((int(row[19] or 0) / total_meetings * 100), 2) if total_meetings > 0 else 0,
-                        "waiting_room_enabled_percentage": round((int(row[20] or 0) / total_meetings * 100), 2) if total_meetings > 0 else 0
-                    }
-                })
+                "meeting_counts": {
+                    "total_meetings_created": total_meetings,
+                    "ended_meetings": ended_meetings,
+                    "active_meetings": int(row[4]),
+                    "scheduled_meetings": int(row[5]),
+                    "completion_rate": round((ended_meetings / total_meetings * 100), 2) if total_meetings > 0 else 0
+                },
+                
+                "duration_analytics": {
+                    "avg_actual_meeting_duration_minutes": rollup.get('avg_actual_meeting_duration_minutes', 0.0),
+                    "total_actual_hosted_duration_minutes": hosted_minutes,
+                    "total_actual_hosted_duration_hours": round(hosted_minutes / 60, 2)
+                },
+                
+                "participant_analytics": {
+                    "total_unique_participants": unique_participants.get((row[0], row[1]), 0),
+                    "avg_participant_attendance": rollup.get('avg_participant_attendance', 0.0),
+                    "avg_overall_attendance": rollup.get('avg_overall_attendance', 0.0),
+                    "total_participant_duration_minutes": participant_minutes,
+                    "total_participant_duration_hours": round(participant_minutes / 60, 2)
+                },
+                
+                "attendance_monitoring": {
+                    "avg_popup_count": rollup.get('avg_popup_count', 0.0),
+                    "avg_total_detections": rollup.get('avg_total_detections', 0.0),
+                    "avg_attendance_penalty": rollup.get('avg_attendance_penalty', 0.0),
+                    "avg_engagement_score": rollup.get('avg_engagement_score', 0.0),
+                    "total_breaks_across_meetings": rollup.get('total_breaks_used', 0)
+                },
+                
+                "activity_period": {
+                    "first_meeting_date": row[6].isoformat() if row[6] else None,
+                    "last_meeting_date": row[7].isoformat() if row[7] else None
+                },
+                
+                "meeting_features": {
+                    "meetings_with_recording_enabled": int(row[8] or 0),
+                    "meetings_with_waiting_room": int(row[9] or 0),
+                    "recording_enabled_percentage": round((int(row[8] or 0) / total_meetings * 100), 2) if total_meetings > 0 else 0,
+                    "waiting_room_enabled_percentage": round((int(row[9] or 0) / total_meetings * 100), 2) if total_meetings > 0 else 0
+                }
+            })
 
         return JsonResponse({"data": host_analytics}, status=SUCCESS_STATUS)
 
@@ -1299,34 +1590,18 @@ def get_participant_attendance_analytics(request):
                     }
                 })
 
-            # Summary statistics for attendance
-            cursor.execute("""
-                SELECT 
-                    COUNT(DISTINCT p.User_ID) as total_participants,
-                    AVG(p.Participant_Attendance) as avg_participant_attendance,
-                    AVG(p.Overall_Attendance) as avg_overall_attendance,
-                    AVG(p.Attendance_Percentagebasedon_host) as avg_attendance_based_on_host,
-                    AVG(ats.attendance_penalty) as avg_penalty,
-                    AVG(ats.engagement_score) as avg_engagement,
-                    COUNT(CASE WHEN ats.break_used = 1 THEN 1 END) as total_breaks_used,
-                    AVG(ats.total_detections) as avg_violations
-                FROM tbl_Participants p
-                LEFT JOIN tbl_Attendance_Sessions ats ON p.Meeting_ID = ats.Meeting_ID AND p.User_ID = ats.User_ID
-                JOIN tbl_Meetings m ON p.Meeting_ID = m.ID
-                WHERE m.Created_At BETWEEN %s AND %s
-            """, [start_date, end_date])
-            
-            summary = cursor.fetchone()
-            attendance_summary = {
-                "total_participants": int(summary[0] or 0),
-                "avg_participant_attendance": round(float(summary[1] or 0), 2),
-                "avg_overall_attendance": round(float(summary[2] or 0), 2),
-                "avg_attendance_based_on_host": round(float(summary[3] or 0), 2),
-                "avg_penalty": round(float(summary[4] or 0), 2),
-                "avg_engagement": round(float(summary[5] or 0), 2),
-                "total_breaks_used": int(summary[6] or 0),
-                "avg_violations": round(float(summary[7] or 0), 2)
-            }
+        # Summary statistics for attendance (pre-aggregated daily rollups)
+        summary = get_user_rollup_summary(start_date, end_date) or {}
+        attendance_summary = {
+            "total_participants": summary.get('unique_users', 0),
+            "avg_participant_attendance": summary.get('avg_participant_attendance', 0.0),
+            "avg_overall_attendance": summary.get('avg_overall_attendance', 0.0),
+            "avg_attendance_based_on_host": summary.get('avg_attendance_based_on_host', 0.0),
+            "avg_penalty": summary.get('avg_attendance_penalty', 0.0),
+            "avg_engagement": summary.get('avg_engagement_score', 0.0),
+            "total_breaks_used": summary.get('total_breaks_taken', 0),
+            "avg_violations": summary.get('avg_total_detections', 0.0)
+        }
 
         return JsonResponse({
             "data": {
@@ -1376,32 +1651,19 @@ def get_host_dashboard_overview(request):
         else:
             return JsonResponse({"error": "Invalid timeframe"}, status=BAD_REQUEST_STATUS)
 
+        # Participant and attendance figures come from the daily rollups;
+        # only the live status breakdown touches tbl_Meetings (no joins).
+        rollup = get_host_rollup_summary(start_date, end_date, host_id=user_id, meeting_type=meeting_type) or {}
+        total_participants = count_unique_participants(start_date, end_date, host_id=user_id, meeting_type=meeting_type)
+
         with connection.cursor() as cursor:
-            # Enhanced overview with attendance sessions data using actual columns
             query = """
                 SELECT 
-                    COUNT(DISTINCT m.ID) as total_meetings,
-                    COUNT(DISTINCT p.User_ID) as total_participants,
-                    AVG(p.Total_Duration_Minutes) as avg_duration_minutes,
-                    AVG(p.Participant_Attendance) as avg_participant_attendance,
-                    AVG(p.Overall_Attendance) as avg_overall_attendance,
-                    
-                    -- Attendance monitoring averages
-                    AVG(ats.popup_count) as avg_popup_count,
-                    AVG(ats.total_detections) as avg_detections,
-                    AVG(ats.attendance_penalty) as avg_penalty,
-                    AVG(ats.total_break_time_used) as avg_break_time,
-                    AVG(ats.engagement_score) as avg_engagement_score,
-                    SUM(CASE WHEN ats.break_used = 1 THEN 1 ELSE 0 END) as total_breaks_used,
-                    
-                    -- Meeting status breakdown
+                    COUNT(*) as total_meetings,
                     COUNT(CASE WHEN m.Status = 'active' THEN 1 END) as active_meetings,
                     COUNT(CASE WHEN m.Status = 'ended' THEN 1 END) as ended_meetings,
                     COUNT(CASE WHEN m.Status = 'scheduled' THEN 1 END) as scheduled_meetings
-                    
                 FROM tbl_Meetings m
-                LEFT JOIN tbl_Participants p ON m.ID = p.Meeting_ID
-                LEFT JOIN tbl_Attendance_Sessions ats ON m.ID = ats.Meeting_ID
                 WHERE m.Host_ID = %s AND m.Created_At BETWEEN %s AND %s
             """
             
@@ -1415,24 +1677,24 @@ def get_host_dashboard_overview(request):
 
         data = {
             "total_meetings": int(result[0] or 0),
-            "total_participants": int(result[1] or 0),
-            "average_duration_minutes": round(float(result[2] or 0), 2),
-            "avg_participant_attendance": round(float(result[3] or 0), 2),
-            "avg_overall_attendance": round(float(result[4] or 0), 2),
+            "total_participants": total_participants,
+            "average_duration_minutes": rollup.get('avg_participant_duration_minutes', 0.0),
+            "avg_participant_attendance": rollup.get('avg_participant_attendance', 0.0),
+            "avg_overall_attendance": rollup.get('avg_overall_attendance', 0.0),
             
             "attendance_monitoring": {
-                "avg_popup_count": round(float(result[5] or 0), 2),
-                "avg_detections": round(float(result[6] or 0), 2),
-                "avg_penalty": round(float(result[7] or 0), 2),
-                "avg_break_time_minutes": round(float(result[8] or 0), 2),
-                "avg_engagement_score": round(float(result[9] or 0), 2),
-                "total_breaks_used": int(result[10] or 0)
+                "avg_popup_count": rollup.get('avg_popup_count', 0.0),
+                "avg_detections": rollup.get('avg_total_detections', 0.0),
+                "avg_penalty": rollup.get('avg_attendance_penalty', 0.0),
+                "avg_break_time_minutes": rollup.get('avg_break_time_used', 0.0),
+                "avg_engagement_score": rollup.get('avg_engagement_score', 0.0),
+                "total_breaks_used": rollup.get('total_breaks_used', 0)
             },
             
             "meeting_status_breakdown": {
-                "active_meetings": int(result[11] or 0),
-                "ended_meetings": int(result[12] or 0),
-                "scheduled_meetings": int(result[13] or 0)
+                "active_meetings": int(result[1] or 0),
+                "ended_meetings": int(result[2] or 0),
+                "scheduled_meetings": int(result[3] or 0)
             }
         }
         
@@ -1461,221 +1723,34 @@ def generate_participant_report_pdf(request):
         if not user_id:
             return JsonResponse({"error": "user_id is required"}, status=BAD_REQUEST_STATUS)
         
-        # Parse date range
-        start_date = None
-        end_date = None
-        if start_date_str:
-            start_date = datetime.strptime(start_date_str, '%Y-%m-%d')
-        if end_date_str:
-            end_date = datetime.strptime(end_date_str, '%Y-%m-%d')
-        
-        # Get report data
-        data = get_participant_report_data(user_id, start_date, end_date)
-        if not data:
-            return JsonResponse({"error": "Participant not found or no data available"}, status=NOT_FOUND_STATUS)
-        
-        # Create PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, leftMargin=50, rightMargin=50, topMargin=80, bottomMargin=80)
-        
-        # Create report generator
-        report_gen = ReportGenerator()
-        
-        # Story elements
-        story = []
-        
-        # Title
-        title = Paragraph(f"Participant Attendance Report", report_gen.custom_styles['ReportTitle'])
-        story.append(title)
-        story.append(Spacer(1, 20))
-        
-        # Participant Information
-        participant_info = data['participant_info']
-        story.append(Paragraph("Participant Information", report_gen.custom_styles['SectionHeader']))
-        
-        participant_table_data = [
-            ['Participant ID:', str(participant_info['user_id'])],
-            ['Full Name:', participant_info['full_name']],
-            ['Report Period:', f"{data['date_range']['start'].strftime('%Y-%m-%d')} to {data['date_range']['end'].strftime('%Y-%m-%d')}"],
-        ]
-        
-        participant_table = Table(participant_table_data, colWidths=[2*inch, 4*inch])
-        participant_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(participant_table)
-        story.append(Spacer(1, 20))
-        
-        # Overall Statistics
-        overall_stats = data['overall_stats']
-        story.append(Paragraph("Overall Statistics", report_gen.custom_styles['SectionHeader']))
-        
-        stats_table_data = [
-            ['Total Meetings Attended:', str(int(overall_stats[0] or 0))],
-            ['Average Participant Attendance:', f"{round(float(overall_stats[1] or 0), 2)}%"],
-            ['Average Overall Attendance:', f"{round(float(overall_stats[2] or 0), 2)}%"],
-            ['Total Duration (Minutes):', f"{round(float(overall_stats[3] or 0), 2)}"],
-            ['Total Duration (Hours):', f"{round(float(overall_stats[3] or 0) / 60, 2)}"],
-            ['Average Engagement Score:', f"{round(float(overall_stats[4] or 0), 2)}"],
-            ['Average Attendance Penalty:', f"{round(float(overall_stats[5] or 0), 2)}"],
-            ['Total Break Time Used (Minutes):', f"{round(float(overall_stats[6] or 0), 2)}"],
-            ['Total Violations/Detections:', str(int(overall_stats[7] or 0))],
-        ]
-        
-        stats_table = Table(stats_table_data, colWidths=[3*inch, 3*inch])
-        stats_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightblue),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(stats_table)
-        story.append(Spacer(1, 20))
-        
-        # Detailed Meeting Records
-        story.append(Paragraph("Detailed Meeting Records", report_gen.custom_styles['SectionHeader']))
-        
-        if data['meetings_data']:
-            for meeting in data['meetings_data']:
-                # Meeting header
-                meeting_title = f"Meeting: {meeting[1] or 'Unnamed Meeting'}"
-                story.append(Paragraph(meeting_title, report_gen.custom_styles['SubHeader']))
-                
-                # Meeting details table
-                meeting_details = [
-                    ['Meeting ID:', str(meeting[0])],
-                    ['Meeting Type:', meeting[2] or 'N/A'],
-                    ['Created Date:', meeting[3].strftime('%Y-%m-%d %H:%M') if meeting[3] else 'N/A'],
-                    ['Started Date:', meeting[4].strftime('%Y-%m-%d %H:%M') if meeting[4] else 'N/A'],
-                    ['Ended Date:', meeting[5].strftime('%Y-%m-%d %H:%M') if meeting[5] else 'N/A'],
-                    ['Host ID:', str(meeting[6])],
-                    ['Participant Role:', meeting[7] or 'participant'],
-                ]
-                
-                meeting_table = Table(meeting_details, colWidths=[2.5*inch, 3.5*inch])
-                meeting_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 9),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                story.append(meeting_table)
-                story.append(Spacer(1, 10))
-                
-                # Attendance and Duration Data
-                attendance_data = [
-                    ['Duration (Minutes):', f"{round(float(meeting[10] or 0), 2)}"],
-                    ['Total Sessions:', str(int(meeting[11] or 0))],
-                    ['Attendance % (Host-based):', f"{round(float(meeting[12] or 0), 2)}%"],
-                    ['Participant Attendance:', f"{round(float(meeting[13] or 0), 2)}%"],
-                    ['Overall Attendance:', f"{round(float(meeting[14] or 0), 2)}%"],
-                    ['Currently Active:', 'Yes' if meeting[15] else 'No'],
-                ]
-                
-                attendance_table = Table(attendance_data, colWidths=[2.5*inch, 3.5*inch])
-                attendance_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (0, -1), colors.lightyellow),
-                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 9),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                story.append(attendance_table)
-                story.append(Spacer(1, 10))
-                
-                # # Attendance Monitoring Data
-                # monitoring_data = [
-                #     ['Popup Count:', str(int(meeting[16] or 0))],
-                #     ['Detection Counts:', meeting[17] or 'N/A'],
-                #     ['Violation Start Times:', meeting[18] or 'N/A'],
-                #     ['Total Detections:', str(int(meeting[19] or 0))],
-                #     ['Attendance Penalty:', f"{round(float(meeting[20] or 0), 2)}"],
-                #     ['Break Used:', 'Yes' if meeting[21] else 'No'],
-                #     ['Total Break Time (seconds):', str(int(meeting[22] or 0))],
-                #     ['Engagement Score:', str(int(meeting[23] or 0))],
-                #     ['Session Attendance %:', f"{round(float(meeting[24] or 0), 2)}%"],
-                #     ['Focus Score:', f"{round(float(meeting[25] or 0), 2)}"],
-                #     ['Break Count:', str(int(meeting[26] or 0))],
-                #     ['Violation Severity Score:', f"{round(float(meeting[27] or 0), 2)}"],
-                # ]
-                
-                # monitoring_table = Table(monitoring_data, colWidths=[2.5*inch, 3.5*inch])
-                # monitoring_table.setStyle(TableStyle([
-                #     ('BACKGROUND', (0, 0), (0, -1), colors.lightcoral),
-                #     ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                #     ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                #     ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                #     ('FONTSIZE', (0, 0), (-1, -1), 9),
-                #     ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                # ]))
-                # story.append(monitoring_table)
-                # story.append(Spacer(1, 15))
-                # Define a paragraph style for wrapped cell text
-                wrapped_style = ParagraphStyle(
-                    name="WrappedStyle",
-                    fontName="Helvetica",
-                    fontSize=8.5,
-                    leading=10,
-                    wordWrap='CJK'
-                )
-
-                # --- Monitoring data (no truncation, full text displayed) ---
-                monitoring_data = [
-                    ['Popup Count:', Paragraph(str(int(meeting[16] or 0)), wrapped_style)],
-                    ['Detection Counts:', Paragraph(str(meeting[17] or 'N/A'), wrapped_style)],
-                    ['Violation Start Times:', Paragraph(str(meeting[18] or 'N/A'), wrapped_style)],
-                    ['Total Detections:', Paragraph(str(int(meeting[19] or 0)), wrapped_style)],
-                    ['Attendance Penalty:', Paragraph(f"{round(float(meeting[20] or 0), 2)}", wrapped_style)],
-                    ['Break Used:', Paragraph('Yes' if meeting[21] else 'No', wrapped_style)],
-                    ['Total Break Time (seconds):', Paragraph(str(int(meeting[22] or 0)), wrapped_style)],
-                    ['Engagement Score:', Paragraph(str(int(meeting[23] or 0)), wrapped_style)],
-                    ['Session Attendance %:', Paragraph(f"{round(float(meeting[24] or 0), 2)}%", wrapped_style)],
-                    ['Focus Score:', Paragraph(f"{round(float(meeting[25] or 0), 2)}", wrapped_style)],
-                    ['Break Count:', Paragraph(str(int(meeting[26] or 0)), wrapped_style)],
-                    ['Violation Severity Score:', Paragraph(f"{round(float(meeting[27] or 0), 2)}", wrapped_style)],
-                ]
+        # Validate date range format before keying the report cache
+        try:
+            for date_str in (start_date_str, end_date_str):
+                if date_str:
+                    datetime.strptime(date_str, '%Y-%m-%d')
+        except ValueError:
+            return JsonResponse({"error": "start_date and end_date must be YYYY-MM-DD"}, status=BAD_REQUEST_STATUS)
+        
+        # Serve from the report cache when the underlying data has not changed
+        report_key = get_report_key('participant', user_id, start_date_str, end_date_str)
+        filename = f"participant_report_{user_id}_{datetime.now().strftime('%Y%m%d')}.pdf"
 
-                # Create monitoring table with consistent alignment & wrapping
-                monitoring_table = Table(monitoring_data, colWidths=[2.7*inch, 3.3*inch])
-                monitoring_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (0, -1), colors.lightcoral),
-                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('WORDWRAP', (0, 0), (-1, -1), 'CJK'),
-                    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 8.5),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
-                ]))
-                story.append(monitoring_table)
-                story.append(Spacer(1, 15))
+        cached = serve_cached_report(report_key, filename)
+        if cached:
+            return cached
 
+        # Rendering inside the request is opt-in (?sync=1); by default a miss is
+        # queued and the client polls status_url / fetches download_url
+        if request.GET.get('sync') in ('1', 'true', 'True'):
+            result = render_report('participant', user_id, start_date_str, end_date_str, report_key)
+            if result['status'] == 'not_found':
+                return JsonResponse({"error": "Participant not found or no data available"}, status=NOT_FOUND_STATUS)
+            if result['status'] != 'ready':
+                return JsonResponse({"error": f"Failed to generate report: {result.get('error')}"}, status=SERVER_ERROR_STATUS)
+            return serve_cached_report(report_key, filename)
 
-        else:
-            story.append(Paragraph("No meeting records found for the selected period.", report_gen.styles['Normal']))
-        
-        # Build PDF with custom header/footer
-        def add_page_number(canvas, doc):
-            report_gen.create_header_footer(canvas, doc, "Participant Attendance Report")
-        
-        doc.build(story, onFirstPage=add_page_number, onLaterPages=add_page_number)
-        
-        # Prepare response
-        buffer.seek(0)
-        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="participant_report_{user_id}_{datetime.now().strftime("%Y%m%d")}.pdf"'
-        
-        return response
+        job = enqueue_report('participant', user_id, start_date_str, end_date_str, report_key)
+        return JsonResponse({"data": job}, status=SUCCESS_STATUS if job['status'] == 'ready' else 202)
         
     except Exception as e:
         logging.error(f"Error generating participant PDF report: {e}")
@@ -1700,186 +1775,34 @@ def generate_host_report_pdf(request):
         if not host_id:
             return JsonResponse({"error": "host_id is required"}, status=BAD_REQUEST_STATUS)
         
-        # Parse date range
-        start_date = None
-        end_date = None
-        if start_date_str:
-            start_date = datetime.strptime(start_date_str, '%Y-%m-%d')
-        if end_date_str:
-            end_date = datetime.strptime(end_date_str, '%Y-%m-%d')
-        
-        # Get report data
-        data = get_host_report_data(host_id, start_date, end_date)
-        if not data:
-            return JsonResponse({"error": "Host not found or no data available"}, status=NOT_FOUND_STATUS)
-        
-        # Create PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, leftMargin=50, rightMargin=50, topMargin=80, bottomMargin=80)
-        
-        # Create report generator
-        report_gen = ReportGenerator()
-        
-        # Story elements
-        story = []
-        
-        # Title
-        title = Paragraph(f"Host Meeting Report", report_gen.custom_styles['ReportTitle'])
-        story.append(title)
-        story.append(Spacer(1, 20))
-        
-        # Host Information
-        story.append(Paragraph("Host Information", report_gen.custom_styles['SectionHeader']))
-        
-        host_info_data = [
-            ['Host ID:', str(data['host_id'])],
-            ['Report Period:', f"{data['date_range']['start'].strftime('%Y-%m-%d')} to {data['date_range']['end'].strftime('%Y-%m-%d')}"],
-        ]
-        
-        host_table = Table(host_info_data, colWidths=[2*inch, 4*inch])
-        host_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(host_table)
-        story.append(Spacer(1, 20))
-        
-        # Host Summary Statistics
-        host_stats = data['host_stats']
-        story.append(Paragraph("Host Summary Statistics", report_gen.custom_styles['SectionHeader']))
-        
-        summary_data = [
-            ['Total Meetings Created:', str(int(host_stats[0] or 0))],
-            ['Active Meetings:', str(int(host_stats[1] or 0))],
-            ['Completed Meetings:', str(int(host_stats[2] or 0))],
-            ['Scheduled Meetings:', str(int(host_stats[3] or 0))],
-            ['Total Unique Participants:', str(int(host_stats[4] or 0))],
-            ['Average Participant Attendance:', f"{round(float(host_stats[5] or 0), 2)}%"],
-            ['Average Engagement Score:', f"{round(float(host_stats[6] or 0), 2)}"],
-            ['Total Violations Across Meetings:', str(int(host_stats[7] or 0))],
-        ]
-        
-        summary_table = Table(summary_data, colWidths=[3*inch, 3*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightblue),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(summary_table)
-        story.append(Spacer(1, 20))
-        
-        # Detailed Meeting Records with Participants
-        story.append(Paragraph("Detailed Meeting Records with Participants", report_gen.custom_styles['SectionHeader']))
-        
-        if data['meetings_data']:
-            # Group meetings data by meeting_id
-            meetings_dict = {}
-            for record in data['meetings_data']:
-                meeting_id = record[0]
-                if meeting_id not in meetings_dict:
-                    meetings_dict[meeting_id] = {
-                        'meeting_info': record[:7],  # meeting details
-                        'participants': []
-                    }
-                
-                # Add participant if exists
-                if record[7]:  # user_id exists
-                    meetings_dict[meeting_id]['participants'].append(record[7:])
-            
-            for meeting_id, meeting_data in meetings_dict.items():
-                meeting_info = meeting_data['meeting_info']
-                participants = meeting_data['participants']
-                
-                # Meeting header
-                meeting_title = f"Meeting: {meeting_info[1] or 'Unnamed Meeting'}"
-                story.append(Paragraph(meeting_title, report_gen.custom_styles['SubHeader']))
-                
-                # Meeting details
-                meeting_details = [
-                    ['Meeting ID:', str(meeting_info[0])],
-                    ['Meeting Type:', meeting_info[2] or 'N/A'],
-                    ['Created Date:', meeting_info[3].strftime('%Y-%m-%d %H:%M') if meeting_info[3] else 'N/A'],
-                    ['Started Date:', meeting_info[4].strftime('%Y-%m-%d %H:%M') if meeting_info[4] else 'N/A'],
-                    ['Ended Date:', meeting_info[5].strftime('%Y-%m-%d %H:%M') if meeting_info[5] else 'N/A'],
-                    ['Status:', meeting_info[6] or 'N/A'],
-                    ['Total Participants:', str(len(participants))],
-                ]
-                
-                meeting_table = Table(meeting_details, colWidths=[2.5*inch, 3.5*inch])
-                meeting_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 9),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                story.append(meeting_table)
-                story.append(Spacer(1, 10))
-                
-                # Participants details
-                if participants:
-                    story.append(Paragraph("Participants:", report_gen.styles['Heading3']))
-                    
-                    # Create participants table
-                    participants_header = [
-                        'Name', 'Role', 'Duration (min)', 'Attendance %', 
-                        'Engagement', 'Penalties', 'Breaks', 'Violations'
-                    ]
-                    participants_data = [participants_header]
-                    
-                    for participant in participants:
-                        participant_row = [
-                            participant[1] or 'N/A',  # Full_Name
-                            participant[2] or 'participant',  # Role
-                            f"{round(float(participant[3] or 0), 1)}",  # Total_Duration_Minutes
-                            f"{round(float(participant[5] or 0), 1)}%",  # Participant_Attendance
-                            str(int(participant[15] or 0)),  # engagement_score
-                            f"{round(float(participant[12] or 0), 2)}",  # attendance_penalty
-                            str(int(participant[13] or 0)),  # break_used
-                            str(int(participant[11] or 0)),  # total_detections
-                        ]
-                        participants_data.append(participant_row)
-                    
-                    participants_table = Table(participants_data, colWidths=[1*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.6*inch, 0.8*inch])
-                    participants_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, 0), 8),
-                        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                        ('FONTSIZE', (0, 1), (-1, -1), 7),
-                        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-                    ]))
-                    story.append(participants_table)
-                else:
-                    story.append(Paragraph("No participants recorded for this meeting.", report_gen.styles['Normal']))
-                
-                story.append(Spacer(1, 15))
-        else:
-            story.append(Paragraph("No meeting records found for the selected period.", report_gen.styles['Normal']))
-        
-        # Build PDF with custom header/footer
-        def add_page_number(canvas, doc):
-            report_gen.create_header_footer(canvas, doc, "Host Meeting Report")
-        
-        doc.build(story, onFirstPage=add_page_number, onLaterPages=add_page_number)
-        
-        # Prepare response
-        buffer.seek(0)
-        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="host_report_{host_id}_{datetime.now().strftime("%Y%m%d")}.pdf"'
-        
-        return response
+        # Validate date range format before keying the report cache
+        try:
+            for date_str in (start_date_str, end_date_str):
+                if date_str:
+                    datetime.strptime(date_str, '%Y-%m-%d')
+        except ValueError:
+            return JsonResponse({"error": "start_date and end_date must be YYYY-MM-DD"}, status=BAD_REQUEST_STATUS)
+        
+        # Serve from the report cache when the underlying data has not changed
+        report_key = get_report_key('host', host_id, start_date_str, end_date_str)
+        filename = f"host_report_{host_id}_{datetime.now().strftime('%Y%m%d')}.pdf"
+
+        cached = serve_cached_report(report_key, filename)
+        if cached:
+            return cached
+
+        # Rendering inside the request is opt-in (?sync=1); by default a miss is
+        # queued and the client polls status_url / fetches download_url
+        if request.GET.get('sync') in ('1', 'true', 'True'):
+            result = render_report('host', host_id, start_date_str, end_date_str, report_key)
+            if result['status'] == 'not_found':
+                return JsonResponse({"error": "Host not found or no data available"}, status=NOT_FOUND_STATUS)
+            if result['status'] != 'ready':
+                return JsonResponse({"error": f"Failed to generate report: {result.get('error')}"}, status=SERVER_ERROR_STATUS)
+            return serve_cached_report(report_key, filename)
+
+        job = enqueue_report('host', host_id, start_date_str, end_date_str, report_key)
+        return JsonResponse({"data": job}, status=SUCCESS_STATUS if job['status'] == 'ready' else 202)
         
     except Exception as e:
         logging.error(f"Error generating host PDF report: {e}")
@@ -1997,6 +1920,43 @@ def get_host_report_preview(request):
         logging.error(f"Error getting host report preview: {e}")
         return JsonResponse({"error": f"Failed to get preview: {str(e)}"}, status=SERVER_ERROR_STATUS)
 
+@require_http_methods(["GET"])
+@csrf_exempt
+def get_report_job_status(request, report_key):
+    """
+    Poll the status of a background report job (queued by the PDF endpoints on a cache miss)
+    """
+    try:
+        status = get_report_status(report_key)
+        if not status.get('status'):
+            return JsonResponse({"error": "Report job not found"}, status=NOT_FOUND_STATUS)
+        return JsonResponse({"data": status}, status=SUCCESS_STATUS)
+    except Exception as e:
+        logging.error(f"Error getting report job status: {e}")
+        return JsonResponse({"error": f"Failed to get report status: {str(e)}"}, status=SERVER_ERROR_STATUS)
+
+@require_http_methods(["GET"])
+@csrf_exempt
+def download_report(request, report_key):
+    """
+    Stream a rendered report from the report cache (disk or S3)
+    """
+    try:
+        status = get_report_status(report_key)
+        kind = status.get('kind') or 'analytics'
+        subject_id = status.get('subject_id') or ''
+        filename = f"{kind}_report_{subject_id}_{datetime.now().strftime('%Y%m%d')}.pdf"
+
+        response = serve_cached_report(report_key, filename)
+        if response:
+            return response
+        if status.get('status') in ('pending', 'running'):
+            return JsonResponse({"data": status}, status=202)
+        return JsonResponse({"error": "Report not found"}, status=NOT_FOUND_STATUS)
+    except Exception as e:
+        logging.error(f"Error downloading report: {e}")
+        return JsonResponse({"error": f"Failed to download report: {str(e)}"}, status=SERVER_ERROR_STATUS)
+
 # URL patterns
 urlpatterns = [
     # Comprehensive Analytics Endpoints
@@ -2009,6 +1969,8 @@ urlpatterns = [
     path('api/analytics/host/overview', get_host_dashboard_overview, name='get_host_dashboard_overview'),
     path('api/reports/participant/pdf', generate_participant_report_pdf, name='generate_participant_report_pdf'),
     path('api/reports/host/pdf', generate_host_report_pdf, name='generate_host_report_pdf'),
+    path('api/reports/status/<str:report_key>', get_report_job_status, name='get_report_job_status'),
+    path('api/reports/download/<str:report_key>', download_report, name='download_report'),
     
     # Report Previews (JSON data)
     path('api/reports/participant/preview', get_participant_report_preview, name='get_participant_report_preview'),
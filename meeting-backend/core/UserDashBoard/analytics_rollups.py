@@ -0,0 +1,523 @@
+# analytics_rollups.py - Daily pre-aggregated attendance analytics
+#
+# The dashboard endpoints in Analytics.py used to join tbl_Participants,
+# tbl_Meetings and tbl_Attendance_Sessions over up to a year of rows on every
+# request. These rollup tables hold one row per day per (user, host, type, role)
+# and per (host, type), storing SUMs and COUNTs so that any date range can be
+# re-aggregated exactly with a handful of indexed rows.
+from django.db import connection, transaction
+from datetime import datetime, timedelta
+import logging
+
+TBL_USER_DAILY_ROLLUPS = 'tbl_User_Daily_Rollups'
+TBL_HOST_DAILY_ROLLUPS = 'tbl_Host_Daily_Rollups'
+TBL_MEETINGS = 'tbl_Meetings'
+TBL_PARTICIPANTS = 'tbl_Participants'
+TBL_ATTENDANCE_SESSIONS = 'tbl_Attendance_Sessions'
+
+_rollup_tables_ready = False
+
+
+def create_analytics_rollup_tables():
+    """Create the daily rollup tables if they do not exist yet"""
+    global _rollup_tables_ready
+    if _rollup_tables_ready:
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {TBL_USER_DAILY_ROLLUPS} (
+                    Rollup_Date DATE NOT NULL,
+                    User_ID INT NOT NULL,
+                    Host_ID INT NOT NULL,
+                    Meeting_Type VARCHAR(50) NOT NULL DEFAULT '',
+                    Role VARCHAR(50) NOT NULL DEFAULT 'participant',
+                    Full_Name VARCHAR(100),
+
+                    -- Participation
+                    Meetings_Attended INT DEFAULT 0,
+                    Active_Meetings INT DEFAULT 0,
+                    Total_Minutes DECIMAL(14,2) DEFAULT 0,
+                    Total_Sessions INT DEFAULT 0,
+
+                    -- Attendance (sum + count so ranges average exactly)
+                    Host_Attendance_Sum DECIMAL(14,2) DEFAULT 0,
+                    Participant_Attendance_Sum DECIMAL(14,2) DEFAULT 0,
+                    Participant_Attendance_Count INT DEFAULT 0,
+                    Overall_Attendance_Sum DECIMAL(14,2) DEFAULT 0,
+                    Overall_Attendance_Count INT DEFAULT 0,
+
+                    -- Attendance monitoring (tbl_Attendance_Sessions)
+                    Monitored_Sessions INT DEFAULT 0,
+                    Popup_Sum INT DEFAULT 0,
+                    Detections_Sum INT DEFAULT 0,
+                    Penalty_Sum DECIMAL(14,2) DEFAULT 0,
+                    Engagement_Sum DECIMAL(14,2) DEFAULT 0,
+                    Focus_Sum DECIMAL(14,2) DEFAULT 0,
+                    Break_Time_Sum INT DEFAULT 0,
+                    Breaks_Used INT DEFAULT 0,
+
+                    First_Meeting_At DATETIME DEFAULT NULL,
+                    Last_Meeting_At DATETIME DEFAULT NULL,
+                    Updated_At DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+                    PRIMARY KEY (Rollup_Date, User_ID, Host_ID, Meeting_Type, Role),
+                    INDEX idx_user_rollup_user_date (User_ID, Rollup_Date),
+                    INDEX idx_user_rollup_host_date (Host_ID, Rollup_Date)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='Daily per-user attendance rollups'
+            """)
+
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {TBL_HOST_DAILY_ROLLUPS} (
+                    Rollup_Date DATE NOT NULL,
+                    Host_ID INT NOT NULL,
+                    Meeting_Type VARCHAR(50) NOT NULL DEFAULT '',
+
+                    -- Meeting level
+                    Meetings_Created INT DEFAULT 0,
+                    Meetings_Ended INT DEFAULT 0,
+                    Timed_Meetings INT DEFAULT 0,
+                    Hosted_Minutes DECIMAL(14,2) DEFAULT 0,
+                    Recording_Enabled INT DEFAULT 0,
+                    Waiting_Room_Enabled INT DEFAULT 0,
+
+                    -- Participant level
+                    Participant_Rows INT DEFAULT 0,
+                    Participant_Minutes DECIMAL(14,2) DEFAULT 0,
+                    Participant_Attendance_Sum DECIMAL(14,2) DEFAULT 0,
+                    Participant_Attendance_Count INT DEFAULT 0,
+                    Overall_Attendance_Sum DECIMAL(14,2) DEFAULT 0,
+                    Overall_Attendance_Count INT DEFAULT 0,
+
+                    -- Attendance monitoring
+                    Monitored_Sessions INT DEFAULT 0,
+                    Popup_Sum INT DEFAULT 0,
+                    Detections_Sum INT DEFAULT 0,
+                    Penalty_Sum DECIMAL(14,2) DEFAULT 0,
+                    Engagement_Sum DECIMAL(14,2) DEFAULT 0,
+                    Break_Time_Sum INT DEFAULT 0,
+                    Breaks_Used INT DEFAULT 0,
+
+                    First_Meeting_At DATETIME DEFAULT NULL,
+                    Last_Meeting_At DATETIME DEFAULT NULL,
+                    Updated_At DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+                    PRIMARY KEY (Rollup_Date, Host_ID, Meeting_Type),
+                    INDEX idx_host_rollup_host_date (Host_ID, Rollup_Date)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='Daily per-host meeting rollups'
+            """)
+        _rollup_tables_ready = True
+        logging.info("✅ Analytics rollup tables created or verified")
+    except Exception as e:
+        logging.error(f"❌ Failed to create analytics rollup tables: {e}")
+        raise
+
+
+def _in_clause(values):
+    return ", ".join(["%s"] * len(values))
+
+
+def _rebuild_user_rollups(cursor, day, user_ids=None):
+    """Recompute user rollup rows for one day (optionally limited to some users)"""
+    day_start = datetime.combine(day, datetime.min.time())
+    day_end = day_start + timedelta(days=1)
+
+    delete_sql = f"DELETE FROM {TBL_USER_DAILY_ROLLUPS} WHERE Rollup_Date = %s"
+    delete_params = [day]
+    filter_sql = ""
+    filter_params = []
+    if user_ids:
+        delete_sql += f" AND User_ID IN ({_in_clause(user_ids)})"
+        delete_params.extend(user_ids)
+        filter_sql = f" AND p.User_ID IN ({_in_clause(user_ids)})"
+        filter_params = list(user_ids)
+
+    cursor.execute(delete_sql, delete_params)
+    cursor.execute(f"""
+        INSERT INTO {TBL_USER_DAILY_ROLLUPS} (
+            Rollup_Date, User_ID, Host_ID, Meeting_Type, Role, Full_Name,
+            Meetings_Attended, Active_Meetings, Total_Minutes, Total_Sessions,
+            Host_Attendance_Sum, Participant_Attendance_Sum, Participant_Attendance_Count,
+            Overall_Attendance_Sum, Overall_Attendance_Count,
+            Monitored_Sessions, Popup_Sum, Detections_Sum, Penalty_Sum,
+            Engagement_Sum, Focus_Sum, Break_Time_Sum, Breaks_Used,
+            First_Meeting_At, Last_Meeting_At
+        )
+        SELECT
+            %s,
+            p.User_ID,
+            m.Host_ID,
+            COALESCE(p.Meeting_Type, ''),
+            p.Role,
+            MAX(p.Full_Name),
+            COUNT(DISTINCT p.Meeting_ID),
+            COUNT(DISTINCT CASE WHEN p.Is_Currently_Active = 1 THEN p.Meeting_ID END),
+            COALESCE(SUM(p.Total_Duration_Minutes), 0),
+            COALESCE(SUM(p.Total_Sessions), 0),
+            COALESCE(SUM(p.Attendance_Percentagebasedon_host), 0),
+            COALESCE(SUM(p.Participant_Attendance), 0),
+            COUNT(p.Participant_Attendance),
+            COALESCE(SUM(p.Overall_Attendance), 0),
+            COUNT(p.Overall_Attendance),
+            COUNT(ats.User_ID),
+            COALESCE(SUM(ats.popup_count), 0),
+            COALESCE(SUM(ats.total_detections), 0),
+            COALESCE(SUM(ats.attendance_penalty), 0),
+            COALESCE(SUM(ats.engagement_score), 0),
+            COALESCE(SUM(ats.focus_score), 0),
+            COALESCE(SUM(ats.total_break_time_used), 0),
+            COUNT(CASE WHEN ats.break_used = 1 THEN 1 END),
+            MIN(m.Created_At),
+            MAX(m.Created_At)
+        FROM {TBL_PARTICIPANTS} p
+        JOIN {TBL_MEETINGS} m ON p.Meeting_ID = m.ID
+        LEFT JOIN {TBL_ATTENDANCE_SESSIONS} ats ON p.Meeting_ID = ats.Meeting_ID AND p.User_ID = ats.User_ID
+        WHERE m.Created_At >= %s AND m.Created_At < %s{filter_sql}
+        GROUP BY p.User_ID, m.Host_ID, COALESCE(p.Meeting_Type, ''), p.Role
+    """, [day, day_start, day_end] + filter_params)
+    return cursor.rowcount
+
+
+def _rebuild_host_rollups(cursor, day, host_ids=None):
+    """Recompute host rollup rows for one day (optionally limited to some hosts)"""
+    day_start = datetime.combine(day, datetime.min.time())
+    day_end = day_start + timedelta(days=1)
+
+    delete_sql = f"DELETE FROM {TBL_HOST_DAILY_ROLLUPS} WHERE Rollup_Date = %s"
+    delete_params = [day]
+    filter_sql = ""
+    filter_params = []
+    if host_ids:
+        delete_sql += f" AND Host_ID IN ({_in_clause(host_ids)})"
+        delete_params.extend(host_ids)
+        filter_sql = f" AND m.Host_ID IN ({_in_clause(host_ids)})"
+        filter_params = list(host_ids)
+
+    cursor.execute(delete_sql, delete_params)
+
+    # Meeting-level and participant-level figures are aggregated separately
+    # so participant fan-out cannot inflate meeting counts.
+    cursor.execute(f"""
+        INSERT INTO {TBL_HOST_DAILY_ROLLUPS} (
+            Rollup_Date, Host_ID, Meeting_Type,
+            Meetings_Created, Meetings_Ended, Timed_Meetings, Hosted_Minutes,
+            Recording_Enabled, Waiting_Room_Enabled,
+            Participant_Rows, Participant_Minutes,
+            Participant_Attendance_Sum, Participant_Attendance_Count,
+            Overall_Attendance_Sum, Overall_Attendance_Count,
+            Monitored_Sessions, Popup_Sum, Detections_Sum, Penalty_Sum,
+            Engagement_Sum, Break_Time_Sum, Breaks_Used,
+            First_Meeting_At, Last_Meeting_At
+        )
+        SELECT
+            %s,
+            mm.Host_ID,
+            mm.Meeting_Type,
+            mm.meetings_created,
+            mm.meetings_ended,
+            mm.timed_meetings,
+            mm.hosted_minutes,
+            mm.recording_enabled,
+            mm.waiting_room_enabled,
+            COALESCE(pp.participant_rows, 0),
+            COALESCE(pp.participant_minutes, 0),
+            COALESCE(pp.participant_attendance_sum, 0),
+            COALESCE(pp.participant_attendance_count, 0),
+            COALESCE(pp.overall_attendance_sum, 0),
+            COALESCE(pp.overall_attendance_count, 0),
+            COALESCE(pp.monitored_sessions, 0),
+            COALESCE(pp.popup_sum, 0),
+            COALESCE(pp.detections_sum, 0),
+            COALESCE(pp.penalty_sum, 0),
+            COALESCE(pp.engagement_sum, 0),
+            COALESCE(pp.break_time_sum, 0),
+            COALESCE(pp.breaks_used, 0),
+            mm.first_meeting_at,
+            mm.last_meeting_at
+        FROM (
+            SELECT
+                m.Host_ID,
+                COALESCE(m.Meeting_Type, '') AS Meeting_Type,
+                COUNT(*) AS meetings_created,
+                COUNT(CASE WHEN m.Status = 'ended' THEN 1 END) AS meetings_ended,
+                COUNT(CASE WHEN m.Started_At IS NOT NULL AND m.Ended_At IS NOT NULL THEN 1 END) AS timed_meetings,
+                COALESCE(SUM(CASE
+                    WHEN m.Started_At IS NOT NULL AND m.Ended_At IS NOT NULL
+                    THEN TIMESTAMPDIFF(MINUTE, m.Started_At, m.Ended_At)
+                    ELSE 0
+                END), 0) AS hosted_minutes,
+                COUNT(CASE WHEN m.Is_Recording_Enabled = 1 THEN 1 END) AS recording_enabled,
+                COUNT(CASE WHEN m.Waiting_Room_Enabled = 1 THEN 1 END) AS waiting_room_enabled,
+                MIN(m.Created_At) AS first_meeting_at,
+                MAX(m.Created_At) AS last_meeting_at
+            FROM {TBL_MEETINGS} m
+            WHERE m.Created_At >= %s AND m.Created_At < %s{filter_sql}
+            GROUP BY m.Host_ID, COALESCE(m.Meeting_Type, '')
+        ) mm
+        LEFT JOIN (
+            SELECT
+                m.Host_ID,
+                COALESCE(m.Meeting_Type, '') AS Meeting_Type,
+                COUNT(*) AS participant_rows,
+                SUM(p.Total_Duration_Minutes) AS participant_minutes,
+                SUM(p.Participant_Attendance) AS participant_attendance_sum,
+                COUNT(p.Participant_Attendance) AS participant_attendance_count,
+                SUM(p.Overall_Attendance) AS overall_attendance_sum,
+                COUNT(p.Overall_Attendance) AS overall_attendance_count,
+                COUNT(ats.User_ID) AS monitored_sessions,
+                SUM(ats.popup_count) AS popup_sum,
+                SUM(ats.total_detections) AS detections_sum,
+                SUM(ats.attendance_penalty) AS penalty_sum,
+                SUM(ats.engagement_score) AS engagement_sum,
+                SUM(ats.total_break_time_used) AS break_time_sum,
+                COUNT(CASE WHEN ats.break_used = 1 THEN 1 END) AS breaks_used
+            FROM {TBL_MEETINGS} m
+            JOIN {TBL_PARTICIPANTS} p ON p.Meeting_ID = m.ID
+            LEFT JOIN {TBL_ATTENDANCE_SESSIONS} ats ON p.Meeting_ID = ats.Meeting_ID AND p.User_ID = ats.User_ID
+            WHERE m.Created_At >= %s AND m.Created_At < %s{filter_sql}
+            GROUP BY m.Host_ID, COALESCE(m.Meeting_Type, '')
+        ) pp ON pp.Host_ID = mm.Host_ID AND pp.Meeting_Type = mm.Meeting_Type
+    """, [day, day_start, day_end] + filter_params + [day_start, day_end] + filter_params)
+    return cursor.rowcount
+
+
+def refresh_meeting_rollups(meeting_id):
+    """
+    Incrementally refresh the rollup rows touched by one meeting.
+    Called from end_meeting; only the meeting's day, its host and its
+    participants are recomputed.
+    """
+    try:
+        create_analytics_rollup_tables()
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT Host_ID, Created_At FROM {TBL_MEETINGS} WHERE ID = %s
+            """, [meeting_id])
+            row = cursor.fetchone()
+            if not row or not row[1]:
+                logging.warning(f"[ROLLUPS] Meeting {meeting_id} not found for rollup refresh")
+                return False
+            host_id, created_at = row
+            day = created_at.date()
+
+            cursor.execute(f"""
+                SELECT DISTINCT User_ID FROM {TBL_PARTICIPANTS} WHERE Meeting_ID = %s
+            """, [meeting_id])
+            user_ids = [r[0] for r in cursor.fetchall()]
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                _rebuild_host_rollups(cursor, day, [host_id])
+                if user_ids:
+                    _rebuild_user_rollups(cursor, day, user_ids)
+
+        logging.info(f"✅ [ROLLUPS] Refreshed rollups for meeting {meeting_id} ({day}, {len(user_ids)} users)")
+        return True
+    except Exception as e:
+        logging.error(f"[ROLLUPS] Failed to refresh rollups for meeting {meeting_id}: {e}")
+        return False
+
+
+def backfill_analytics_rollups(start_day, end_day):
+    """Rebuild all rollup rows for every day in [start_day, end_day]"""
+    create_analytics_rollup_tables()
+    days_processed = 0
+    user_rows = 0
+    host_rows = 0
+    day = start_day
+    while day <= end_day:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                user_rows += max(_rebuild_user_rollups(cursor, day), 0)
+                host_rows += max(_rebuild_host_rollups(cursor, day), 0)
+        days_processed += 1
+        day += timedelta(days=1)
+    return {
+        'days_processed': days_processed,
+        'user_rows': user_rows,
+        'host_rows': host_rows,
+    }
+
+
+def _avg(total, count):
+    return round(float(total or 0) / count, 2) if count else 0.0
+
+
+def _range_days(start_date, end_date):
+    start = start_date.date() if isinstance(start_date, datetime) else start_date
+    end = end_date.date() if isinstance(end_date, datetime) else end_date
+    return start, end
+
+
+def get_host_rollup_summary(start_date, end_date, host_id=None, meeting_type='all', group_by_host=False):
+    """
+    Aggregate host rollups for a date range.
+    Returns a list of dicts keyed by (host_id, meeting_type) when group_by_host,
+    otherwise a single dict for the whole range.
+    """
+    create_analytics_rollup_tables()
+    start_day, end_day = _range_days(start_date, end_date)
+
+    group_cols = "Host_ID, Meeting_Type" if group_by_host else "NULL, NULL"
+    query = f"""
+        SELECT
+            {group_cols},
+            SUM(Meetings_Created), SUM(Meetings_Ended), SUM(Timed_Meetings), SUM(Hosted_Minutes),
+            SUM(Recording_Enabled), SUM(Waiting_Room_Enabled),
+            SUM(Participant_Rows), SUM(Participant_Minutes),
+            SUM(Participant_Attendance_Sum), SUM(Participant_Attendance_Count),
+            SUM(Overall_Attendance_Sum), SUM(Overall_Attendance_Count),
+            SUM(Monitored_Sessions), SUM(Popup_Sum), SUM(Detections_Sum), SUM(Penalty_Sum),
+            SUM(Engagement_Sum), SUM(Break_Time_Sum), SUM(Breaks_Used),
+            MIN(First_Meeting_At), MAX(Last_Meeting_At)
+        FROM {TBL_HOST_DAILY_ROLLUPS}
+        WHERE Rollup_Date BETWEEN %s AND %s
+    """
+    params = [start_day, end_day]
+    if host_id:
+        query += " AND Host_ID = %s"
+        params.append(host_id)
+    if meeting_type and meeting_type != 'all':
+        query += " AND Meeting_Type = %s"
+        params.append(meeting_type)
+    if group_by_host:
+        query += " GROUP BY Host_ID, Meeting_Type ORDER BY SUM(Meetings_Created) DESC"
+
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+
+    results = []
+    for row in rows:
+        participant_rows = int(row[8] or 0)
+        monitored = int(row[14] or 0)
+        results.append({
+            'host_id': row[0],
+            'meeting_type': row[1] or None,
+            'meetings_created': int(row[2] or 0),
+            'meetings_ended': int(row[3] or 0),
+            'avg_actual_meeting_duration_minutes': _avg(row[5], int(row[4] or 0)),
+            'total_actual_hosted_duration_minutes': round(float(row[5] or 0), 2),
+            'meetings_with_recording_enabled': int(row[6] or 0),
+            'meetings_with_waiting_room': int(row[7] or 0),
+            'participant_rows': participant_rows,
+            'total_participant_duration_minutes': round(float(row[9] or 0), 2),
+            'avg_participant_duration_minutes': _avg(row[9], participant_rows),
+            'avg_participant_attendance': _avg(row[10], int(row[11] or 0)),
+            'avg_overall_attendance': _avg(row[12], int(row[13] or 0)),
+            'avg_popup_count': _avg(row[15], monitored),
+            'avg_total_detections': _avg(row[16], monitored),
+            'total_detections': int(row[16] or 0),
+            'avg_attendance_penalty': _avg(row[17], monitored),
+            'avg_engagement_score': _avg(row[18], monitored),
+            'avg_break_time_used': _avg(row[19], monitored),
+            'total_breaks_used': int(row[20] or 0),
+            'first_meeting_at': row[21],
+            'last_meeting_at': row[22],
+        })
+
+    if group_by_host:
+        return results
+    return results[0] if results else None
+
+
+def count_unique_participants(start_date, end_date, host_id=None, meeting_type='all', group_by_host=False):
+    """COUNT(DISTINCT User_ID) over the user rollups for a date range"""
+    create_analytics_rollup_tables()
+    start_day, end_day = _range_days(start_date, end_date)
+
+    select_cols = "Host_ID, Meeting_Type, " if group_by_host else ""
+    query = f"""
+        SELECT {select_cols}COUNT(DISTINCT User_ID)
+        FROM {TBL_USER_DAILY_ROLLUPS}
+        WHERE Rollup_Date BETWEEN %s AND %s
+    """
+    params = [start_day, end_day]
+    if host_id:
+        query += " AND Host_ID = %s"
+        params.append(host_id)
+    if meeting_type and meeting_type != 'all':
+        query += " AND Meeting_Type = %s"
+        params.append(meeting_type)
+    if group_by_host:
+        query += " GROUP BY Host_ID, Meeting_Type"
+
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+        if group_by_host:
+            return {(r[0], r[1] or None): int(r[2] or 0) for r in cursor.fetchall()}
+        row = cursor.fetchone()
+        return int(row[0] or 0) if row else 0
+
+
+def get_user_rollup_summary(start_date, end_date, user_id=None, meeting_type='all', role=None, group_by_user=False):
+    """
+    Aggregate user rollups for a date range.
+    Returns per-(user, meeting_type) dicts when group_by_user, else a single dict.
+    """
+    create_analytics_rollup_tables()
+    start_day, end_day = _range_days(start_date, end_date)
+
+    group_cols = "User_ID, MAX(Full_Name), Meeting_Type" if group_by_user else "NULL, NULL, NULL"
+    query = f"""
+        SELECT
+            {group_cols},
+            SUM(Meetings_Attended), SUM(Active_Meetings), SUM(Total_Minutes), SUM(Total_Sessions),
+            SUM(Host_Attendance_Sum),
+            SUM(Participant_Attendance_Sum), SUM(Participant_Attendance_Count),
+            SUM(Overall_Attendance_Sum), SUM(Overall_Attendance_Count),
+            SUM(Monitored_Sessions), SUM(Popup_Sum), SUM(Detections_Sum), SUM(Penalty_Sum),
+            SUM(Engagement_Sum), SUM(Focus_Sum), SUM(Break_Time_Sum), SUM(Breaks_Used),
+            MIN(First_Meeting_At), MAX(Last_Meeting_At),
+            COUNT(DISTINCT User_ID)
+        FROM {TBL_USER_DAILY_ROLLUPS}
+        WHERE Rollup_Date BETWEEN %s AND %s
+    """
+    params = [start_day, end_day]
+    if user_id:
+        query += " AND User_ID = %s"
+        params.append(user_id)
+    if meeting_type and meeting_type != 'all':
+        query += " AND Meeting_Type = %s"
+        params.append(meeting_type)
+    if role:
+        query += " AND Role = %s"
+        params.append(role)
+    if group_by_user:
+        query += " GROUP BY User_ID, Meeting_Type ORDER BY SUM(Meetings_Attended) DESC"
+
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+
+    results = []
+    for row in rows:
+        meetings = int(row[3] or 0)
+        monitored = int(row[12] or 0)
+        results.append({
+            'user_id': row[0],
+            'full_name': row[1],
+            'meeting_type': row[2] or None,
+            'total_meetings_attended': meetings,
+            'active_meetings': int(row[4] or 0),
+            'total_participation_time_minutes': round(float(row[5] or 0), 2),
+            'avg_meeting_duration_minutes': _avg(row[5], meetings),
+            'avg_sessions_per_meeting': _avg(row[6], meetings),
+            'avg_attendance_based_on_host': _avg(row[7], meetings),
+            'avg_participant_attendance': _avg(row[8], int(row[9] or 0)),
+            'avg_overall_attendance': _avg(row[10], int(row[11] or 0)),
+            'avg_popup_count': _avg(row[13], monitored),
+            'avg_total_detections': _avg(row[14], monitored),
+            'avg_attendance_penalty': _avg(row[15], monitored),
+            'avg_engagement_score': _avg(row[16], monitored),
+            'avg_focus_score': _avg(row[17], monitored),
+            'avg_break_time_used': _avg(row[18], monitored),
+            'total_breaks_taken': int(row[19] or 0),
+            'first_meeting_at': row[20],
+            'last_meeting_at': row[21],
+            'unique_users': int(row[22] or 0),
+        })
+
+    if group_by_user:
+        return results
+    return results[0] if results else None
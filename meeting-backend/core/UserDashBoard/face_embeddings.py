@@ -300,6 +300,15 @@ def detect_and_generate_embedding(image: np.ndarray, user_id: int) -> Dict:
 # DATABASE OPERATIONS
 # ============================================================================
 
+def _invalidate_cached_embeddings(user_id) -> None:
+    """Drop the user's shared (Redis) and worker-cached templates after a change"""
+    try:
+        from core.FaceAuth.embedding_store import invalidate_user_embeddings
+        invalidate_user_embeddings(user_id)
+    except Exception as e:
+        logger.warning(f"⚠ Could not invalidate cached embeddings for user {user_id}: {e}")
+
+
 def store_face_embedding(user_id: int, photo_id: str, embedding_data: Dict) -> Optional[str]:
     """
     Store face embedding in MongoDB
@@ -342,6 +351,8 @@ def store_face_embedding(user_id: int, photo_id: str, embedding_data: Dict) -> O
         result = face_embeddings_collection.insert_one(embedding_doc)
         embedding_id = str(result.inserted_id)
         
+        _invalidate_cached_embeddings(user_id)
+        
         logger.info(f"✓ Stored embedding {embedding_id} for user {user_id}")
         return embedding_id
         
@@ -412,6 +423,42 @@ def get_user_embeddings(user_id: int) -> List[Dict]:
         return []
 
 
+def get_embeddings_for_users(user_ids: List[int]) -> Dict[int, List[Dict]]:
+    """
+    Get all active embeddings for many users in one query
+
+    Args:
+        user_ids: User IDs from MySQL
+
+    Returns:
+        {user_id: [embedding documents]} - users without embeddings map to [];
+        {} if the query could not run
+    """
+    user_ids = sorted({int(u) for u in user_ids})
+    try:
+        if face_embeddings_collection is None or not user_ids:
+            return {}
+
+        embeddings = face_embeddings_collection.find(
+            {'user_id': {'$in': user_ids}, 'status': 'active'},
+            {'user_id': 1, 'embedding': 1, 'det_score': 1, 'photo_id': 1, 'created_at': 1},
+            sort=[('created_at', -1)]
+        )
+
+        result = {user_id: [] for user_id in user_ids}
+        for doc in embeddings:
+            doc['_id'] = str(doc['_id'])
+            doc['photo_id'] = str(doc.get('photo_id'))
+            result.setdefault(int(doc['user_id']), []).append(doc)
+
+        logger.debug(f"Found embeddings for {sum(1 for v in result.values() if v)}/{len(user_ids)} users")
+        return result
+
+    except Exception as e:
+        logger.error(f"✗ Error getting embeddings for {len(user_ids)} users: {e}")
+        return {}
+
+
 def delete_face_embedding(embedding_id: str, permanent: bool = False) -> bool:
     """
     Delete face embedding
@@ -426,18 +473,24 @@ def delete_face_embedding(embedding_id: str, permanent: bool = False) -> bool:
     try:
         if face_embeddings_collection is None:
             return False
+        
+        doc = face_embeddings_collection.find_one({'_id': ObjectId(embedding_id)}, {'user_id': 1})
             
         if permanent:
             result = face_embeddings_collection.delete_one({'_id': ObjectId(embedding_id)})
             logger.info(f"✓ Permanently deleted embedding {embedding_id}")
-            return result.deleted_count > 0
+            changed = result.deleted_count > 0
         else:
             result = face_embeddings_collection.update_one(
                 {'_id': ObjectId(embedding_id)},
                 {'$set': {'status': 'deleted', 'deleted_at': datetime.utcnow()}}
             )
             logger.info(f"✓ Soft deleted embedding {embedding_id}")
-            return result.modified_count > 0
+            changed = result.modified_count > 0
+        
+        if changed and doc and doc.get('user_id') is not None:
+            _invalidate_cached_embeddings(doc['user_id'])
+        return changed
         
     except Exception as e:
         logger.error(f"✗ Error deleting embedding {embedding_id}: {e}")
@@ -776,6 +829,7 @@ def cleanup_orphaned_embeddings() -> int:
         embeddings = face_embeddings_collection.find({'status': 'active'})
         
         cleanup_count = 0
+        affected_users = set()
         for emb_doc in embeddings:
             photo_doc = profile_photos_collection.find_one({'_id': ObjectId(emb_doc['photo_id'])})
             
@@ -786,8 +840,13 @@ def cleanup_orphaned_embeddings() -> int:
                     {'$set': {'status': 'deleted', 'deleted_at': datetime.utcnow()}}
                 )
                 cleanup_count += 1
+                if emb_doc.get('user_id') is not None:
+                    affected_users.add(emb_doc['user_id'])
+        
+        for user_id in affected_users:
+            _invalidate_cached_embeddings(user_id)
         
-        logger.info(f"✓ Cleaned up {cleanup_count} orphaned embeddings")
+        logger.info(f"✓ Cleaned up {cleanup_count} orphaned embeddings ({len(affected_users)} users)")
         return cleanup_count
         
     except Exception as e:
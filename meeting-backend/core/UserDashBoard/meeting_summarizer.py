@@ -0,0 +1,366 @@
+# meeting_summarizer.py - Map-reduce meeting summaries with a content-addressed cache
+#
+# summarize_segment used to send the whole transcript to gpt-4o in one prompt.
+# Long meetings overflowed the context window, and reprocessing a recording
+# paid for the same call again. MeetingSummarizer instead:
+# - chunks the Whisper segments into SUMMARY_CHUNK_CHARS / SUMMARY_CHUNK_SECONDS
+#   pieces, preferring to cut at a speaker change or a pause once a chunk is
+#   mostly full, so a chunk holds whole exchanges
+# - summarizes the chunks concurrently (map), at most SUMMARY_MAX_IN_FLIGHT
+#   requests at a time
+# - merges the chunk notes in groups of up to SUMMARY_REDUCE_CHARS, level by
+#   level, until one group is left (hierarchical reduce)
+# - writes the final document from those notes with the caller's prompt
+#   (recordings.build_summary_prompt), so the output format is unchanged;
+#   transcripts that fit in one chunk go straight to the final prompt as before
+# Every completion is cached in SQLite by sha256(backend | system | prompt), so
+# a reprocessed meeting, or one chunk that repeats, costs no model call.
+#
+# The model sits behind a backend: OpenAIChatBackend in production,
+# StubSummaryBackend (SUMMARY_BACKEND=stub) for offline runs and benchmarks.
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+
+from core.utils.lazy_imports import lazy_import
+
+openai = lazy_import("openai", on_load=lambda m: setattr(m, "api_key", os.getenv("OPENAI_API_KEY")))
+
+SUMMARY_BACKEND = os.getenv("SUMMARY_BACKEND", "openai")
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gpt-4o")
+SUMMARY_CACHE_PATH = os.getenv(
+    "SUMMARY_CACHE_PATH",
+    os.path.join(settings.MEDIA_ROOT, "summary_cache", "summaries.sqlite3")
+)
+SUMMARY_CHUNK_CHARS = int(os.getenv("SUMMARY_CHUNK_CHARS", 12000))        # ~3k tokens of transcript
+SUMMARY_CHUNK_SECONDS = float(os.getenv("SUMMARY_CHUNK_SECONDS", 900))
+SUMMARY_SOFT_CUT = 0.6              # past this share of a chunk, cut at the next speaker change or pause
+SUMMARY_PAUSE_SECONDS = 2.0
+SUMMARY_REDUCE_CHARS = int(os.getenv("SUMMARY_REDUCE_CHARS", 16000))
+SUMMARY_MAX_IN_FLIGHT = int(os.getenv("SUMMARY_MAX_IN_FLIGHT", 4))
+SUMMARY_MAP_MAX_TOKENS = 900
+SUMMARY_REDUCE_MAX_TOKENS = 1500
+SUMMARY_FINAL_MAX_TOKENS = 3000
+
+SUMMARY_SYSTEM_PROMPT = "You are a technical documentation assistant trained to summarize training meetings."
+
+MAP_PROMPT = """Below is part {index} of {total} of a meeting transcript ({span}).
+Write dense working notes for a technical writer who will later combine the notes of all parts.
+Keep, in order of appearance: topics and their explanations, step-by-step procedures, tools,
+commands, configurations, paths and parameters, decisions, problems and their fixes, and action items.
+Replace real usernames, IP addresses, hostnames, ports, passwords and emails with <username>, <ip>,
+<hostname>, <port>, <password> and <email>. No introduction, no conclusion, plain text.
+
+TRANSCRIPT PART {index}:
+\"\"\"{text}\"\"\"
+"""
+
+REDUCE_PROMPT = """Below are consecutive working notes from parts of one meeting ({span}).
+Merge them into one set of working notes in the same style: keep every distinct topic, step,
+command, configuration, decision and action item, merge duplicates, keep the original order.
+Plain text, no introduction.
+
+NOTES:
+\"\"\"{text}\"\"\"
+"""
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class OpenAIChatBackend:
+    """gpt-4o through the ChatCompletion API used elsewhere in recordings.py"""
+
+    def __init__(self, model=SUMMARY_MODEL, temperature=0.4):
+        self.model = model
+        self.temperature = temperature
+        self.cache_id = f"openai:{model}:{temperature}"
+
+    def complete(self, system, prompt, max_tokens):
+        response = openai.ChatCompletion.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature,
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content.strip()
+
+
+class StubSummaryBackend:
+    """
+    Offline stand-in: deterministic, no network. Returns every tenth word of
+    the prompt (capped at max_tokens words), so each level really shrinks.
+    latency simulates the API round trip.
+    """
+
+    cache_id = "stub:v1"
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def complete(self, system, prompt, max_tokens):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        words = prompt.split()[::10][:max_tokens]
+        return f"[stub {hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]}] " + " ".join(words)
+
+
+def get_summary_backend(name=None):
+    name = name or SUMMARY_BACKEND
+    if name == "stub":
+        return StubSummaryBackend()
+    if name == "openai":
+        return OpenAIChatBackend()
+    raise ValueError(f"Unknown summary backend: {name}")
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class SummaryCache:
+    """Persistent sha256 -> completion store shared by every worker on the host"""
+
+    def __init__(self, path=SUMMARY_CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                " key TEXT PRIMARY KEY, stage TEXT NOT NULL, text TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute("SELECT text FROM completions WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, stage, text):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO completions (key, stage, text, created_at) VALUES (?, ?, ?, ?)",
+                (key, stage, text, time.time())
+            )
+
+
+# ============================================================================
+# CHUNKING
+# ============================================================================
+
+def _clock(seconds):
+    seconds = int(seconds or 0)
+    return f"{seconds // 3600:d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def _segment_line(seg):
+    speaker = seg.get("speaker")
+    prefix = f"[{_clock(seg.get('start'))}] " + (f"{speaker}: " if speaker else "")
+    return prefix + seg.get("text", "").strip()
+
+
+def chunk_segments(segments, max_chars=SUMMARY_CHUNK_CHARS, max_seconds=SUMMARY_CHUNK_SECONDS):
+    """
+    Group transcript segments into chunks under max_chars / max_seconds. Once a
+    chunk is SUMMARY_SOFT_CUT full it ends at the next speaker change or pause.
+    Returns [{'start', 'end', 'text'}].
+    """
+    chunks, lines, size = [], [], 0
+    chunk_start = previous = None
+
+    def close():
+        chunks.append({'start': chunk_start, 'end': previous.get('end', previous.get('start', 0)),
+                       'text': "\n".join(lines)})
+
+    for seg in segments:
+        line = _segment_line(seg)
+        if not seg.get("text", "").strip():
+            continue
+        start = seg.get("start", 0) or 0
+        if lines:
+            full = size + len(line) > max_chars or start - chunk_start > max_seconds
+            soft = size > max_chars * SUMMARY_SOFT_CUT or start - chunk_start > max_seconds * SUMMARY_SOFT_CUT
+            boundary = (seg.get("speaker") != previous.get("speaker")
+                        or start - (previous.get("end") or start) >= SUMMARY_PAUSE_SECONDS)
+            if full or (soft and boundary):
+                close()
+                lines, size = [], 0
+        if not lines:
+            chunk_start = start
+        lines.append(line)
+        size += len(line) + 1
+        previous = seg
+    if lines:
+        close()
+    return chunks
+
+
+def _group_by_chars(texts, max_chars):
+    """Consecutive groups of texts, each under max_chars (a longer text goes alone)"""
+    groups, current, size = [], [], 0
+    for text in texts:
+        if current and size + len(text) > max_chars:
+            groups.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text)
+    if current:
+        groups.append(current)
+    return groups
+
+
+# ============================================================================
+# SUMMARIZER
+# ============================================================================
+
+class _SummaryRun:
+    """Counters for one summarize() call; the summarizer itself is a shared singleton"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.stats = {}
+
+    def count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+    def call_started(self):
+        with self._lock:
+            self._in_flight += 1
+            self.stats['peak_in_flight'] = max(self.stats.get('peak_in_flight', 0), self._in_flight)
+
+    def call_finished(self):
+        with self._lock:
+            self._in_flight -= 1
+
+
+class MeetingSummarizer:
+    """Chunk -> concurrent map -> hierarchical reduce -> final document, every call cached"""
+
+    def __init__(self, backend=None, cache=None, max_in_flight=SUMMARY_MAX_IN_FLIGHT):
+        self.backend = backend or get_summary_backend()
+        self.max_in_flight = max(1, max_in_flight)
+        if cache is None:
+            try:
+                cache = SummaryCache()
+            except Exception as e:
+                logging.warning(f"⚠️ Summary cache unavailable, summarizing without it: {e}")
+        self.cache = cache
+
+    def complete(self, stage, prompt, max_tokens, system=SUMMARY_SYSTEM_PROMPT, run=None):
+        """One cached backend call (counted on run, if given)"""
+        run = run or _SummaryRun()
+        key = hashlib.sha256(
+            f"{self.backend.cache_id}|{max_tokens}|{system}|{prompt}".encode("utf-8")
+        ).hexdigest()
+        if self.cache is not None:
+            try:
+                cached = self.cache.get(key)
+            except Exception as e:
+                logging.warning(f"⚠️ Summary cache read failed: {e}")
+                cached = None
+            if cached is not None:
+                run.count('cache_hits')
+                return cached
+
+        run.call_started()
+        try:
+            text = self.backend.complete(system, prompt, max_tokens)
+        finally:
+            run.call_finished()
+        run.count(f'{stage}_calls')
+
+        if self.cache is not None and text:
+            try:
+                self.cache.put(key, stage, text)
+            except Exception as e:
+                logging.warning(f"⚠️ Summary cache write failed: {e}")
+        return text
+
+    def _map(self, chunks, run):
+        total = len(chunks)
+        prompts = [
+            MAP_PROMPT.format(index=i + 1, total=total, span=f"{_clock(c['start'])}-{_clock(c['end'])}", text=c['text'])
+            for i, c in enumerate(chunks)
+        ]
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="SummaryMap") as pool:
+            return list(pool.map(lambda p: self.complete('map', p, SUMMARY_MAP_MAX_TOKENS, run=run), prompts))
+
+    def _reduce(self, notes, span, run):
+        """Merge notes level by level until they fit in one SUMMARY_REDUCE_CHARS group"""
+        level = 0
+        while len(notes) > 1 and sum(len(n) for n in notes) > SUMMARY_REDUCE_CHARS:
+            groups = _group_by_chars(notes, SUMMARY_REDUCE_CHARS)
+            if len(groups) == len(notes):
+                # Every note is already at the limit; pair them up so the level still shrinks
+                groups = [notes[i:i + 2] for i in range(0, len(notes), 2)]
+            level += 1
+            prompts = [REDUCE_PROMPT.format(span=span, text="\n\n".join(group)) for group in groups]
+            with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="SummaryReduce") as pool:
+                notes = list(pool.map(lambda p: self.complete('reduce', p, SUMMARY_REDUCE_MAX_TOKENS, run=run), prompts))
+        run.count('reduce_levels', level)
+        return "\n\n".join(notes)
+
+    def summarize(self, segments, final_prompt, transcript_text=None):
+        """
+        Final summary document for a meeting. segments: Whisper segments
+        (start, end, text, optional speaker); final_prompt(text) builds the
+        document prompt. Returns (summary, stats) where stats counts this
+        call's model calls per stage, cache hits, reduce levels and peak
+        in-flight requests. Raises if the backend fails.
+        """
+        started = time.perf_counter()
+        run = _SummaryRun()
+        if not segments and transcript_text:
+            segments = [{"start": 0, "end": 0, "text": transcript_text}]
+        chunks = chunk_segments(segments or [])
+        if not chunks:
+            raise ValueError("empty transcript")
+
+        if len(chunks) == 1:
+            # Fits in one prompt: same single call as before (now cached)
+            source = transcript_text if transcript_text else chunks[0]['text']
+        else:
+            notes = self._map(chunks, run)
+            span = f"{_clock(chunks[0]['start'])}-{_clock(chunks[-1]['end'])}"
+            source = self._reduce(notes, span, run)
+        summary = self.complete('final', final_prompt(source), SUMMARY_FINAL_MAX_TOKENS, run=run)
+
+        run.stats.update(chunks=len(chunks), seconds=round(time.perf_counter() - started, 2))
+        logging.info(f"✅ Meeting summary: {run.stats}")
+        return summary, run.stats
+
+
+_summarizer_instance = None
+_summarizer_lock = threading.Lock()
+
+
+def get_meeting_summarizer():
+    global _summarizer_instance
+    if _summarizer_instance is None:
+        with _summarizer_lock:
+            if _summarizer_instance is None:
+                _summarizer_instance = MeetingSummarizer()
+    return _summarizer_instance
@@ -18,12 +18,13 @@ from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
 from django.views import View
 from graphviz import Source
-import torch
-from transformers import MarianMTModel, MarianTokenizer
+from core.utils.lazy_imports import lazy_import
+
 import logging
 from urllib.parse import quote_plus
 from django.http import StreamingHttpResponse
-import openai
+# openai loads on first use, not at import time
+openai = lazy_import("openai", on_load=lambda m: setattr(m, "api_key", os.getenv("OPENAI_API_KEY")))
 import logging
 from django.urls import path
 from fpdf import FPDF
@@ -38,13 +39,14 @@ import boto3
 from botocore.exceptions import NoCredentialsError
 from pydub import AudioSegment
 from deep_translator import GoogleTranslator
-import torch
 from django.utils import timezone
+from core.livekit_recording.finalize import meets_delivery_profile
+from core.livekit_recording.encoder_registry import get_encoder_registry
+from core.livekit_recording.segment_transcode import SegmentTranscodeSkipped, transcode_in_segments
+from core.UserDashBoard.subtitle_translation import get_subtitle_translator
+from core.UserDashBoard.meeting_summarizer import get_meeting_summarizer
 from core.WebSocketConnection.meetings import BAD_REQUEST_STATUS, NOT_FOUND_STATUS, SERVER_ERROR_STATUS, SUCCESS_STATUS, TBL_MEETINGS, create_meetings_table
 
-# === GPU CHECK ===
-print("Using GPU:", torch.cuda.is_available())
-
 # === CONFIGURATION ===
 # AWS Configuration
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
@@ -68,7 +70,7 @@ S3_FOLDERS = {
     "subtitles": os.getenv("S3_FOLDER_SUBTITLES", "subtitles")
 }
 
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# openai.api_key is set when the lazy openai proxy first loads (see imports above)
 
 # === FIXED FUNCTION 1: Enhanced S3 Key Extraction ===
 def extract_s3_key_from_url(s3_url: str, s3_bucket: str) -> str:
@@ -779,8 +781,9 @@ async def transcribe_chunk(chunk_file: str, offset: float):
         logger.error(f"[ERROR] Transcribing chunk failed: {chunk_file} - {e}")
         return []
 
-def summarize_segment(transcript: str, context: str = ""):
-    prompt = f"""
+def build_summary_prompt(transcript: str, context: str = "") -> str:
+    """Final summary document prompt; transcript may be the raw transcript or merged chunk notes"""
+    return f"""
 You are a senior documentation and technical writing expert. Your task is to convert the following raw transcript segment into a comprehensive, highly accurate, and formal implementation or study guide based on the subject matter discussed.
 
 The final output must:
@@ -920,166 +923,37 @@ End Document with Standardized "Suggested Next Steps" Note
 Suggested next steps: No specific next steps mentioned in this segment.
 """
 
+
+def summarize_segment(transcript: str, context: str = "", segments: List[dict] = None):
+    """Summary document via MeetingSummarizer (map-reduce over segments when the transcript is long)"""
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a technical documentation assistant trained to summarize training meetings."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.4,
-            max_tokens=3000
+        summary, _ = get_meeting_summarizer().summarize(
+            segments,
+            lambda text: build_summary_prompt(text, context),
+            transcript_text=transcript
         )
-        return response.choices[0].message.content.strip()
+        return summary
     except Exception as e:
         logger.error(f"[ERROR] Summary generation failed: {e}")
         return "Summary generation failed."
 
 # === ENHANCED VIDEO PROCESSING WITH FASTAPI FEATURES ===
 # Add these imports at the very top of your file
-import torch
-from transformers import MarianMTModel, MarianTokenizer
 import logging
 
-class LocalIndianLanguageTranslator:
-    """Fast local translation for Hindi and Telugu using Helsinki-NLP models"""
-    
-    def __init__(self):
-        self.models = {}
-        self.tokenizers = {}
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        
-        # Model names for Indian languages
-        self.model_names = {
-            "hi": "Helsinki-NLP/opus-mt-en-hi",  # English to Hindi
-            "te": "Helsinki-NLP/opus-mt-en-hi",  # Use Hindi model for Telugu (fallback)
-        }
-        
-        logging.info(f"🔧 LocalTranslator initialized on device: {self.device}")
-    
-    def load_model(self, lang):
-        """Lazy load model only when needed"""
-        if lang in self.models:
-            return  # Already loaded
-        
-        try:
-            model_name = self.model_names.get(lang)
-            if not model_name:
-                raise Exception(f"No model available for {lang}")
-            
-            logging.info(f"📥 Loading {lang} translation model: {model_name}")
-            
-            self.tokenizers[lang] = MarianTokenizer.from_pretrained(model_name)
-            self.models[lang] = MarianMTModel.from_pretrained(model_name)
-            
-            # Move to GPU if available
-            if self.device == "cuda":
-                self.models[lang] = self.models[lang].cuda()
-                logging.info(f"✅ {lang} model loaded on GPU")
-            else:
-                logging.info(f"✅ {lang} model loaded on CPU")
-                
-        except Exception as e:
-            logging.error(f"❌ Failed to load {lang} model: {e}")
-            raise
-    
-    def translate_batch(self, texts, target_lang):
-        """Translate a batch of texts to target language"""
-        if target_lang not in self.model_names:
-            raise Exception(f"Unsupported language: {target_lang}")
-        
-        # Load model if not already loaded
-        self.load_model(target_lang)
-        
-        try:
-            # Tokenize input texts
-            inputs = self.tokenizers[target_lang](
-                texts, 
-                return_tensors="pt", 
-                padding=True, 
-                truncation=True, 
-                max_length=512
-            )
-            
-            # Move to GPU if available
-            if self.device == "cuda":
-                inputs = {k: v.cuda() for k, v in inputs.items()}
-            
-            # Generate translations
-            with torch.no_grad():  # Disable gradient calculation for inference
-                outputs = self.models[target_lang].generate(
-                    **inputs,
-                    max_length=512,
-                    num_beams=4,  # Better quality
-                    early_stopping=True
-                )
-            
-            # Decode translations
-            translations = self.tokenizers[target_lang].batch_decode(
-                outputs, 
-                skip_special_tokens=True
-            )
-            
-            return translations
-            
-        except Exception as e:
-            logging.error(f"Translation error for {target_lang}: {e}")
-            # Return fallback translations
-            return ["[Translation unavailable]"] * len(texts)
-    
-    def translate_segments(self, segments, target_lang, batch_size=32):
-        """Translate all segments for a language in batches"""
-        if target_lang == "en":
-            return segments  # No translation needed
-        
-        logging.info(f"🌐 Translating {len(segments)} segments to {target_lang} using local model...")
-        
-        translated_segments = []
-        total_batches = (len(segments) + batch_size - 1) // batch_size
-        
-        for batch_idx in range(0, len(segments), batch_size):
-            batch_segments = segments[batch_idx:batch_idx + batch_size]
-            batch_texts = [seg["text"].strip() for seg in batch_segments]
-            
-            # Translate batch
-            translations = self.translate_batch(batch_texts, target_lang)
-            
-            # Create translated segments
-            for i, seg in enumerate(batch_segments):
-                translated_segments.append({
-                    "start": seg["start"],
-                    "end": seg["end"],
-                    "text": translations[i] if i < len(translations) else "[Translation failed]"
-                })
-            
-            # Progress logging
-            current_batch = (batch_idx // batch_size) + 1
-            if current_batch % 5 == 0 or current_batch == total_batches:
-                progress = (len(translated_segments) / len(segments)) * 100
-                logging.info(f"   {target_lang}: {progress:.1f}% ({len(translated_segments)}/{len(segments)} segments)")
-        
-        return translated_segments
-    
-    def cleanup(self):
-        """Free GPU memory"""
-        for model in self.models.values():
-            del model
-        self.models.clear()
-        self.tokenizers.clear()
-        
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
-
 # Replace your process_video_sync function with this improved version:
-def process_video_sync(video_path: str, meeting_id: str, user_id: str):
-    """Process video with GPU acceleration - OPTIMIZED FOR PYAV MP4 INPUT - ONLY FINAL MP4"""
+def process_video_sync(video_path: str, meeting_id: str, user_id: str, recorder_output: bool = False):
+    """
+    Process video with GPU acceleration - OPTIMIZED FOR PYAV MP4 INPUT - ONLY FINAL MP4
+    recorder_output: the file is the recorder's finalize output, which may be
+    published without a transcode; uploads are always normalized.
+    """
     import logging
     import subprocess
     from tempfile import TemporaryDirectory
     import os
     import json
     from datetime import datetime
-    import openai
     
     logging.info(f"🎬 Starting video processing: {video_path}")
     
@@ -1127,45 +1001,52 @@ def process_video_sync(video_path: str, meeting_id: str, user_id: str):
                 if audio_stream:
                     logging.info(f"🔊 Audio: {audio_stream.get('codec_name', 'unknown')} {audio_stream.get('sample_rate', 0)}Hz")
                 
+                delivery_ready = recorder_output and meets_delivery_profile(streams_info)
+                
             except Exception as probe_error:
                 logging.warning(f"⚠ Failed to probe PyAV input file: {probe_error}")
+                streams_info = {}
+                video_stream = {}
                 has_audio = True
                 has_video = True
                 video_duration = 0
+                delivery_ready = False
             
             if not has_video:
                 raise Exception("Input file does not contain a valid video stream")
             
             if video_duration <= 0:
-                logging.warning(f"⚠ Duration detection failed, using file analysis")
-                try:
-                    duration_cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", video_path]
-                    duration_result = subprocess.run(duration_cmd, capture_output=True, text=True, check=True)
-                    video_duration = float(duration_result.stdout.strip())
-                    logging.info(f"📏 Duration detected: {video_duration:.2f}s")
-                except:
+                # Same probe: a container without a duration often still has one per stream
+                stream_durations = [float(s.get('duration') or 0) for s in streams_info.get('streams', [])]
+                video_duration = max(stream_durations, default=0)
+                if video_duration > 0:
+                    logging.info(f"📏 Duration detected from streams: {video_duration:.2f}s")
+                else:
                     video_duration = 30.0
                     logging.warning(f"⚠ Using default duration assumption: {video_duration}s")
             
-            # ========== GPU DETECTION ==========
-            nvenc_available = False
-            try:
-                check_nvenc = subprocess.run(
-                    ['ffmpeg', '-h', 'encoder=h264_nvenc'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
+            # ========== GPU DETECTION (cached, see encoder_registry.py) ==========
+            encoder_registry = get_encoder_registry()
+            nvenc_available = encoder_registry.capabilities().nvenc
+            if nvenc_available:
+                logging.info("🚀 GPU (NVENC) detected - Will use GPU acceleration for encoding")
+                cpu_preset = None
+            else:
+                try:
+                    num, den = video_stream.get('r_frame_rate', '24/1').split('/')
+                    source_fps = float(num) / float(den) if float(den) else 24.0
+                except (ValueError, ZeroDivisionError):
+                    source_fps = 24.0
+                cpu_preset = encoder_registry.choose_x264_preset(
+                    video_stream.get('width') or 1280, video_stream.get('height') or 720, source_fps
+                )
+                logging.info(
+                    f"ℹ️ GPU not available - Will use CPU encoding (libx264 {cpu_preset}, "
+                    f"{encoder_registry.active_jobs} other encodes running)"
                 )
-                nvenc_available = (check_nvenc.returncode == 0)
-                if nvenc_available:
-                    logging.info("🚀 GPU (NVENC) detected - Will use GPU acceleration for encoding")
-                else:
-                    logging.info("ℹ️ GPU not available - Will use CPU encoding")
-            except:
-                nvenc_available = False
-                logging.info("ℹ️ GPU check failed - Will use CPU encoding")
             
             # ========== OPTIMIZED COMPRESSION WITH GPU SUPPORT ==========
+            skip_compression = False
             if input_ext == '.webm':
                 logging.info("🔄 Converting WebM to MP4...")
                 
@@ -1215,26 +1096,30 @@ def process_video_sync(video_path: str, meeting_id: str, user_id: str):
                     # CPU fallback for WebM
                     if has_audio:
                         logging.info("ℹ️ CPU - Converting WebM with audio using libx264")
+                        x264_args = ["-crf", "23", "-maxrate", "8M", "-bufsize", "16M",
+                                     "-profile:v", "high", "-level", "4.0"]
+                        movflags = "+faststart"
                         ffmpeg_cmd = [
                             "ffmpeg", "-y", "-i", video_path,
-                            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-                            "-maxrate", "8M", "-bufsize", "16M",
+                            "-c:v", "libx264", "-preset", cpu_preset, *x264_args,
                             "-c:a", "aac", "-ar", "44100", "-ac", "2", "-b:a", "192k",
-                            "-movflags", "+faststart", "-profile:v", "high", "-level", "4.0",
+                            "-movflags", movflags,
                             "-pix_fmt", "yuv420p",
                             "-avoid_negative_ts", "make_zero",
                             compressed
                         ]
                     else:
                         logging.info("ℹ️ CPU - Converting WebM (adding silent audio) using libx264")
+                        x264_args = ["-crf", "23", "-maxrate", "8M", "-bufsize", "16M",
+                                     "-profile:v", "high", "-level", "4.0"]
+                        movflags = "+faststart"
                         ffmpeg_cmd = [
                             "ffmpeg", "-y", "-i", video_path,
                             "-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=44100",
-                            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-                            "-maxrate", "8M", "-bufsize", "16M",
+                            "-c:v", "libx264", "-preset", cpu_preset, *x264_args,
                             "-c:a", "aac", "-ar", "44100", "-ac", "2", "-b:a", "64k",
                             "-shortest",
-                            "-movflags", "+faststart", "-profile:v", "high", "-level", "4.0",
+                            "-movflags", movflags,
                             "-pix_fmt", "yuv420p",
                             compressed
                         ]
@@ -1242,9 +1127,11 @@ def process_video_sync(video_path: str, meeting_id: str, user_id: str):
                 # PyAV MP4 input - CHECK IF ALREADY OPTIMIZED
                 
                 # ========== SKIP REDUNDANT COMPRESSION ==========
-                # If this is a final MP4 from recording_service, don't re-compress
-                if "_final.mp4" in video_path:
-                    logging.info("✅ Input is already optimized final MP4 from recording_service - skipping re-compression")
+                # Only recorder output (flagged by the caller) whose probe shows it
+                # already meets the delivery profile skips re-compression; the
+                # filename alone is not trusted (raw fallbacks are _final.mp4 too)
+                if delivery_ready:
+                    logging.info("✅ Input already meets the delivery profile - skipping re-compression")
                     compressed = video_path
                     
                     # Verify file is valid
@@ -1311,37 +1198,61 @@ def process_video_sync(video_path: str, meeting_id: str, user_id: str):
                         # CPU fallback for PyAV MP4
                         if has_audio:
                             logging.info("ℹ️ CPU - Optimizing PyAV MP4 (preserving audio) using libx264")
+                            x264_args = ["-crf", "23", "-maxrate", "10M", "-bufsize", "20M",
+                                         "-profile:v", "baseline", "-level", "3.1", "-vsync", "cfr"]
+                            movflags = "+faststart+frag_keyframe+separate_moof+omit_tfhd_offset"
                             ffmpeg_cmd = [
                                 "ffmpeg", "-y", "-i", video_path,
-                                "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-                                "-maxrate", "10M", "-bufsize", "20M", 
+                                "-c:v", "libx264", "-preset", cpu_preset, *x264_args,
                                 "-c:a", "copy",
-                                "-movflags", "+faststart+frag_keyframe+separate_moof+omit_tfhd_offset",
-                                "-profile:v", "baseline",
-                                "-level", "3.1",
+                                "-movflags", movflags,
                                 "-pix_fmt", "yuv420p",
                                 "-avoid_negative_ts", "make_zero",
                                 "-fflags", "+genpts",
-                                "-vsync", "cfr",
                                 compressed
                             ]
                         else:
                             logging.info("ℹ️ CPU - Optimizing PyAV MP4 (adding silent audio) using libx264")
+                            x264_args = ["-crf", "23", "-maxrate", "3M", "-bufsize", "6M",
+                                         "-profile:v", "high", "-level", "4.0", "-vsync", "cfr"]
+                            movflags = "+faststart"
                             ffmpeg_cmd = [
                                 "ffmpeg", "-y", "-i", video_path,
                                 "-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=44100",
-                                "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-                                "-maxrate", "3M", "-bufsize", "6M",
+                                "-c:v", "libx264", "-preset", cpu_preset, *x264_args,
                                 "-c:a", "aac", "-ar", "44100", "-ac", "2", "-b:a", "64k",
                                 "-shortest",
-                                "-movflags", "+faststart", "-profile:v", "high", "-level", "4.0",
+                                "-movflags", movflags,
                                 "-pix_fmt", "yuv420p",
                                 "-avoid_negative_ts", "make_zero",
                                 "-fflags", "+genpts",
-                                "-vsync", "cfr",
                                 compressed
                             ]
 
+            # ========== SEGMENT-PARALLEL CPU ENCODE FOR LONG RECORDINGS ==========
+            if not skip_compression and not nvenc_available:
+                segments_dir = os.path.join(workdir, "segments")
+                os.makedirs(segments_dir, exist_ok=True)
+                try:
+                    with encoder_registry.encoding():
+                        # Same x264 settings as the single-process command built above
+                        report = transcode_in_segments(
+                            video_path, compressed, segments_dir,
+                            preset=cpu_preset, input_info=streams_info or None,
+                            video_args=x264_args, movflags=movflags
+                        )
+                    logging.info(
+                        f"✅ Video compressed in {report['segments']} parallel segments "
+                        f"({report['total_seconds']}s, frames {report['frames'][1]}/{report['frames'][0]})"
+                    )
+                    skip_compression = True
+                except SegmentTranscodeSkipped as skipped:
+                    logging.info(f"ℹ️ Single-process encode: {skipped}")
+                except Exception as parallel_error:
+                    logging.warning(f"⚠ Segment-parallel encode failed, using single-process encode: {parallel_error}")
+                finally:
+                    shutil.rmtree(segments_dir, ignore_errors=True)
+            
             # ✅ ONLY EXECUTE COMPRESSION IF NOT SKIPPED
             if not skip_compression:
                 try:
@@ -1355,7 +1266,8 @@ def process_video_sync(video_path: str, meeting_id: str, user_id: str):
 
                     logging.info(f"FFmpeg environment: CUDA_VISIBLE_DEVICES={ffmpeg_env.get('CUDA_VISIBLE_DEVICES')}")
 
-                    result = subprocess.run(ffmpeg_cmd, check=True, capture_output=True, text=True, timeout=600, env=ffmpeg_env)
+                    with encoder_registry.encoding():
+                        result = subprocess.run(ffmpeg_cmd, check=True, capture_output=True, text=True, timeout=600, env=ffmpeg_env)
                     encoder_used = "GPU (NVENC)" if nvenc_available else "CPU (libx264)"
                     logging.info(f"✅ Video compressed successfully using {encoder_used}: {compressed}")
                 except subprocess.TimeoutExpired:
@@ -1364,7 +1276,7 @@ def process_video_sync(video_path: str, meeting_id: str, user_id: str):
                     logging.error(f"❌ Video compression failed: {compression_error}")
                     logging.error(f"❌ FFmpeg stderr: {compression_error.stderr}")
                     raise Exception(f"Video compression failed: {compression_error.stderr}")
-            else:
+            elif compressed == video_path:
                 logging.info("✅ Compression skipped - using pre-optimized file")
                 compressed_size = os.path.getsize(compressed)
 
@@ -1377,9 +1289,12 @@ def process_video_sync(video_path: str, meeting_id: str, user_id: str):
                 compressed_size = os.path.getsize(compressed)
             
             try:
-                verify_cmd = ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_streams", "-show_format", compressed]
-                verify_result = subprocess.run(verify_cmd, capture_output=True, text=True, check=True, timeout=30)
-                verify_data = json.loads(verify_result.stdout)
+                if compressed == video_path and streams_info:
+                    verify_data = streams_info    # same file as the input probe
+                else:
+                    verify_cmd = ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_streams", "-show_format", compressed]
+                    verify_result = subprocess.run(verify_cmd, capture_output=True, text=True, check=True, timeout=30)
+                    verify_data = json.loads(verify_result.stdout)
                 
                 compressed_has_audio = any(stream.get('codec_type') == 'audio' for stream in verify_data.get('streams', []))
                 compressed_has_video = any(stream.get('codec_type') == 'video' for stream in verify_data.get('streams', []))
@@ -1532,9 +1447,9 @@ def process_video_sync(video_path: str, meeting_id: str, user_id: str):
                         logging.warning("⚠️ Interpreter shutting down - skipping subtitle generation")
                         subtitle_urls = {}
                     else:
-                        # Initialize local translator (GPU-accelerated if available)
+                        # Process-wide translator: models stay loaded, segments are cached across meetings
                         try:
-                            local_translator = LocalIndianLanguageTranslator()
+                            local_translator = get_subtitle_translator()
                         except Exception as init_error:
                             logging.error(f"❌ Failed to initialize local translator: {init_error}")
                             logging.warning("⚠️ Falling back to no translation")
@@ -1553,11 +1468,7 @@ def process_video_sync(video_path: str, meeting_id: str, user_id: str):
                                         logging.info("✅ en segments ready (no translation needed)")
                                     else:
                                         # Translate using local model
-                                        translated_segments = local_translator.translate_segments(
-                                            segments, 
-                                            lang, 
-                                            batch_size=32  # Process 32 segments at once
-                                        )
+                                        translated_segments = local_translator.translate_segments(segments, lang)
                                         language_results[lang] = translated_segments
                                         logging.info(f"✅ {lang} translation completed")
                                         
@@ -1607,7 +1518,7 @@ def process_video_sync(video_path: str, meeting_id: str, user_id: str):
             summary = "Processing summary..."
             try:
                 if transcript_text and len(transcript_text.strip()) > 10:
-                    summary = summarize_segment(transcript_text)
+                    summary = summarize_segment(transcript_text, segments=segments)
                     logging.info(f"✅ Summary generated ({len(summary)} chars)")
                 else:
                     summary = "No sufficient content available for summary generation."
@@ -0,0 +1,298 @@
+# report_jobs.py - Background PDF report rendering with a content-addressed cache
+#
+# Reports are keyed by (kind, subject, requested range, data version). The data
+# version is a handful of cheap aggregate reads (daily rollups + live meeting /
+# participant counters), so a repeated click on an unchanged report streams the
+# cached PDF from disk (or S3) without re-running the report queries.
+from django.conf import settings
+from django.db import connection
+from django.http import FileResponse, HttpResponseRedirect
+from datetime import datetime
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+REPORT_KINDS = ('participant', 'host')
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", os.path.join(settings.MEDIA_ROOT, "reports"))
+REPORT_CACHE_MAX_AGE_SECONDS = int(os.getenv("REPORT_CACHE_MAX_AGE_SECONDS", 7 * 24 * 3600))
+REPORT_JOB_STALE_SECONDS = int(os.getenv("REPORT_JOB_STALE_SECONDS", 600))
+
+# Optional S3 sink so cached reports survive pod restarts and are shared across pods
+REPORT_S3_ENABLED = os.getenv("REPORT_S3_ENABLED", "False") == "True"
+REPORT_S3_PREFIX = os.getenv("REPORT_S3_PREFIX", "reports")
+AWS_S3_BUCKET = os.getenv("AWS_S3_BUCKET", "connectly-storage")
+AWS_REGION = os.getenv("AWS_REGION", "ap-south-1")
+
+STATUS_PENDING = 'pending'
+STATUS_RUNNING = 'running'
+STATUS_READY = 'ready'
+STATUS_FAILED = 'failed'
+STATUS_NOT_FOUND = 'not_found'
+
+_s3_client = None
+
+
+def _get_s3_client():
+    global _s3_client
+    if _s3_client is None:
+        import boto3
+        _s3_client = boto3.client(
+            "s3",
+            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+            region_name=AWS_REGION
+        )
+    return _s3_client
+
+
+def get_report_data_version(kind, subject_id, start_date_str=None, end_date_str=None):
+    """
+    Cheap fingerprint of everything a report reads. Any ended meeting refreshes
+    the daily rollups (Updated_At) and any live join/leave changes the
+    participant counters, so the fingerprint moves whenever the PDF would.
+    """
+    from core.UserDashBoard.analytics_rollups import (
+        create_analytics_rollup_tables, TBL_USER_DAILY_ROLLUPS, TBL_HOST_DAILY_ROLLUPS
+    )
+    create_analytics_rollup_tables()
+
+    parts = []
+    with connection.cursor() as cursor:
+        if kind == 'participant':
+            cursor.execute(f"""
+                SELECT COUNT(*), MAX(Updated_At) FROM {TBL_USER_DAILY_ROLLUPS} WHERE User_ID = %s
+            """, [subject_id])
+            parts.extend(cursor.fetchone())
+            cursor.execute("""
+                SELECT COUNT(*), SUM(Total_Sessions), SUM(Is_Currently_Active), MAX(End_Meeting_Time)
+                FROM tbl_Participants WHERE User_ID = %s
+            """, [subject_id])
+            parts.extend(cursor.fetchone())
+        else:
+            cursor.execute(f"""
+                SELECT COUNT(*), MAX(Updated_At) FROM {TBL_HOST_DAILY_ROLLUPS} WHERE Host_ID = %s
+            """, [subject_id])
+            parts.extend(cursor.fetchone())
+            cursor.execute("""
+                SELECT COUNT(*), MAX(Ended_At), SUM(CASE WHEN Status = 'active' THEN 1 ELSE 0 END)
+                FROM tbl_Meetings WHERE Host_ID = %s
+            """, [subject_id])
+            parts.extend(cursor.fetchone())
+
+    # Open-ended ranges default to "last year until now", so they roll daily
+    if not end_date_str:
+        parts.append(datetime.now().strftime('%Y-%m-%d'))
+    return "|".join(str(p) for p in parts)
+
+
+def get_report_key(kind, subject_id, start_date_str=None, end_date_str=None):
+    """Content-addressed cache key for a report request"""
+    version = get_report_data_version(kind, subject_id, start_date_str, end_date_str)
+    raw = f"{kind}|{subject_id}|{start_date_str or ''}|{end_date_str or ''}|{version}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _report_paths(report_key):
+    return (
+        os.path.join(REPORT_CACHE_DIR, f"{report_key}.pdf"),
+        os.path.join(REPORT_CACHE_DIR, f"{report_key}.json"),
+    )
+
+
+def _write_status(report_key, status, **extra):
+    os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+    _, status_path = _report_paths(report_key)
+    payload = {'report_key': report_key, 'status': status, 'updated_at': time.time()}
+    payload.update(extra)
+    tmp_path = f"{status_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, status_path)
+    return payload
+
+
+def _read_status(report_key):
+    _, status_path = _report_paths(report_key)
+    try:
+        with open(status_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _s3_key(report_key):
+    return f"{REPORT_S3_PREFIX}/{report_key}.pdf"
+
+
+def _s3_has_report(report_key):
+    if not REPORT_S3_ENABLED:
+        return False
+    try:
+        _get_s3_client().head_object(Bucket=AWS_S3_BUCKET, Key=_s3_key(report_key))
+        return True
+    except Exception:
+        return False
+
+
+def get_report_status(report_key):
+    """Current job status for a report key (ready if the PDF is on disk or in S3)"""
+    pdf_path, _ = _report_paths(report_key)
+    status = _read_status(report_key) or {'report_key': report_key, 'status': None}
+    if os.path.exists(pdf_path):
+        status['status'] = STATUS_READY
+        status['size_bytes'] = os.path.getsize(pdf_path)
+    elif _s3_has_report(report_key):
+        # Rendered on another pod (or before a restart) and only kept in S3
+        status['status'] = STATUS_READY
+        status['storage'] = 's3'
+    elif status['status'] == STATUS_READY:
+        # The PDF was pruned; the status file alone cannot serve a download
+        status['status'] = None
+    status['download_url'] = f"/api/reports/download/{report_key}" if status['status'] == STATUS_READY else None
+    status['status_url'] = f"/api/reports/status/{report_key}"
+    return status
+
+
+def render_report(kind, subject_id, start_date_str=None, end_date_str=None, report_key=None):
+    """
+    Fetch report data and render the PDF into the cache. Writes go to a temp
+    file and are renamed into place so readers never see a partial PDF.
+    """
+    from core.UserDashBoard.Analytics import (
+        get_participant_report_data, get_host_report_data,
+        build_participant_report_pdf, build_host_report_pdf,
+    )
+
+    if kind not in REPORT_KINDS:
+        raise ValueError(f"Unknown report kind: {kind}")
+
+    report_key = report_key or get_report_key(kind, subject_id, start_date_str, end_date_str)
+    pdf_path, _ = _report_paths(report_key)
+    if os.path.exists(pdf_path):
+        return get_report_status(report_key)
+
+    started = time.time()
+    _write_status(report_key, STATUS_RUNNING, kind=kind, subject_id=str(subject_id),
+                  start_date=start_date_str, end_date=end_date_str, started_at=started)
+    try:
+        start_date = datetime.strptime(start_date_str, '%Y-%m-%d') if start_date_str else None
+        end_date = datetime.strptime(end_date_str, '%Y-%m-%d') if end_date_str else None
+
+        if kind == 'participant':
+            data = get_participant_report_data(subject_id, start_date, end_date)
+            builder = build_participant_report_pdf
+        else:
+            data = get_host_report_data(subject_id, start_date, end_date)
+            builder = build_host_report_pdf
+
+        if not data:
+            return _write_status(report_key, STATUS_NOT_FOUND, kind=kind, subject_id=str(subject_id))
+
+        tmp_path = f"{pdf_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            builder(data, f)
+        os.replace(tmp_path, pdf_path)
+
+        if REPORT_S3_ENABLED:
+            try:
+                _get_s3_client().upload_file(pdf_path, AWS_S3_BUCKET, _s3_key(report_key))
+            except Exception as e:
+                logging.warning(f"[REPORTS] S3 upload failed for {report_key}: {e}")
+
+        render_seconds = round(time.time() - started, 2)
+        logging.info(f"✅ [REPORTS] Rendered {kind} report for {subject_id} in {render_seconds}s")
+        _write_status(report_key, STATUS_READY, kind=kind, subject_id=str(subject_id),
+                      render_seconds=render_seconds)
+        prune_report_cache()
+        return get_report_status(report_key)
+
+    except Exception as e:
+        logging.error(f"[REPORTS] Failed to render {kind} report for {subject_id}: {e}")
+        return _write_status(report_key, STATUS_FAILED, kind=kind, subject_id=str(subject_id), error=str(e))
+
+
+def _dispatch_render(kind, subject_id, start_date_str, end_date_str, report_key):
+    """Run the render on Celery when a broker is configured, else on a daemon thread"""
+    if getattr(settings, 'CELERY_BROKER_URL', None):
+        try:
+            from core.UserDashBoard.tasks import render_analytics_report_task
+            render_analytics_report_task.delay(kind, str(subject_id), start_date_str, end_date_str, report_key)
+            return 'celery'
+        except Exception as e:
+            logging.warning(f"[REPORTS] Celery dispatch failed, rendering in thread: {e}")
+
+    def _run():
+        try:
+            render_report(kind, subject_id, start_date_str, end_date_str, report_key)
+        finally:
+            connection.close()
+
+    threading.Thread(target=_run, daemon=True, name=f"report-{report_key[:12]}").start()
+    return 'thread'
+
+
+def enqueue_report(kind, subject_id, start_date_str=None, end_date_str=None, report_key=None):
+    """Queue a report for background rendering unless it is cached or already in flight"""
+    report_key = report_key or get_report_key(kind, subject_id, start_date_str, end_date_str)
+    status = get_report_status(report_key)
+
+    if status['status'] == STATUS_READY:
+        return status
+    if status['status'] in (STATUS_PENDING, STATUS_RUNNING):
+        if time.time() - status.get('updated_at', 0) < REPORT_JOB_STALE_SECONDS:
+            return status
+        logging.warning(f"[REPORTS] Job {report_key} looks stale, re-queueing")
+
+    _write_status(report_key, STATUS_PENDING, kind=kind, subject_id=str(subject_id),
+                  start_date=start_date_str, end_date=end_date_str)
+    runner = _dispatch_render(kind, subject_id, start_date_str, end_date_str, report_key)
+    status = get_report_status(report_key)
+    status['runner'] = runner
+    return status
+
+
+def serve_cached_report(report_key, filename):
+    """Stream a cached PDF from disk, or redirect to S3; None if not cached"""
+    pdf_path, _ = _report_paths(report_key)
+    if os.path.exists(pdf_path):
+        response = FileResponse(open(pdf_path, 'rb'), content_type='application/pdf',
+                                as_attachment=True, filename=filename)
+        response['X-Report-Key'] = report_key
+        return response
+
+    if _s3_has_report(report_key):
+        try:
+            url = _get_s3_client().generate_presigned_url(
+                'get_object',
+                Params={
+                    'Bucket': AWS_S3_BUCKET,
+                    'Key': _s3_key(report_key),
+                    'ResponseContentDisposition': f'attachment; filename="{filename}"',
+                },
+                ExpiresIn=3600
+            )
+            return HttpResponseRedirect(url)
+        except Exception:
+            return None
+    return None
+
+
+def prune_report_cache(max_age_seconds=REPORT_CACHE_MAX_AGE_SECONDS):
+    """Delete cached reports (and their status files) older than max_age_seconds"""
+    removed = 0
+    cutoff = time.time() - max_age_seconds
+    try:
+        for name in os.listdir(REPORT_CACHE_DIR):
+            path = os.path.join(REPORT_CACHE_DIR, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+    except OSError:
+        pass
+    return removed
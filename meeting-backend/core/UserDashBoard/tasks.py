@@ -0,0 +1,15 @@
+from celery import shared_task
+import logging
+from .report_jobs import render_report
+
+@shared_task
+def render_analytics_report_task(kind, subject_id, start_date_str=None, end_date_str=None, report_key=None):
+    """Celery task to render an analytics PDF report into the report cache"""
+    try:
+        logging.info(f"Starting Celery task: render_analytics_report ({kind} {subject_id})")
+        result = render_report(kind, subject_id, start_date_str, end_date_str, report_key)
+        logging.info(f"Report task completed: {result.get('status')}")
+        return result
+    except Exception as e:
+        logging.error(f"Report task failed: {e}")
+        return {'status': 'failed', 'error': str(e)}
@@ -2113,6 +2113,13 @@ def Regenerate_User_Embedding(request, user_id):
                 [new_embedding_id, user_id]
             )
             
+            # Verifiers must stop matching against the old embedding
+            try:
+                from core.FaceAuth.embedding_store import invalidate_user_embeddings
+                invalidate_user_embeddings(user_id)
+            except Exception as e:
+                logger.warning(f"Failed to invalidate cached embeddings for user {user_id}: {e}")
+            
             return JsonResponse({
                 "Message": "Face embedding regenerated successfully",
                 "user_id": user_id,
@@ -0,0 +1,526 @@
+# livekit_webhooks.py - Event-driven participant presence from LiveKit webhooks
+#
+# LiveKit posts participant_joined / participant_left / room_finished events here.
+# Each event is verified against the API secret, skipped if its ID was already
+# applied, and pushed onto a per-meeting Redis list; whichever worker holds the
+# meeting's drain lock applies the events in arrival order. Updates go through
+# the participant session helpers, so replays and out-of-order deliveries are
+# no-ops. An event ID is recorded as applied, and the participant's presence
+# timestamp advanced, only once its transaction commits. The request answers as
+# soon as the event is queued: 500 if this worker drained it and the apply
+# failed (so LiveKit retries), otherwise 200 ("applied" or "queued"). A failure
+# inside another worker's drain is logged and left to the reconciliation pass.
+# Sync_LiveKit_Participants_Fixed is kept as a low-frequency reconciliation pass
+# for meetings whose webhooks are flowing.
+from django.db import connection, transaction
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+from django.views.decorators.csrf import csrf_exempt
+from collections import OrderedDict
+from datetime import datetime
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+import jwt
+import pytz
+
+from core.WebSocketConnection.participant_sessions import (
+    open_participant_session, close_participant_session, close_meeting_sessions, epoch_now
+)
+
+IST_TIMEZONE = pytz.timezone('Asia/Kolkata')
+
+LIVEKIT_WEBHOOK_CONFIG = {
+    'api_key': os.getenv("LIVEKIT_API_KEY"),
+    'api_secret': os.getenv("LIVEKIT_API_SECRET"),
+    'event_ttl': int(os.getenv("LIVEKIT_WEBHOOK_EVENT_TTL", 24 * 3600)),
+    'lock_ttl': int(os.getenv("LIVEKIT_WEBHOOK_LOCK_TTL", 30)),
+    # Meetings that received a webhook within this window skip client-driven sync
+    'active_window': int(os.getenv("LIVEKIT_WEBHOOK_ACTIVE_WINDOW", 3600)),
+    # Minimum gap between reconciliation passes for webhook-driven meetings
+    'reconcile_interval': int(os.getenv("LIVEKIT_RECONCILE_INTERVAL", 300)),
+}
+
+HANDLED_EVENTS = ('participant_joined', 'participant_left', 'room_finished')
+
+SUCCESS_STATUS = 200
+BAD_REQUEST_STATUS = 400
+UNAUTHORIZED_STATUS = 401
+SERVER_ERROR_STATUS = 500
+
+# In-process fallbacks when Redis is unavailable
+_local_locks = {}
+_local_locks_guard = threading.Lock()
+_local_seen_events = OrderedDict()
+_local_state = {}
+_room_meeting_cache = {}
+
+# KEYS: presence hash. ARGV: user_id, event epoch, ttl. Only ever moves forward.
+_ADVANCE_PRESENCE_LUA = """
+local last = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+if tonumber(ARGV[2]) > last then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+# KEYS: lock. ARGV: token. Delete only our own lock.
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _redis():
+    from core.WebSocketConnection.participants import get_redis
+    return get_redis()
+
+
+def _event_time_str(epoch):
+    return datetime.fromtimestamp(epoch, IST_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def parse_livekit_user_id(lk_participant):
+    """
+    Extract our User_ID from a LiveKit participant dict.
+    Returns (user_id or None, parsing_method).
+    """
+    identity = lk_participant.get('identity', '') or ''
+    metadata = lk_participant.get('metadata', {})
+    name = lk_participant.get('name', '') or ''
+
+    # Method 1: From metadata (most reliable)
+    if isinstance(metadata, dict) and metadata.get('user_id'):
+        return str(metadata['user_id']), "metadata_dict"
+    if isinstance(metadata, str) and metadata.strip():
+        try:
+            meta_dict = json.loads(metadata)
+            if isinstance(meta_dict, dict) and meta_dict.get('user_id'):
+                return str(meta_dict['user_id']), "metadata_json"
+        except json.JSONDecodeError:
+            pass
+
+    # Method 2: From identity pattern "user_{id}_{timestamp}"
+    if 'user_' in identity.lower():
+        parts = identity.split('_')
+        if len(parts) >= 2 and parts[1].isdigit():
+            return parts[1], "identity_pattern"
+
+    # Method 3: Direct numeric identity
+    if identity.isdigit():
+        return identity, "identity_numeric"
+
+    # Method 4: Extract from name field
+    if name:
+        if name.isdigit():
+            return name, "name_numeric"
+        match = re.search(r'user_(\d+)', name.lower())
+        if match:
+            return match.group(1), "name_pattern"
+
+    # Method 5: Regex extraction - find any number
+    numbers = re.findall(r'\d+', identity)
+    if numbers:
+        return numbers[0], "regex_identity"
+    numbers = re.findall(r'\d+', name)
+    if numbers:
+        return numbers[0], "regex_name"
+
+    return None, "none"
+
+
+def verify_webhook(body, auth_header):
+    """
+    Verify a LiveKit webhook: the Authorization header is an HS256 JWT issued by
+    our API key whose sha256 claim is the base64 SHA-256 of the raw body.
+    Returns the decoded claims, raises ValueError if verification fails.
+    """
+    api_key = LIVEKIT_WEBHOOK_CONFIG['api_key']
+    api_secret = LIVEKIT_WEBHOOK_CONFIG['api_secret']
+    if not api_key or not api_secret:
+        raise ValueError("LiveKit API credentials are not configured")
+    if not auth_header:
+        raise ValueError("Missing Authorization header")
+
+    token = auth_header[7:] if auth_header.lower().startswith('bearer ') else auth_header
+    try:
+        claims = jwt.decode(token, api_secret, algorithms=['HS256'],
+                            options={'verify_aud': False}, leeway=10)
+    except jwt.PyJWTError as e:
+        raise ValueError(f"Invalid webhook token: {e}")
+
+    if claims.get('iss') != api_key:
+        raise ValueError("Webhook token issuer does not match API key")
+
+    expected = base64.b64encode(hashlib.sha256(body).digest()).decode()
+    if not hmac.compare_digest(str(claims.get('sha256', '')), expected):
+        raise ValueError("Webhook body hash mismatch")
+    return claims
+
+
+def resolve_meeting_id(room_name):
+    """Map a LiveKit room name to a tbl_Meetings ID"""
+    if not room_name:
+        return None
+    if room_name in _room_meeting_cache:
+        return _room_meeting_cache[room_name]
+
+    meeting_id = None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT ID FROM tbl_Meetings WHERE LiveKit_Room_Name = %s LIMIT 1", [room_name])
+        row = cursor.fetchone()
+        if not row and room_name.startswith('meeting_'):
+            cursor.execute("SELECT ID FROM tbl_Meetings WHERE ID = %s", [room_name[len('meeting_'):]])
+            row = cursor.fetchone()
+        if row:
+            meeting_id = str(row[0])
+
+    if meeting_id:
+        _room_meeting_cache[room_name] = meeting_id
+    return meeting_id
+
+
+def _event_epoch(event, *fields):
+    """First usable unix-seconds timestamp from the event (or its participant)"""
+    participant = event.get('participant') or {}
+    for field in fields:
+        value = participant.get(field) if field == 'joinedAt' else event.get(field)
+        try:
+            if value:
+                return int(float(value))
+        except (TypeError, ValueError):
+            continue
+    return epoch_now()
+
+
+def _event_seen(event_id):
+    """True if an event ID was already applied"""
+    if not event_id:
+        return False
+    r = _redis()
+    if r:
+        try:
+            return bool(r.exists(f"livekit:event:{event_id}"))
+        except Exception as e:
+            logging.warning(f"[WEBHOOK] Redis dedupe failed: {e}")
+    return event_id in _local_seen_events
+
+
+def _mark_event_seen(event_id):
+    """Record an event ID as applied (called only after its transaction committed)"""
+    if not event_id:
+        return
+    r = _redis()
+    if r:
+        try:
+            r.set(f"livekit:event:{event_id}", 1, ex=LIVEKIT_WEBHOOK_CONFIG['event_ttl'])
+            return
+        except Exception as e:
+            logging.warning(f"[WEBHOOK] Redis dedupe failed: {e}")
+
+    _local_seen_events[event_id] = time.time()
+    while len(_local_seen_events) > 10000:
+        _local_seen_events.popitem(last=False)
+
+
+def _is_stale(meeting_id, user_id, event_epoch):
+    """Skip events older than the last one applied for this participant"""
+    r = _redis()
+    if r:
+        try:
+            last = r.hget(f"livekit:presence:{meeting_id}", user_id)
+            return bool(last) and int(last) > event_epoch
+        except Exception as e:
+            logging.warning(f"[WEBHOOK] Redis presence check failed: {e}")
+    return _local_state.get((meeting_id, user_id), 0) > event_epoch
+
+
+def _advance_presence(meeting_id, user_id, event_epoch):
+    """Move the participant's last-applied timestamp forward (on commit only)"""
+    r = _redis()
+    if r:
+        try:
+            r.eval(_ADVANCE_PRESENCE_LUA, 1, f"livekit:presence:{meeting_id}",
+                   user_id, event_epoch, LIVEKIT_WEBHOOK_CONFIG['active_window'] * 24)
+            return
+        except Exception as e:
+            logging.warning(f"[WEBHOOK] Redis presence update failed: {e}")
+    state_key = (meeting_id, user_id)
+    _local_state[state_key] = max(_local_state.get(state_key, 0), event_epoch)
+
+
+def _apply_participant_joined(meeting_id, event):
+    participant = event.get('participant') or {}
+    user_id, method = parse_livekit_user_id(participant)
+    if not user_id:
+        return 'unmapped'
+    user_id = int(user_id)
+    join_epoch = _event_epoch(event, 'joinedAt', 'createdAt')
+    if _is_stale(meeting_id, user_id, join_epoch):
+        return 'stale'
+    join_time_str = _event_time_str(join_epoch)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        transaction.on_commit(lambda: _advance_presence(meeting_id, user_id, join_epoch))
+        cursor.execute("""
+            SELECT ID, Is_Currently_Active, Role
+            FROM tbl_Participants
+            WHERE Meeting_ID = %s AND User_ID = %s
+            FOR UPDATE
+        """, [meeting_id, user_id])
+        row = cursor.fetchone()
+
+        if row:
+            participant_id, is_active, role = row
+            if is_active:
+                return 'already_active'
+            open_participant_session(cursor, participant_id, meeting_id, user_id, role, join_epoch, join_time_str)
+            return 'rejoined'
+
+        cursor.execute("SELECT Host_ID, Meeting_Type, Status FROM tbl_Meetings WHERE ID = %s", [meeting_id])
+        meeting_row = cursor.fetchone()
+        if not meeting_row or meeting_row[2] == 'ended':
+            return 'meeting_closed'
+        host_id, meeting_type = meeting_row[0], meeting_row[1] or 'InstantMeeting'
+
+        cursor.execute("SELECT full_name FROM tbl_Users WHERE ID = %s", [user_id])
+        user_row = cursor.fetchone()
+        full_name = (user_row[0] or '').strip() if user_row and user_row[0] else (participant.get('name') or f"User_{user_id}")
+        role = 'host' if host_id and str(host_id) == str(user_id) else 'participant'
+
+        cursor.execute("""
+            INSERT INTO tbl_Participants
+            (Meeting_ID, User_ID, Full_Name, Role, Meeting_Type,
+             Join_Times, Leave_Times, Total_Duration_Minutes, Total_Sessions,
+             Is_Currently_Active, Attendance_Percentagebasedon_host)
+            VALUES (%s, %s, %s, %s, %s, JSON_ARRAY(), JSON_ARRAY(), 0, 0, TRUE, 0.00)
+        """, [meeting_id, user_id, full_name, role, meeting_type])
+        open_participant_session(cursor, cursor.lastrowid, meeting_id, user_id, role, join_epoch, join_time_str)
+        return 'added'
+
+
+def _apply_participant_left(meeting_id, event):
+    participant = event.get('participant') or {}
+    user_id, method = parse_livekit_user_id(participant)
+    if not user_id:
+        return 'unmapped'
+    user_id = int(user_id)
+    leave_epoch = _event_epoch(event, 'createdAt')
+    if _is_stale(meeting_id, user_id, leave_epoch):
+        return 'stale'
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        transaction.on_commit(lambda: _advance_presence(meeting_id, user_id, leave_epoch))
+        cursor.execute("""
+            SELECT ID, Is_Currently_Active
+            FROM tbl_Participants
+            WHERE Meeting_ID = %s AND User_ID = %s
+            FOR UPDATE
+        """, [meeting_id, user_id])
+        row = cursor.fetchone()
+        if not row:
+            return 'unknown_participant'
+        participant_id, is_active = row
+        if not is_active:
+            return 'already_left'
+        close_participant_session(cursor, participant_id, leave_epoch, _event_time_str(leave_epoch))
+        return 'removed'
+
+
+def _apply_room_finished(meeting_id, event):
+    end_epoch = _event_epoch(event, 'createdAt')
+    with transaction.atomic(), connection.cursor() as cursor:
+        closed = close_meeting_sessions(cursor, meeting_id, end_epoch, _event_time_str(end_epoch))
+    return f'closed_{closed}'
+
+
+EVENT_HANDLERS = {
+    'participant_joined': _apply_participant_joined,
+    'participant_left': _apply_participant_left,
+    'room_finished': _apply_room_finished,
+}
+
+
+def apply_event(meeting_id, event):
+    """
+    Apply one webhook event to tbl_Participants / tbl_Participant_Sessions.
+    The event ID is marked applied only after the handler's transaction
+    committed; a failure returns 'error' and leaves it unmarked for the retry.
+    """
+    handler = EVENT_HANDLERS.get(event.get('event'))
+    if not handler:
+        return 'ignored'
+    try:
+        result = handler(meeting_id, event)
+    except Exception as e:
+        logging.error(f"[WEBHOOK] Failed to apply {event.get('event')} for meeting {meeting_id}: {e}")
+        import traceback
+        logging.error(f"Traceback: {traceback.format_exc()}")
+        return 'error'
+    _mark_event_seen(event.get('id'))
+    logging.info(f"[WEBHOOK] {event.get('event')} for meeting {meeting_id}: {result}")
+    return result
+
+
+def drain_meeting_queue(meeting_id, event_id=None):
+    """
+    Apply queued events for a meeting in order. Only the holder of the meeting's
+    drain lock applies events; other workers just enqueue and return. After
+    releasing the lock the holder re-checks the queue so a push that raced the
+    release is not stranded. Returns (events processed, apply result of
+    event_id if this call applied it, else None).
+    """
+    r = _redis()
+    queue_key = f"livekit:events:{meeting_id}"
+    lock_key = f"livekit:events:{meeting_id}:lock"
+    processed = 0
+    own_result = None
+
+    while True:
+        token = str(uuid.uuid4())
+        if not r.set(lock_key, token, nx=True, ex=LIVEKIT_WEBHOOK_CONFIG['lock_ttl']):
+            return processed, own_result
+        try:
+            while True:
+                raw = r.lpop(queue_key)
+                if raw is None:
+                    break
+                queued_event = json.loads(raw)
+                result = apply_event(meeting_id, queued_event)
+                if event_id and queued_event.get('id') == event_id:
+                    own_result = result
+                processed += 1
+                r.expire(lock_key, LIVEKIT_WEBHOOK_CONFIG['lock_ttl'])
+        finally:
+            r.eval(_RELEASE_LOCK_LUA, 1, lock_key, token)
+        if not r.llen(queue_key):
+            return processed, own_result
+
+
+def enqueue_event(meeting_id, event):
+    """
+    Queue an event on the meeting's ordered queue and drain it if no one else is.
+    Returns (events processed here, outcome of this event: 'applied', 'failed'
+    or 'queued' if another worker's drain owns it). Never waits on other workers.
+    """
+    r = _redis()
+    if r:
+        queued = False
+        try:
+            queue_key = f"livekit:events:{meeting_id}"
+            r.rpush(queue_key, json.dumps(event))
+            queued = True
+            r.expire(queue_key, LIVEKIT_WEBHOOK_CONFIG['active_window'])
+            r.setex(f"livekit:webhook_seen:{meeting_id}", LIVEKIT_WEBHOOK_CONFIG['active_window'], epoch_now())
+            processed, result = drain_meeting_queue(meeting_id, event.get('id'))
+            if result is None:
+                return processed, 'queued'
+            return processed, 'failed' if result == 'error' else 'applied'
+        except Exception as e:
+            if queued:
+                # Outcome unknown: ask LiveKit to retry (a replay of an applied event is a no-op)
+                logging.error(f"[WEBHOOK] Redis failed after queueing event for meeting {meeting_id}: {e}")
+                return 0, 'failed'
+            logging.warning(f"[WEBHOOK] Redis queue unavailable, applying inline: {e}")
+
+    with _local_locks_guard:
+        lock = _local_locks.setdefault(meeting_id, threading.Lock())
+    with lock:
+        _local_state[('webhook_seen', meeting_id)] = epoch_now()
+        result = apply_event(meeting_id, event)
+    return 1, 'failed' if result == 'error' else 'applied'
+
+
+def should_skip_poll_sync(meeting_id):
+    """
+    True when webhooks are flowing for this meeting and a reconciliation pass ran
+    recently, so a client-triggered sync has nothing to add. Otherwise records
+    this call as the latest reconciliation and returns False.
+    """
+    now = epoch_now()
+    window = LIVEKIT_WEBHOOK_CONFIG['active_window']
+    interval = LIVEKIT_WEBHOOK_CONFIG['reconcile_interval']
+    r = _redis()
+    if r:
+        try:
+            if not r.exists(f"livekit:webhook_seen:{meeting_id}"):
+                return False
+            # Only one caller per interval gets to reconcile
+            return not r.set(f"livekit:reconciled:{meeting_id}", now, nx=True, ex=interval)
+        except Exception as e:
+            logging.warning(f"[WEBHOOK] Redis reconcile check failed: {e}")
+            return False
+
+    seen = _local_state.get(('webhook_seen', meeting_id), 0)
+    if now - seen > window:
+        return False
+    last = _local_state.get(('reconciled', meeting_id), 0)
+    if now - last < interval:
+        return True
+    _local_state[('reconciled', meeting_id)] = now
+    return False
+
+
+@require_http_methods(["POST"])
+@csrf_exempt
+def livekit_webhook(request):
+    """
+    LiveKit webhook receiver (participant_joined / participant_left / room_finished)
+    """
+    try:
+        body = request.body
+        try:
+            verify_webhook(body, request.headers.get('Authorization'))
+        except ValueError as e:
+            logging.warning(f"[WEBHOOK] Rejected webhook: {e}")
+            return JsonResponse({"error": "Invalid webhook signature"}, status=UNAUTHORIZED_STATUS)
+
+        try:
+            event = json.loads(body)
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "Invalid JSON format"}, status=BAD_REQUEST_STATUS)
+
+        event_type = event.get('event')
+        if event_type not in HANDLED_EVENTS:
+            return JsonResponse({"success": True, "status": "ignored", "event": event_type}, status=SUCCESS_STATUS)
+
+        room_name = (event.get('room') or {}).get('name')
+        meeting_id = resolve_meeting_id(room_name)
+        if not meeting_id:
+            logging.info(f"[WEBHOOK] No meeting for room {room_name}, ignoring {event_type}")
+            return JsonResponse({"success": True, "status": "unknown_room"}, status=SUCCESS_STATUS)
+
+        if _event_seen(event.get('id')):
+            return JsonResponse({"success": True, "status": "duplicate"}, status=SUCCESS_STATUS)
+
+        processed, outcome = enqueue_event(meeting_id, event)
+        if outcome == 'failed':
+            # Not marked seen, so LiveKit's retry is applied rather than deduplicated
+            return JsonResponse({
+                "error": "Failed to apply event",
+                "event": event_type,
+                "meeting_id": meeting_id
+            }, status=SERVER_ERROR_STATUS)
+        return JsonResponse({
+            "success": True,
+            "status": outcome,
+            "event": event_type,
+            "meeting_id": meeting_id,
+            "processed": processed
+        }, status=SUCCESS_STATUS)
+
+    except Exception as e:
+        logging.error(f"[WEBHOOK] Unexpected error: {e}")
+        import traceback
+        logging.error(f"Traceback: {traceback.format_exc()}")
+        return JsonResponse({"error": "Internal server error", "details": str(e)}, status=SERVER_ERROR_STATUS)
@@ -5061,6 +5061,13 @@ def join_livekit_meeting(request):
         except Exception as participant_error:
             logging.warning(f"Failed to record participant join (non-critical): {participant_error}")
         
+        # Warm the shared face embedding store for the whole meeting (once per meeting)
+        try:
+            from core.FaceAuth.embedding_store import schedule_meeting_prefetch
+            schedule_meeting_prefetch(meeting_id)
+        except Exception as prefetch_error:
+            logging.warning(f"Embedding prefetch not scheduled (non-critical): {prefetch_error}")
+        
         # SUCCESS: Fast response for immediate connection
         response_data = {
             'success': True,
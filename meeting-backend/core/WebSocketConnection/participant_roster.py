@@ -0,0 +1,211 @@
+# participant_roster.py - Cached per-meeting participant roster with a version hash
+#
+# The live participant endpoints are polled by every attendee. Instead of
+# re-running the participants x users join and re-parsing the JSON session arrays
+# on every poll, the roster is built once into a Redis snapshot and rebuilt only
+# after a join, leave, role change or removal invalidates it. The snapshot's
+# version hash is served as an ETag so unchanged polls get a bodyless 304.
+#
+# Every invalidation bumps a per-meeting generation counter. A poll records the
+# generation before it reads the database and only caches its snapshot if the
+# generation is unchanged at write time, so a poll that read the rows before a
+# write committed cannot re-cache them after the post-commit invalidation.
+from django.db import connection, transaction
+from django.http import HttpResponseNotModified
+import hashlib
+import json
+import logging
+import os
+
+ROSTER_CACHE_TTL = int(os.getenv("ROSTER_CACHE_TTL", 600))
+ROSTER_LIVEKIT_TTL = int(os.getenv("ROSTER_LIVEKIT_TTL", 5))
+ROSTER_KEY_PREFIX = "roster"
+
+# SETEX only if the generation is still the one read before the DB load
+_SET_IF_GENERATION_LUA = """
+local current = redis.call('GET', KEYS[2]) or '0'
+if current ~= ARGV[1] then
+    return 0
+end
+redis.call('SETEX', KEYS[1], ARGV[2], ARGV[3])
+return 1
+"""
+
+
+def _redis():
+    from core.WebSocketConnection.participants import get_redis
+    return get_redis()
+
+
+def _roster_key(meeting_id):
+    return f"{ROSTER_KEY_PREFIX}:{meeting_id}"
+
+
+def _generation_key(meeting_id):
+    return f"{ROSTER_KEY_PREFIX}:{meeting_id}:gen"
+
+
+def _load_array(value):
+    if not value:
+        return []
+    if isinstance(value, list):
+        return value
+    try:
+        return json.loads(value)
+    except (ValueError, TypeError):
+        return []
+
+
+def _float(value):
+    return float(value) if value is not None else 0.0
+
+
+def build_roster_snapshot(meeting_id):
+    """
+    Read the meeting's roster from the database. Returns None when the meeting
+    does not exist. Rows are kept in ID order with the raw fields both endpoints
+    need; per-request decoration happens in the views.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT ID, Meeting_Name, LiveKit_Room_Name FROM tbl_Meetings WHERE ID = %s", [meeting_id])
+        meeting_row = cursor.fetchone()
+        if not meeting_row:
+            return None
+
+        cursor.execute("""
+            SELECT
+                p.ID, p.Meeting_ID, p.User_ID, p.Full_Name, p.Join_Times, p.Leave_Times,
+                p.End_Meeting_Time, p.Role, p.Meeting_Type, p.Total_Duration_Minutes,
+                p.Total_Sessions, p.Is_Currently_Active, p.Attendance_Percentagebasedon_host,
+                p.Participant_Attendance, p.Overall_Attendance,
+                u.email, u.full_name
+            FROM tbl_Participants p
+            LEFT JOIN tbl_Users u ON p.User_ID = u.ID
+            WHERE p.Meeting_ID = %s
+            ORDER BY p.ID ASC
+        """, [meeting_id])
+        rows = cursor.fetchall()
+
+    participants = []
+    for row in rows:
+        participants.append({
+            'id': row[0],
+            'meeting_id': row[1],
+            'user_id': row[2],
+            'full_name': row[3],
+            'join_times': _load_array(row[4]),
+            'leave_times': _load_array(row[5]),
+            'end_meeting_time': row[6].isoformat() if row[6] else None,
+            'role': row[7],
+            'meeting_type': row[8],
+            'total_duration_minutes': _float(row[9]),
+            'total_sessions': row[10] or 0,
+            'is_currently_active': bool(row[11]),
+            'attendance_percentagebasedon_host': _float(row[12]),
+            'participant_attendance': _float(row[13]),
+            'overall_attendance': _float(row[14]),
+            'email': row[15],
+            'user_table_name': row[16],
+        })
+
+    snapshot = {
+        'meeting_id': str(meeting_row[0]),
+        'meeting_name': meeting_row[1],
+        'room_name': meeting_row[2] or f"meeting_{meeting_id}",
+        'participants': participants,
+    }
+    payload = json.dumps(snapshot, sort_keys=True, default=str)
+    snapshot['version'] = hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+    return snapshot
+
+
+def get_roster_snapshot(meeting_id):
+    """Cached roster snapshot for a meeting (None if the meeting does not exist)"""
+    r = _redis()
+    generation = None
+    if r:
+        try:
+            cached, generation = r.mget(_roster_key(meeting_id), _generation_key(meeting_id))
+            if cached:
+                return json.loads(cached)
+            generation = generation.decode() if isinstance(generation, bytes) else (generation or '0')
+        except Exception as e:
+            generation = None
+            logging.warning(f"[ROSTER] Redis read failed for {meeting_id}: {e}")
+
+    snapshot = build_roster_snapshot(meeting_id)
+    if snapshot and r and generation is not None:
+        try:
+            stored = r.eval(
+                _SET_IF_GENERATION_LUA, 2, _roster_key(meeting_id), _generation_key(meeting_id),
+                generation, ROSTER_CACHE_TTL, json.dumps(snapshot, default=str)
+            )
+            if not stored:
+                logging.debug(f"[ROSTER] Skipped caching stale roster for {meeting_id}")
+        except Exception as e:
+            logging.warning(f"[ROSTER] Redis write failed for {meeting_id}: {e}")
+    return snapshot
+
+
+def _delete_roster(meeting_id):
+    r = _redis()
+    if r:
+        try:
+            pipe = r.pipeline(transaction=True)
+            pipe.incr(_generation_key(meeting_id))
+            pipe.expire(_generation_key(meeting_id), ROSTER_CACHE_TTL * 2)
+            pipe.delete(_roster_key(meeting_id))
+            pipe.execute()
+        except Exception as e:
+            logging.warning(f"[ROSTER] Redis invalidate failed for {meeting_id}: {e}")
+
+
+def invalidate_roster(meeting_id):
+    """
+    Bump the roster generation and drop the cached roster once the current
+    transaction commits. Polls that loaded the pre-commit rows see the new
+    generation and skip their write-back.
+    """
+    if not meeting_id:
+        return
+    transaction.on_commit(lambda: _delete_roster(meeting_id))
+
+
+def etag_for(*parts):
+    """Quoted ETag from the snapshot version plus any per-request overlay"""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode('utf-8')).hexdigest()[:16]
+    return f'"{digest}"'
+
+
+def not_modified(request, etag):
+    """304 response if the client's If-None-Match already has this ETag"""
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+    return None
+
+
+def get_cached_room_participants(livekit_service, room_name):
+    """
+    LiveKit room listing shared by all pollers of a room for ROSTER_LIVEKIT_TTL
+    seconds, so N attendees polling cost one LiveKit API call per window.
+    """
+    r = _redis()
+    key = f"{ROSTER_KEY_PREFIX}:livekit:{room_name}"
+    if r:
+        try:
+            cached = r.get(key)
+            if cached:
+                return json.loads(cached)
+        except Exception as e:
+            logging.warning(f"[ROSTER] Redis read failed for room {room_name}: {e}")
+
+    participants = livekit_service.list_participants(room_name)
+    if r:
+        try:
+            r.setex(key, ROSTER_LIVEKIT_TTL, json.dumps(participants, default=str))
+        except Exception as e:
+            logging.warning(f"[ROSTER] Redis write failed for room {room_name}: {e}")
+    return participants
@@ -0,0 +1,338 @@
+# participant_sessions.py - One row per join/leave interval for tbl_Participants
+#
+# Join/leave history used to live only in the Join_Times/Leave_Times JSON arrays,
+# which every event read, parsed, appended to and rewrote, and every duration read
+# re-parsed with strptime. Sessions are now stored as epoch-second intervals keyed
+# by participant, with Total_Duration_Minutes/Total_Sessions maintained
+# incrementally when a session closes. The JSON arrays are still appended (in SQL,
+# without a read-modify-write) so existing history endpoints keep working.
+# Opening and closing a session both lock the tbl_Participants row first, so a
+# client join racing a LiveKit webhook join cannot open two sessions.
+from django.db import connection, transaction
+from datetime import datetime
+import json
+import logging
+import time
+import pytz
+
+from core.WebSocketConnection.participant_roster import invalidate_roster
+
+TBL_PARTICIPANT_SESSIONS = 'tbl_Participant_Sessions'
+IST_TIMEZONE = pytz.timezone('Asia/Kolkata')
+
+_sessions_table_ready = False
+
+
+def create_participant_sessions_table():
+    """Create tbl_Participant_Sessions if it does not exist (once per process)"""
+    global _sessions_table_ready
+    if _sessions_table_ready:
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {TBL_PARTICIPANT_SESSIONS} (
+                    ID BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    Participant_ID INT NOT NULL,
+                    Meeting_ID CHAR(36) NOT NULL,
+                    User_ID INT NOT NULL,
+                    Role VARCHAR(50) DEFAULT 'participant',
+                    Join_Epoch BIGINT NOT NULL COMMENT 'Session start, unix seconds',
+                    Leave_Epoch BIGINT DEFAULT NULL COMMENT 'Session end, unix seconds (NULL while open)',
+                    Duration_Seconds INT DEFAULT NULL COMMENT 'Leave_Epoch - Join_Epoch once closed',
+
+                    INDEX idx_sessions_participant_open (Participant_ID, Leave_Epoch),
+                    INDEX idx_sessions_meeting_user (Meeting_ID, User_ID, Join_Epoch),
+                    INDEX idx_sessions_meeting_open (Meeting_ID, Leave_Epoch),
+                    INDEX idx_sessions_user_join (User_ID, Join_Epoch),
+
+                    CONSTRAINT FK_Sessions_Participant FOREIGN KEY (Participant_ID)
+                        REFERENCES tbl_Participants(ID)
+                        ON DELETE CASCADE
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='Participant join/leave intervals in epoch seconds'
+            """)
+        _sessions_table_ready = True
+    except Exception as e:
+        logging.error(f"❌ Failed to create {TBL_PARTICIPANT_SESSIONS} table: {e}")
+
+
+def epoch_now():
+    return int(time.time())
+
+
+def _legacy_time_to_epoch(time_str):
+    """Convert a 'YYYY-MM-DD HH:MM:SS' IST string from the JSON arrays to epoch seconds"""
+    dt = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S')
+    return int(IST_TIMEZONE.localize(dt).timestamp())
+
+
+def _load_array(value):
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    try:
+        return json.loads(value) if value.strip() else []
+    except (ValueError, AttributeError):
+        return []
+
+
+def backfill_participant_sessions(cursor, participant_id):
+    """
+    Convert a participant's legacy Join_Times/Leave_Times arrays into session rows.
+    Only runs for participants that have no session rows yet; totals are left
+    untouched because Total_Duration_Minutes already covers the closed sessions.
+    Returns the number of rows inserted.
+    """
+    cursor.execute(f"SELECT COUNT(*) FROM {TBL_PARTICIPANT_SESSIONS} WHERE Participant_ID = %s", [participant_id])
+    if cursor.fetchone()[0]:
+        return 0
+
+    cursor.execute("""
+        SELECT Meeting_ID, User_ID, Role, Join_Times, Leave_Times
+        FROM tbl_Participants WHERE ID = %s
+    """, [participant_id])
+    row = cursor.fetchone()
+    if not row:
+        return 0
+
+    meeting_id, user_id, role, join_times_json, leave_times_json = row
+    join_times = _load_array(join_times_json)
+    leave_times = _load_array(leave_times_json)
+
+    rows = []
+    for i, join_time_str in enumerate(join_times):
+        try:
+            join_epoch = _legacy_time_to_epoch(join_time_str)
+            leave_epoch = _legacy_time_to_epoch(leave_times[i]) if i < len(leave_times) else None
+        except (ValueError, TypeError) as e:
+            logging.error(f"[SESSIONS] Skipping unparseable session {i+1} for participant {participant_id}: {e}")
+            continue
+        duration = max(0, leave_epoch - join_epoch) if leave_epoch is not None else None
+        rows.append([participant_id, meeting_id, user_id, role, join_epoch, leave_epoch, duration])
+
+    if rows:
+        cursor.executemany(f"""
+            INSERT INTO {TBL_PARTICIPANT_SESSIONS}
+            (Participant_ID, Meeting_ID, User_ID, Role, Join_Epoch, Leave_Epoch, Duration_Seconds)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, rows)
+    return len(rows)
+
+
+def _lock_participant(cursor, participant_id):
+    """Row-lock the participant until the surrounding transaction ends"""
+    cursor.execute("SELECT ID FROM tbl_Participants WHERE ID = %s FOR UPDATE", [participant_id])
+    return cursor.fetchone() is not None
+
+
+def open_participant_session(cursor, participant_id, meeting_id, user_id, role, join_epoch=None, join_time_str=None):
+    """
+    Start a session for a participant row and mark it active. A participant never
+    has more than one open session, so a repeated join is a no-op.
+    Returns the new session ID, or None if a session was already open.
+    """
+    create_participant_sessions_table()
+    join_epoch = join_epoch or epoch_now()
+
+    # Savepoint inside the caller's transaction, or a transaction of its own
+    # for callers running in autocommit, so the row lock spans check + insert
+    with transaction.atomic():
+        _lock_participant(cursor, participant_id)
+        cursor.execute(f"""
+            SELECT ID FROM {TBL_PARTICIPANT_SESSIONS}
+            WHERE Participant_ID = %s AND Leave_Epoch IS NULL
+            LIMIT 1
+        """, [participant_id])
+        if cursor.fetchone():
+            return None
+        return _insert_open_session(cursor, participant_id, meeting_id, user_id, role, join_epoch, join_time_str)
+
+
+def _insert_open_session(cursor, participant_id, meeting_id, user_id, role, join_epoch, join_time_str):
+    """Insert the session row and mark the (locked) participant active"""
+    cursor.execute(f"""
+        INSERT INTO {TBL_PARTICIPANT_SESSIONS}
+        (Participant_ID, Meeting_ID, User_ID, Role, Join_Epoch)
+        VALUES (%s, %s, %s, %s, %s)
+    """, [participant_id, meeting_id, user_id, role, join_epoch])
+    session_id = cursor.lastrowid
+
+    if join_time_str:
+        cursor.execute("""
+            UPDATE tbl_Participants
+            SET Join_Times = JSON_ARRAY_APPEND(COALESCE(Join_Times, JSON_ARRAY()), '$', %s),
+                Is_Currently_Active = TRUE
+            WHERE ID = %s
+        """, [join_time_str, participant_id])
+    else:
+        cursor.execute("UPDATE tbl_Participants SET Is_Currently_Active = TRUE WHERE ID = %s", [participant_id])
+
+    invalidate_roster(meeting_id)
+    return session_id
+
+
+def close_participant_session(cursor, participant_id, leave_epoch=None, leave_time_str=None):
+    """
+    Close the participant's open session and add its length to the running
+    Total_Duration_Minutes / Total_Sessions. Returns a dict with the closed
+    session count, the minutes added, and the participant's new totals.
+    """
+    create_participant_sessions_table()
+    leave_epoch = leave_epoch or epoch_now()
+
+    with transaction.atomic():
+        # Same lock order as open_participant_session
+        _lock_participant(cursor, participant_id)
+        return _close_open_sessions(cursor, participant_id, leave_epoch, leave_time_str)
+
+
+def _close_open_sessions(cursor, participant_id, leave_epoch, leave_time_str):
+    """Close the (locked) participant's open sessions and fold them into its totals"""
+    cursor.execute(f"""
+        SELECT ID, Join_Epoch FROM {TBL_PARTICIPANT_SESSIONS}
+        WHERE Participant_ID = %s AND Leave_Epoch IS NULL
+        FOR UPDATE
+    """, [participant_id])
+    open_sessions = cursor.fetchall()
+
+    # Participants that joined before this table existed have no rows yet
+    if not open_sessions and backfill_participant_sessions(cursor, participant_id):
+        cursor.execute(f"""
+            SELECT ID, Join_Epoch FROM {TBL_PARTICIPANT_SESSIONS}
+            WHERE Participant_ID = %s AND Leave_Epoch IS NULL
+            FOR UPDATE
+        """, [participant_id])
+        open_sessions = cursor.fetchall()
+
+    added_seconds = sum(max(0, leave_epoch - join_epoch) for _, join_epoch in open_sessions)
+    added_minutes = round(added_seconds / 60.0, 2)
+
+    if open_sessions:
+        cursor.execute(f"""
+            UPDATE {TBL_PARTICIPANT_SESSIONS}
+            SET Leave_Epoch = %s,
+                Duration_Seconds = GREATEST(%s - Join_Epoch, 0)
+            WHERE Participant_ID = %s AND Leave_Epoch IS NULL
+        """, [leave_epoch, leave_epoch, participant_id])
+
+        leave_entries = [leave_time_str] * len(open_sessions) if leave_time_str else []
+        leave_sql = ", ".join(["'$', %s"] * len(leave_entries))
+        leave_update = f"Leave_Times = JSON_ARRAY_APPEND(COALESCE(Leave_Times, JSON_ARRAY()), {leave_sql})," if leave_entries else ""
+        cursor.execute(f"""
+            UPDATE tbl_Participants
+            SET {leave_update}
+                Total_Duration_Minutes = COALESCE(Total_Duration_Minutes, 0) + %s,
+                Total_Sessions = COALESCE(Total_Sessions, 0) + %s,
+                Is_Currently_Active = FALSE
+            WHERE ID = %s
+        """, leave_entries + [added_minutes, len(open_sessions), participant_id])
+    else:
+        cursor.execute("UPDATE tbl_Participants SET Is_Currently_Active = FALSE WHERE ID = %s", [participant_id])
+
+    cursor.execute("""
+        SELECT Total_Duration_Minutes, Total_Sessions, Meeting_ID FROM tbl_Participants WHERE ID = %s
+    """, [participant_id])
+    totals = cursor.fetchone() or (0, 0, None)
+    invalidate_roster(totals[2])
+
+    return {
+        'closed_sessions': len(open_sessions),
+        'added_minutes': added_minutes,
+        'total_duration_minutes': float(totals[0] or 0),
+        'total_sessions': int(totals[1] or 0),
+    }
+
+
+def close_meeting_sessions(cursor, meeting_id, end_epoch=None, end_time_str=None, end_time=None):
+    """
+    Close every open session in a meeting in set-based SQL and fold the closed
+    intervals into each participant's running totals. Returns the number of
+    sessions closed.
+    """
+    create_participant_sessions_table()
+    end_epoch = end_epoch or epoch_now()
+
+    # Adopt still-active participants that predate the sessions table
+    cursor.execute(f"""
+        SELECT p.ID FROM tbl_Participants p
+        WHERE p.Meeting_ID = %s AND p.Is_Currently_Active = TRUE
+        AND NOT EXISTS (SELECT 1 FROM {TBL_PARTICIPANT_SESSIONS} s WHERE s.Participant_ID = p.ID)
+    """, [meeting_id])
+    for (participant_id,) in cursor.fetchall():
+        backfill_participant_sessions(cursor, participant_id)
+
+    leave_update = ""
+    params = [end_epoch, meeting_id]
+    if end_time_str:
+        leave_update = "p.Leave_Times = JSON_ARRAY_APPEND(COALESCE(p.Leave_Times, JSON_ARRAY()), '$', %s),"
+        params.append(end_time_str)
+
+    cursor.execute(f"""
+        UPDATE tbl_Participants p
+        JOIN (
+            SELECT Participant_ID,
+                   SUM(GREATEST(%s - Join_Epoch, 0)) AS Open_Seconds,
+                   COUNT(*) AS Open_Sessions
+            FROM {TBL_PARTICIPANT_SESSIONS}
+            WHERE Meeting_ID = %s AND Leave_Epoch IS NULL
+            GROUP BY Participant_ID
+        ) s ON s.Participant_ID = p.ID
+        SET {leave_update}
+            p.Total_Duration_Minutes = COALESCE(p.Total_Duration_Minutes, 0) + ROUND(s.Open_Seconds / 60, 2),
+            p.Total_Sessions = COALESCE(p.Total_Sessions, 0) + s.Open_Sessions
+    """, params)
+
+    cursor.execute(f"""
+        UPDATE {TBL_PARTICIPANT_SESSIONS}
+        SET Leave_Epoch = %s,
+            Duration_Seconds = GREATEST(%s - Join_Epoch, 0)
+        WHERE Meeting_ID = %s AND Leave_Epoch IS NULL
+    """, [end_epoch, end_epoch, meeting_id])
+    closed = cursor.rowcount
+
+    if end_time is not None:
+        cursor.execute("""
+            UPDATE tbl_Participants
+            SET End_Meeting_Time = %s, Is_Currently_Active = FALSE
+            WHERE Meeting_ID = %s
+        """, [end_time, meeting_id])
+    else:
+        cursor.execute("UPDATE tbl_Participants SET Is_Currently_Active = FALSE WHERE Meeting_ID = %s", [meeting_id])
+
+    invalidate_roster(meeting_id)
+    return closed
+
+
+def get_participant_duration_minutes(meeting_id, user_id=None, role=None, first=False):
+    """
+    Closed-session total plus the elapsed time of any open session, in minutes.
+    Select the participant row either by user_id or by role (first=True picks
+    the lowest ID, matching how the host row is chosen elsewhere).
+    """
+    create_participant_sessions_table()
+    where = "p.Meeting_ID = %s"
+    params = [epoch_now(), meeting_id]
+    if user_id is not None:
+        where += " AND p.User_ID = %s"
+        params.append(user_id)
+    if role is not None:
+        where += " AND p.Role = %s"
+        params.append(role)
+    order = "ASC" if first else "DESC"
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT COALESCE(p.Total_Duration_Minutes, 0)
+                   + COALESCE(SUM(GREATEST(%s - s.Join_Epoch, 0)), 0) / 60
+            FROM tbl_Participants p
+            LEFT JOIN {TBL_PARTICIPANT_SESSIONS} s
+                ON s.Participant_ID = p.ID AND s.Leave_Epoch IS NULL
+            WHERE {where}
+            GROUP BY p.ID, p.Total_Duration_Minutes
+            ORDER BY p.ID {order}
+            LIMIT 1
+        """, params)
+        row = cursor.fetchone()
+
+    return round(float(row[0]), 2) if row and row[0] is not None else 0.0
@@ -23,6 +23,15 @@ import socket
 from datetime import timedelta  # Add this import at the top
 import redis
 from django.conf import settings   
+from core.UserDashBoard.analytics_rollups import refresh_meeting_rollups
+from core.WebSocketConnection.participant_sessions import (
+    create_participant_sessions_table, open_participant_session, close_participant_session,
+    close_meeting_sessions, get_participant_duration_minutes, epoch_now
+)
+from core.WebSocketConnection.livekit_webhooks import parse_livekit_user_id, should_skip_poll_sync
+from core.WebSocketConnection.participant_roster import (
+    get_roster_snapshot, invalidate_roster, etag_for, not_modified, get_cached_room_participants
+)
 
 # Add this import section at the top after other imports
 #try:
@@ -195,89 +204,10 @@ logging.basicConfig(filename=LOG_FILE_PATH, level=LOG_LEVEL, format=LOG_FORMAT)
 
 
 
-def calculate_duration_from_arrays(join_times, leave_times):
-    """Calculate total duration from join/leave time arrays"""
-    if not join_times:
-        return 0.0
-    
-    total_duration = 0.0
-    
-    try:
-        for i, join_time_str in enumerate(join_times):
-            try:
-                join_dt = datetime.strptime(join_time_str, '%Y-%m-%d %H:%M:%S')
-                
-                if i < len(leave_times):
-                    leave_time_str = leave_times[i]
-                    leave_dt = datetime.strptime(leave_time_str, '%Y-%m-%d %H:%M:%S')
-                else:
-                    leave_dt = datetime.now()
-                
-                if join_dt.tzinfo is None:
-                    join_dt = IST_TIMEZONE.localize(join_dt)
-                if leave_dt.tzinfo is None:
-                    leave_dt = IST_TIMEZONE.localize(leave_dt)
-                
-                session_duration = (leave_dt - join_dt).total_seconds() / 60.0
-                
-                if session_duration > 0:
-                    total_duration += session_duration
-                    
-            except Exception as e:
-                logging.error(f"Error processing session {i+1}: {e}")
-                continue
-        
-        return round(total_duration, 2)
-        
-    except Exception as e:
-        logging.error(f"Error in calculate_duration_from_arrays: {e}")
-        return 0.0
-
-
 def get_host_duration_for_meeting(meeting_id):
     """Get HOST's duration (total meeting duration)"""
     try:
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    Total_Duration_Minutes,
-                    Join_Times,
-                    Leave_Times
-                FROM tbl_Participants
-                WHERE Meeting_ID = %s 
-                AND Role = 'host'
-                ORDER BY ID ASC
-                LIMIT 1
-            """, [meeting_id])
-            
-            host_data = cursor.fetchone()
-            
-            if not host_data:
-                return 0.0
-            
-            total_duration, join_times_json, leave_times_json = host_data
-            
-            if total_duration and total_duration > 0:
-                return float(total_duration)
-            
-            try:
-                if isinstance(join_times_json, str):
-                    join_times = json.loads(join_times_json)
-                else:
-                    join_times = join_times_json or []
-                
-                if isinstance(leave_times_json, str):
-                    leave_times = json.loads(leave_times_json)
-                else:
-                    leave_times = leave_times_json or []
-                
-                duration = calculate_duration_from_arrays(join_times, leave_times)
-                return duration
-                
-            except Exception as e:
-                logging.error(f"Error parsing host times: {e}")
-                return 0.0
-                
+        return get_participant_duration_minutes(meeting_id, role='host', first=True)
     except Exception as e:
         logging.error(f"Error getting host duration: {e}")
         return 0.0
@@ -286,47 +216,7 @@ def get_host_duration_for_meeting(meeting_id):
 def get_user_duration_for_meeting(meeting_id, user_id):
     """Get specific USER's duration in meeting"""
     try:
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    Total_Duration_Minutes,
-                    Join_Times,
-                    Leave_Times
-                FROM tbl_Participants
-                WHERE Meeting_ID = %s 
-                AND User_ID = %s
-                ORDER BY ID DESC
-                LIMIT 1
-            """, [meeting_id, user_id])
-            
-            user_data = cursor.fetchone()
-            
-            if not user_data:
-                return 0.0
-            
-            total_duration, join_times_json, leave_times_json = user_data
-            
-            if total_duration and total_duration > 0:
-                return float(total_duration)
-            
-            try:
-                if isinstance(join_times_json, str):
-                    join_times = json.loads(join_times_json)
-                else:
-                    join_times = join_times_json or []
-                
-                if isinstance(leave_times_json, str):
-                    leave_times = json.loads(leave_times_json)
-                else:
-                    leave_times = leave_times_json or []
-                
-                duration = calculate_duration_from_arrays(join_times, leave_times)
-                return duration
-                
-            except Exception as e:
-                logging.error(f"Error parsing user times: {e}")
-                return 0.0
-                
+        return get_participant_duration_minutes(meeting_id, user_id=user_id)
     except Exception as e:
         logging.error(f"Error getting user duration: {e}")
         return 0.0
@@ -705,12 +595,13 @@ def record_participant_join(request):
         role = 'host' if (is_host or (host_id and user_id == host_id)) else 'participant'
         join_time = get_ist_now()
         join_time_str = join_time.strftime('%Y-%m-%d %H:%M:%S')
+        join_epoch = epoch_now()
         
         try:
-            with connection.cursor() as cursor:
+            with transaction.atomic(), connection.cursor() as cursor:
                 # Check if user already has a record
                 cursor.execute("""
-                    SELECT ID, Join_Times, Leave_Times, Is_Currently_Active, Total_Sessions
+                    SELECT ID, Is_Currently_Active, Total_Sessions
                     FROM tbl_Participants 
                     WHERE Meeting_ID = %s AND User_ID = %s
                 """, [meeting_id, user_id])
@@ -726,34 +617,22 @@ def record_participant_join(request):
                         (Meeting_ID, User_ID, Full_Name, Role, Meeting_Type,
                          Join_Times, Leave_Times, Total_Duration_Minutes, Total_Sessions,
                          Is_Currently_Active, Attendance_Percentagebasedon_host)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, 0, 0, TRUE, 0.00)
+                        VALUES (%s, %s, %s, %s, %s, JSON_ARRAY(), JSON_ARRAY(), 0, 0, TRUE, 0.00)
                     """, [
                         meeting_id, 
                         user_id, 
                         actual_user_name, 
                         role, 
-                        meeting_type,
-                        json.dumps([join_time_str]),
-                        json.dumps([])
+                        meeting_type
                     ])
                     
                     participant_id = cursor.lastrowid
+                    open_participant_session(cursor, participant_id, meeting_id, user_id, role, join_epoch, join_time_str)
                     action = 'first_join'
                     
                 else:
                     # ===== REJOIN =====
-                    participant_id, join_times_json, leave_times_json, is_active, total_sessions = existing
-                    
-                    # Parse arrays
-                    try:
-                        join_times = json.loads(join_times_json) if isinstance(join_times_json, str) else (join_times_json or [])
-                    except:
-                        join_times = []
-                    
-                    try:
-                        leave_times = json.loads(leave_times_json) if isinstance(leave_times_json, str) else (leave_times_json or [])
-                    except:
-                        leave_times = []
+                    participant_id, is_active, total_sessions = existing
                     
                     if is_active:
                         logging.warning(f"[JOIN] User {user_id} already active - treating as duplicate")
@@ -764,19 +643,16 @@ def record_participant_join(request):
                             'action': 'already_active'
                         }, status=200)
                     
-                    # Append new join time
-                    join_times.append(join_time_str)
-                    
+                    # Start a new session; the Join_Times array is appended in SQL
+                    open_participant_session(cursor, participant_id, meeting_id, user_id, role, join_epoch, join_time_str)
                     cursor.execute("""
                         UPDATE tbl_Participants 
-                        SET Join_Times = %s,
-                            Is_Currently_Active = TRUE,
-                            Full_Name = %s
+                        SET Full_Name = %s
                         WHERE ID = %s
-                    """, [json.dumps(join_times), actual_user_name, participant_id])
+                    """, [actual_user_name, participant_id])
                     
                     action = 'rejoin'
-                    logging.info(f"[JOIN] User {user_id} rejoined (session #{len(join_times)})")
+                    logging.info(f"[JOIN] User {user_id} rejoined (session #{(total_sessions or 0) + 1})")
                 
                 # Attendance integration
                 if ATTENDANCE_INTEGRATION:
@@ -859,13 +735,13 @@ def record_participant_leave(request):
         leave_time_str = leave_time.strftime('%Y-%m-%d %H:%M:%S')
         
         try:
-            with connection.cursor() as cursor:
+            with transaction.atomic(), connection.cursor() as cursor:
                 # Get participant record
                 cursor.execute("""
-                    SELECT ID, Join_Times, Leave_Times, Full_Name, Role, 
-                           Is_Currently_Active, Total_Duration_Minutes, Total_Sessions
+                    SELECT ID, Full_Name, Role, Is_Currently_Active
                     FROM tbl_Participants 
                     WHERE Meeting_ID = %s AND User_ID = %s
+                    FOR UPDATE
                 """, [meeting_id, user_id])
                 
                 row = cursor.fetchone()
@@ -886,33 +762,10 @@ def record_participant_leave(request):
                         'user_id': user_id
                     }, status=400)
                 
-                (participant_id, join_times_json, leave_times_json, full_name, 
-                 role, is_active, cumulative_minutes, total_sessions) = row
+                participant_id, full_name, role, is_active = row
                 
                 logging.info(f"[LEAVE] Found record - ID: {participant_id}, Active: {is_active}")
                 
-                # Parse JSON arrays
-                join_times = []
-                leave_times = []
-                
-                try:
-                    if join_times_json:
-                        if isinstance(join_times_json, str):
-                            join_times = json.loads(join_times_json)
-                        elif isinstance(join_times_json, list):
-                            join_times = join_times_json
-                except Exception as e:
-                    logging.error(f"[LEAVE] Error parsing join_times: {e}")
-                
-                try:
-                    if leave_times_json:
-                        if isinstance(leave_times_json, str):
-                            leave_times = json.loads(leave_times_json)
-                        elif isinstance(leave_times_json, list):
-                            leave_times = leave_times_json
-                except Exception as e:
-                    logging.error(f"[LEAVE] Error parsing leave_times: {e}")
-                
                 # Check if user is currently active
                 if not is_active:
                     logging.warning(f"[LEAVE] User {user_id} already left")
@@ -924,37 +777,19 @@ def record_participant_leave(request):
                         'status': 'already_left'
                     }, status=400)
                 
-                # Check if we have join times
-                if len(join_times) == 0:
+                # ===== Close the open session and add it to the running totals =====
+                session_result = close_participant_session(cursor, participant_id, epoch_now(), leave_time_str)
+                
+                if session_result['closed_sessions'] == 0:
                     return JsonResponse({
                         'success': False,
                         'error': 'No join time found for this user'
                     }, status=400)
                 
-                # Append to leave times array
-                leave_times.append(leave_time_str)
-                
-                # ===== CRITICAL: Calculate total duration from ALL sessions =====
-                total_duration_minutes = calculate_duration_from_arrays(join_times, leave_times)
-                completed_sessions = len(leave_times)
-                
-                logging.info(f"[LEAVE] Calculated duration: {total_duration_minutes:.2f} minutes across {completed_sessions} sessions")
-                
-                # Update participant record
-                cursor.execute("""
-                    UPDATE tbl_Participants
-                    SET Leave_Times = %s,
-                        Total_Duration_Minutes = %s,
-                        Total_Sessions = %s,
-                        Is_Currently_Active = FALSE
-                    WHERE ID = %s
-                """, [json.dumps(leave_times), total_duration_minutes, completed_sessions, participant_id])
+                total_duration_minutes = session_result['total_duration_minutes']
+                completed_sessions = session_result['total_sessions']
                 
-                if cursor.rowcount == 0:
-                    return JsonResponse({
-                        'success': False,
-                        'error': 'Failed to update leave time'
-                    }, status=500)
+                logging.info(f"[LEAVE] Session added {session_result['added_minutes']:.2f} minutes, total {total_duration_minutes:.2f} across {completed_sessions} sessions")
                 
                 logging.info(f"✅ [LEAVE SUCCESS] User {user_id}: {total_duration_minutes:.2f} minutes total")
                 
@@ -1167,12 +1002,13 @@ def Leave_Meeting(request, participant_id):
         leave_time = get_ist_now()
         leave_time_str = leave_time.strftime('%Y-%m-%d %H:%M:%S')
         
-        with connection.cursor() as cursor:
+        with transaction.atomic(), connection.cursor() as cursor:
             # Get participant info
             cursor.execute("""
-                SELECT Meeting_ID, User_ID, Join_Times, Leave_Times, Is_Currently_Active
+                SELECT Meeting_ID, User_ID, Is_Currently_Active
                 FROM tbl_Participants
                 WHERE ID = %s
+                FOR UPDATE
             """, [participant_id])
             row = cursor.fetchone()
 
@@ -1180,35 +1016,16 @@ def Leave_Meeting(request, participant_id):
                 logging.warning(f"[LEAVE] Participant ID {participant_id} not found")
                 return JsonResponse({"Error": "Participant not found"}, status=404)
 
-            meeting_id, user_id, join_times_json, leave_times_json, is_active = row
+            meeting_id, user_id, is_active = row
             
             if not is_active:
                 logging.info(f"[LEAVE] Participant {participant_id} already left")
                 return JsonResponse({"Error": "Participant has already left"}, status=400)
 
-            # Parse arrays
-            try:
-                join_times = json.loads(join_times_json) if isinstance(join_times_json, str) else join_times_json
-                leave_times = json.loads(leave_times_json) if isinstance(leave_times_json, str) else leave_times_json
-            except:
-                join_times = []
-                leave_times = []
-            
-            # Append to leave times
-            leave_times.append(leave_time_str)
-            
-            # Calculate total duration
-            total_duration = calculate_duration_from_arrays(join_times, leave_times)
-            
-            # Update participant
-            cursor.execute("""
-                UPDATE tbl_Participants
-                SET Leave_Times = %s,
-                    Is_Currently_Active = FALSE,
-                    Total_Duration_Minutes = %s,
-                    Total_Sessions = %s
-                WHERE ID = %s
-            """, [json.dumps(leave_times), total_duration, len(leave_times), participant_id])
+            # Close the open session and add it to the running totals
+            session_result = close_participant_session(cursor, participant_id, epoch_now(), leave_time_str)
+            total_duration = session_result['total_duration_minutes']
+            total_sessions = session_result['total_sessions']
 
             # Format duration
             hours = int(total_duration // 60)
@@ -1227,7 +1044,7 @@ def Leave_Meeting(request, participant_id):
         "Leave_Time": leave_time_str,
         "Total_Duration_Minutes": round(total_duration, 2),
         "Duration_Display": duration_display,
-        "Total_Sessions": len(leave_times)
+        "Total_Sessions": total_sessions
     }, status=200)
 
 
@@ -1236,132 +1053,80 @@ def Leave_Meeting(request, participant_id):
 def list_participants_basic(request, meeting_id):
     """
     ✅ CORRECTED: List participants with proper error handling
+    Served from the cached roster snapshot; unchanged polls get 304 via ETag.
     """
     try:
-        # Validate meeting exists
+        # Load roster snapshot (validates meeting exists)
         try:
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT ID, Meeting_Name 
-                    FROM tbl_Meetings 
-                    WHERE ID = %s
-                """, [meeting_id])
-                meeting_row = cursor.fetchone()
-                
-                if not meeting_row:
-                    return JsonResponse({
-                        'success': False,
-                        'error': 'Meeting not found',
-                        'meeting_id': meeting_id
-                    }, status=404)
-                
-                meeting_name = meeting_row[1]
+            snapshot = get_roster_snapshot(meeting_id)
         except Exception as e:
-            logging.error(f"Meeting validation error: {e}")
+            logging.error(f"Roster snapshot error: {e}")
             return JsonResponse({
                 'success': False,
                 'error': f'Database error: {str(e)}'
             }, status=500)
         
-        # Get all participants
-        participants = []
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT ID, Meeting_ID, User_ID, Full_Name, Role, Meeting_Type,
-                           Join_Times, Leave_Times, End_Meeting_Time,
-                           Total_Duration_Minutes, Total_Sessions, Is_Currently_Active,
-                           Participant_Attendance, Overall_Attendance
-                    FROM tbl_Participants
-                    WHERE Meeting_ID = %s
-                    ORDER BY ID DESC
-                """, [meeting_id])
-                
-                rows = cursor.fetchall()
-                
-                for row in rows:
-                    try:
-                        # Parse arrays safely
-                        join_times = []
-                        leave_times = []
-                        
-                        try:
-                            join_times_raw = row[6]
-                            if isinstance(join_times_raw, str):
-                                join_times = json.loads(join_times_raw)
-                            elif isinstance(join_times_raw, list):
-                                join_times = join_times_raw
-                        except Exception as e:
-                            logging.error(f"Error parsing join_times: {e}")
-                        
-                        try:
-                            leave_times_raw = row[7]
-                            if isinstance(leave_times_raw, str):
-                                leave_times = json.loads(leave_times_raw)
-                            elif isinstance(leave_times_raw, list):
-                                leave_times = leave_times_raw
-                        except Exception as e:
-                            logging.error(f"Error parsing leave_times: {e}")
-                        
-                        # Get first join and last leave
-                        first_join = join_times[0] if join_times else None
-                        last_leave = leave_times[-1] if leave_times else None
-                        
-                        # Format duration
-                        total_duration = float(row[9]) if row[9] else 0.0
-                        hours = int(total_duration // 60)
-                        mins = int(total_duration % 60)
-                        duration_display = f"{hours}h {mins}m" if hours > 0 else f"{mins}m"
-                        
-                        participant = {
-                            'id': row[0],
-                            'meeting_id': row[1],
-                            'user_id': row[2],
-                            'full_name': row[3] or f"User {row[2]}",
-                            'role': row[4],
-                            'meeting_type': row[5],
-                            
-                            # Time data
-                            'first_join_time': first_join,
-                            'last_leave_time': last_leave,
-                            'end_meeting_time': row[8].isoformat() if row[8] else None,
-                            
-                            # Session data
-                            'join_times': join_times,
-                            'leave_times': leave_times,
-                            'total_sessions': row[10] or 0,
-                            
-                            # Duration
-                            'total_duration_minutes': round(total_duration, 2),
-                            'duration_display': duration_display,
-                            # Attendance fields (new columns)
-                            'participant_attendance': float(row[12]) if row[12] is not None else 0.0,
-                            'overall_attendance': float(row[13]) if row[13] is not None else 0.0,
-                            # Status
-                            'is_currently_active': bool(row[11]),
-                            'status': 'active' if row[11] else 'left',
-                            'is_online': bool(row[11]),
-                        }
-                        participants.append(participant)
-                    except Exception as row_error:
-                        logging.error(f"Error processing participant row: {row_error}")
-                        continue
-                        
-        except Exception as e:
-            logging.error(f"Error fetching participants: {e}")
-            import traceback
-            logging.error(traceback.format_exc())
+        if not snapshot:
             return JsonResponse({
                 'success': False,
-                'error': 'Failed to get participants',
-                'details': str(e)
-            }, status=500)
+                'error': 'Meeting not found',
+                'meeting_id': meeting_id
+            }, status=404)
+        
+        etag = etag_for(snapshot['version'], 'basic')
+        cached_response = not_modified(request, etag)
+        if cached_response:
+            return cached_response
+        
+        meeting_name = snapshot['meeting_name']
+        
+        # Get all participants (newest first)
+        participants = []
+        for row in reversed(snapshot['participants']):
+            join_times = row['join_times']
+            leave_times = row['leave_times']
+            
+            # Format duration
+            total_duration = row['total_duration_minutes']
+            hours = int(total_duration // 60)
+            mins = int(total_duration % 60)
+            duration_display = f"{hours}h {mins}m" if hours > 0 else f"{mins}m"
+            
+            participants.append({
+                'id': row['id'],
+                'meeting_id': row['meeting_id'],
+                'user_id': row['user_id'],
+                'full_name': row['full_name'] or f"User {row['user_id']}",
+                'role': row['role'],
+                'meeting_type': row['meeting_type'],
+                
+                # Time data
+                'first_join_time': join_times[0] if join_times else None,
+                'last_leave_time': leave_times[-1] if leave_times else None,
+                'end_meeting_time': row['end_meeting_time'],
+                
+                # Session data
+                'join_times': join_times,
+                'leave_times': leave_times,
+                'total_sessions': row['total_sessions'],
+                
+                # Duration
+                'total_duration_minutes': round(total_duration, 2),
+                'duration_display': duration_display,
+                # Attendance fields (new columns)
+                'participant_attendance': row['participant_attendance'],
+                'overall_attendance': row['overall_attendance'],
+                # Status
+                'is_currently_active': row['is_currently_active'],
+                'status': 'active' if row['is_currently_active'] else 'left',
+                'is_online': row['is_currently_active'],
+            })
         
         # Summary stats
         total_participants = len(participants)
         active_participants = len([p for p in participants if p['status'] == 'active'])
         
-        return JsonResponse({
+        response = JsonResponse({
             'success': True,
             'meeting_id': meeting_id,
             'meeting_name': meeting_name,
@@ -1372,6 +1137,8 @@ def list_participants_basic(request, meeting_id):
                 'participants_left': total_participants - active_participants
             }
         })
+        response['ETag'] = etag
+        return response
             
     except Exception as e:
         logging.error(f"Error in list_participants_basic: {e}")
@@ -2158,133 +1925,11 @@ def Get_Live_Participants_Enhanced_No_Status(request, meeting_id):
         if requesting_user_id:
             requesting_user_id = int(requesting_user_id)
         
-        db_participants = []
-        
-        # ===== STEP 1: Get database participants with CORRECTED SCHEMA =====
+        # ===== STEP 1: Get the cached roster snapshot =====
         try:
-            with connection.cursor() as cursor:
-                # ✅ FIXED: Using correct column names from new schema INCLUDING Attendance_Percentagebasedon_host
-                cursor.execute("""
-                    SELECT 
-                        p.ID,                                    -- 0
-                        p.Meeting_ID,                            -- 1
-                        p.User_ID,                               -- 2
-                        p.Full_Name,                             -- 3
-                        p.Join_Times,                            -- 4 ✅ JSON array (not Join_Time)
-                        p.Leave_Times,                           -- 5 ✅ JSON array (not Leave_Time)
-                        p.End_Meeting_Time,                      -- 6
-                        p.Role,                                  -- 7
-                        p.Meeting_Type,                          -- 8
-                        p.Total_Duration_Minutes,                -- 9 ✅ Calculated field (not Duration)
-                        p.Is_Currently_Active,                   -- 10 ✅ FIXED INDEX
-                        p.Attendance_Percentagebasedon_host,     -- 11 ✅ NEW COLUMN
-                        p.Participant_Attendance,                -- 12 ✅ NEW
-                        p.Overall_Attendance,                    -- 13 ✅ NEW
-                        u.email,                                 -- 14 ✅ FIXED INDEX
-                        u.full_name as user_table_name           -- 15 ✅ FIXED INDEX - Get name from tbl_Users as backup
-                    FROM tbl_Participants p
-                    LEFT JOIN tbl_Users u ON p.User_ID = u.ID
-                    WHERE p.Meeting_ID = %s
-                    ORDER BY p.ID ASC
-                """, [meeting_id])
-                
-                rows = cursor.fetchall()
-                
-                for row in rows:
-                    # Parse data with CORRECTED INDICES
-                    participant_id = row[0]
-                    meeting_id_val = row[1]
-                    user_id = row[2]
-                    participant_name = row[3]  # Name from tbl_Participants
-                    join_times_json = row[4]
-                    leave_times_json = row[5]
-                    end_meeting_time = row[6]
-                    role = row[7]
-                    meeting_type = row[8]
-                    total_duration = row[9]
-                    # CORRECT:
-                    is_active = row[10]                    # Fixed index
-                    attendance_basedon_host = row[11]      # Get the existing column
-                    participant_attendance = row[12]        # ✅ new
-                    overall_attendance = row[13]            # ✅ new
-                    email = row[14]                        # Fixed index
-                    user_table_name = row[15]              # Fixed index                    # ✅ FIXED: was row[14] - Name from tbl_Users
-                    
-                    # ✅ PRIORITY: Use tbl_Users name if available, fallback to tbl_Participants
-                    display_name = user_table_name if user_table_name else participant_name
-                    if not display_name:
-                        display_name = f"User {user_id}"
-                    
-                    # ✅ Add "(You)" label for requesting user
-                    if requesting_user_id and user_id == requesting_user_id:
-                        if not display_name.endswith('(You)'):
-                            display_name = f"{display_name} (You)"
-                    
-                    # Parse JSON arrays safely
-                    join_times = []
-                    leave_times = []
-                    
-                    try:
-                        if join_times_json:
-                            if isinstance(join_times_json, str):
-                                join_times = json.loads(join_times_json)
-                            elif isinstance(join_times_json, list):
-                                join_times = join_times_json
-                    except Exception as e:
-                        logging.error(f"Error parsing join_times: {e}")
-                    
-                    try:
-                        if leave_times_json:
-                            if isinstance(leave_times_json, str):
-                                leave_times = json.loads(leave_times_json)
-                            elif isinstance(leave_times_json, list):
-                                leave_times = leave_times_json
-                    except Exception as e:
-                        logging.error(f"Error parsing leave_times: {e}")
-                    
-                    # Get first join time and last leave time
-                    first_join = join_times[0] if join_times else None
-                    last_leave = leave_times[-1] if leave_times else None
-                    
-                    # Build participant object
-                    participant = {
-                        'ID': participant_id,
-                        'Meeting_ID': meeting_id_val,
-                        'User_ID': user_id,
-                        'Full_Name': display_name,  # ✅ Correct name with "(You)" label
-                        'email': email,
-                        
-                        # Time data with arrays
-                        'Join_Time': first_join,  # For backwards compatibility
-                        'Leave_Time': last_leave,  # For backwards compatibility
-                        'Join_Times': join_times,
-                        'Leave_Times': leave_times,
-                        'End_Meeting_Time': end_meeting_time.isoformat() if end_meeting_time else None,
-                        
-                        # Role and type
-                        'Role': role,
-                        'Meeting_Type': meeting_type,
-                        
-                        # Duration and metrics
-                        'Duration': float(total_duration) if total_duration else 0.0,
-                        'Total_Duration_Minutes': float(total_duration) if total_duration else 0.0,
-                        'Attendance_Percentagebasedon_host': float(attendance_basedon_host) if attendance_basedon_host else 0.0,
-                        'Participant_Attendance': float(participant_attendance) if participant_attendance is not None else 0.0,
-                        'Overall_Attendance': float(overall_attendance) if overall_attendance is not None else 0.0,
-
-                        # Status - based on Is_Currently_Active and Leave_Time
-                        'Is_Currently_Active': bool(is_active),
-                        'Status': 'checking' if is_active else 'offline',
-                        
-                        # LiveKit status (will be updated below)
-                        'LiveKit_Connected': False,
-                        'Has_Stream': False,
-                        'Debug_Info': {}
-                    }
-                    
-                    db_participants.append(participant)
-                    
-                logging.info(f"✅ Retrieved {len(db_participants)} participants from database")
+            snapshot = get_roster_snapshot(meeting_id)
+            roster_rows = snapshot['participants'] if snapshot else []
+            logging.info(f"✅ Retrieved {len(roster_rows)} participants from roster snapshot")
                 
         except Exception as e:
             logging.error(f"❌ Database error: {e}")
@@ -2299,69 +1944,16 @@ def Get_Live_Participants_Enhanced_No_Status(request, meeting_id):
         # ===== STEP 2: Get LiveKit participants =====
         livekit_participants = []
         livekit_user_mapping = {}
-        room_name = f"meeting_{meeting_id}"
+        room_name = snapshot['room_name'] if snapshot else f"meeting_{meeting_id}"
         
         if LIVEKIT_ENABLED and livekit_service:
             try:
-                # Get room name from meeting
-                with connection.cursor() as cursor:
-                    cursor.execute("""
-                        SELECT LiveKit_Room_Name FROM tbl_Meetings WHERE ID = %s
-                    """, [meeting_id])
-                    row = cursor.fetchone()
-                    if row and row[0]:
-                        room_name = row[0]
-                
-                livekit_participants = livekit_service.list_participants(room_name)
+                livekit_participants = get_cached_room_participants(livekit_service, room_name)
                 logging.info(f"📡 Retrieved {len(livekit_participants)} LiveKit participants")
                 
-                # Parse LiveKit participants with multiple extraction methods
                 for lk_participant in livekit_participants:
                     identity = lk_participant.get('identity', '')
-                    name = lk_participant.get('name', '')
-                    metadata = lk_participant.get('metadata', {})
-                    
-                    user_id = None
-                    parsing_method = "none"
-                    
-                    # Method 1: From metadata (most reliable)
-                    if isinstance(metadata, dict) and metadata.get('user_id'):
-                        user_id = str(metadata['user_id'])
-                        parsing_method = "metadata_dict"
-                    elif isinstance(metadata, str) and metadata.strip():
-                        try:
-                            meta_dict = json.loads(metadata)
-                            if meta_dict.get('user_id'):
-                                user_id = str(meta_dict['user_id'])
-                                parsing_method = "metadata_json"
-                        except:
-                            pass
-                    
-                    # Method 2: From identity pattern "user_{id}_{timestamp}"
-                    if not user_id and 'user_' in identity.lower():
-                        try:
-                            parts = identity.split('_')
-                            if len(parts) >= 2 and parts[1].isdigit():
-                                user_id = parts[1]
-                                parsing_method = "identity_pattern"
-                        except:
-                            pass
-                    
-                    # Method 3: Direct numeric identity
-                    if not user_id and identity.isdigit():
-                        user_id = identity
-                        parsing_method = "identity_numeric"
-                    
-                    # Method 4: Regex extraction
-                    if not user_id:
-                        try:
-                            import re
-                            numbers = re.findall(r'\d+', identity)
-                            if numbers:
-                                user_id = numbers[0]
-                                parsing_method = "regex_identity"
-                        except:
-                            pass
+                    user_id, parsing_method = parse_livekit_user_id(lk_participant)
                     
                     if user_id:
                         livekit_user_mapping[str(user_id)] = {
@@ -2372,57 +1964,113 @@ def Get_Live_Participants_Enhanced_No_Status(request, meeting_id):
                             'parsed_user_id': user_id,
                             'parsing_method': parsing_method
                         }
-                        logging.info(f"✅ Mapped LiveKit: {identity} -> User {user_id}")
+                        logging.debug(f"✅ Mapped LiveKit: {identity} -> User {user_id}")
                 
             except Exception as e:
                 logging.warning(f"⚠️ LiveKit error: {e}")
         
-        # ===== STEP 3: Update status with LiveKit data =====
-        for db_participant in db_participants:
-            user_id = str(db_participant['User_ID'])
+        # ===== STEP 3: Work out each participant's status from the roster + LiveKit =====
+        statuses = {}
+        for row in roster_rows:
+            user_id = str(row['user_id'])
             
-            # Check if user is in LiveKit
             if user_id in livekit_user_mapping:
-                lk_data = livekit_user_mapping[user_id]
-                
                 # User is live in LiveKit
-                db_participant['LiveKit_Connected'] = True
-                db_participant['Has_Stream'] = lk_data.get('total_tracks', 0) > 0
-                db_participant['Status'] = 'live'
-                db_participant['LiveKit_Data'] = lk_data
-                db_participant['Debug_Info'] = {
+                statuses[user_id] = ('live', livekit_user_mapping[user_id].get('total_tracks', 0) > 0)
+            elif row['is_currently_active']:
+                # User is marked active but not in LiveKit - give grace period
+                join_time = row['join_times'][0] if row['join_times'] else None
+                status = 'connecting'
+                if join_time:
+                    try:
+                        join_dt = datetime.fromisoformat(join_time.replace('Z', '+00:00'))
+                        now_dt = datetime.now(join_dt.tzinfo if join_dt.tzinfo else None)
+                        time_since_join = (now_dt - join_dt).total_seconds()
+                        
+                        if time_since_join >= 120:  # 2 minute grace period
+                            status = 'connection_lost'
+                    except:
+                        status = 'connecting'
+                statuses[user_id] = (status, False)
+            else:
+                # User has left (Is_Currently_Active = False)
+                statuses[user_id] = ('offline', False)
+        
+        # Version = roster snapshot + per-request overlay (viewer, live statuses, LiveKit state).
+        # Checked before any response body is built so unchanged polls stay cheap.
+        etag = etag_for(
+            snapshot['version'] if snapshot else 'empty',
+            requesting_user_id,
+            sorted(statuses.items()),
+            json.dumps(livekit_participants, sort_keys=True, default=str)
+        )
+        cached_response = not_modified(request, etag)
+        if cached_response:
+            return cached_response
+        
+        # ===== STEP 4: Build participant objects =====
+        db_participants = []
+        for row in roster_rows:
+            user_id = row['user_id']
+            
+            # ✅ PRIORITY: Use tbl_Users name if available, fallback to tbl_Participants
+            display_name = row['user_table_name'] or row['full_name'] or f"User {user_id}"
+            
+            # ✅ Add "(You)" label for requesting user (per-request overlay)
+            if requesting_user_id and user_id == requesting_user_id:
+                if not display_name.endswith('(You)'):
+                    display_name = f"{display_name} (You)"
+            
+            join_times = row['join_times']
+            leave_times = row['leave_times']
+            status, has_stream = statuses[str(user_id)]
+            lk_data = livekit_user_mapping.get(str(user_id))
+            
+            # Build participant object
+            participant = {
+                'ID': row['id'],
+                'Meeting_ID': row['meeting_id'],
+                'User_ID': user_id,
+                'Full_Name': display_name,  # ✅ Correct name with "(You)" label
+                'email': row['email'],
+                
+                # Time data with arrays
+                'Join_Time': join_times[0] if join_times else None,  # For backwards compatibility
+                'Leave_Time': leave_times[-1] if leave_times else None,  # For backwards compatibility
+                'Join_Times': join_times,
+                'Leave_Times': leave_times,
+                'End_Meeting_Time': row['end_meeting_time'],
+                
+                # Role and type
+                'Role': row['role'],
+                'Meeting_Type': row['meeting_type'],
+                
+                # Duration and metrics
+                'Duration': row['total_duration_minutes'],
+                'Total_Duration_Minutes': row['total_duration_minutes'],
+                'Attendance_Percentagebasedon_host': row['attendance_percentagebasedon_host'],
+                'Participant_Attendance': row['participant_attendance'],
+                'Overall_Attendance': row['overall_attendance'],
+
+                # Status - from LiveKit presence, Is_Currently_Active and the join grace period
+                'Is_Currently_Active': row['is_currently_active'],
+                'Status': status,
+                
+                # LiveKit status
+                'LiveKit_Connected': lk_data is not None,
+                'Has_Stream': has_stream,
+                'Debug_Info': {}
+            }
+            if lk_data is not None:
+                participant['LiveKit_Data'] = lk_data
+                participant['Debug_Info'] = {
                     'parsing_method': lk_data.get('parsing_method'),
                     'tracks_count': lk_data.get('total_tracks', 0)
                 }
-                
-            else:
-                # User not in LiveKit
-                db_participant['LiveKit_Connected'] = False
-                db_participant['Has_Stream'] = False
-                
-                # Determine status based on Is_Currently_Active and Leave_Time
-                if db_participant['Is_Currently_Active']:
-                    # User is marked active but not in LiveKit - give grace period
-                    join_time = db_participant.get('Join_Time')
-                    if join_time:
-                        try:
-                            join_dt = datetime.fromisoformat(join_time.replace('Z', '+00:00'))
-                            now_dt = datetime.now(join_dt.tzinfo if join_dt.tzinfo else None)
-                            time_since_join = (now_dt - join_dt).total_seconds()
-                            
-                            if time_since_join < 120:  # 2 minute grace period
-                                db_participant['Status'] = 'connecting'
-                            else:
-                                db_participant['Status'] = 'connection_lost'
-                        except:
-                            db_participant['Status'] = 'connecting'
-                    else:
-                        db_participant['Status'] = 'connecting'
-                else:
-                    # User has left (Is_Currently_Active = False)
-                    db_participant['Status'] = 'offline'
+            
+            db_participants.append(participant)
         
-        # ===== STEP 4: Apply role-based filtering (if user_id provided) =====
+        # ===== STEP 5: Apply role-based filtering (if user_id provided) =====
         filtered_participants = db_participants
         requesting_user_role = 'participant'
         
@@ -2448,7 +2096,7 @@ def Get_Live_Participants_Enhanced_No_Status(request, meeting_id):
                     # HOST VIEW: Show all participants
                     logging.info(f"🔑 HOST VIEW: User {requesting_user_id} sees all {len(filtered_participants)} participants")
         
-        # ===== STEP 5: Build response =====
+        # ===== STEP 6: Build response =====
         total_participants = len(db_participants)
         filtered_count = len(filtered_participants)
         currently_live = len([p for p in filtered_participants if p['Status'] == 'live'])
@@ -2485,7 +2133,9 @@ def Get_Live_Participants_Enhanced_No_Status(request, meeting_id):
 - Requesting user: {requesting_user_id} ({requesting_user_role})
         """)
         
-        return JsonResponse(response_data, status=200)
+        response = JsonResponse(response_data, status=200)
+        response['ETag'] = etag
+        return response
         
     except Exception as e:
         logging.error(f"❌ Critical error in Get_Live_Participants_Enhanced_No_Status: {e}")
@@ -2501,7 +2151,30 @@ def Get_Live_Participants_Enhanced_No_Status(request, meeting_id):
 @csrf_exempt
 def Sync_LiveKit_Participants_Fixed(request, meeting_id):
     """
-    ✅ FULLY CORRECTED: Sync LiveKit participants with comprehensive error handling
+    Client-triggered sync. Meetings that receive LiveKit webhooks are already
+    kept current by livekit_webhooks, so those only run a reconciliation pass
+    once per LIVEKIT_RECONCILE_INTERVAL no matter how many clients poll.
+    """
+    if LIVEKIT_ENABLED and livekit_service and should_skip_poll_sync(meeting_id):
+        return JsonResponse({
+            "success": True,
+            "message": "Participants kept in sync by LiveKit webhooks",
+            "meeting_id": meeting_id,
+            "sync_results": {
+                "added": 0, 
+                "removed": 0, 
+                "rejoined": 0, 
+                "already_synced": 0
+            },
+            "mode": "webhook",
+            "livekit_enabled": True
+        }, status=200)
+    return reconcile_livekit_participants(meeting_id)
+
+
+def reconcile_livekit_participants(meeting_id):
+    """
+    ✅ FULLY CORRECTED: Reconcile LiveKit participants with comprehensive error handling
     """
     
     # First check - LiveKit availability
@@ -2588,73 +2261,8 @@ def Sync_LiveKit_Participants_Fixed(request, meeting_id):
             for lk_participant in livekit_participants:
                 try:
                     identity = lk_participant.get('identity', '')
-                    metadata = lk_participant.get('metadata', {})
                     name = lk_participant.get('name', '')
-                    user_id = None
-                    parsing_method = "none"
-                    
-                    # Method 1: From metadata (most reliable)
-                    if isinstance(metadata, dict) and metadata.get('user_id'):
-                        user_id = str(metadata['user_id'])
-                        parsing_method = "metadata_dict"
-                    elif isinstance(metadata, str) and metadata.strip():
-                        try:
-                            meta_dict = json.loads(metadata)
-                            if meta_dict.get('user_id'):
-                                user_id = str(meta_dict['user_id'])
-                                parsing_method = "metadata_json"
-                        except json.JSONDecodeError:
-                            pass
-                    
-                    # Method 2: From identity pattern "user_{id}_{timestamp}"
-                    if not user_id and 'user_' in identity.lower():
-                        try:
-                            parts = identity.split('_')
-                            if len(parts) >= 2:
-                                potential_id = parts[1]
-                                if potential_id.isdigit():
-                                    user_id = potential_id
-                                    parsing_method = "identity_pattern"
-                        except Exception:
-                            pass
-                    
-                    # Method 3: Direct numeric identity
-                    if not user_id and identity.isdigit():
-                        user_id = identity
-                        parsing_method = "identity_numeric"
-                    
-                    # Method 4: Extract from name field
-                    if not user_id and name:
-                        if name.isdigit():
-                            user_id = name
-                            parsing_method = "name_numeric"
-                        elif 'user_' in name.lower():
-                            try:
-                                import re
-                                match = re.search(r'user_(\d+)', name.lower())
-                                if match:
-                                    user_id = match.group(1)
-                                    parsing_method = "name_pattern"
-                            except Exception:
-                                pass
-                    
-                    # Method 5: Regex extraction - find any number
-                    if not user_id:
-                        try:
-                            import re
-                            # Try identity first
-                            numbers = re.findall(r'\d+', identity)
-                            if numbers:
-                                user_id = numbers[0]
-                                parsing_method = "regex_identity"
-                            else:
-                                # Try name
-                                numbers = re.findall(r'\d+', name)
-                                if numbers:
-                                    user_id = numbers[0]
-                                    parsing_method = "regex_name"
-                        except Exception:
-                            pass
+                    user_id, parsing_method = parse_livekit_user_id(lk_participant)
                     
                     if user_id:
                         livekit_user_mapping[str(user_id)] = {
@@ -2763,51 +2371,16 @@ def Sync_LiveKit_Participants_Fixed(request, meeting_id):
                         # 15 second grace period before marking as left
                         if time_since_join > 15:
                             try:
-                                with connection.cursor() as cursor:
-                                    # Get current leave times
-                                    cursor.execute("""
-                                        SELECT Leave_Times FROM tbl_Participants WHERE ID = %s
-                                    """, [participant_info['id']])
-                                    leave_times_row = cursor.fetchone()
+                                with transaction.atomic(), connection.cursor() as cursor:
+                                    # Close the open session and add it to the running totals
+                                    session_result = close_participant_session(
+                                        cursor, participant_info['id'], epoch_now(), current_time_str
+                                    )
                                     
-                                    if leave_times_row:
-                                        leave_times = []
-                                        try:
-                                            if leave_times_row[0] is None:
-                                                leave_times = []
-                                            elif isinstance(leave_times_row[0], str):
-                                                leave_times = json.loads(leave_times_row[0]) if leave_times_row[0].strip() else []
-                                            elif isinstance(leave_times_row[0], list):
-                                                leave_times = leave_times_row[0]
-                                        except Exception as e:
-                                            logging.error(f"[SYNC-FIXED] Error parsing leave_times: {e}")
-                                            leave_times = []
-                                        
-                                        # Append current time to leave times
-                                        leave_times.append(current_time_str)
-                                        
-                                        # Calculate total duration
-                                        total_duration = calculate_duration_from_arrays(join_times, leave_times)
-                                        
-                                        # Update participant
-                                        cursor.execute("""
-                                            UPDATE tbl_Participants 
-                                            SET Leave_Times = %s,
-                                                Is_Currently_Active = FALSE,
-                                                Total_Duration_Minutes = %s,
-                                                Total_Sessions = %s
-                                            WHERE ID = %s
-                                        """, [
-                                            json.dumps(leave_times), 
-                                            total_duration, 
-                                            len(leave_times), 
-                                            participant_info['id']
-                                        ])
-                                        
-                                        if cursor.rowcount > 0:
-                                            sync_results['removed'] += 1
-                                            logging.info(f"[SYNC-FIXED] User {user_id} marked as left (grace period expired)")
-                                            del active_db_users[user_id]
+                                    if session_result['closed_sessions'] > 0:
+                                        sync_results['removed'] += 1
+                                        logging.info(f"[SYNC-FIXED] User {user_id} marked as left (grace period expired)")
+                                        del active_db_users[user_id]
                                             
                             except Exception as e:
                                 logging.error(f"[SYNC-FIXED] Error updating user {user_id}: {e}")
@@ -2824,40 +2397,25 @@ def Sync_LiveKit_Participants_Fixed(request, meeting_id):
                     sync_results['already_synced'] += 1
                     
                 elif user_id in inactive_db_users:
-                    # User rejoined - append to Join_Times array
+                    # User rejoined - start a new session
                     participant_id = inactive_db_users[user_id]['id']
                     
                     try:
                         with connection.cursor() as cursor:
                             cursor.execute("""
-                                SELECT Join_Times FROM tbl_Participants WHERE ID = %s
+                                SELECT Role FROM tbl_Participants WHERE ID = %s
                             """, [participant_id])
                             row = cursor.fetchone()
                             
                             if row:
-                                join_times = []
-                                try:
-                                    if row[0] is None:
-                                        join_times = []
-                                    elif isinstance(row[0], str):
-                                        join_times = json.loads(row[0]) if row[0].strip() else []
-                                    elif isinstance(row[0], list):
-                                        join_times = row[0]
-                                except Exception as e:
-                                    logging.error(f"[SYNC-FIXED] Error parsing join_times: {e}")
-                                    join_times = []
-                                
-                                # Append new join time
-                                join_times.append(current_time_str)
-                                
-                                cursor.execute("""
-                                    UPDATE tbl_Participants 
-                                    SET Join_Times = %s, Is_Currently_Active = TRUE
-                                    WHERE ID = %s
-                                """, [json.dumps(join_times), participant_id])
+                                # Start a new session; the Join_Times array is appended in SQL
+                                open_participant_session(
+                                    cursor, participant_id, meeting_id, int(user_id), row[0],
+                                    epoch_now(), current_time_str
+                                )
                                 
                                 sync_results['rejoined'] += 1
-                                logging.info(f"[SYNC-FIXED] User {user_id} rejoined (session #{len(join_times)})")
+                                logging.info(f"[SYNC-FIXED] User {user_id} rejoined")
                                 
                     except Exception as e:
                         logging.error(f"[SYNC-FIXED] Error rejoining user {user_id}: {e}")
@@ -2885,16 +2443,18 @@ def Sync_LiveKit_Participants_Fixed(request, meeting_id):
                                 (Meeting_ID, User_ID, Full_Name, Role, Meeting_Type,
                                  Join_Times, Leave_Times, Total_Duration_Minutes, Total_Sessions,
                                  Is_Currently_Active, Attendance_Percentagebasedon_host)
-                                VALUES (%s, %s, %s, %s, %s, %s, %s, 0, 0, TRUE, 0.00)
+                                VALUES (%s, %s, %s, %s, %s, JSON_ARRAY(), JSON_ARRAY(), 0, 0, TRUE, 0.00)
                             """, [
                                 meeting_id, 
                                 user_id, 
                                 user_name, 
                                 role, 
-                                'InstantMeeting',
-                                json.dumps([current_time_str]),
-                                json.dumps([])
+                                'InstantMeeting'
                             ])
+                            open_participant_session(
+                                cursor, cursor.lastrowid, meeting_id, int(user_id), role,
+                                epoch_now(), current_time_str
+                            )
                             
                             sync_results['added'] += 1
                             logging.info(f"[SYNC-FIXED] Added new user {user_id} ({user_name})")
@@ -3029,13 +2589,19 @@ def end_meeting(request, meeting_id):
             logging.error(f"[end_meeting] Failed to mark meeting ended: {e}")
             return JsonResponse({"error": "Failed to update meeting status", "details": str(e)}, status=500)
 
-        # ===== Step 3: Update each participant's durations ===== (UNCHANGED)
+        # ===== Step 3: Update each participant's durations =====
         try:
             with transaction.atomic():
                 with connection.cursor() as cursor:
+                    # Close every open session and fold it into the running totals
+                    closed_sessions = close_meeting_sessions(
+                        cursor, meeting_id, epoch_now(), end_time_str, end_time
+                    )
+                    logging.info(f"[end_meeting] Closed {closed_sessions} open session(s)")
+
                     cursor.execute("""
                         SELECT ID, User_ID, Full_Name, Role, Meeting_Type,
-                               Join_Times, Leave_Times, Is_Currently_Active
+                               Total_Duration_Minutes, Total_Sessions
                         FROM tbl_Participants
                         WHERE Meeting_ID = %s
                     """, [meeting_id])
@@ -3043,39 +2609,9 @@ def end_meeting(request, meeting_id):
                     all_participants = cursor.fetchall()
 
                     for row in all_participants:
-                        participant_id, user_id, full_name, role, meeting_type, join_times_json, leave_times_json, is_active = row
-
-                        # Parse arrays
-                        try:
-                            join_times = json.loads(join_times_json) if isinstance(join_times_json, str) else join_times_json or []
-                            leave_times = json.loads(leave_times_json) if isinstance(leave_times_json, str) else leave_times_json or []
-                        except Exception:
-                            join_times, leave_times = [], []
-
-                        # If participant still active -> append end time
-                        if is_active and len(join_times) > len(leave_times):
-                            leave_times.append(end_time_str)
-
-                        # Calculate total duration (in minutes)
-                        total_duration_minutes = calculate_duration_from_arrays(join_times, leave_times)
-                        completed_sessions = len(leave_times)
-
-                        # Update DB
-                        cursor.execute("""
-                            UPDATE tbl_Participants
-                            SET Leave_Times = %s,
-                                End_Meeting_Time = %s,
-                                Total_Duration_Minutes = %s,
-                                Total_Sessions = %s,
-                                Is_Currently_Active = FALSE
-                            WHERE ID = %s
-                        """, [
-                            json.dumps(leave_times),
-                            end_time,
-                            total_duration_minutes,
-                            completed_sessions,
-                            participant_id
-                        ])
+                        participant_id, user_id, full_name, role, meeting_type, total_duration_minutes, completed_sessions = row
+                        total_duration_minutes = float(total_duration_minutes or 0)
+                        completed_sessions = completed_sessions or 0
 
                         participants_processed += 1
                         participants_data.append({
@@ -3235,6 +2771,13 @@ def end_meeting(request, meeting_id):
             attendance_calculation_results = []
             attendance_calculation_success = False
 
+        # ===== Step 6b: Refresh daily analytics rollups for this meeting =====
+        # Failures are logged inside and never block ending the meeting.
+        refresh_meeting_rollups(meeting_id)
+
+        # Attendance columns changed above; drop the cached roster
+        invalidate_roster(meeting_id)
+
         # ===== Step 7: Meeting summary ===== (UNCHANGED)
         summary_average = round(total_participant_percentage / participant_count, 2) if participant_count > 0 else 0.0
         meeting_duration_display = "Unknown"
@@ -3434,6 +2977,7 @@ def assign_co_host(request):
                     }, status=500)
                 
                 logging.info(f"✅ [COHOST] Updated participant {participant_id} to co-host")
+                invalidate_roster(meeting_id)
         
         except Exception as e:
             logging.error(f"[COHOST] Database update error: {e}")
@@ -3665,6 +3209,7 @@ def remove_co_host(request):
                     }, status=500)
                 
                 logging.info(f"✅ [REMOVE-COHOST] Updated role to participant ({rows_affected} row(s))")
+                invalidate_roster(meeting_id)
         
         except Exception as e:
             logging.error(f"[REMOVE-COHOST] Database update error: {e}")
@@ -4014,13 +3559,11 @@ def remove_participant_from_meeting(request):
         # Get participant info
         participant_name = f'User_{user_id_to_remove}'
         participant_id = None
-        join_times_json = None
-        leave_times_json = None
         
         try:
             with connection.cursor() as cursor:
                 cursor.execute("""
-                    SELECT ID, Full_Name, Join_Times, Leave_Times, Role
+                    SELECT ID, Full_Name, Role
                     FROM tbl_Participants 
                     WHERE Meeting_ID = %s AND User_ID = %s AND Is_Currently_Active = TRUE
                 """, [meeting_id, user_id_to_remove])
@@ -4035,7 +3578,7 @@ def remove_participant_from_meeting(request):
                         'user_id': user_id_to_remove
                     }, status=400)
                 
-                participant_id, db_name, join_times_json, leave_times_json, participant_role = participant_row
+                participant_id, db_name, participant_role = participant_row
                 
                 if db_name:
                     participant_name = db_name
@@ -4057,62 +3600,12 @@ def remove_participant_from_meeting(request):
         remove_time_str = remove_time.strftime('%Y-%m-%d %H:%M:%S')
         
         try:
-            with connection.cursor() as cursor:
-                # Parse JSON arrays safely
-                join_times = []
-                leave_times = []
-                
-                try:
-                    if join_times_json:
-                        if isinstance(join_times_json, str):
-                            join_times = json.loads(join_times_json)
-                        elif isinstance(join_times_json, list):
-                            join_times = join_times_json
-                except Exception as e:
-                    logging.error(f"[REMOVE-PARTICIPANT] Error parsing join_times: {e}")
-                
-                try:
-                    if leave_times_json:
-                        if isinstance(leave_times_json, str):
-                            leave_times = json.loads(leave_times_json)
-                        elif isinstance(leave_times_json, list):
-                            leave_times = leave_times_json
-                except Exception as e:
-                    logging.error(f"[REMOVE-PARTICIPANT] Error parsing leave_times: {e}")
-                
-                # Append current time to leave times
-                leave_times.append(remove_time_str)
-                
-                logging.info(f"[REMOVE-PARTICIPANT] Sessions - Join: {len(join_times)}, Leave: {len(leave_times)}")
-                
-                # Calculate total duration
-                total_duration = 0.0
-                try:
-                    total_duration = calculate_duration_from_arrays(join_times, leave_times)
-                    logging.info(f"[REMOVE-PARTICIPANT] Calculated duration: {total_duration:.2f} minutes")
-                except Exception as e:
-                    logging.error(f"[REMOVE-PARTICIPANT] Error calculating duration: {e}")
-                
-                # Update participant record
-                cursor.execute("""
-                    UPDATE tbl_Participants 
-                    SET Leave_Times = %s,
-                        Is_Currently_Active = FALSE,
-                        Total_Duration_Minutes = %s,
-                        Total_Sessions = %s
-                    WHERE ID = %s
-                """, [json.dumps(leave_times), total_duration, len(leave_times), participant_id])
-                
-                rows_affected = cursor.rowcount
-                
-                if rows_affected == 0:
-                    logging.error(f"[REMOVE-PARTICIPANT] Update failed - no rows affected")
-                    return JsonResponse({
-                        'success': False,
-                        'error': 'Failed to update participant record'
-                    }, status=500)
+            with transaction.atomic(), connection.cursor() as cursor:
+                # Close the open session and add it to the running totals
+                session_result = close_participant_session(cursor, participant_id, epoch_now(), remove_time_str)
+                total_duration = session_result['total_duration_minutes']
                 
-                logging.info(f"✅ [REMOVE-PARTICIPANT] Updated participant record ({rows_affected} row(s))")
+                logging.info(f"✅ [REMOVE-PARTICIPANT] Closed {session_result['closed_sessions']} session(s), total duration: {total_duration:.2f} minutes")
         
         except Exception as e:
             logging.error(f"[REMOVE-PARTICIPANT] Database update error: {e}")
@@ -17,6 +17,7 @@ from .participants import (
     check_co_host_status,
     remove_participant_from_meeting,
 )
+from .livekit_webhooks import livekit_webhook
 
 urlpatterns = [
     # CRITICAL: Core participant endpoints that are missing
@@ -30,6 +31,7 @@ urlpatterns = [
     # Participant sync endpoints
     # path('api/participants/sync/<str:meeting_id>/', Sync_LiveKit_Participants, name='Sync_LiveKit_Participants'),
     path('api/participants/sync-optimized/<str:meeting_id>/', Sync_LiveKit_Participants_Fixed, name='Sync_LiveKit_Participants_Fixed'),
+    path('api/livekit/webhook/', livekit_webhook, name='livekit_webhook'),
     
     # Basic participant management
     path('api/participants/list/<str:meeting_id>/', list_participants_basic, name='list_participants_basic'),
@@ -72,3 +72,9 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Heavy models load lazily on first use; inference workers can opt into
+        # loading them at boot with WARM_MODELS (see core/utils/lazy_imports.py)
+        from core.utils.lazy_imports import warm_up_from_env
+        warm_up_from_env()
@@ -0,0 +1,264 @@
+"""
+Audio Mixer - Compact per-track audio buffers with streaming mixdown
+====================================================================
+
+The recorder used to turn every LiveKit audio frame into a Python list,
+extend per-participant list buffers, keep every flushed chunk for the whole
+meeting and convert it all to float64 at stop (~28 bytes per sample, held
+until the end).
+
+Now each track writes int16 frames into a TrackRingBuffer:
+- a preallocated (RING_SECONDS x SAMPLE_RATE, CHANNELS) int16 array,
+  addressed by absolute sample-frame index modulo its size
+- a block index of (start_frame, end_frame) runs says which frames hold
+  audio; everything else reads as silence
+- writes continue where the previous one ended while the capture timestamp
+  stays within DRIFT_TOLERANCE_SECONDS, and jump to the timestamp otherwise
+  (mute/unmute, reconnects), so gaps no longer shift later speech earlier
+
+AudioMixer runs MIX_LATENCY_SECONDS behind the recording clock and mixes
+BLOCK_SECONDS at a time, vectorized across tracks:
+- overlapping speakers are divided by sqrt(count), as before
+- gain follows a peak envelope (boost quiet, tame loud, linear ramp across
+  each block) instead of one gain for the whole file, then a soft knee
+  above KNEE and clipping to int16
+- mixed blocks are appended to a WAV file on disk; consumed ring space is
+  reused
+
+Memory is RING_SECONDS per track regardless of meeting length.
+"""
+
+import logging
+import os
+import threading
+import wave
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger("recording_audio_mixer")
+
+
+class AudioMixConfig:
+    """Audio mix configuration"""
+    SAMPLE_RATE = 48000
+    CHANNELS = 2
+    RING_SECONDS = float(os.getenv("RECORDING_AUDIO_RING_SECONDS", 10.0))
+    MIX_LATENCY_SECONDS = float(os.getenv("RECORDING_AUDIO_MIX_LATENCY", 1.0))
+    BLOCK_SECONDS = 0.5
+    DRIFT_TOLERANCE_SECONDS = 0.2
+
+    # AGC: same targets as the old whole-file pass
+    TARGET_AMPLITUDE = 18000.0
+    BOOST_BELOW = 8000.0
+    COMPRESS_ABOVE = 20000.0
+    MAX_GAIN = 4.0
+    GAIN_SMOOTHING = 0.2
+    ENVELOPE_DECAY = 0.9        # per block
+    KNEE = 20000.0
+    KNEE_RATIO = 0.7
+
+
+class TrackRingBuffer:
+    """Fixed-size int16 ring for one audio track"""
+
+    def __init__(self, capacity_frames: int, channels: int):
+        self.capacity = capacity_frames
+        self.data = np.zeros((capacity_frames, channels), dtype=np.int16)
+        self.blocks = deque()       # (start_frame, end_frame), sorted, non-overlapping
+        self.next_frame: Optional[int] = None
+        self.late_frames = 0
+        self.overrun_frames = 0
+
+    def write(self, start: int, frames: np.ndarray, floor: int):
+        """Store frames at absolute index start; nothing before floor (already mixed) is kept"""
+        if self.blocks:
+            start = max(start, self.blocks[-1][1])
+        if start < floor:
+            skip = min(floor - start, len(frames))
+            self.late_frames += skip
+            frames = frames[skip:]
+            start += skip
+        room = floor + self.capacity - start
+        if len(frames) > room:
+            self.overrun_frames += len(frames) - max(room, 0)
+            frames = frames[:max(room, 0)]
+        n = len(frames)
+        if n == 0:
+            return
+
+        idx = start % self.capacity
+        first = min(n, self.capacity - idx)
+        self.data[idx:idx + first] = frames[:first]
+        if first < n:
+            self.data[:n - first] = frames[first:]
+
+        end = start + n
+        if self.blocks and self.blocks[-1][1] == start:
+            self.blocks[-1] = (self.blocks[-1][0], end)
+        else:
+            self.blocks.append((start, end))
+        self.next_frame = end
+
+    def read_into(self, a: int, b: int, acc: np.ndarray, count: np.ndarray):
+        """Add frames [a, b) to acc and bump count where this track has audio; release them"""
+        for start, end in self.blocks:
+            if start >= b:
+                break
+            lo, hi = max(start, a), min(end, b)
+            if lo >= hi:
+                continue
+            idx = lo % self.capacity
+            first = min(hi - lo, self.capacity - idx)
+            acc[lo - a:lo - a + first] += self.data[idx:idx + first]
+            if first < hi - lo:
+                acc[lo - a + first:hi - a] += self.data[:hi - lo - first]
+            count[lo - a:hi - a] += 1
+
+        while self.blocks and self.blocks[0][1] <= b:
+            self.blocks.popleft()
+        if self.blocks and self.blocks[0][0] < b:
+            self.blocks[0] = (b, self.blocks[0][1])
+
+
+class AudioMixer:
+    """Mixes all recorder audio tracks into one WAV file while recording"""
+
+    def __init__(self, output_path: str, clock: Callable[[], float], config=AudioMixConfig):
+        """clock() returns seconds since recording start, same base as add_samples timestamps"""
+        self.output_path = output_path
+        self.clock = clock
+        self.config = config
+        self.rate = config.SAMPLE_RATE
+        self.channels = config.CHANNELS
+        self.block_frames = int(config.BLOCK_SECONDS * self.rate)
+        self.ring_frames = int(config.RING_SECONDS * self.rate)
+        self.drift_frames = int(config.DRIFT_TOLERANCE_SECONDS * self.rate)
+
+        self.tracks: Dict[str, TrackRingBuffer] = {}
+        self.mixed_until = 0            # absolute frame index written to the WAV
+        self.last_timestamp = 0.0       # end of the newest audio, seconds
+        self.gain = 1.0
+        self.envelope = 0.0
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._wav = None
+        self.stats = {
+            'blocks_mixed': 0,
+            'max_speakers': 0,
+            'peak': 0.0,
+            'knee_samples': 0,
+        }
+
+    @property
+    def has_audio(self) -> bool:
+        return bool(self.tracks)
+
+    def start(self):
+        self._wav = wave.open(self.output_path, 'wb')
+        self._wav.setnchannels(self.channels)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(self.rate)
+        self._thread = threading.Thread(target=self._run, name="AudioMixer", daemon=True)
+        self._thread.start()
+
+    def add_samples(self, track_key: str, samples: np.ndarray, timestamp: float):
+        """samples: interleaved int16, timestamp: seconds since recording start"""
+        usable = len(samples) - len(samples) % self.channels
+        if usable <= 0:
+            return
+        frames = samples[:usable].reshape(-1, self.channels)
+        ts_frame = int(round(timestamp * self.rate))
+
+        with self._lock:
+            track = self.tracks.get(track_key)
+            if track is None:
+                track = self.tracks[track_key] = TrackRingBuffer(self.ring_frames, self.channels)
+            start = ts_frame
+            if track.next_frame is not None and abs(ts_frame - track.next_frame) <= self.drift_frames:
+                start = track.next_frame
+            track.write(start, frames, self.mixed_until)
+            if track.next_frame is not None:
+                self.last_timestamp = max(self.last_timestamp, track.next_frame / self.rate)
+
+    # ========================================================================
+    # MIXDOWN
+    # ========================================================================
+
+    def _target_gain(self) -> float:
+        envelope = self.envelope
+        if envelope <= 0:
+            return self.gain
+        if envelope < self.config.BOOST_BELOW or envelope > self.config.COMPRESS_ABOVE:
+            return min(self.config.MAX_GAIN, self.config.TARGET_AMPLITUDE / envelope)
+        return 1.0
+
+    def _mix_block(self, a: int, b: int):
+        n = b - a
+        acc = np.zeros((n, self.channels), dtype=np.float32)
+        count = np.zeros(n, dtype=np.int16)
+        with self._lock:
+            for track in self.tracks.values():
+                track.read_into(a, b, acc, count)
+            self.mixed_until = b
+
+        overlap = count > 1
+        if overlap.any():
+            acc[overlap] /= np.sqrt(count[overlap]).astype(np.float32)[:, None]
+            self.stats['max_speakers'] = max(self.stats['max_speakers'], int(count.max()))
+
+        peak = float(np.abs(acc).max()) if n else 0.0
+        self.stats['peak'] = max(self.stats['peak'], peak)
+        self.envelope = max(peak, self.envelope * self.config.ENVELOPE_DECAY)
+
+        previous_gain = self.gain
+        self.gain += (self._target_gain() - self.gain) * self.config.GAIN_SMOOTHING
+        if previous_gain != 1.0 or self.gain != 1.0:
+            acc *= np.linspace(previous_gain, self.gain, n, dtype=np.float32)[:, None]
+
+        magnitude = np.abs(acc)
+        above = magnitude > self.config.KNEE
+        if above.any():
+            self.stats['knee_samples'] += int(above.sum())
+            acc[above] = np.sign(acc[above]) * (
+                self.config.KNEE + (magnitude[above] - self.config.KNEE) * self.config.KNEE_RATIO
+            )
+
+        self._wav.writeframes(np.clip(acc, -32768, 32767).astype(np.int16).tobytes())
+        self.stats['blocks_mixed'] += 1
+
+    def _mix_until(self, end_frame: int):
+        while self.mixed_until < end_frame:
+            self._mix_block(self.mixed_until, min(end_frame, self.mixed_until + self.block_frames))
+
+    def _run(self):
+        latency = self.config.MIX_LATENCY_SECONDS
+        while not self._stop.wait(self.config.BLOCK_SECONDS):
+            try:
+                end = int((self.clock() - latency) * self.rate)
+                self._mix_until(end - end % self.block_frames)
+            except Exception as e:
+                logger.error(f"❌ Audio mix failed at {self.mixed_until / self.rate:.1f}s: {e}")
+
+    def finish(self, duration: float) -> float:
+        """Mix everything up to max(duration, last audio), close the WAV, return its length in seconds"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+        end = int(max(duration, self.last_timestamp) * self.rate)
+        self._mix_until(end)
+        self._wav.close()
+
+        late = sum(t.late_frames for t in self.tracks.values())
+        overrun = sum(t.overrun_frames for t in self.tracks.values())
+        seconds = self.mixed_until / self.rate
+        logger.info(
+            f"🎵 Audio mixed: {seconds:.1f}s from {len(self.tracks)} tracks | "
+            f"max speakers {self.stats['max_speakers']}, peak {self.stats['peak']:.0f}, "
+            f"knee samples {self.stats['knee_samples']}, late {late / self.rate:.2f}s, "
+            f"overrun {overrun / self.rate:.2f}s"
+        )
+        return seconds
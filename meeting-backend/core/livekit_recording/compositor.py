@@ -0,0 +1,427 @@
+"""
+Video Compositor - Multi-participant recording layouts
+======================================================
+
+Without it every video track feeds one frame stream and each output frame
+shows whichever participant's frame landed in that slot. VideoCompositor
+gives each track its own tile instead:
+
+- layouts: "grid" (up to MAX_TILES, ceil(sqrt(n)) columns), "speaker"
+  (active speaker large, filmstrip below) and "screen_filmstrip" (newest
+  screen share large, cameras in a column on the right). LAYOUT=auto picks
+  screen_filmstrip while anyone shares, speaker when an active speaker is
+  known and there are 3+ cameras, grid otherwise
+- track state is explicit (TrackState: waiting -> live <-> stale) and so
+  is tile geometry (Tile); the layout is recomputed only when tracks, the
+  speaker or a screen share change, not per frame
+- per-track decode + scale runs on a small worker pool (cv2 releases the
+  GIL). Each track has a latest-wins mailbox, so a slow track drops frames
+  instead of queueing them; tracks without a visible tile are not decoded
+  at all. Each source frame is decoded once and downscaled once, straight
+  to its tile size, with the name label drawn into the tile at that point
+- compose() only copies a prebuilt background and pastes ready tiles
+  (centred, so letterbox bars are just background): its cost is bounded by
+  two canvas copies no matter how many tracks are connected
+
+CPU only. compose() is the frame_source of LiveVideoEncoder, which calls it
+once per output slot.
+
+Opt-in with RECORDING_COMPOSITE=True (and live encoding on); without it
+recordings keep the single shared frame stream.
+"""
+
+import logging
+import math
+import os
+import queue
+import threading
+from typing import Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger("recording_compositor")
+
+
+class CompositorConfig:
+    """Compositor configuration"""
+    # Off by default: tiling costs a decode + scale per visible track on the
+    # recording host, so enable it per deployment once that CPU is provisioned
+    ENABLED = os.getenv("RECORDING_COMPOSITE", "False") == "True"
+    LAYOUT = os.getenv("RECORDING_LAYOUT", "auto")    # auto | grid | speaker | screen_filmstrip
+    WIDTH = 1280
+    HEIGHT = 720
+    MAX_TILES = int(os.getenv("RECORDING_MAX_TILES", 9))
+    FILMSTRIP_TILES = int(os.getenv("RECORDING_FILMSTRIP_TILES", 5))
+    WORKERS = int(os.getenv("RECORDING_SCALE_WORKERS", 2))
+    STALE_SECONDS = 2.0          # no frame for this long -> show the name card
+    SPEAKER_HOLD_SECONDS = 2.0   # minimum time between speaker-driven layout switches
+    MARGIN = 4
+    BACKGROUND = (32, 32, 32)
+    CARD_COLOR = (60, 60, 60)
+
+
+LAYOUTS = ("grid", "speaker", "screen_filmstrip")
+
+
+class Tile:
+    """Tile geometry on the output canvas"""
+    __slots__ = ('x', 'y', 'w', 'h')
+
+    def __init__(self, x: int, y: int, w: int, h: int):
+        self.x, self.y, self.w, self.h = x, y, w, h
+
+    def __eq__(self, other):
+        return isinstance(other, Tile) and (self.x, self.y, self.w, self.h) == (other.x, other.y, other.w, other.h)
+
+    def __repr__(self):
+        return f"Tile({self.x}, {self.y}, {self.w}x{self.h})"
+
+
+class TrackState:
+    """One video track as the compositor sees it"""
+    __slots__ = ('track_id', 'participant', 'source', 'order', 'state', 'tile',
+                 'image', 'card', 'last_frame_time', 'pending', 'queued',
+                 'frames_in', 'frames_scaled', 'frames_dropped')
+
+    WAITING, LIVE, STALE = 'waiting', 'live', 'stale'
+
+    def __init__(self, track_id: str, participant: str, source: str, order: int):
+        self.track_id = track_id
+        self.participant = participant
+        self.source = source                 # "video" | "screen_share"
+        self.order = order
+        self.state = self.WAITING
+        self.tile: Optional[Tile] = None     # None: not visible in the current layout
+        self.image: Optional[np.ndarray] = None   # scaled to fit inside tile, label drawn
+        self.card: Optional[np.ndarray] = None    # name card for tile, built once per geometry
+        self.last_frame_time = None
+        self.pending = None                  # (raw, timestamp, decode_fn), latest wins
+        self.queued = False
+        self.frames_in = 0
+        self.frames_scaled = 0
+        self.frames_dropped = 0
+
+
+# ============================================================================
+# LAYOUTS
+# ============================================================================
+
+def _grid_tiles(count: int, x: int, y: int, w: int, h: int, margin: int) -> List[Tile]:
+    if count <= 0:
+        return []
+    cols = math.ceil(math.sqrt(count))
+    rows = math.ceil(count / cols)
+    tile_w, tile_h = w // cols, h // rows
+    tiles = []
+    for i in range(count):
+        row, col = divmod(i, cols)
+        # Centre a short last row
+        row_count = min(cols, count - row * cols)
+        offset = (w - row_count * tile_w) // 2
+        tiles.append(Tile(x + offset + col * tile_w + margin, y + row * tile_h + margin,
+                          tile_w - 2 * margin, tile_h - 2 * margin))
+    return tiles
+
+
+def compute_layout(layout: str, cameras: List[TrackState], screen: Optional[TrackState],
+                   speaker: Optional[str], config=CompositorConfig) -> Dict[str, Tile]:
+    """Map track_id -> Tile for the visible tracks; cameras are in join order"""
+    W, H, m = config.WIDTH, config.HEIGHT, config.MARGIN
+
+    if speaker is not None:
+        # Active speaker first so they stay visible when tiles run out
+        cameras = sorted(cameras, key=lambda s: s.participant != speaker)
+
+    if layout == "screen_filmstrip" and screen is not None:
+        strip_w = W // 5
+        tiles = {screen.track_id: Tile(m, m, W - strip_w - 2 * m, H - 2 * m)}
+        visible = cameras[:config.FILMSTRIP_TILES]
+        tile_h = H // max(1, config.FILMSTRIP_TILES)
+        for i, state in enumerate(visible):
+            tiles[state.track_id] = Tile(W - strip_w + m, i * tile_h + m, strip_w - 2 * m, tile_h - 2 * m)
+        return tiles
+
+    if layout == "speaker" and cameras:
+        main, others = cameras[0], cameras[1:config.FILMSTRIP_TILES + 1]
+        strip_h = H // 5 if others else 0
+        tiles = {main.track_id: Tile(m, m, W - 2 * m, H - strip_h - 2 * m)}
+        if others:
+            tile_w = W // config.FILMSTRIP_TILES
+            offset = (W - len(others) * tile_w) // 2
+            for i, state in enumerate(others):
+                tiles[state.track_id] = Tile(offset + i * tile_w + m, H - strip_h + m,
+                                             tile_w - 2 * m, strip_h - 2 * m)
+        return tiles
+
+    sources = ([screen] if screen is not None else []) + cameras
+    visible = sources[:config.MAX_TILES]
+    return {state.track_id: tile for state, tile in zip(visible, _grid_tiles(len(visible), 0, 0, W, H, m))}
+
+
+def fit_to_tile(frame: np.ndarray, tile: Tile) -> np.ndarray:
+    """Scale frame to fit inside tile keeping its aspect ratio, with one resize"""
+    h, w = frame.shape[:2]
+    scale = min(tile.w / w, tile.h / h)
+    new_w, new_h = max(1, int(w * scale)), max(1, int(h * scale))
+    if (new_w, new_h) == (w, h):
+        return frame.copy()
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    return cv2.resize(frame, (new_w, new_h), interpolation=interpolation)
+
+
+def _draw_label(image: np.ndarray, text: str):
+    if image.shape[0] < 60 or not text:
+        return
+    scale = 0.5 if image.shape[0] < 240 else 0.7
+    (tw, th), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, 1)
+    y = image.shape[0] - 8
+    cv2.rectangle(image, (4, y - th - 6), (12 + tw, y + 4), (0, 0, 0), -1)
+    cv2.putText(image, text, (8, y), cv2.FONT_HERSHEY_SIMPLEX, scale, (255, 255, 255), 1)
+
+
+def _name_card(state: TrackState, tile: Tile, config=CompositorConfig) -> np.ndarray:
+    card = np.empty((tile.h, tile.w, 3), dtype=np.uint8)
+    card[:] = config.CARD_COLOR     # once per tile geometry
+    text = state.participant[:24]
+    scale = 0.6 if tile.h < 240 else 1.0
+    (tw, th), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, 2)
+    cv2.putText(card, text, (max(4, (tile.w - tw) // 2), (tile.h + th) // 2),
+                cv2.FONT_HERSHEY_SIMPLEX, scale, (220, 220, 220), 2)
+    return card
+
+
+# ============================================================================
+# COMPOSITOR
+# ============================================================================
+
+class VideoCompositor:
+    """Per-track tiles, scaled off the hot path, composited per output slot"""
+
+    def __init__(self, clock: Callable[[], float], config=CompositorConfig):
+        """clock() returns seconds since recording start"""
+        self.clock = clock
+        self.config = config
+        self.layout_mode = config.LAYOUT if config.LAYOUT in LAYOUTS + ("auto",) else "auto"
+        self.layout = "grid"
+
+        self.tracks: Dict[str, TrackState] = {}
+        self.active_speaker: Optional[str] = None
+        self._speaker_changed_at = float('-inf')
+        self._order = 0
+        self._dirty = True
+
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._workers: List[threading.Thread] = []
+
+        self.canvas = np.empty((config.HEIGHT, config.WIDTH, 3), dtype=np.uint8)
+        # Filling from a tuple broadcasts per pixel; copying a prebuilt frame is ~40x faster
+        self._background = np.empty_like(self.canvas)
+        self._background[:] = config.BACKGROUND
+        self.stats = {
+            'composites': 0,
+            'layout_changes': 0,
+            'compose_ms_total': 0.0,
+            'compose_ms_max': 0.0,
+            'scale_ms_total': 0.0,
+        }
+
+    # ========================================================================
+    # LIFECYCLE
+    # ========================================================================
+
+    def start(self):
+        for i in range(max(1, self.config.WORKERS)):
+            worker = threading.Thread(target=self._worker, name=f"CompositorScale-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        logger.info(f"🎛️ Compositor started ({self.layout_mode} layout, {len(self._workers)} scale workers)")
+
+    def stop(self):
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5)
+        self._workers = []
+        stats = self.get_stats()
+        logger.info(
+            f"🎛️ Compositor stopped: {stats['composites']} frames, avg compose {stats['avg_compose_ms']} ms, "
+            f"max {stats['compose_ms_max']:.1f} ms, {stats['layout_changes']} layout changes"
+        )
+
+    # ========================================================================
+    # TRACKS
+    # ========================================================================
+
+    def add_track(self, track_id: str, participant: str, source: str = "video"):
+        with self._lock:
+            if track_id in self.tracks:
+                return
+            self.tracks[track_id] = TrackState(track_id, participant, source, self._order)
+            self._order += 1
+            self._dirty = True
+        logger.info(f"🎛️ Compositor track added: {participant} ({source})")
+
+    def remove_track(self, track_id: str):
+        with self._lock:
+            if self.tracks.pop(track_id, None) is not None:
+                self._dirty = True
+
+    def set_active_speaker(self, participant: Optional[str]):
+        with self._lock:
+            if participant == self.active_speaker:
+                return
+            now = self.clock()
+            if now - self._speaker_changed_at < self.config.SPEAKER_HOLD_SECONDS:
+                return
+            self.active_speaker = participant
+            self._speaker_changed_at = now
+            self._dirty = True
+
+    def submit(self, track_id: str, raw, decode_fn: Optional[Callable] = None):
+        """Hand a raw frame to the scale workers; replaces any frame still waiting"""
+        with self._lock:
+            state = self.tracks.get(track_id)
+            if state is None:
+                return
+            state.frames_in += 1
+            if state.tile is None:
+                return
+            if state.pending is not None:
+                state.frames_dropped += 1
+            state.pending = (raw, self.clock(), decode_fn)
+            if state.queued:
+                return
+            state.queued = True
+        self._queue.put(track_id)
+
+    # ========================================================================
+    # SCALE WORKERS
+    # ========================================================================
+
+    def _worker(self):
+        while True:
+            track_id = self._queue.get()
+            if track_id is None:
+                return
+            with self._lock:
+                state = self.tracks.get(track_id)
+                if state is None:
+                    continue
+                item, state.pending, state.queued = state.pending, None, False
+                tile = state.tile
+            if item is None or tile is None:
+                continue
+
+            raw, timestamp, decode_fn = item
+            try:
+                started = self.clock()
+                frame = decode_fn(raw) if decode_fn is not None else raw
+                if frame is None:
+                    continue
+                image = fit_to_tile(frame, tile)
+                _draw_label(image, state.participant if state.source == "video" else f"{state.participant} (screen)")
+                elapsed_ms = (self.clock() - started) * 1000
+            except Exception as e:
+                logger.debug(f"Compositor scale failed for {track_id}: {e}")
+                continue
+
+            with self._lock:
+                self.stats['scale_ms_total'] += elapsed_ms
+                if self.tracks.get(track_id) is state and state.tile == tile:
+                    state.image = image
+                    state.last_frame_time = timestamp
+                    state.state = TrackState.LIVE
+                    state.frames_scaled += 1
+
+    # ========================================================================
+    # LAYOUT + COMPOSE
+    # ========================================================================
+
+    def _choose_layout(self, cameras: List[TrackState], screen: Optional[TrackState]) -> str:
+        if self.layout_mode != "auto":
+            return self.layout_mode
+        if screen is not None:
+            return "screen_filmstrip"
+        if self.active_speaker is not None and len(cameras) >= 3:
+            return "speaker"
+        return "grid"
+
+    def _apply_layout(self):
+        ordered = sorted(self.tracks.values(), key=lambda s: s.order)
+        cameras = [s for s in ordered if s.source != "screen_share"]
+        screens = [s for s in ordered if s.source == "screen_share"]
+        screen = screens[-1] if screens else None
+
+        layout = self._choose_layout(cameras, screen)
+        tiles = compute_layout(layout, cameras, screen, self.active_speaker, self.config)
+        if layout != self.layout:
+            self.stats['layout_changes'] += 1
+            logger.info(f"🎛️ Layout -> {layout} ({len(tiles)} tiles)")
+        self.layout = layout
+
+        for state in ordered:
+            tile = tiles.get(state.track_id)
+            if tile == state.tile:
+                continue
+            state.tile = tile
+            state.card = None
+            if tile is None:
+                state.image = None
+            elif state.image is not None:
+                # Reuse the last scaled frame until the next one arrives at the new size
+                state.image = fit_to_tile(state.image, tile)
+        self._dirty = False
+
+    def compose(self) -> np.ndarray:
+        """
+        Current composite. Returns the shared canvas, which is overwritten by
+        the next call: copy it if it has to outlive that.
+        """
+        started = now = self.clock()
+        canvas = self.canvas
+        with self._lock:
+            if self._dirty:
+                self._apply_layout()
+            np.copyto(canvas, self._background)
+            for state in self.tracks.values():
+                tile = state.tile
+                if tile is None:
+                    continue
+                if state.state == TrackState.LIVE and now - state.last_frame_time > self.config.STALE_SECONDS:
+                    state.state = TrackState.STALE
+                image = state.image if state.state == TrackState.LIVE else None
+                if image is None:
+                    if state.card is None:
+                        state.card = _name_card(state, tile, self.config)
+                    image = state.card
+                h, w = image.shape[:2]
+                y, x = tile.y + (tile.h - h) // 2, tile.x + (tile.w - w) // 2
+                canvas[y:y + h, x:x + w] = image
+
+        elapsed_ms = (self.clock() - started) * 1000
+        self.stats['composites'] += 1
+        self.stats['compose_ms_total'] += elapsed_ms
+        self.stats['compose_ms_max'] = max(self.stats['compose_ms_max'], elapsed_ms)
+        return canvas
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        composites = max(1, stats['composites'])
+        stats['avg_compose_ms'] = round(stats['compose_ms_total'] / composites, 3)
+        stats['layout'] = self.layout
+        with self._lock:
+            stats['tracks'] = {
+                s.track_id: {
+                    'participant': s.participant,
+                    'source': s.source,
+                    'state': s.state,
+                    'tile': repr(s.tile) if s.tile else None,
+                    'frames_in': s.frames_in,
+                    'frames_scaled': s.frames_scaled,
+                    'frames_dropped': s.frames_dropped,
+                }
+                for s in self.tracks.values()
+            }
+        return stats
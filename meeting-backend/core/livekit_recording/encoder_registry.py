@@ -0,0 +1,278 @@
+"""
+Encoder Registry - What this host's ffmpeg can encode with, probed once
+=======================================================================
+
+process_video_sync, the post-stop recording encode and the finalize
+fallback each ran `ffmpeg -h encoder=h264_nvenc` (or `ffmpeg -encoders`)
+on every job. That costs a subprocess per job and still says nothing about
+whether a GPU is actually there: the encoder is compiled in on CPU-only
+hosts too, so the job's ffmpeg failed later.
+
+EncoderRegistry probes once per process and caches the result for
+TTL_SECONDS:
+- encoders and hwaccels compiled into ffmpeg (`-encoders`, `-hwaccels`)
+- nvenc: h264_nvenc is listed AND a tiny test encode succeeds
+- libx264 preset speed: a few seconds of 720p testsrc per preset, measured
+  on a background thread so no job waits for it
+
+choose_x264_preset() turns the measurements into a per-job choice: the
+slowest (best compression) preset, from BEST_PRESET down, that still
+encodes the job's resolution and frame rate at MIN_REALTIME_SPEED while
+sharing the CPU with the other encodes in flight (encoding() counts them).
+Until the benchmark is in, or on hosts without ffmpeg/libx264, it returns
+DEFAULT_PRESET.
+
+Inference and processing workers can probe at boot with WARM_MODELS=encoders.
+"""
+
+import logging
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("encoder_registry")
+
+
+class EncoderRegistryConfig:
+    """Encoder registry configuration"""
+    TTL_SECONDS = float(os.getenv("ENCODER_REGISTRY_TTL", 3600))
+    PROBE_TIMEOUT = 10
+    BENCHMARK_ENABLED = os.getenv("ENCODER_BENCHMARK", "True") == "True"
+    BENCHMARK_SECONDS = 2.0
+    BENCHMARK_SIZE = (1280, 720)
+    BENCHMARK_FPS = 24
+    # Best compression first; choose_x264_preset walks towards the fast end
+    X264_PRESETS = ('medium', 'fast', 'veryfast', 'ultrafast')
+    BEST_PRESET = os.getenv("ENCODER_BEST_PRESET", "medium")
+    DEFAULT_PRESET = os.getenv("ENCODER_DEFAULT_PRESET", "fast")
+    MIN_REALTIME_SPEED = float(os.getenv("ENCODER_MIN_REALTIME_SPEED", 2.0))
+
+
+def ffmpeg_gpu_env() -> Dict[str, str]:
+    """Environment the encode jobs run ffmpeg with (GPU 0 visible)"""
+    env = os.environ.copy()
+    env['CUDA_VISIBLE_DEVICES'] = '0'
+    env['CUDA_DEVICE_ORDER'] = 'PCI_BUS_ID'
+    env.pop('NVIDIA_DISABLE', None)
+    return env
+
+
+def _parse_encoders(output: str) -> List[str]:
+    """Names from `ffmpeg -encoders` (lines after the ' ------' separator)"""
+    names = []
+    started = False
+    for line in output.splitlines():
+        if line.strip().startswith('------'):
+            started = True
+            continue
+        parts = line.split()
+        if started and len(parts) >= 2:
+            names.append(parts[1])
+    return names
+
+
+def _parse_hwaccels(output: str) -> List[str]:
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    if lines and lines[0].lower().startswith('hardware acceleration methods'):
+        lines = lines[1:]
+    return lines
+
+
+class EncoderCapabilities:
+    """One probe of the local ffmpeg"""
+
+    def __init__(self, encoders: List[str], hwaccels: List[str], nvenc: bool):
+        self.encoders = encoders
+        self.hwaccels = hwaccels
+        self.nvenc = nvenc
+        self.probed_at = time.time()
+        self.x264_fps: Dict[str, float] = {}     # preset -> frames/s at BENCHMARK_SIZE
+
+    @property
+    def x264(self) -> bool:
+        return 'libx264' in self.encoders
+
+    def to_dict(self) -> Dict:
+        return {
+            "nvenc": self.nvenc,
+            "libx264": self.x264,
+            "h264_encoders": [name for name in self.encoders if '264' in name],
+            "hwaccels": self.hwaccels,
+            "x264_fps": dict(self.x264_fps),
+            "probed_at": self.probed_at,
+        }
+
+
+class EncoderRegistry:
+    """Process-wide, TTL-cached encoder capabilities and preset choice"""
+
+    def __init__(self, config=EncoderRegistryConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self._probe_done = threading.Condition(self._lock)
+        self._probing = False
+        self._capabilities: Optional[EncoderCapabilities] = None
+        self._benchmark_thread: Optional[threading.Thread] = None
+        self._active_jobs = 0
+
+    # ---------- probing ----------
+
+    def _run(self, cmd: List[str], timeout: Optional[float] = None, env=None) -> Optional[subprocess.CompletedProcess]:
+        try:
+            return subprocess.run(
+                cmd, capture_output=True, text=True,
+                timeout=timeout or self.config.PROBE_TIMEOUT, env=env
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ {' '.join(cmd[:3])} failed: {e}")
+            return None
+
+    def _probe(self) -> EncoderCapabilities:
+        result = self._run(['ffmpeg', '-hide_banner', '-encoders'])
+        encoders = _parse_encoders(result.stdout) if result is not None and result.returncode == 0 else []
+        result = self._run(['ffmpeg', '-hide_banner', '-hwaccels'])
+        hwaccels = _parse_hwaccels(result.stdout) if result is not None and result.returncode == 0 else []
+
+        nvenc = False
+        if 'h264_nvenc' in encoders:
+            # Listed on every build with NVENC compiled in; only an encode shows a usable GPU
+            result = self._run([
+                'ffmpeg', '-hide_banner', '-loglevel', 'error',
+                '-f', 'lavfi', '-i', 'color=c=black:s=256x256:r=24:d=0.2',
+                '-c:v', 'h264_nvenc', '-f', 'null', '-'
+            ], env=ffmpeg_gpu_env())
+            nvenc = result is not None and result.returncode == 0
+
+        capabilities = EncoderCapabilities(encoders, hwaccels, nvenc)
+        if not encoders:
+            logger.warning("⚠️ ffmpeg encoders unavailable - encode jobs will fail")
+        else:
+            logger.info(
+                f"🎛️ Encoders probed: nvenc={nvenc}, libx264={capabilities.x264}, "
+                f"hwaccels={','.join(hwaccels) or 'none'}"
+            )
+        return capabilities
+
+    def _benchmark(self, capabilities: EncoderCapabilities):
+        width, height = self.config.BENCHMARK_SIZE
+        fps = self.config.BENCHMARK_FPS
+        frames = int(self.config.BENCHMARK_SECONDS * fps)
+        for preset in self.config.X264_PRESETS:
+            started = time.perf_counter()
+            result = self._run([
+                'ffmpeg', '-hide_banner', '-loglevel', 'error',
+                '-f', 'lavfi', '-i', f'testsrc2=size={width}x{height}:rate={fps}',
+                '-frames:v', str(frames),
+                '-c:v', 'libx264', '-preset', preset, '-pix_fmt', 'yuv420p',
+                '-f', 'null', '-'
+            ], timeout=60)
+            if result is None or result.returncode != 0:
+                logger.warning(f"⚠️ libx264 {preset} benchmark failed")
+                continue
+            capabilities.x264_fps[preset] = round(frames / (time.perf_counter() - started), 1)
+        logger.info(f"⏱️ libx264 presets at {width}x{height}: {capabilities.x264_fps} fps")
+
+    def capabilities(self, wait_for_benchmark: bool = False) -> EncoderCapabilities:
+        """
+        Cached capabilities, re-probed once TTL_SECONDS old. Never raises.
+        The probe runs outside the lock in one thread at a time: while it
+        re-probes, other callers get the stale result, and only the very
+        first probe makes them wait.
+        """
+        probe_here = False
+        with self._lock:
+            while True:
+                current = self._capabilities
+                if current is not None and time.time() - current.probed_at <= self.config.TTL_SECONDS:
+                    break
+                if not self._probing:
+                    self._probing = probe_here = True
+                    break
+                if current is not None:
+                    break
+                self._probe_done.wait()
+            thread = self._benchmark_thread
+
+        if probe_here:
+            probed = None
+            try:
+                probed = self._probe()
+            finally:
+                with self._lock:
+                    if probed is not None:
+                        current = self._capabilities = probed
+                        if self.config.BENCHMARK_ENABLED and probed.x264:
+                            self._benchmark_thread = threading.Thread(
+                                target=self._benchmark, args=(probed,), name="x264-benchmark", daemon=True
+                            )
+                            self._benchmark_thread.start()
+                    thread = self._benchmark_thread
+                    self._probing = False
+                    self._probe_done.notify_all()
+
+        if wait_for_benchmark and thread is not None:
+            thread.join()
+        return current
+
+    # ---------- per-job choice ----------
+
+    @contextmanager
+    def encoding(self):
+        """Wrap an encode so concurrent jobs see it when choosing a preset"""
+        with self._lock:
+            self._active_jobs += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active_jobs -= 1
+
+    @property
+    def active_jobs(self) -> int:
+        return self._active_jobs
+
+    def choose_x264_preset(self, width: int = 1280, height: int = 720, fps: float = 24.0,
+                           queue_depth: Optional[int] = None) -> str:
+        """
+        Slowest preset that encodes width x height at fps at least
+        MIN_REALTIME_SPEED x real time, with the CPU shared by queue_depth
+        other encodes (default: those currently inside encoding()).
+        """
+        measured = self.capabilities().x264_fps
+        presets = list(self.config.X264_PRESETS)
+        if self.config.BEST_PRESET in presets:
+            presets = presets[presets.index(self.config.BEST_PRESET):]
+        candidates = [preset for preset in presets if preset in measured]
+        if not candidates:
+            return self.config.DEFAULT_PRESET
+
+        if queue_depth is None:
+            queue_depth = self.active_jobs
+        bench_width, bench_height = self.config.BENCHMARK_SIZE
+        pixel_ratio = max(1, width or bench_width) * max(1, height or bench_height) / (bench_width * bench_height)
+        needed_fps = max(fps or self.config.BENCHMARK_FPS, 1.0) * self.config.MIN_REALTIME_SPEED * pixel_ratio
+        for preset in candidates:
+            if measured[preset] / (queue_depth + 1) >= needed_fps:
+                return preset
+        return candidates[-1]
+
+
+_registry_instance = None
+_registry_lock = threading.Lock()
+
+
+def get_encoder_registry() -> EncoderRegistry:
+    global _registry_instance
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                _registry_instance = EncoderRegistry()
+    return _registry_instance
+
+
+def warm_encoder_registry():
+    """WARM_MODELS target: probe and benchmark before the first job"""
+    return get_encoder_registry().capabilities(wait_for_benchmark=True)
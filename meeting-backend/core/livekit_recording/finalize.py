@@ -0,0 +1,311 @@
+"""
+Finalize - One ffmpeg pass from recording to fragmented MP4 on S3
+=================================================================
+
+After capture the recorder used to:
+- poll the growing video temp file every 500ms and upload new bytes as
+  multipart parts (S3ChunkUploader), then upload the WAV separately
+- download both back from S3 in _create_final_video_simple_s3, mux them
+  into an MP4 (faststart, so the whole file is rewritten once more) and
+  upload that
+- download the MP4 again in _trigger_processing_pipeline, where
+  process_video_sync re-encoded it before publishing
+
+Now the recorder keeps the H.264 MPEG-TS and the mixed WAV on local disk
+and finalize_recording() runs a single ffmpeg:
+- video is stream-copied, audio is encoded to AAC
+- output is fragmented MP4 (moov up front, one fragment per keyframe), which
+  needs no seek-back, so ffmpeg can write it to stdout
+- S3PipeUploader reads stdout in PART_SIZE_MB parts and uploads them with
+  S3 multipart while ffmpeg keeps muxing; nothing polls a file
+- optionally the same bytes are teed to a local file, which the processing
+  pipeline uses instead of downloading the upload back
+
+meets_delivery_profile() tells process_video_sync when this output can be
+published as-is instead of transcoded. It only checks codecs and container,
+so process_video_sync applies it to recorder output only, never to uploads.
+
+The ffmpeg watchdog scales with the recording's length (finalize_timeout),
+so a long meeting is not killed into the raw-upload fallback.
+
+Supervised recordings (supervisor.py) that were restarted after a crash
+leave one segment_NNN.ts / .wav pair per run in their work directory.
+join_segments() feeds the videos to ffmpeg's concat demuxer (still a stream
+copy) and joins the audio, padding or trimming each WAV to its video's
+length so later segments stay in sync.
+"""
+
+import glob
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, List, Optional, Tuple
+
+logger = logging.getLogger("recording_finalize")
+
+
+class FinalizeConfig:
+    """Finalize configuration"""
+    PART_SIZE_MB = max(5, int(os.getenv("RECORDING_UPLOAD_PART_MB", 8)))   # S3 minimum for all but the last part
+    UPLOAD_WORKERS = int(os.getenv("RECORDING_UPLOAD_WORKERS", 2))
+    KEEP_LOCAL_COPY = os.getenv("RECORDING_KEEP_LOCAL_FINAL", "True") == "True"
+    AUDIO_BITRATE = "192k"
+    AUDIO_SAMPLE_RATE = 48000
+    TIMEOUT = 600                            # minimum, for short recordings
+    TIMEOUT_PER_RECORDED_SECOND = float(os.getenv("RECORDING_FINALIZE_TIMEOUT_FACTOR", 0.5))
+
+
+# What the player and process_video_sync expect from a published recording
+DELIVERY_VIDEO_CODECS = ("h264",)
+DELIVERY_PIX_FMTS = ("yuv420p",)
+DELIVERY_AUDIO_CODECS = ("aac",)
+DELIVERY_CONTAINERS = ("mp4", "mov")
+
+
+def meets_delivery_profile(probe: dict) -> bool:
+    """
+    probe: ffprobe -show_streams -show_format JSON. True if the recorder's
+    finalize output can be published without transcoding. Codec and container
+    only: bitrate, level and moov placement are what the recorder produces,
+    so callers must not use this for arbitrary uploads.
+    """
+    formats = probe.get('format', {}).get('format_name', '').split(',')
+    if not any(f in DELIVERY_CONTAINERS for f in formats):
+        return False
+
+    streams = probe.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'), None)
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+    return (
+        video is not None and audio is not None
+        and video.get('codec_name') in DELIVERY_VIDEO_CODECS
+        and video.get('pix_fmt') in DELIVERY_PIX_FMTS
+        and audio.get('codec_name') in DELIVERY_AUDIO_CODECS
+    )
+
+
+def segment_paths(work_dir: str, segment: int) -> Tuple[str, str]:
+    """(video, audio) paths of one recording segment"""
+    base = os.path.join(work_dir, f"segment_{segment:03d}")
+    return base + '.ts', base + '.wav'
+
+
+def list_segments(work_dir: str) -> List[Tuple[str, Optional[str]]]:
+    """Recorded (video, audio or None) segments in work_dir, in order"""
+    segments = []
+    for video_path in sorted(glob.glob(os.path.join(work_dir, 'segment_*.ts'))):
+        if os.path.getsize(video_path) == 0:
+            continue
+        audio_path = video_path[:-3] + '.wav'
+        segments.append((video_path, audio_path if os.path.exists(audio_path) else None))
+    return segments
+
+
+def probe_duration(path: str) -> float:
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+         '-of', 'default=noprint_wrappers=1:nokey=1', path],
+        capture_output=True, text=True, timeout=60
+    )
+    return float(result.stdout.strip() or 0)
+
+
+def join_segments(segments: List[Tuple[str, Optional[str]]], work_dir: str,
+                  config=FinalizeConfig) -> Tuple[str, str, str]:
+    """
+    Concat list for the videos plus one WAV covering all segments.
+    Returns (video_input, video_format, audio_path) for finalize_recording.
+    """
+    list_path = os.path.join(work_dir, 'segments.txt')
+    with open(list_path, 'w') as f:
+        for video_path, _ in segments:
+            f.write(f"file '{video_path}'\n")
+
+    audio_path = os.path.join(work_dir, 'joined.wav')
+    rate, channels = config.AUDIO_SAMPLE_RATE, 2
+    with wave.open(audio_path, 'wb') as out:
+        out.setnchannels(channels)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        for index, (video_path, segment_audio) in enumerate(segments):
+            last = index == len(segments) - 1
+            wanted = None if last else int(probe_duration(video_path) * rate)
+            written = 0
+            if segment_audio:
+                try:
+                    # The mixer patches the WAV header after every block, so a crashed segment reads fine
+                    with wave.open(segment_audio, 'rb') as src:
+                        if src.getframerate() == rate and src.getnchannels() == channels:
+                            frames = src.readframes(src.getnframes() if wanted is None else wanted)
+                            out.writeframes(frames)
+                            written = len(frames) // (2 * channels)
+                except (wave.Error, EOFError) as e:
+                    logger.warning(f"⚠️ Unreadable segment audio {segment_audio}, using silence: {e}")
+            if wanted is not None and written < wanted:
+                out.writeframes(b'\x00' * (wanted - written) * 2 * channels)
+
+    logger.info(f"🧩 Joined {len(segments)} recording segments")
+    return list_path, 'concat', audio_path
+
+
+def build_finalize_command(video_path: str, audio_path: Optional[str], config=FinalizeConfig,
+                           video_format: Optional[str] = None) -> list:
+    """ffmpeg command muxing H.264 video and WAV audio into fragmented MP4 on stdout"""
+    cmd = ['ffmpeg', '-y', '-nostats', '-loglevel', 'error']
+    if video_format == 'concat':
+        cmd += ['-f', 'concat', '-safe', '0']
+    cmd += ['-i', video_path]
+    if audio_path:
+        cmd += ['-i', audio_path]
+    else:
+        cmd += ['-f', 'lavfi', '-i', f'anullsrc=channel_layout=stereo:sample_rate={config.AUDIO_SAMPLE_RATE}']
+    cmd += [
+        '-map', '0:v:0',
+        '-map', '1:a:0',
+        '-c:v', 'copy',
+        '-c:a', 'aac',
+        '-b:a', config.AUDIO_BITRATE,
+        '-ar', str(config.AUDIO_SAMPLE_RATE),
+        '-ac', '2',
+        '-af', 'asetpts=PTS-STARTPTS',
+        '-max_interleave_delta', '0',
+    ]
+    if not audio_path:
+        cmd += ['-shortest']
+    cmd += [
+        '-movflags', '+frag_keyframe+empty_moov+default_base_moof',
+        '-f', 'mp4',
+        'pipe:1',
+    ]
+    return cmd
+
+
+class S3PipeUploader:
+    """S3 multipart upload fed from a readable stream, one part per PART_SIZE_MB read"""
+
+    def __init__(self, client, bucket: str, key: str, content_type: str = 'video/mp4',
+                 config=FinalizeConfig):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.content_type = content_type
+        self.part_size = config.PART_SIZE_MB * 1024 * 1024
+        self.workers = max(1, config.UPLOAD_WORKERS)
+        self.total_uploaded = 0
+
+    def _upload_part(self, upload_id: str, part_number: int, data: bytes) -> dict:
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            PartNumber=part_number,
+            UploadId=upload_id,
+            Body=data
+        )
+        return {'ETag': response['ETag'], 'PartNumber': part_number}
+
+    def upload(self, stream: BinaryIO, tee: Optional[BinaryIO] = None) -> int:
+        """Upload everything read from stream until EOF; return bytes uploaded. Aborts the upload on error."""
+        upload_id = self.client.create_multipart_upload(
+            Bucket=self.bucket, Key=self.key, ContentType=self.content_type
+        )['UploadId']
+        parts = []
+        pending = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="S3PipeUploader") as pool:
+                part_number = 0
+                while True:
+                    # BufferedReader.read(n) blocks until n bytes or EOF, so every part but the last is full size
+                    data = stream.read(self.part_size)
+                    if not data:
+                        break
+                    if tee is not None:
+                        tee.write(data)
+                    part_number += 1
+                    self.total_uploaded += len(data)
+                    pending.append(pool.submit(self._upload_part, upload_id, part_number, data))
+                    # At most `workers` parts in memory; ffmpeg waits on the pipe meanwhile
+                    while len(pending) >= self.workers:
+                        parts.append(pending.pop(0).result())
+                for future in pending:
+                    parts.append(future.result())
+
+            if not parts:
+                raise ValueError("no data to upload")
+
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': sorted(parts, key=lambda p: p['PartNumber'])}
+            )
+            logger.info(f"✅ Multipart upload completed: {self.key} "
+                        f"({len(parts)} parts, {self.total_uploaded / (1024 * 1024):.1f}MB)")
+            return self.total_uploaded
+
+        except Exception:
+            try:
+                self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=upload_id)
+                logger.info(f"🛑 Aborted multipart upload: {self.key}")
+            except Exception as abort_error:
+                logger.warning(f"⚠️ Could not abort multipart upload: {abort_error}")
+            raise
+
+
+def finalize_timeout(duration: float, config=FinalizeConfig) -> float:
+    """Watchdog for muxing and uploading a recording of duration seconds"""
+    return max(config.TIMEOUT, duration * config.TIMEOUT_PER_RECORDED_SECOND)
+
+
+def finalize_recording(video_path: str, audio_path: Optional[str], client, bucket: str, key: str,
+                       local_copy_path: Optional[str] = None, config=FinalizeConfig,
+                       video_format: Optional[str] = None, duration: float = 0.0) -> int:
+    """
+    Mux video_path (H.264; a concat list with video_format='concat') and
+    audio_path (WAV, or silence if None) into fragmented MP4 and stream it to
+    s3://bucket/key. If local_copy_path is given the same bytes are written
+    there. duration (seconds recorded) sizes the watchdog. Returns the size
+    in bytes; raises if ffmpeg or the upload fails.
+    """
+    cmd = build_finalize_command(video_path, audio_path, config, video_format)
+    uploader = S3PipeUploader(client, bucket, key, config=config)
+    started = time.time()
+    timeout = finalize_timeout(duration, config)
+
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr_file)
+        # Stops a hung ffmpeg from holding the recording thread forever
+        watchdog = threading.Timer(timeout, process.kill)
+        watchdog.start()
+        tee = open(local_copy_path, 'wb') if local_copy_path else None
+        try:
+            size = uploader.upload(process.stdout, tee=tee)
+            returncode = process.wait()
+        except Exception:
+            process.kill()
+            process.wait()
+            stderr_file.seek(0)
+            logger.error(f"❌ Finalize ffmpeg stderr: {stderr_file.read().decode(errors='ignore')[-1000:]}")
+            raise
+        finally:
+            watchdog.cancel()
+            process.stdout.close()
+            if tee is not None:
+                tee.close()
+
+        if returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors='ignore')[-1000:]
+            # The upload already completed with whatever ffmpeg wrote; don't leave a truncated file behind
+            try:
+                client.delete_object(Bucket=bucket, Key=key)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not delete incomplete upload {key}: {e}")
+            raise RuntimeError(f"ffmpeg exited with {returncode}: {stderr}")
+
+    logger.info(f"✅ Finalized in one pass: {size:,} bytes in {time.time() - started:.1f}s -> {key}")
+    return size
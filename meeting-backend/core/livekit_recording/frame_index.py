@@ -0,0 +1,71 @@
+"""
+Frame Index - Sorted frame timeline maintained as frames arrive
+===============================================================
+
+The post-stop encode path kept every frame (placeholders included) in a
+list, and:
+- the placeholder loop scanned the whole list for the newest real frame
+  every 0.5s (O(n) per check, O(n^2) over a meeting)
+- finalize sorted all frames and built a dict keyed by int(t * FPS)
+- each output frame probed up to +/-3 dict keys for the closest entry
+
+FrameTimeline keeps real frames in two parallel lists sorted by capture
+timestamp. Frames almost always arrive in order, so add() is an append;
+the rare out-of-order frame is inserted at its bisect position. It tracks
+the newest real-frame timestamp and the newest timestamp of any frame as
+they arrive, so:
+- the placeholder check is O(1)
+- nearest(t, tolerance) is two bisect probes, O(log n)
+- nothing has to be sorted or rebuilt at stop
+
+Placeholder frames only move max_timestamp; they are never selected, so
+they are not stored.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, List, Optional
+
+
+class FrameTimeline:
+    """Append-only, timestamp-sorted index of real frames"""
+
+    def __init__(self):
+        self.timestamps: List[float] = []
+        self.frames: List[Any] = []
+        self.last_real_timestamp: Optional[float] = None
+        self.max_timestamp = 0.0
+        self.out_of_order = 0
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def add(self, timestamp: float, frame: Any, real: bool = True):
+        """Record a frame; only real frames become selectable"""
+        if timestamp > self.max_timestamp:
+            self.max_timestamp = timestamp
+        if not real:
+            return
+
+        if not self.timestamps or timestamp >= self.timestamps[-1]:
+            self.timestamps.append(timestamp)
+            self.frames.append(frame)
+        else:
+            i = bisect_right(self.timestamps, timestamp)
+            self.timestamps.insert(i, timestamp)
+            self.frames.insert(i, frame)
+            self.out_of_order += 1
+
+        if self.last_real_timestamp is None or timestamp > self.last_real_timestamp:
+            self.last_real_timestamp = timestamp
+
+    def nearest(self, target: float, tolerance: float) -> Optional[Any]:
+        """Frame closest to target within tolerance seconds, earlier one on ties"""
+        timestamps = self.timestamps
+        i = bisect_left(timestamps, target)
+        best, best_distance = None, tolerance
+        if i > 0 and target - timestamps[i - 1] <= best_distance:
+            best, best_distance = i - 1, target - timestamps[i - 1]
+        if i < len(timestamps) and timestamps[i] - target <= best_distance:
+            if best is None or timestamps[i] - target < best_distance:
+                best = i
+        return self.frames[best] if best is not None else None
@@ -0,0 +1,271 @@
+"""
+Live Encoder - Encode recording frames while the meeting is running
+===================================================================
+
+StreamingRecordingWithChunks used to keep every captured BGR frame in
+video_frames until stop, then build a lookup and encode the whole meeting in
+one go. Memory grew with meeting length (~2.7 MB per 720p frame) and the MP4
+was only ready minutes after stop.
+
+LiveVideoEncoder keeps one ffmpeg process open for the whole recording:
+- add_frame() pushes (timestamp, frame) into a bounded jitter buffer (a heap
+  ordered by capture timestamp), so late or reordered frames from different
+  tracks still come out in order
+- an encoder thread runs on the output clock (FPS): output frame n is written
+  once the clock passes n / FPS + JITTER_SECONDS, using the newest buffered
+  frame at or before that slot, or repeating the previous one if nothing
+  arrived (same as the old placeholder fallback to the current screen frame)
+- if the buffer is full the oldest frame is dropped, so memory is bounded by
+  JITTER_MAX_FRAMES frames no matter how long the meeting runs
+- ffmpeg writes H.264 in MPEG-TS, which is append-only: nothing is rewritten
+  at the end, and a crashed recording still leaves a playable file
+
+With a frame_source (the compositor), each slot takes frame_source()
+instead of the buffer; add_frame() is then unused.
+
+finish() flushes whatever is buffered, closes ffmpeg and returns the encoded
+duration. Muxing with audio afterwards (finalize.py) is a stream copy, not
+a re-encode.
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import subprocess
+import threading
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from core.livekit_recording.encoder_registry import get_encoder_registry
+
+logger = logging.getLogger("recording_live_encoder")
+
+
+class LiveEncodeConfig:
+    """Live encode configuration"""
+    ENABLED = os.getenv("RECORDING_LIVE_ENCODE", "True") == "True"
+    FPS = float(os.getenv("RECORDING_LIVE_FPS", 24.0))
+    WIDTH = 1280
+    HEIGHT = 720
+    JITTER_SECONDS = float(os.getenv("RECORDING_JITTER_SECONDS", 0.3))
+    JITTER_MAX_FRAMES = int(os.getenv("RECORDING_JITTER_MAX_FRAMES", 48))
+    GOP_SECONDS = 2
+    CLOSE_TIMEOUT = 60
+
+
+def nvenc_available() -> bool:
+    """True if the local ffmpeg can encode with h264_nvenc (cached, see encoder_registry.py)"""
+    return get_encoder_registry().capabilities().nvenc
+
+
+def build_live_encode_command(output_path: str, fps: float, use_nvenc: bool,
+                              config=LiveEncodeConfig) -> list:
+    """ffmpeg command reading raw BGR frames on stdin and writing H.264 MPEG-TS"""
+    gop = str(int(fps * config.GOP_SECONDS))
+    cmd = [
+        'ffmpeg', '-y', '-nostats', '-loglevel', 'error',
+        '-f', 'rawvideo',
+        '-vcodec', 'rawvideo',
+        '-pix_fmt', 'bgr24',
+        '-s', f'{config.WIDTH}x{config.HEIGHT}',
+        '-r', str(fps),
+        '-i', '-',
+    ]
+    if use_nvenc:
+        cmd += [
+            '-c:v', 'h264_nvenc',
+            '-preset', 'p5',
+            '-rc', 'cbr',
+            '-b:v', '2M',
+            '-maxrate', '2.5M',
+            '-bufsize', '15M',
+        ]
+    else:
+        # veryfast keeps up in real time on a shared CPU; medium does not for long meetings
+        cmd += [
+            '-c:v', 'libx264',
+            '-preset', 'veryfast',
+            '-crf', '21',
+        ]
+    cmd += [
+        '-g', gop,
+        '-pix_fmt', 'yuv420p',
+        '-f', 'mpegts',
+        output_path,
+    ]
+    return cmd
+
+
+class LiveVideoEncoder:
+    """Long-lived ffmpeg encoder fed on the output-frame clock"""
+
+    def __init__(self, output_path: str, clock: Callable[[], float],
+                 placeholder_fn: Callable[[int, float], np.ndarray],
+                 frame_source: Optional[Callable[[], np.ndarray]] = None,
+                 config=LiveEncodeConfig):
+        """
+        clock() returns seconds since recording start, on the same base as the
+        timestamps passed to add_frame(). placeholder_fn(frame_number, t) makes
+        a frame for slots before any frame has arrived. frame_source(), if
+        given, supplies every slot's frame instead of the jitter buffer.
+        """
+        self.output_path = output_path
+        self.clock = clock
+        self.placeholder_fn = placeholder_fn
+        self.frame_source = frame_source
+        self.config = config
+        self.fps = config.FPS
+        self.frame_interval = 1.0 / self.fps
+
+        self._heap = []
+        self._seq = itertools.count()     # tie-breaker so equal timestamps never compare arrays
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.process: Optional[subprocess.Popen] = None
+        self.encoder_name = None
+
+        self.frames_written = 0
+        self.stats = {
+            'frames_in': 0,
+            'frames_late': 0,
+            'frames_dropped': 0,
+            'frames_repeated': 0,
+            'max_buffered': 0,
+        }
+
+    # ========================================================================
+    # LIFECYCLE
+    # ========================================================================
+
+    def start(self):
+        use_nvenc = nvenc_available()
+        self.encoder_name = 'h264_nvenc' if use_nvenc else 'libx264'
+        cmd = build_live_encode_command(self.output_path, self.fps, use_nvenc, self.config)
+
+        ffmpeg_env = os.environ.copy()
+        ffmpeg_env['CUDA_VISIBLE_DEVICES'] = '0'
+        ffmpeg_env['CUDA_DEVICE_ORDER'] = 'PCI_BUS_ID'
+        ffmpeg_env.pop('NVIDIA_DISABLE', None)
+
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            env=ffmpeg_env,
+        )
+        self._thread = threading.Thread(target=self._encode_loop, name="LiveVideoEncoder", daemon=True)
+        self._thread.start()
+        logger.info(f"🎞️ Live encoder started ({self.encoder_name} @ {self.fps} FPS) -> {self.output_path}")
+
+    def finish(self) -> float:
+        """Flush buffered frames, close ffmpeg, return encoded duration in seconds"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.config.CLOSE_TIMEOUT)
+
+        if self.process is not None:
+            try:
+                self.process.stdin.close()
+            except Exception:
+                pass
+            try:
+                _, stderr = self.process.communicate(timeout=self.config.CLOSE_TIMEOUT)
+                if self.process.returncode != 0:
+                    logger.error(f"❌ Live encoder exited with {self.process.returncode}: "
+                                 f"{(stderr or b'').decode(errors='ignore')[-1000:]}")
+            except subprocess.TimeoutExpired:
+                logger.warning("⚠️ Live encoder did not exit in time, killing it")
+                self.process.kill()
+
+        duration = self.frames_written / self.fps
+        logger.info(
+            f"✅ Live encode finished: {self.frames_written} frames ({duration:.1f}s) | "
+            f"in {self.stats['frames_in']}, late {self.stats['frames_late']}, "
+            f"dropped {self.stats['frames_dropped']}, repeated {self.stats['frames_repeated']}, "
+            f"max buffered {self.stats['max_buffered']}"
+        )
+        return duration
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    # ========================================================================
+    # INPUT
+    # ========================================================================
+
+    def add_frame(self, frame: np.ndarray, timestamp: float):
+        """Queue a frame captured at timestamp (seconds since recording start)"""
+        if frame is None or self._stopping:
+            return
+        with self._lock:
+            self.stats['frames_in'] += 1
+            if timestamp < self.frames_written * self.frame_interval:
+                # Its slot is already encoded; it can only become the "previous" frame
+                self.stats['frames_late'] += 1
+            heapq.heappush(self._heap, (timestamp, next(self._seq), frame))
+            if len(self._heap) > self.config.JITTER_MAX_FRAMES:
+                heapq.heappop(self._heap)
+                self.stats['frames_dropped'] += 1
+            self.stats['max_buffered'] = max(self.stats['max_buffered'], len(self._heap))
+
+    # ========================================================================
+    # OUTPUT CLOCK
+    # ========================================================================
+
+    def _take_frame_for_slot(self, slot_end: float):
+        """Pop every buffered frame up to slot_end; return the newest of them"""
+        newest = None
+        with self._lock:
+            while self._heap and self._heap[0][0] <= slot_end:
+                newest = heapq.heappop(self._heap)[2]
+        return newest
+
+    def _prepare(self, frame: np.ndarray) -> bytes:
+        if frame.shape[:2] != (self.config.HEIGHT, self.config.WIDTH):
+            frame = cv2.resize(frame, (self.config.WIDTH, self.config.HEIGHT))
+        return np.ascontiguousarray(frame).tobytes()
+
+    def _encode_loop(self):
+        previous = None
+        jitter = self.config.JITTER_SECONDS
+        try:
+            while True:
+                slot_start = self.frames_written * self.frame_interval
+                slot_end = slot_start + self.frame_interval
+
+                if not self._stopping:
+                    wait = slot_end + jitter - self.clock()
+                    if wait > 0:
+                        self._wakeup.wait(wait)
+                        continue
+                else:
+                    with self._lock:
+                        drained = not self._heap
+                    if drained:
+                        break
+
+                if self.frame_source is not None:
+                    frame = self.frame_source()
+                else:
+                    frame = self._take_frame_for_slot(slot_end)
+                if frame is not None:
+                    previous = self._prepare(frame)
+                elif previous is None:
+                    previous = self._prepare(self.placeholder_fn(self.frames_written, slot_start))
+                else:
+                    self.stats['frames_repeated'] += 1
+
+                self.process.stdin.write(previous)
+                self.frames_written += 1
+        except (BrokenPipeError, IOError, ValueError) as e:
+            logger.error(f"❌ Live encoder pipe closed at frame {self.frames_written}: {e}")
+        except Exception as e:
+            logger.error(f"❌ Live encoder loop failed at frame {self.frames_written}: {e}")
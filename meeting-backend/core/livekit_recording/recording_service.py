@@ -62,6 +62,7 @@ import weakref
 from functools import wraps
 import json
 import tempfile
+import shutil
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List, Tuple
 import subprocess
@@ -81,6 +82,15 @@ import math
 # ADD THIS AT THE TOP (after imports):
 import boto3
 import io
+from core.livekit_recording.live_encoder import LiveEncodeConfig, LiveVideoEncoder
+from core.livekit_recording.audio_mixer import AudioMixer
+from core.livekit_recording.frame_index import FrameTimeline
+from core.livekit_recording.compositor import CompositorConfig, VideoCompositor
+from core.livekit_recording.finalize import (
+    FinalizeConfig, finalize_recording, join_segments, list_segments, probe_duration, segment_paths
+)
+from core.livekit_recording.supervisor import RecordingSupervisor, get_recording_supervisor
+from core.livekit_recording.encoder_registry import get_encoder_registry
 
 # Configure S3
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
@@ -313,223 +323,51 @@ class LiveKitEventLoopManager:
 loop_manager = LiveKitEventLoopManager()
 
 # ====== ADD THESE TWO NEW CLASSES HERE ======
-class S3ChunkUploader:
-    """
-    Uploads file chunks to S3 using MULTIPART UPLOAD.
-    This properly concatenates chunks instead of overwriting.
-    """
-    
-    def __init__(self, bucket: str, s3_key: str, chunk_size_mb: int = 5):
-        self.bucket = bucket
-        self.s3_key = s3_key
-        self.chunk_size = chunk_size_mb * 1024 * 1024  # Convert to bytes
-        
-        self.last_uploaded_size = 0
-        self.total_uploaded = 0
-        self.is_uploading = True
-        self.upload_thread = None
-        self.lock = threading.Lock()
-        
-        # Multipart upload tracking
-        self.multipart_upload_id = None
-        self.part_number = 0
-        self.uploaded_parts = []  # List of {'ETag': ..., 'PartNumber': ...}
-        
-        logger.info(f"🚀 S3 Chunk Uploader (Multipart) initialized: {s3_key} ({chunk_size_mb}MB chunks)")
-    
-    def start_chunk_monitor(self, local_file_path: str):
-        """Start background thread to monitor and upload chunks"""
-        self.upload_thread = threading.Thread(
-            target=self._chunk_upload_loop,
-            args=(local_file_path,),
-            daemon=False
-        )
-        self.upload_thread.start()
-        logger.info(f"📤 Chunk upload monitor started for: {local_file_path}")
-    
-    def _chunk_upload_loop(self, local_file_path: str):
-        """
-        Continuously monitor local file and upload new chunks to S3 using multipart
-        """
-        try:
-            check_interval = 0.5  # Check every 500ms
-            last_log_time = time.time()
-            
-            while self.is_uploading:
-                try:
-                    # Get current file size
-                    if not os.path.exists(local_file_path):
-                        time.sleep(check_interval)
-                        continue
-                    
-                    current_size = os.path.getsize(local_file_path)
-                    
-                    # Check if file grew enough for new chunk
-                    if current_size >= self.last_uploaded_size + self.chunk_size:
-                        # Upload chunk
-                        self.part_number += 1
-                        self._upload_chunk_multipart(
-                            local_file_path,
-                            self.last_uploaded_size,
-                            current_size,
-                            self.part_number
-                        )
-                        self.last_uploaded_size = current_size
-                    
-                    # Log progress every 5 seconds
-                    now = time.time()
-                    if now - last_log_time >= 5:
-                        logger.info(
-                            f"📊 Upload progress: {self.total_uploaded / (1024*1024):.1f}MB uploaded, "
-                            f"Local file: {current_size / (1024*1024):.1f}MB, "
-                            f"Parts: {len(self.uploaded_parts)}"
-                        )
-                        last_log_time = now
-                    
-                    time.sleep(check_interval)
-                    
-                except Exception as e:
-                    logger.warning(f"⚠️ Chunk monitor error: {e}")
-                    time.sleep(check_interval)
-        
-        except Exception as e:
-            logger.error(f"❌ Chunk upload loop failed: {e}")
-        finally:
-            logger.info("🛑 Chunk upload monitor stopped")
-    
-    def _upload_chunk_multipart(self, local_file_path: str, start_byte: int, end_byte: int, part_number: int):
-        """Upload a chunk using S3 multipart upload"""
-        try:
-            # Initiate multipart upload if first chunk
-            if self.multipart_upload_id is None:
-                response = s3_client.create_multipart_upload(
-                    Bucket=self.bucket,
-                    Key=self.s3_key
-                )
-                self.multipart_upload_id = response['UploadId']
-                logger.info(f"✅ Initiated multipart upload: {self.multipart_upload_id}")
-            
-            # Read chunk from local file
-            with open(local_file_path, 'rb') as f:
-                f.seek(start_byte)
-                chunk_data = f.read(end_byte - start_byte)
-            
-            if not chunk_data:
-                return
-            
-            chunk_size_mb = len(chunk_data) / (1024 * 1024)
-            
-            # Upload part
-            response = s3_client.upload_part(
-                Bucket=self.bucket,
-                Key=self.s3_key,
-                PartNumber=part_number,
-                UploadId=self.multipart_upload_id,
-                Body=chunk_data
-            )
-            
-            etag = response['ETag']
-            part_info = {
-                'ETag': etag,
-                'PartNumber': part_number
-            }
-            self.uploaded_parts.append(part_info)
-            
-            with self.lock:
-                self.total_uploaded += len(chunk_data)
-            
-            logger.info(
-                f"✅ Part {part_number} uploaded: {chunk_size_mb:.1f}MB "
-                f"(Total: {self.total_uploaded / (1024*1024):.1f}MB) | ETag: {etag[:20]}..."
-            )
-        
-        except Exception as e:
-            logger.error(f"❌ Part {part_number} upload failed: {e}")
-    
-    def stop_and_upload_final(self, local_file_path: str):
-        """Stop monitoring, upload final chunk, and complete multipart upload"""
-        self.is_uploading = False
-        
-        # Wait for upload thread to finish
-        if self.upload_thread and self.upload_thread.is_alive():
-            logger.info("⏳ Waiting for chunk upload thread to finish...")
-            self.upload_thread.join(timeout=60)
-        
-        # Upload final chunk if any remaining data
-        try:
-            if os.path.exists(local_file_path):
-                current_size = os.path.getsize(local_file_path)
-                
-                if current_size > self.last_uploaded_size:
-                    logger.info(f"📤 Uploading final chunk: {current_size - self.last_uploaded_size} bytes")
-                    self.part_number += 1
-                    self._upload_chunk_multipart(
-                        local_file_path,
-                        self.last_uploaded_size,
-                        current_size,
-                        self.part_number
-                    )
-                
-                logger.info(f"✅ All chunks uploaded: {self.total_uploaded / (1024*1024):.1f}MB total")
-        except Exception as e:
-            logger.error(f"❌ Final chunk upload failed: {e}")
-        
-        # Complete multipart upload
-        try:
-            if self.multipart_upload_id and len(self.uploaded_parts) > 0:
-                logger.info(f"🔗 Completing multipart upload with {len(self.uploaded_parts)} parts...")
-                
-                # Sort parts by part number
-                self.uploaded_parts.sort(key=lambda x: x['PartNumber'])
-                
-                response = s3_client.complete_multipart_upload(
-                    Bucket=self.bucket,
-                    Key=self.s3_key,
-                    UploadId=self.multipart_upload_id,
-                    MultipartUpload={
-                        'Parts': self.uploaded_parts
-                    }
-                )
-                
-                logger.info(f"✅ Multipart upload completed: {response['Key']}")
-                logger.info(f"📊 Final file ETag: {response['ETag']}")
-            else:
-                logger.warning("⚠️ No multipart upload to complete")
-        
-        except Exception as e:
-            logger.error(f"❌ Multipart upload completion failed: {e}")
-            # Try to abort on error
-            try:
-                if self.multipart_upload_id:
-                    s3_client.abort_multipart_upload(
-                        Bucket=self.bucket,
-                        Key=self.s3_key,
-                        UploadId=self.multipart_upload_id
-                    )
-                    logger.info(f"🛑 Aborted multipart upload")
-            except Exception as abort_error:
-                logger.warning(f"⚠️ Could not abort multipart upload: {abort_error}")
-
 class StreamingRecordingWithChunks:
-    """Recording with streaming chunk uploads to S3"""
+    """Recording to local H.264 + WAV, finalized to S3 in one pass"""
     
-    def __init__(self, meeting_id: str):
+    def __init__(self, meeting_id: str, work_dir: Optional[str] = None, segment: int = 0):
+        """work_dir/segment: supervised recordings write segment files there and join them at finalize"""
         self.meeting_id = meeting_id
         self.s3_prefix = f"{S3_FOLDERS['recordings_temp']}/{meeting_id}"
+        self.work_dir = work_dir
+        
+        # Live mode encodes H.264 MPEG-TS while recording; otherwise the same after stop
+        self.live_encode = LiveEncodeConfig.ENABLED
+        self.live_encoder = None
+        
+        # Composited layouts need the live encoder's output clock
+        self.compositor = None
+        if self.live_encode and CompositorConfig.ENABLED:
+            self.compositor = VideoCompositor(
+                clock=lambda: time.perf_counter() - (self.start_perf_counter or time.perf_counter())
+            )
         
         # Temp file for FFmpeg output
-        self.temp_video_fd, self.temp_video_path = tempfile.mkstemp(
-            suffix='.avi',
-            prefix=f'recording_{meeting_id}_'
-        )
-        os.close(self.temp_video_fd)
+        if work_dir:
+            self.temp_video_path, self.temp_audio_path = segment_paths(work_dir, segment)
+        else:
+            self.temp_video_fd, self.temp_video_path = tempfile.mkstemp(
+                suffix='.ts',
+                prefix=f'recording_{meeting_id}_'
+            )
+            os.close(self.temp_video_fd)
+            
+            # Mixed audio is written here while recording
+            self.temp_audio_fd, self.temp_audio_path = tempfile.mkstemp(
+                suffix='.wav',
+                prefix=f'recording_audio_{meeting_id}_'
+            )
+            os.close(self.temp_audio_fd)
         
-        self.s3_video_key = f"{self.s3_prefix}/raw_video_{meeting_id}.avi"
-        self.chunk_uploader = None
+        # One-pass finalize streams the muxed MP4 here; the local copy feeds the processing pipeline
+        self.s3_final_key = f"{self.s3_prefix}/raw_video_{meeting_id}_final.mp4"
+        self.final_local_path = None
+        self.audio_mixer = None
         
-        # Video frames and audio
-        self.video_frames = []
-        self.raw_audio_data = []
+        # Video frames (post-stop encode only) and newest real frame, for placeholders
+        self.frame_index = FrameTimeline()
+        self.last_real_frame_time = None
         self.start_time = None
         self.start_perf_counter = None
         self.is_recording = False
@@ -538,54 +376,46 @@ class StreamingRecordingWithChunks:
         
         # Audio tracking
         self.active_audio_tracks = {}
-        self.participant_audio_buffers = {}
         self.processing_tracks = set()
         
-        self.AUDIO_BUFFER_SIZE = 4800
-        self.frame_lookup = None
-        self.frame_lookup_built = False
         self.TARGET_FPS = 24.0
         
         logger.info(f"✅ Streaming Recorder Initialized - Prefix: {self.s3_prefix}")
         logger.info(f"📝 Temp file: {self.temp_video_path}")
     
     def start_recording(self):
-        """Start recording and chunk uploader"""
+        """Start recording, the live encoder and the audio mixer"""
         self.start_time = time.time()
         self.start_perf_counter = time.perf_counter()
         self.is_recording = True
-        self.video_frames = []
-        self.raw_audio_data = []
-        self.frame_lookup = None
-        self.frame_lookup_built = False
-        
-        # Start chunk uploader
-        self.chunk_uploader = S3ChunkUploader(
-            bucket=AWS_S3_BUCKET,
-            s3_key=self.s3_video_key,
-            chunk_size_mb=5  # 5MB chunks
+        self.frame_index = FrameTimeline()
+        self.last_real_frame_time = None
+        
+        if self.compositor is not None:
+            self.compositor.start()
+        
+        if self.live_encode:
+            self.live_encoder = LiveVideoEncoder(
+                self.temp_video_path,
+                clock=lambda: time.perf_counter() - self.start_perf_counter,
+                placeholder_fn=self.create_placeholder_frame,
+                frame_source=self.compositor.compose if self.compositor is not None else None
+            )
+            self.live_encoder.start()
+        
+        self.audio_mixer = AudioMixer(
+            self.temp_audio_path,
+            clock=lambda: time.perf_counter() - self.start_perf_counter
         )
-        self.chunk_uploader.start_chunk_monitor(self.temp_video_path)
+        self.audio_mixer.start()
         
-        logger.info("🎬 Recording started with streaming chunk upload to S3")
+        logger.info("🎬 Recording started")
     
     def stop_recording(self):
         """Stop recording and finalize uploads"""
         self.is_recording = False
         
         with self.audio_lock:
-            if hasattr(self, 'participant_audio_buffers'):
-                for participant_id, participant_buffer in self.participant_audio_buffers.items():
-                    if len(participant_buffer['buffer']) > 0:
-                        buffer_data = participant_buffer['buffer'].copy()
-                        self.raw_audio_data.append({
-                            'timestamp': participant_buffer['buffer_start_time'],
-                            'samples': buffer_data,
-                            'participant': participant_id
-                        })
-                
-                self.participant_audio_buffers = {}
-            
             self.active_audio_tracks = {}
         
         logger.info("⏹️ Recording stopped")
@@ -596,24 +426,46 @@ class StreamingRecordingWithChunks:
             return
             
         timestamp = time.perf_counter() - self.start_perf_counter
+        is_real = source_type in ["video", "screen_share"] and frame is not None
+        
+        if self.live_encoder is not None:
+            self.live_encoder.add_frame(frame, timestamp)
+            if is_real:
+                with self.frame_lock:
+                    self.current_screen_frame = frame
+                    self.last_real_frame_time = max(timestamp, self.last_real_frame_time or 0.0)
+            return
         
         with self.frame_lock:
-            class TimestampedFrame:
-                def __init__(self, frame, timestamp, source_type="placeholder"):
-                    self.frame = frame
-                    self.timestamp = timestamp
-                    self.source_type = source_type
-                    self.capture_time = time.perf_counter()
-            
-            timestamped_frame = TimestampedFrame(frame, timestamp, source_type)
-            self.video_frames.append(timestamped_frame)
+            self.frame_index.add(timestamp, frame, real=is_real)
             
-            if source_type in ["video", "screen_share"] and frame is not None:
+            if is_real:
+                self.last_real_frame_time = self.frame_index.last_real_timestamp
                 self.current_screen_frame = frame.copy() if hasattr(self, 'current_screen_frame') else frame
     
+    def add_video_track(self, track_id, participant_id, source_type="video"):
+        """Give a video track its own tile (composited recordings only)"""
+        if self.compositor is not None:
+            self.compositor.add_track(track_id, participant_id, source_type)
+    
+    def remove_video_track(self, track_id):
+        if self.compositor is not None:
+            self.compositor.remove_track(track_id)
+    
+    def add_track_frame(self, track_id, raw_frame, decode_fn=None):
+        """Hand an undecoded track frame to the compositor; decode and scale run on its workers"""
+        if not self.is_recording or self.compositor is None:
+            return
+        self.last_real_frame_time = time.perf_counter() - self.start_perf_counter
+        self.compositor.submit(track_id, raw_frame, decode_fn)
+    
+    def set_active_speaker(self, participant_id):
+        if self.compositor is not None:
+            self.compositor.set_active_speaker(participant_id)
+    
     def add_audio_samples(self, samples, participant_id="unknown", track_id=None, track_source=None):
-        """Add audio samples with FIXED-SIZE buffering for smooth playback"""
-        if not self.is_recording or not samples:
+        """Add interleaved stereo int16 samples to the track's ring buffer"""
+        if not self.is_recording or samples is None or len(samples) == 0:
             return
         
         with self.audio_lock:
@@ -632,38 +484,8 @@ class StreamingRecordingWithChunks:
                     logger.info(f"✅ Using {source_name} audio track {track_id} for {participant_id}")
             
             timestamp = time.perf_counter() - self.start_perf_counter
-            
-            if track_key not in self.participant_audio_buffers:
-                self.participant_audio_buffers[track_key] = {
-                    'buffer': [],
-                    'buffer_start_time': timestamp,
-                    'participant': participant_id,
-                    'source': track_source or 'microphone'
-                }
-            
-            participant_buffer = self.participant_audio_buffers[track_key]
-            
-            if isinstance(samples, list):
-                participant_buffer['buffer'].extend(samples)
-            else:
-                participant_buffer['buffer'].extend(samples.tolist() if hasattr(samples, 'tolist') else list(samples))
-            
-            buffer_size = len(participant_buffer['buffer'])
-            
-            if buffer_size >= self.AUDIO_BUFFER_SIZE:
-                chunk_to_flush = participant_buffer['buffer'][:self.AUDIO_BUFFER_SIZE]
-                
-                self.raw_audio_data.append({
-                    'timestamp': participant_buffer['buffer_start_time'],
-                    'samples': chunk_to_flush,
-                    'participant': participant_id,
-                    'source': track_source or 'microphone'
-                })
-                
-                participant_buffer['buffer'] = participant_buffer['buffer'][self.AUDIO_BUFFER_SIZE:]
-                
-                chunk_duration = self.AUDIO_BUFFER_SIZE / (48000 * 2)
-                participant_buffer['buffer_start_time'] += chunk_duration
+        
+        self.audio_mixer.add_samples(track_key, np.asarray(samples, dtype=np.int16), timestamp)
     
     def get_current_screen_frame(self):
         """Get current screen frame for placeholder generation"""
@@ -692,111 +514,170 @@ class StreamingRecordingWithChunks:
             
             return frame
     
-    def _build_optimized_frame_lookup(self):
-        """⭐ FIXED: Build frame lookup using TARGET_FPS (24) instead of hardcoded 30"""
-        logger.info("🔨 Building optimized frame lookup index...")
-        start_build = time.time()
-        
-        # Sort frames by timestamp for better cache locality
-        sorted_frames = sorted(self.video_frames, key=lambda f: f.timestamp)
-        
-        # Create multi-resolution lookup table
-        self.frame_lookup = {}
-        self.last_real_frame = None
-        
-        # ⭐ Build index using TARGET_FPS (24 FPS) - CRITICAL FIX
-        for frame_obj in sorted_frames:
-            frame_key = int(frame_obj.timestamp * self.TARGET_FPS)  # Was: * 30
-            
-            # Store real frames (not placeholders)
-            if frame_obj.source_type in ["video", "screen_share"]:
-                if frame_key not in self.frame_lookup:
-                    self.frame_lookup[frame_key] = frame_obj.frame
-                self.last_real_frame = frame_obj.frame
-        
-        build_time = time.time() - start_build
-        logger.info(f"✅ Frame index built: {len(self.frame_lookup)} entries in {build_time:.2f}s")
-        logger.info(f"📊 Index size: ~{len(self.frame_lookup) * 8 / 1024 / 1024:.1f}MB in RAM")
-        
-        self.frame_lookup_built = True
-    
     def _find_best_frame_fast(self, target_timestamp, frame_interval):
-        """Find best matching frame WITHOUT repeating frames"""
-        if not self.frame_lookup_built:
-            return None
-        
-        frame_key = int(target_timestamp * self.TARGET_FPS)
-        
-        # Try exact match first
-        if frame_key in self.frame_lookup:
-            return self.frame_lookup[frame_key]
-        
-        # Search for closest frame within a WIDER tolerance
-        tolerance_frames = max(3, int(frame_interval * self.TARGET_FPS * 3))
-        
-        closest_frame = None
-        min_distance = float('inf')
-        
-        # Search both directions
-        for offset in range(-tolerance_frames, tolerance_frames + 1):
-            test_key = frame_key + offset
-            if test_key in self.frame_lookup:
-                distance = abs(offset)
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_frame = self.frame_lookup[test_key]
-        
-        # Return closest frame OR None (not self.last_real_frame!)
-        return closest_frame
+        """Real frame closest to the output slot's centre within 3 frame intervals, or None"""
+        return self.frame_index.nearest(target_timestamp + frame_interval / 2, frame_interval * 3)
     
     def generate_synchronized_video(self, target_fps=24.0):
-        """Generate video with streaming chunk uploads"""
+        """
+        Finish the video and audio and upload the final MP4.
+        Returns (video_s3_key, audio_s3_key): the final MP4 and None, or the raw
+        TS and WAV if the one-pass finalize failed and they were uploaded instead.
+        """
         
-        if not self.video_frames and not self.raw_audio_data:
-            logger.error("❌ No frames or audio recorded")
-            return None, None
+        if self.live_encoder is not None:
+            return self._finish_live_encode()
+        
+        if self.audio_mixer is None or (not len(self.frame_index) and not self.audio_mixer.has_audio):
+            # Nothing new in this run; a restarted supervised recording still has earlier segments
+            return self.finalize_segments()
         
         self.TARGET_FPS = 24.0
         target_fps = 24.0
         
-        max_video_time = max([f.timestamp for f in self.video_frames]) if self.video_frames else 0
-        max_audio_time = max([d['timestamp'] for d in self.raw_audio_data]) if self.raw_audio_data else 0
+        max_video_time = self.frame_index.max_timestamp
+        max_audio_time = self.audio_mixer.last_timestamp
         recording_duration = max(max_video_time, max_audio_time, 1.0)
         
         logger.info(f"🎬 Generating video: {recording_duration:.1f}s at {target_fps} FPS")
-        logger.info(f"📊 Total video frames: {len(self.video_frames)}")
-        logger.info(f"📊 Total audio chunks: {len(self.raw_audio_data)}")
+        logger.info(f"📊 Total video frames: {len(self.frame_index)} ({self.frame_index.out_of_order} out of order)")
+        logger.info(f"📊 Total audio tracks: {len(self.audio_mixer.tracks)}")
         
         frame_interval = 1.0 / target_fps
         total_frames = int(recording_duration * target_fps)
         
-        audio_s3_key = f"{self.s3_prefix}/raw_audio_{self.meeting_id}.wav"
-        
-        # Generate video with streaming chunks
         return self._generate_video_with_streaming_chunks(
-            total_frames, frame_interval, audio_s3_key, recording_duration, target_fps
+            total_frames, frame_interval, recording_duration, target_fps
         )
     
+    def _finish_live_encode(self):
+        """Close the live encoder; the video is already encoded, only the mux is left"""
+        try:
+            logger.info("🔚 Closing live encoder...")
+            video_duration = self.live_encoder.finish()
+            if self.compositor is not None:
+                self.compositor.stop()
+            
+            return self._finalize_to_s3(video_duration)
+        
+        except Exception as e:
+            logger.error(f"❌ Live encode finalization failed: {e}")
+            import traceback
+            logger.error(traceback.format_exc())
+            return None, None
+    
+    def finalize_segments(self):
+        """Finalize the segments already in work_dir (supervised restarts); (None, None) if there are none"""
+        if not self.work_dir or not list_segments(self.work_dir):
+            logger.error("❌ No frames or audio recorded")
+            return None, None
+        return self._finalize_to_s3(0.0)
+    
+    def _finalize_to_s3(self, video_duration):
+        """Mix down audio and stream video + audio as one fragmented MP4 to S3"""
+        last_audio = self.audio_mixer.last_timestamp if self.audio_mixer is not None else 0.0
+        recording_duration = max(video_duration, last_audio, 1.0)
+        audio_path = None
+        if self.audio_mixer is not None:
+            try:
+                self.audio_mixer.finish(recording_duration)
+                audio_path = self.temp_audio_path
+            except Exception as e:
+                logger.error(f"❌ Audio mixdown failed, finalizing with silence: {e}")
+        
+        video_input, video_format = self.temp_video_path, None
+        if self.work_dir:
+            segments = list_segments(self.work_dir)
+            if not segments:
+                logger.error(f"❌ No recorded segments in {self.work_dir}")
+                return None, None
+            if recording_duration <= 1.0:
+                # Restarted worker: nothing measured in this process, ask the segments
+                try:
+                    recording_duration = max(1.0, sum(probe_duration(video) for video, _ in segments))
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not probe segment durations: {e}")
+            if len(segments) > 1:
+                video_input, video_format, audio_path = join_segments(segments, self.work_dir)
+            else:
+                video_input = segments[0][0]
+                if self.audio_mixer is None:
+                    audio_path = segments[0][1]
+        
+        local_copy_path = None
+        if FinalizeConfig.KEEP_LOCAL_COPY:
+            local_fd, local_copy_path = tempfile.mkstemp(
+                suffix='_final.mp4',
+                prefix=f'recording_{self.meeting_id}_'
+            )
+            os.close(local_fd)
+        
+        try:
+            logger.info(f"📤 Finalizing to S3 in one pass: {self.s3_final_key}")
+            finalize_recording(
+                video_input, audio_path,
+                s3_client, AWS_S3_BUCKET, self.s3_final_key,
+                local_copy_path=local_copy_path,
+                video_format=video_format,
+                duration=recording_duration
+            )
+            self.final_local_path = local_copy_path
+            if self.work_dir:
+                shutil.rmtree(self.work_dir, ignore_errors=True)
+            return self.s3_final_key, None
+        
+        except Exception as e:
+            if local_copy_path and os.path.exists(local_copy_path):
+                os.remove(local_copy_path)
+            if self.work_dir:
+                # Supervised: the segments stay on disk and a restarted worker finalizes them again
+                logger.error(f"❌ One-pass finalize failed, segments kept in {self.work_dir}: {e}")
+                return None, None
+            logger.error(f"❌ One-pass finalize failed, uploading raw video and audio instead: {e}")
+            return self._upload_raw_to_s3(audio_path, recording_duration)
+        
+        finally:
+            for path in (() if self.work_dir else (self.temp_video_path, self.temp_audio_path)):
+                try:
+                    if os.path.exists(path):
+                        os.remove(path)
+                        logger.info(f"🧹 Deleted temp file: {path}")
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not delete temp file: {e}")
+    
+    def _upload_raw_to_s3(self, audio_path, duration):
+        """Fallback: upload the raw TS and WAV for _create_final_video_simple_s3 to merge"""
+        video_s3_key = f"{self.s3_prefix}/raw_video_{self.meeting_id}.ts"
+        audio_s3_key = f"{self.s3_prefix}/raw_audio_{self.meeting_id}.wav"
+        try:
+            s3_client.upload_file(self.temp_video_path, AWS_S3_BUCKET, video_s3_key)
+            logger.info(f"✅ Raw video uploaded to S3: {video_s3_key}")
+        except Exception as e:
+            logger.error(f"❌ Raw video upload failed: {e}")
+            return None, None
+        
+        if audio_path:
+            try:
+                s3_client.upload_file(audio_path, AWS_S3_BUCKET, audio_s3_key,
+                                      ExtraArgs={'ContentType': 'audio/wav'})
+                logger.info(f"✅ Raw audio uploaded to S3: {audio_s3_key}")
+                return video_s3_key, audio_s3_key
+            except Exception as e:
+                logger.error(f"❌ Raw audio upload failed: {e}")
+        
+        self._create_silent_audio_s3(audio_s3_key, duration)
+        return video_s3_key, audio_s3_key
+    
     def _generate_video_with_streaming_chunks(self, total_frames, frame_interval, 
-                                             audio_s3_key, recording_duration, target_fps):
+                                             recording_duration, target_fps):
         """
-        Generate video with FFmpeg writing to temp file
-        Chunks are uploaded to S3 as they arrive
+        Generate video with FFmpeg writing H.264 MPEG-TS to the temp file,
+        then finalize it with the audio to S3 in one pass
         """
         try:
-            if not self.frame_lookup_built:
-                self._build_optimized_frame_lookup()
-            
-            # Check GPU availability
-            nvenc_available = False
-            try:
-                check_nvenc = subprocess.run(
-                    ['ffmpeg', '-h', 'encoder=h264_nvenc'],
-                    capture_output=True, text=True, timeout=5
-                )
-                nvenc_available = (check_nvenc.returncode == 0)
-            except Exception:
-                nvenc_available = False
+            # Cached GPU / preset capabilities (encoder_registry.py)
+            encoder_registry = get_encoder_registry()
+            nvenc_available = encoder_registry.capabilities().nvenc
             
             # Build FFmpeg command to write to LOCAL temp file
             base_ffmpeg_cmd = [
@@ -820,18 +701,19 @@ class StreamingRecordingWithChunks:
                     '-bufsize', '15M',
                     '-r', str(target_fps),
                     '-pix_fmt', 'yuv420p',
-                    '-f', 'avi',
+                    '-f', 'mpegts',
                     self.temp_video_path  # ✅ Write to temp file
                 ]
             else:
-                logger.info(f"ℹ️ CPU Fallback - libx264 @ {target_fps} FPS")
+                cpu_preset = encoder_registry.choose_x264_preset(1280, 720, target_fps)
+                logger.info(f"ℹ️ CPU Fallback - libx264 {cpu_preset} @ {target_fps} FPS")
                 base_ffmpeg_cmd += [
                     '-c:v', 'libx264',
-                    '-preset', 'medium',
+                    '-preset', cpu_preset,
                     '-crf', '21',
                     '-r', str(target_fps),
                     '-pix_fmt', 'yuv420p',
-                    '-f', 'avi',
+                    '-f', 'mpegts',
                     self.temp_video_path  # ✅ Write to temp file
                 ]
             
@@ -842,19 +724,18 @@ class StreamingRecordingWithChunks:
             ffmpeg_env.pop('NVIDIA_DISABLE', None)
             
             logger.info(f"🎯 Starting FFmpeg to temp file: {self.temp_video_path}")
-            logger.info(f"📤 Chunks will stream to S3: {self.s3_video_key}")
             
             # Start FFmpeg process
             process = subprocess.Popen(
                 base_ffmpeg_cmd,
                 stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 env=ffmpeg_env,
                 bufsize=10485760
             )
             
-            logger.info(f"🎞️ FFmpeg started - streaming chunks to S3 in background")
+            logger.info(f"🎞️ FFmpeg started")
             
             start_time = time.time()
             total_frames_written = 0
@@ -888,8 +769,7 @@ class StreamingRecordingWithChunks:
                         progress = (frame_num / total_frames) * 100
                         eta = (total_frames - frame_num) / fps / 60 if fps > 0 else 0
                         logger.info(
-                            f"Progress: {progress:.1f}% | Speed: {fps:.0f} fps | ETA: {eta:.1f} min | "
-                            f"Chunks uploaded: {self.chunk_uploader.total_uploaded / (1024*1024):.1f}MB"
+                            f"Progress: {progress:.1f}% | Speed: {fps:.0f} fps | ETA: {eta:.1f} min"
                         )
                         last_log_time = now
                 
@@ -904,30 +784,7 @@ class StreamingRecordingWithChunks:
             except Exception as e:
                 logger.warning(f"FFmpeg finalization issue: {e}")
             
-            # Stop chunk uploader and finalize uploads
-            logger.info("⏳ Finalizing chunk uploads...")
-            self.chunk_uploader.stop_and_upload_final(self.temp_video_path)
-            
-            # Verify final file in S3
-            try:
-                response = s3_client.head_object(Bucket=AWS_S3_BUCKET, Key=self.s3_video_key)
-                video_size = response['ContentLength']
-                logger.info(f"✅ Video complete in S3: {video_size:,} bytes - {self.s3_video_key}")
-            except Exception as e:
-                logger.error(f"❌ Video verification failed: {e}")
-                return None, None
-            
-            # Clean up temp file
-            try:
-                os.remove(self.temp_video_path)
-                logger.info(f"🧹 Deleted temp file: {self.temp_video_path}")
-            except Exception as e:
-                logger.warning(f"⚠️ Could not delete temp file: {e}")
-            
-            # Generate audio to S3
-            self._generate_smooth_audio_to_s3(audio_s3_key, recording_duration)
-            
-            return self.s3_video_key, audio_s3_key
+            return self._finalize_to_s3(recording_duration)
         
         except Exception as e:
             logger.error(f"❌ Video generation failed: {e}")
@@ -935,165 +792,6 @@ class StreamingRecordingWithChunks:
             logger.error(traceback.format_exc())
             return None, None
     
-    def _generate_smooth_audio_to_s3(self, audio_s3_key, duration):
-        """Generate audio and upload to S3"""
-        try:
-            sample_rate = 48000
-            total_samples = int(duration * sample_rate * 2)
-            
-            if not self.raw_audio_data or len(self.raw_audio_data) == 0:
-                logger.warning("No audio data available, creating silent audio in S3")
-                self._create_silent_audio_s3(audio_s3_key, duration)
-                return
-            
-            final_audio = np.zeros(total_samples, dtype=np.float64)
-            sample_count = np.zeros(total_samples, dtype=np.int32)
-            
-            logger.info(f"Processing {len(self.raw_audio_data)} audio chunks with sub-sample precision")
-            
-            sorted_audio = sorted(self.raw_audio_data, key=lambda x: x['timestamp'])
-            
-            successful_chunks = 0
-            skipped_chunks = 0
-            participants_detected = set()
-            audio_sources = {'microphone': 0, 'screen_share_audio': 0}
-            
-            for audio_chunk in sorted_audio:
-                timestamp = audio_chunk['timestamp']
-                samples = audio_chunk['samples']
-                participant = audio_chunk.get('participant', 'unknown')
-                source = audio_chunk.get('source', 'microphone')
-                
-                participants_detected.add(participant)
-                audio_sources[source] = audio_sources.get(source, 0) + 1
-                
-                if not samples or len(samples) == 0:
-                    skipped_chunks += 1
-                    continue
-                
-                try:
-                    if isinstance(samples, list):
-                        audio_data = np.array(samples, dtype=np.float64)
-                    else:
-                        audio_data = samples.astype(np.float64)
-                    
-                    if len(audio_data) == 0:
-                        skipped_chunks += 1
-                        continue
-                    
-                    if len(audio_data) % 2 != 0:
-                        audio_data = np.append(audio_data, 0)
-                    
-                    start_sample_float = timestamp * sample_rate * 2
-                    start_sample = int(start_sample_float)
-                    sub_sample_offset = start_sample_float - start_sample
-                    
-                    if start_sample >= total_samples:
-                        skipped_chunks += 1
-                        continue
-                    
-                    end_sample = min(start_sample + len(audio_data), total_samples)
-                    audio_length = end_sample - start_sample
-                    
-                    if audio_length > 0:
-                        if sub_sample_offset > 0.01:
-                            interpolated = audio_data[:audio_length].copy()
-                            if audio_length > 1:
-                                interpolated[1:] = (1 - sub_sample_offset) * audio_data[:audio_length-1] + \
-                                                sub_sample_offset * audio_data[1:audio_length]
-                            final_audio[start_sample:end_sample] += interpolated
-                        else:
-                            final_audio[start_sample:end_sample] += audio_data[:audio_length]
-                        
-                        sample_count[start_sample:end_sample] += 1
-                        successful_chunks += 1
-                    else:
-                        skipped_chunks += 1
-                        
-                except Exception as chunk_error:
-                    logger.debug(f"Skipping audio chunk: {chunk_error}")
-                    skipped_chunks += 1
-                    continue
-            
-            logger.info(f"Audio: {successful_chunks} chunks processed, {skipped_chunks} skipped")
-            logger.info(f"👥 Participants: {len(participants_detected)}")
-            logger.info(f"🎤 Sources: {audio_sources['microphone']} mic, {audio_sources.get('screen_share_audio', 0)} screen")
-            
-            max_amplitude_before = np.max(np.abs(final_audio))
-            if max_amplitude_before == 0:
-                logger.warning("No audio signal detected")
-                self._create_silent_audio_s3(audio_s3_key, duration)
-                return
-            
-            overlap_mask = sample_count > 1
-            if np.any(overlap_mask):
-                final_audio[overlap_mask] = final_audio[overlap_mask] / np.sqrt(sample_count[overlap_mask])
-                max_overlap = np.max(sample_count)
-                overlap_percentage = (np.sum(overlap_mask) / len(final_audio)) * 100
-                logger.info(f"🎵 Audio mixing: {max_overlap} max speakers, {overlap_percentage:.1f}% overlap")
-            
-            max_amplitude_after = np.max(np.abs(final_audio))
-            target_amplitude = 18000.0
-            
-            if max_amplitude_after > 28000:
-                threshold = 20000.0
-                ratio = 0.7
-                mask_above = np.abs(final_audio) > threshold
-                final_audio[mask_above] = np.sign(final_audio[mask_above]) * (
-                    threshold + (np.abs(final_audio[mask_above]) - threshold) * ratio
-                )
-                logger.info(f"🔊 AGC: Soft-knee compression applied")
-            elif max_amplitude_after < 8000:
-                boost_ratio = target_amplitude / max_amplitude_after
-                final_audio = final_audio * boost_ratio
-                logger.info(f"🔊 AGC: Boosted {max_amplitude_after:.0f} → {target_amplitude:.0f}")
-            elif max_amplitude_after > 20000:
-                compression_ratio = 18000.0 / max_amplitude_after
-                final_audio = final_audio * compression_ratio
-                logger.info(f"🔊 AGC: Gentle compression")
-            else:
-                logger.info(f"🔊 AGC: Optimal range ({max_amplitude_after:.0f})")
-            
-            final_audio_int16 = np.clip(final_audio, -32768, 32767).astype(np.int16)
-            
-            clipped_samples = np.sum((final_audio < -32768) | (final_audio > 32767))
-            if clipped_samples > 0:
-                clipped_percentage = (clipped_samples / len(final_audio)) * 100
-                if clipped_percentage > 0.1:
-                    logger.warning(f"⚠️ Audio clipping: {clipped_percentage:.3f}%")
-                else:
-                    logger.info(f"✅ Minimal clipping: {clipped_percentage:.3f}%")
-            else:
-                logger.info(f"✅ Perfect audio - no clipping")
-            
-            wav_buffer = io.BytesIO()
-            with wave.open(wav_buffer, 'wb') as wav_file:
-                wav_file.setnchannels(2)
-                wav_file.setsampwidth(2)
-                wav_file.setframerate(sample_rate)
-                wav_file.writeframes(final_audio_int16.tobytes())
-            
-            wav_buffer.seek(0)
-            audio_bytes = wav_buffer.read()
-            
-            s3_client.put_object(
-                Bucket=AWS_S3_BUCKET,
-                Key=audio_s3_key,
-                Body=audio_bytes,
-                ContentType='audio/wav'
-            )
-            
-            audio_duration = len(final_audio_int16) / (sample_rate * 2)
-            file_size = len(audio_bytes)
-            final_max = np.max(np.abs(final_audio_int16))
-            logger.info(f"✅ Audio uploaded to S3: {audio_duration:.1f}s, {file_size:,} bytes, amplitude: {final_max:.0f}")
-            
-        except Exception as e:
-            logger.error(f"Error generating audio: {e}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            self._create_silent_audio_s3(audio_s3_key, duration)
-
     def _create_silent_audio_s3(self, audio_s3_key, duration):
         try:
             sample_rate = 48000
@@ -1135,7 +833,8 @@ class FixedRecordingBot:
     """Fixed recording bot with proper HTTPS/WSS support - NO CHANGES NEEDED"""
     
     def __init__(self, room_url: str, token: str, room_name: str, meeting_id: str,
-                 result_queue: queue.Queue, stop_event: threading.Event):
+                 result_queue: queue.Queue, stop_event: threading.Event,
+                 heartbeat=None, work_dir: Optional[str] = None, segment: int = 0):
         
         self.room_url = room_url
         self.token = token
@@ -1144,11 +843,12 @@ class FixedRecordingBot:
         # self.output_dir = output_dir
         self.result_queue = result_queue
         self.stop_event = stop_event
+        self.heartbeat = heartbeat  # supervised recordings: proves the loop is alive
         
         self.room = None
         self.is_connected = False
         
-        self.stream_recorder = StreamingRecordingWithChunks(meeting_id)  # ✅ Updated!
+        self.stream_recorder = StreamingRecordingWithChunks(meeting_id, work_dir=work_dir, segment=segment)
         
         self.active_video_streams = {}
         self.active_audio_streams = {}
@@ -1163,6 +863,7 @@ class FixedRecordingBot:
             self.room.on("track_unsubscribed", self._on_track_unsubscribed)
             self.room.on("connected", self._on_connected)
             self.room.on("disconnected", self._on_disconnected)
+            self.room.on("active_speakers_changed", self._on_active_speakers_changed)
             
             logger.info(f"🔗 Attempting WSS connection to: {self.room_url}")
             
@@ -1211,6 +912,8 @@ class FixedRecordingBot:
         asyncio.create_task(self._placeholder_generation_loop())
         
         while not self.stop_event.is_set():
+            if self.heartbeat is not None:
+                self.heartbeat()
             await asyncio.sleep(0.1)
         
         self.stream_recorder.stop_recording()
@@ -1219,6 +922,9 @@ class FixedRecordingBot:
 
     async def _placeholder_generation_loop(self):
         """MINIMAL placeholder generation - only when NO video at all"""
+        if self.stream_recorder.compositor is not None:
+            return  # the compositor draws name cards and background itself
+        
         frame_count = 0
         TARGET_FPS = 24
         FRAME_INTERVAL = 1.0 / TARGET_FPS
@@ -1226,14 +932,12 @@ class FixedRecordingBot:
         while not self.stop_event.is_set():
             current_time = time.perf_counter() - self.stream_recorder.start_perf_counter if self.stream_recorder.start_perf_counter else 0
             
-            # Check if we have ANY real video frames recently
-            has_any_video = False
-            if self.stream_recorder.video_frames:
-                latest_real_frame_time = max([
-                    f.timestamp for f in self.stream_recorder.video_frames 
-                    if f.source_type in ["video", "screen_share"]
-                ], default=0)
-                has_any_video = (current_time - latest_real_frame_time) < 2.0  # 2 second timeout
+            # Check if we have ANY real video frames recently (O(1): tracked as frames arrive)
+            latest_real_frame_time = self.stream_recorder.last_real_frame_time
+            has_any_video = (
+                latest_real_frame_time is not None
+                and (current_time - latest_real_frame_time) < 2.0  # 2 second timeout
+            )
             
             # Only generate placeholder if NO video for 2+ seconds
             if not has_any_video:
@@ -1255,9 +959,15 @@ class FixedRecordingBot:
             self.stream_recorder.processing_tracks.add(track.sid)
             
             if track.kind == rtc.TrackKind.KIND_VIDEO:
+                source_type = self._video_source_type(track, publication)
+                # Composited recordings show a presenter's camera and screen share side by side
+                if self.stream_recorder.compositor is not None:
+                    stream_prefix = f"video_{participant.identity}_{source_type}_"
+                else:
+                    stream_prefix = f"video_{participant.identity}_"
                 existing_video_count = sum(
                     1 for k in self.active_video_streams.keys() 
-                    if participant.identity in k
+                    if k.startswith(stream_prefix)
                 )
                 
                 if existing_video_count >= 1:
@@ -1265,8 +975,8 @@ class FixedRecordingBot:
                     self.stream_recorder.processing_tracks.discard(track.sid)
                     return
                 
-                task = asyncio.create_task(self._capture_video_stream(track, participant))
-                self.active_video_streams[f"video_{participant.identity}_{track.sid}"] = task
+                task = asyncio.create_task(self._capture_video_stream(track, participant, source_type))
+                self.active_video_streams[f"video_{participant.identity}_{source_type}_{track.sid}"] = task
                 logger.info(f"✅ Started video capture from {participant.identity}")
                 
             elif track.kind == rtc.TrackKind.KIND_AUDIO:
@@ -1310,6 +1020,7 @@ class FixedRecordingBot:
             self.stream_recorder.processing_tracks.discard(track.sid)
             
             if track.kind == rtc.TrackKind.KIND_VIDEO:
+                self.stream_recorder.remove_video_track(track.sid)
                 for key in list(self.active_video_streams.keys()):
                     if track.sid in key:
                         self.active_video_streams[key].cancel()
@@ -1328,8 +1039,30 @@ class FixedRecordingBot:
         except Exception as e:
             logger.error(f"Track unsubscription error: {e}")
 
-    async def _capture_video_stream(self, track, participant):
+    def _video_source_type(self, track, publication=None):
+        """'screen_share' or 'video' for a video track"""
+        try:
+            if hasattr(track, 'source') and hasattr(track.source, 'name'):
+                return "screen_share" if "screen" in track.source.name.lower() else "video"
+            elif hasattr(publication, 'source'):
+                return "screen_share" if publication.source == rtc.TrackSource.SOURCE_SCREEN_SHARE else "video"
+            else:
+                track_name = getattr(track, 'name', '').lower()
+                return "screen_share" if any(x in track_name for x in ['screen', 'display', 'desktop']) else "video"
+        except:
+            return "video"
+
+    def _on_active_speakers_changed(self, speakers):
+        """Feed the speaker layout; silence keeps the last speaker"""
+        try:
+            if speakers:
+                self.stream_recorder.set_active_speaker(speakers[0].identity)
+        except Exception as e:
+            logger.debug(f"Active speaker update error: {e}")
+
+    async def _capture_video_stream(self, track, participant, source_type="video"):
         """Capture video at EXACTLY 24 FPS with precise timestamps"""
+        composited = self.stream_recorder.compositor is not None
         try:
             stream = rtc.VideoStream(track)
             frame_count = 0
@@ -1340,6 +1073,9 @@ class FixedRecordingBot:
             # Track actual FPS for logging
             capture_start_time = time.perf_counter()
             
+            if composited:
+                self.stream_recorder.add_video_track(track.sid, participant.identity, source_type)
+            
             async for frame_event in stream:
                 if self.stop_event.is_set():
                     break
@@ -1353,34 +1089,33 @@ class FixedRecordingBot:
                 
                 frame = frame_event.frame if hasattr(frame_event, 'frame') else frame_event
                 
-                if frame:
+                if not frame:
+                    continue
+                
+                if composited:
+                    # Decoding happens on the compositor's workers, off the event loop
+                    self.stream_recorder.add_track_frame(track.sid, frame, self._convert_frame_to_opencv)
+                else:
                     cv_frame = self._convert_frame_to_opencv(frame)
-                    
-                    if cv_frame is not None:
-                        try:
-                            if hasattr(track, 'source') and hasattr(track.source, 'name'):
-                                source_type = "screen_share" if "screen" in track.source.name.lower() else "video"
-                            elif hasattr(publication, 'source'):
-                                source_type = "screen_share" if publication.source == rtc.TrackSource.SOURCE_SCREEN_SHARE else "video"
-                            else:
-                                track_name = getattr(track, 'name', '').lower()
-                                source_type = "screen_share" if any(x in track_name for x in ['screen', 'display', 'desktop']) else "video"
-                        except:
-                            source_type = "video"
-                        
-                        self.stream_recorder.add_video_frame(cv_frame, source_type)
-                        last_capture_time = current_time
-                        frame_count += 1
-                        
-                        if frame_count % 100 == 0:
-                            elapsed = current_time - capture_start_time
-                            actual_fps = frame_count / elapsed if elapsed > 0 else 0
-                            logger.info(f"Captured {frame_count} {source_type} frames from {participant.identity} (avg {actual_fps:.1f} fps)")
+                    if cv_frame is None:
+                        continue
+                    self.stream_recorder.add_video_frame(cv_frame, source_type)
+                
+                last_capture_time = current_time
+                frame_count += 1
+                
+                if frame_count % 100 == 0:
+                    elapsed = current_time - capture_start_time
+                    actual_fps = frame_count / elapsed if elapsed > 0 else 0
+                    logger.info(f"Captured {frame_count} {source_type} frames from {participant.identity} (avg {actual_fps:.1f} fps)")
             
             logger.info(f"Video capture completed: {frame_count} frames from {participant.identity}")
             
         except Exception as e:
             logger.error(f"Video capture error: {e}")
+        finally:
+            if composited:
+                self.stream_recorder.remove_video_track(track.sid)
 
     async def _capture_audio_stream(self, track, participant, track_source="microphone"):
         """Capture audio stream with proper source detection"""
@@ -1399,7 +1134,7 @@ class FixedRecordingBot:
                 if frame:
                     samples = self._convert_frame_to_audio_simple(frame)
                     
-                    if samples:
+                    if samples is not None and len(samples) > 0:
                         self.stream_recorder.add_audio_samples(
                             samples, 
                             participant.identity,
@@ -1462,7 +1197,7 @@ class FixedRecordingBot:
             return None
 
     def _convert_frame_to_audio_simple(self, frame):
-        """Convert LiveKit audio frame to samples with proper format detection"""
+        """Convert LiveKit audio frame to interleaved stereo int16 with proper format detection"""
         try:
             if not frame or not hasattr(frame, 'data') or not frame.data:
                 return None
@@ -1482,14 +1217,12 @@ class FixedRecordingBot:
                     return None
                 
                 if num_channels == 1:
-                    stereo_audio = np.repeat(audio_array, 2)
-                    return stereo_audio.tolist()
+                    return np.repeat(audio_array, 2)
                 elif num_channels == 2:
-                    return audio_array.tolist()
+                    return audio_array
                 else:
                     reshaped = audio_array.reshape(-1, num_channels)
-                    stereo_audio = reshaped[:, :2].flatten()
-                    return stereo_audio.tolist()
+                    return reshaped[:, :2].flatten()
                 
             except:
                 try:
@@ -1501,14 +1234,12 @@ class FixedRecordingBot:
                         return None
                     
                     if num_channels == 1:
-                        stereo_audio = np.repeat(audio_array, 2)
-                        return stereo_audio.tolist()
+                        return np.repeat(audio_array, 2)
                     elif num_channels == 2:
-                        return audio_array.tolist()
+                        return audio_array
                     else:
                         reshaped = audio_array.reshape(-1, num_channels)
-                        stereo_audio = reshaped[:, :2].flatten()
-                        return stereo_audio.tolist()
+                        return reshaped[:, :2].flatten()
                     
                 except:
                     return None
@@ -1542,6 +1273,7 @@ class FixedRecordingBot:
             
             self.final_video_path = video_path
             self.final_audio_path = audio_path
+            self.final_local_path = self.stream_recorder.final_local_path
             
             if self.room and self.is_connected:
                 try:
@@ -1625,8 +1357,14 @@ class FixedGoogleMeetRecorder:
         if not room_name:
             room_name = f"meeting_{meeting_id}"
         
+        supervisor = get_recording_supervisor()
         with self._global_lock:
-            if meeting_id in self.active_recordings:
+            if supervisor is not None:
+                status = supervisor.status(meeting_id)
+                active = status is not None and status["state"] not in ("done", "failed")
+            else:
+                active = meeting_id in self.active_recordings
+            if active:
                 return {
                     "status": "already_active",
                     "message": "Recording already in progress",
@@ -1689,6 +1427,23 @@ class FixedGoogleMeetRecorder:
     def _start_simple_recording(self, room_name: str, meeting_id: str, host_user_id: str,
                                recording_doc_id: str, recorder_identity: str) -> Tuple[bool, Optional[str]]:
         """Start simple recording process"""
+        supervisor = get_recording_supervisor()
+        if supervisor is not None:
+            # The worker process joins the room itself; start() returns once it has
+            try:
+                result = supervisor.start({
+                    "meeting_id": meeting_id,
+                    "room_url": self.livekit_wss_url,
+                    "room_name": room_name,
+                    "recorder_identity": recorder_identity,
+                    "host_user_id": host_user_id,
+                    "recording_doc_id": recording_doc_id,
+                })
+                return result['ok'], result.get('error')
+            except Exception as e:
+                logger.error(f"❌ Error starting supervised recording: {e}")
+                return False, str(e)
+        
         try:
             recorder_token = self.generate_recorder_token(room_name, recorder_identity)
             
@@ -1731,7 +1486,8 @@ class FixedGoogleMeetRecorder:
 
     def _run_simple_recording_task(self, room_url: str, token: str, room_name: str,
                                   meeting_id: str, result_queue: queue.Queue, 
-                                  stop_event: threading.Event):
+                                  stop_event: threading.Event, heartbeat=None,
+                                  work_dir: Optional[str] = None, segment: int = 0):
         """Run simple recording task"""
         identifier = f"simple_recording_{meeting_id}"
         loop = None
@@ -1748,17 +1504,25 @@ class FixedGoogleMeetRecorder:
                 meeting_id=meeting_id,
                 # output_dir=output_dir,
                 result_queue=result_queue,
-                stop_event=stop_event
+                stop_event=stop_event,
+                heartbeat=heartbeat,
+                work_dir=work_dir,
+                segment=segment
             )
             
-            result = loop_manager.safe_run_until_complete(
+            loop_manager.safe_run_until_complete(
                 loop, 
                 bot.run_recording(),
                 timeout=None,
                 identifier=identifier
             )
             
-            return result
+            # S3 keys (final MP4, or raw video/audio) and the local MP4 copy, for _async_finalize_recording
+            return (
+                getattr(bot, 'final_video_path', None),
+                getattr(bot, 'final_audio_path', None),
+                getattr(bot, 'final_local_path', None),
+            )
             
         except Exception as e:
             logger.error(f"❌ Simple recording task error: {e}")
@@ -1770,7 +1534,66 @@ class FixedGoogleMeetRecorder:
             if loop:
                 loop_manager.force_cleanup_loop(loop, identifier)
 
+    def run_supervised_recording(self, spec: Dict, channel) -> Dict:
+        """
+        Body of a supervised recording worker (supervisor.py): record until
+        stopped, finalize, post-process. spec['mode'] says where a restarted
+        worker resumes; failures raise so the supervisor restarts it.
+        """
+        meeting_id = spec['meeting_id']
+        mode = spec.get('mode', 'record')
+        work_dir = spec['work_dir']
+        segment = spec.get('segment', 0)
+        raw_keys = None
+        
+        if mode == 'record':
+            token = self.generate_recorder_token(spec['room_name'], spec['recorder_identity'])
+            raw_keys = self._run_simple_recording_task(
+                spec['room_url'], token, spec['room_name'], meeting_id,
+                channel, channel.stop_event,
+                heartbeat=channel.tick, work_dir=work_dir, segment=segment
+            )
+        elif mode == 'process':
+            raw_keys = spec['raw_keys']
+        
+        channel.set_state('stopping')
+        if (not raw_keys or not raw_keys[0]) and mode != 'process':
+            # The bot never got to finalize (rejoin failed, or finalize-only restart)
+            recorder = StreamingRecordingWithChunks(meeting_id, work_dir=work_dir, segment=segment)
+            video_key, audio_key = recorder.finalize_segments()
+            raw_keys = (video_key, audio_key, recorder.final_local_path)
+        if not raw_keys or not raw_keys[0]:
+            raise RuntimeError(f"No recording to finalize for {meeting_id}")
+        
+        channel.send('finalized', list(raw_keys))
+        channel.set_state('processing')
+        self._post_process_recording(meeting_id, spec, raw_keys)
+        return {"final_video": raw_keys[0]}
+
     def stop_stream_recording(self, meeting_id: str) -> Dict:
+        supervisor = get_recording_supervisor()
+        if supervisor is not None:
+            try:
+                stopped = supervisor.stop(meeting_id)
+            except Exception as e:
+                logger.error(f"❌ Error stopping recording: {e}")
+                return {
+                    "status": "error",
+                    "message": f"Failed to stop recording: {str(e)}",
+                    "meeting_id": meeting_id
+                }
+            if not stopped:
+                return {
+                    "status": "error",
+                    "message": "No active recording found",
+                    "meeting_id": meeting_id
+                }
+            return {
+                "status": "success",
+                "message": "Recording stopped. Processing will continue in background.",
+                "meeting_id": meeting_id
+            }
+        
         with self._global_lock:
             if meeting_id not in self.active_recordings:
                 return {
@@ -1832,73 +1655,89 @@ class FixedGoogleMeetRecorder:
         """Run full S3/FFmpeg finalization in the background."""
         try:
             recording_future = recording_info.get("recording_future")
+            raw_keys = None
             if recording_future:
                 logger.info(f"🎬 Background finalization started for {meeting_id}")
-                recording_future.result()  # runs full sync finalize
+                raw_keys = recording_future.result()  # runs full sync finalize
                 logger.info(f"✅ Background finalization done for {meeting_id}")
             else:
                 logger.warning(f"⚠️ No recording_future found for {meeting_id}")
 
-            # ====== CONTINUE FULL POST-PROCESSING ======
-            s3_prefix = f"{S3_FOLDERS['recordings_temp']}/{meeting_id}"
-            raw_video_s3_key = f"{s3_prefix}/raw_video_{meeting_id}.avi"
-            raw_audio_s3_key = f"{s3_prefix}/raw_audio_{meeting_id}.wav"
+            self._post_process_recording(meeting_id, recording_info, raw_keys)
 
-            # 1️⃣ Create final MP4 file
+        except Exception as e:
+            logger.error(f"❌ Background finalization failed for {meeting_id}: {e}")
+            import traceback
+            logger.error(traceback.format_exc())
+
+    def _post_process_recording(self, meeting_id: str, recording_info: dict, raw_keys=None):
+        """Final MP4, processing pipeline, temp cleanup and DB update for a stopped recording"""
+        s3_prefix = f"{S3_FOLDERS['recordings_temp']}/{meeting_id}"
+        raw_video_s3_key = f"{s3_prefix}/raw_video_{meeting_id}.ts"
+        raw_audio_s3_key = f"{s3_prefix}/raw_audio_{meeting_id}.wav"
+        local_video_path = None
+        if raw_keys and raw_keys[0]:
+            raw_video_s3_key, raw_audio_s3_key = raw_keys[0], raw_keys[1] or raw_audio_s3_key
+            local_video_path = raw_keys[2]
+
+        # 1️⃣ Create final MP4 file (already done in one pass unless that failed)
+        if raw_video_s3_key.endswith('_final.mp4'):
+            final_video_s3_key = raw_video_s3_key
+            logger.info(f"✅ Final MP4 already in S3: {final_video_s3_key}")
+        else:
             final_video_s3_key = self._create_final_video_simple_s3(
                 raw_video_s3_key, raw_audio_s3_key, meeting_id
             )
 
-            if not final_video_s3_key:
-                logger.error(f"❌ Failed to create final video for {meeting_id}")
-                return
-
-            # 2️⃣ Trigger pipeline
-            processing_result = None
-            try:
-                processing_result = self._trigger_processing_pipeline(
-                    final_video_s3_key, meeting_id,
-                    recording_info.get("host_user_id"),
-                    recording_info.get("recording_doc_id")
-                )
-                logger.info(f"✅ Triggered processing pipeline for {meeting_id}")
-            except Exception as e:
-                logger.error(f"⚠️ Pipeline trigger failed for {meeting_id}: {e}")
-
-            # 3️⃣ Clean up temp S3 folder
-            try:
-                logger.info(f"🧹 Deleting temp S3 folder: {s3_prefix}")
-                self._delete_s3_folder(s3_prefix)
-            except Exception as e:
-                logger.warning(f"⚠️ Could not delete temp folder: {e}")
+        if not final_video_s3_key:
+            logger.error(f"❌ Failed to create final video for {meeting_id}")
+            return
 
-            # 4️⃣ Update DB
-            try:
-                self.collection.update_one(
-                    {"_id": recording_info.get("recording_doc_id")},
-                    {"$set": {
-                        "recording_status": "completed",
-                        "completed_at": datetime.now(),
-                        "file_path": final_video_s3_key,
-                        "processing_result": processing_result
-                    }}
-                )
-                logger.info(f"✅ DB updated for {meeting_id}")
-            except Exception as db_err:
-                logger.warning(f"⚠️ DB update failed: {db_err}")
+        # 2️⃣ Trigger pipeline
+        processing_result = None
+        try:
+            processing_result = self._trigger_processing_pipeline(
+                final_video_s3_key, meeting_id,
+                recording_info.get("host_user_id"),
+                recording_info.get("recording_doc_id"),
+                local_video_path=local_video_path
+            )
+            logger.info(f"✅ Triggered processing pipeline for {meeting_id}")
+        except Exception as e:
+            logger.error(f"⚠️ Pipeline trigger failed for {meeting_id}: {e}")
+        finally:
+            if local_video_path and os.path.exists(local_video_path):
+                os.remove(local_video_path)
 
+        # 3️⃣ Clean up temp S3 folder
+        try:
+            logger.info(f"🧹 Deleting temp S3 folder: {s3_prefix}")
+            self._delete_s3_folder(s3_prefix)
         except Exception as e:
-            logger.error(f"❌ Background finalization failed for {meeting_id}: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.warning(f"⚠️ Could not delete temp folder: {e}")
+
+        # 4️⃣ Update DB
+        try:
+            self.collection.update_one(
+                {"_id": recording_info.get("recording_doc_id")},
+                {"$set": {
+                    "recording_status": "completed",
+                    "completed_at": datetime.now(),
+                    "file_path": final_video_s3_key,
+                    "processing_result": processing_result
+                }}
+            )
+            logger.info(f"✅ DB updated for {meeting_id}")
+        except Exception as db_err:
+            logger.warning(f"⚠️ DB update failed: {db_err}")
 
     def _create_final_video_simple_s3(self, video_s3_key: str, audio_s3_key: Optional[str] = None, 
                               meeting_id: Optional[str] = None) -> Optional[str]:
         """
-        Create final MP4 by:
-        1. Download raw AVI from S3 to temp file
+        Fallback when the one-pass finalize failed. Create final MP4 by:
+        1. Download raw AVI (or H.264 TS) from S3 to temp file
         2. Download raw WAV from S3 to temp file
-        3. Use FFmpeg to merge locally
+        3. Use FFmpeg to merge locally (TS video is already H.264: stream copy)
         4. Upload final MP4 to S3
         5. Clean up everything
         """
@@ -1909,12 +1748,15 @@ class FixedGoogleMeetRecorder:
         try:
             import tempfile
             
-            final_output_key = video_s3_key.replace('.avi', '_final.mp4')
+            video_ext = os.path.splitext(video_s3_key)[1] or '.avi'
+            final_output_key = video_s3_key[:-len(video_ext)] + '_final.mp4'
+            # Live-encoded recordings are H.264 already; only the audio needs encoding
+            copy_video = video_ext == '.ts'
             
             logger.info(f"Creating final video with PERFECT SYNC from S3")
             
             # STEP 1: Create temp files
-            temp_video_fd, temp_video_file = tempfile.mkstemp(suffix='.avi', prefix='raw_video_')
+            temp_video_fd, temp_video_file = tempfile.mkstemp(suffix=video_ext, prefix='raw_video_')
             os.close(temp_video_fd)
             
             temp_audio_fd, temp_audio_file = tempfile.mkstemp(suffix='.wav', prefix='raw_audio_')
@@ -1943,22 +1785,31 @@ class FixedGoogleMeetRecorder:
                 logger.error(f"❌ Failed to download audio from S3: {e}")
                 return None
             
-            # STEP 4: Check GPU availability
-            nvenc_available = False
-            try:
-                result = subprocess.run(
-                    ['ffmpeg', '-hide_banner', '-encoders'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                nvenc_available = 'h264_nvenc' in result.stdout
-                logger.info(f"NVENC availability: {nvenc_available}")
-            except Exception as e:
-                logger.warning(f"Could not check NVENC: {e}")
+            # STEP 4: Check GPU availability (cached, see encoder_registry.py)
+            encoder_registry = get_encoder_registry()
+            nvenc_available = encoder_registry.capabilities().nvenc
+            logger.info(f"NVENC availability: {nvenc_available}")
             
             # STEP 5: Build FFmpeg command to merge locally
-            if nvenc_available:
+            if copy_video:
+                logger.info("⚡ Live-encoded video - stream copy, audio only")
+                ffmpeg_cmd = [
+                    'ffmpeg', '-y',
+                    '-i', temp_video_file,
+                    '-i', temp_audio_file,
+                    '-map', '0:v:0',
+                    '-map', '1:a:0',
+                    '-c:v', 'copy',
+                    '-c:a', 'aac',
+                    '-b:a', '192k',
+                    '-ar', '48000',
+                    '-ac', '2',
+                    '-af', 'asetpts=PTS-STARTPTS',
+                    '-movflags', '+faststart',
+                    '-max_interleave_delta', '0',
+                    temp_final_file
+                ]
+            elif nvenc_available:
                 logger.info("🚀 GPU ACCELERATION - PERFECT SYNC MODE")
                 ffmpeg_cmd = [
                     'ffmpeg', '-y',
@@ -1984,13 +1835,14 @@ class FixedGoogleMeetRecorder:
                     temp_final_file
                 ]
             else:
-                logger.info("⚙️ Using CPU encoding - PERFECT SYNC MODE")
+                cpu_preset = encoder_registry.choose_x264_preset()
+                logger.info(f"⚙️ Using CPU encoding ({cpu_preset}) - PERFECT SYNC MODE")
                 ffmpeg_cmd = [
                     'ffmpeg', '-y',
                     '-i', temp_video_file,
                     '-i', temp_audio_file,
                     '-c:v', 'libx264',
-                    '-preset', 'medium',
+                    '-preset', cpu_preset,
                     '-crf', '21',
                     '-pix_fmt', 'yuv420p',
                     '-fps_mode', 'cfr',
@@ -2017,13 +1869,14 @@ class FixedGoogleMeetRecorder:
             ffmpeg_env['CUDA_DEVICE_ORDER'] = 'PCI_BUS_ID'
             ffmpeg_env.pop('NVIDIA_DISABLE', None)
             
-            result = subprocess.run(
-                ffmpeg_cmd,
-                capture_output=True,
-                text=True,
-                env=ffmpeg_env,
-                timeout=None
-            )
+            with encoder_registry.encoding():
+                result = subprocess.run(
+                    ffmpeg_cmd,
+                    capture_output=True,
+                    text=True,
+                    env=ffmpeg_env,
+                    timeout=None
+                )
             
             if result.returncode != 0:
                 logger.error(f"❌ FFmpeg failed with return code: {result.returncode}")
@@ -2122,8 +1975,9 @@ class FixedGoogleMeetRecorder:
             logger.error(f"Error deleting S3 folder: {e}")
             
     def _trigger_processing_pipeline(self, video_file_path: str, meeting_id: str,
-                               host_user_id: str, recording_doc_id: str) -> Dict:
-        """Trigger the video processing pipeline - DOWNLOAD FROM S3 FIRST"""
+                               host_user_id: str, recording_doc_id: str,
+                               local_video_path: Optional[str] = None) -> Dict:
+        """Trigger the video processing pipeline - uses local_video_path if given, else DOWNLOADS FROM S3 FIRST"""
         try:
             import tempfile
             import os
@@ -2144,40 +1998,45 @@ class FixedGoogleMeetRecorder:
             
             logger.info(f"📍 S3 Key: {s3_key}")
             
-            # ✅ FIX: Download S3 file to temp location before processing
-            logger.info(f"📥 Downloading video from S3...")
-            
-            # Create temp file for downloaded video
-            temp_fd, temp_video_path = tempfile.mkstemp(
-                suffix='.mp4',
-                prefix=f'process_video_{meeting_id}_'
-            )
-            os.close(temp_fd)
+            if local_video_path and os.path.exists(local_video_path) and os.path.getsize(local_video_path) > 0:
+                # One-pass finalize kept the bytes it uploaded; no need to download them back
+                temp_video_path = local_video_path
+                logger.info(f"✅ Using local copy of final video: {temp_video_path}")
+            else:
+                # ✅ FIX: Download S3 file to temp location before processing
+                logger.info(f"📥 Downloading video from S3...")
             
-            try:
-                # Download from S3
-                s3_client.download_file(
-                    Bucket=AWS_S3_BUCKET,
-                    Key=s3_key,
-                    Filename=temp_video_path
+                # Create temp file for downloaded video
+                temp_fd, temp_video_path = tempfile.mkstemp(
+                    suffix='.mp4',
+                    prefix=f'process_video_{meeting_id}_'
                 )
+                os.close(temp_fd)
+            
+                try:
+                    # Download from S3
+                    s3_client.download_file(
+                        Bucket=AWS_S3_BUCKET,
+                        Key=s3_key,
+                        Filename=temp_video_path
+                    )
                 
-                file_size = os.path.getsize(temp_video_path)
-                logger.info(f"✅ Downloaded video: {file_size:,} bytes from S3")
+                    file_size = os.path.getsize(temp_video_path)
+                    logger.info(f"✅ Downloaded video: {file_size:,} bytes from S3")
                 
-                if file_size == 0:
-                    raise Exception("Downloaded video file is empty")
+                    if file_size == 0:
+                        raise Exception("Downloaded video file is empty")
                 
-            except Exception as download_error:
-                logger.error(f"❌ Failed to download video from S3: {download_error}")
-                raise Exception(f"S3 download failed: {str(download_error)}")
+                except Exception as download_error:
+                    logger.error(f"❌ Failed to download video from S3: {download_error}")
+                    raise Exception(f"S3 download failed: {str(download_error)}")
             
             # ✅ NOW pass local file path to process_video_sync
             logger.info(f"🎬 Passing local file to video processing: {temp_video_path}")
             
             from core.UserDashBoard.recordings import process_video_sync
             
-            result = process_video_sync(temp_video_path, meeting_id, host_user_id)
+            result = process_video_sync(temp_video_path, meeting_id, host_user_id, recorder_output=True)
             
             # Clean up temp file after processing
             try:
@@ -2240,6 +2099,20 @@ class FixedGoogleMeetRecorder:
 
     def get_recording_status(self, meeting_id: str) -> Dict:
         """Get current recording status"""
+        supervisor = get_recording_supervisor()
+        if supervisor is not None:
+            worker = supervisor.status(meeting_id)
+            if worker is not None:
+                is_active = worker["state"] in ("starting", "recording", "restarting") and worker["mode"] == "record"
+                return {
+                    "meeting_id": meeting_id,
+                    "status": "active" if is_active else worker["state"],
+                    "start_time": worker["start_time"],
+                    "room_name": worker["room_name"],
+                    "is_active": is_active,
+                    "worker": worker
+                }
+        
         with self._global_lock:
             if meeting_id in self.active_recordings:
                 recording_info = self.active_recordings[meeting_id]
@@ -2259,6 +2132,10 @@ class FixedGoogleMeetRecorder:
 
     def list_active_recordings(self) -> List[Dict]:
         """List all active recordings"""
+        supervisor = get_recording_supervisor()
+        if supervisor is not None:
+            return supervisor.list()
+        
         with self._global_lock:
             return [
                 {
@@ -2289,6 +2166,16 @@ def cleanup_recording_service():
                 except Exception as e:
                     logger.error(f"Error stopping recording {meeting_id}: {e}")
         
+        # In-process supervisor: workers finalize after the stop (they are not daemonic).
+        # A standalone supervisor keeps its recordings running across web restarts.
+        supervisor = get_recording_supervisor()
+        if isinstance(supervisor, RecordingSupervisor):
+            for worker in supervisor.list():
+                try:
+                    supervisor.stop(worker["meeting_id"])
+                except Exception as e:
+                    logger.error(f"Error stopping recording {worker['meeting_id']}: {e}")
+        
         fixed_google_meet_recorder.thread_pool.shutdown(wait=False)
         loop_manager.cleanup_all_loops()
         logger.info("✅ Recording service shutdown completed")
@@ -0,0 +1,274 @@
+"""
+Segment Transcode - Encode long recordings as parallel keyframe segments
+========================================================================
+
+process_video_sync encodes a recording with one libx264 process. x264's
+own threading stops scaling long before a many-core CPU node is busy, so a
+2-hour meeting takes most of an hour on a machine that is mostly idle.
+
+transcode_in_segments() splits the work instead:
+1. the video stream is cut into about WORKERS * SEGMENTS_PER_WORKER pieces
+   with ffmpeg's segment muxer (stream copy). It only cuts at keyframes, so
+   every piece decodes on its own and no frame is lost or duplicated.
+2. the pieces are encoded concurrently, one ffmpeg per piece. No more than
+   WORKERS encodes run at once in the process, however many jobs share it,
+   and each gets cpu_count / WORKERS threads.
+3. the encoded pieces are joined with the concat demuxer (stream copy).
+   The audio is muxed straight from the original in the same pass, so it is
+   never cut and AAC priming cannot add gaps at the joins. Any start offset
+   between video and audio in the input is carried over.
+4. validate_transcode() compares the output with the input: the video frame
+   count, the duration, and the audio/video start offset and length
+   difference. Any mismatch raises, and the caller falls back to the
+   single-process encode.
+
+Inputs shorter than MIN_DURATION_SECONDS, or with too few keyframes to cut,
+raise SegmentTranscodeSkipped, which also means "use the single encode".
+"""
+
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("segment_transcode")
+
+
+class SegmentTranscodeConfig:
+    """Segment-parallel transcode configuration"""
+    ENABLED = os.getenv("VIDEO_PARALLEL_TRANSCODE", "True") == "True"
+    MIN_DURATION_SECONDS = float(os.getenv("VIDEO_PARALLEL_MIN_DURATION", 600))
+    WORKERS = int(os.getenv("VIDEO_PARALLEL_WORKERS", max(1, min(8, (os.cpu_count() or 1) // 2))))
+    SEGMENTS_PER_WORKER = 2         # smaller pieces even out slow (busy) stretches of the meeting
+    MIN_SEGMENT_SECONDS = 30.0
+    AUDIO_BITRATE = "192k"
+    # Rate control, profile/level and frame timing for each piece. process_video_sync
+    # passes the args of the single-process libx264 command the segments replace,
+    # so both paths produce the same stream; this default is its MP4-with-audio one.
+    VIDEO_ARGS = [
+        '-crf', '23', '-maxrate', '10M', '-bufsize', '20M',
+        '-profile:v', 'baseline', '-level', '3.1',
+        '-vsync', 'cfr',
+    ]
+    MOVFLAGS = '+faststart+frag_keyframe+separate_moof+omit_tfhd_offset'
+    SEGMENT_TIMEOUT = 1800
+    # Validation tolerances
+    DURATION_TOLERANCE = 0.5        # seconds, or 0.1% of the duration if larger
+    SYNC_TOLERANCE = 0.05           # seconds of A/V offset drift
+
+
+class SegmentTranscodeSkipped(Exception):
+    """Input is not worth splitting; use the single-process encode"""
+
+
+# Caps concurrent segment encodes across all jobs in this process
+_encode_slots = threading.BoundedSemaphore(max(1, SegmentTranscodeConfig.WORKERS))
+
+
+def probe(path: str) -> Dict:
+    result = subprocess.run(
+        ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_streams', '-show_format', path],
+        capture_output=True, text=True, check=True, timeout=60
+    )
+    return json.loads(result.stdout)
+
+
+def count_video_frames(path: str) -> int:
+    """Video packets in the file (demux only, no decode)"""
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-count_packets',
+         '-show_entries', 'stream=nb_read_packets', '-of', 'csv=p=0', path],
+        capture_output=True, text=True, check=True, timeout=600
+    )
+    return int(result.stdout.strip().split(',')[0] or 0)
+
+
+def _stream(info: Dict, codec_type: str) -> Optional[Dict]:
+    return next((s for s in info.get('streams', []) if s.get('codec_type') == codec_type), None)
+
+
+def _float(value, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _av_timing(info: Dict) -> Dict:
+    """Start offset of audio against video and each stream's length, in seconds"""
+    video, audio = _stream(info, 'video'), _stream(info, 'audio')
+    duration = _float(info.get('format', {}).get('duration'))
+    timing = {
+        'duration': duration,
+        'video_start': _float(video.get('start_time')) if video else 0.0,
+        'video_duration': _float(video.get('duration'), duration) if video else 0.0,
+    }
+    if audio:
+        timing['audio_start'] = _float(audio.get('start_time'))
+        timing['audio_duration'] = _float(audio.get('duration'), duration)
+    return timing
+
+
+def validate_transcode(input_info: Dict, output_path: str, input_frames: Optional[int] = None,
+                       config=SegmentTranscodeConfig) -> Dict:
+    """Raise ValueError if output_path lost frames, duration or A/V sync against the input"""
+    output_info = probe(output_path)
+    before, after = _av_timing(input_info), _av_timing(output_info)
+    report = {'input': before, 'output': after}
+
+    if input_frames is not None:
+        output_frames = count_video_frames(output_path)
+        report['frames'] = (input_frames, output_frames)
+        if output_frames != input_frames:
+            raise ValueError(f"video frame count {output_frames} != input {input_frames}")
+
+    tolerance = max(config.DURATION_TOLERANCE, before['duration'] * 0.001)
+    if abs(after['duration'] - before['duration']) > tolerance:
+        raise ValueError(f"duration {after['duration']:.2f}s != input {before['duration']:.2f}s")
+
+    if 'audio_start' in before:
+        if 'audio_start' not in after:
+            raise ValueError("output has no audio stream")
+        offset_before = before['audio_start'] - before['video_start']
+        offset_after = after['audio_start'] - after['video_start']
+        if abs(offset_after - offset_before) > config.SYNC_TOLERANCE:
+            raise ValueError(f"A/V start offset {offset_after:+.3f}s != input {offset_before:+.3f}s")
+        # Both streams should end where they ended before (no drift over the joins)
+        gap_before = before['audio_duration'] - before['video_duration']
+        gap_after = after['audio_duration'] - after['video_duration']
+        if abs(gap_after - gap_before) > tolerance:
+            raise ValueError(f"A/V length difference {gap_after:+.3f}s != input {gap_before:+.3f}s")
+    return report
+
+
+def _run(cmd: List[str], timeout: float):
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with {result.returncode}: {result.stderr[-1000:]}")
+
+
+def _split(input_path: str, work_dir: str, segment_seconds: float) -> List[str]:
+    """Stream-copy the video into pieces starting at the first keyframe after each boundary"""
+    pattern = os.path.join(work_dir, 'source_%04d.mkv')
+    _run([
+        'ffmpeg', '-y', '-nostats', '-loglevel', 'error',
+        '-i', input_path,
+        '-map', '0:v:0', '-c', 'copy',
+        '-f', 'segment',
+        '-segment_time', f'{segment_seconds:.3f}',
+        '-segment_format', 'matroska',
+        '-reset_timestamps', '1',
+        pattern
+    ], timeout=1800)
+    return sorted(
+        os.path.join(work_dir, name) for name in os.listdir(work_dir)
+        if name.startswith('source_') and os.path.getsize(os.path.join(work_dir, name)) > 0
+    )
+
+
+def _encode_piece(source: str, output: str, preset: str, threads: int, video_args: List[str], config) -> float:
+    with _encode_slots:
+        started = time.perf_counter()
+        _run([
+            'ffmpeg', '-y', '-nostats', '-loglevel', 'error',
+            '-i', source,
+            '-map', '0:v:0',
+            '-c:v', 'libx264', '-preset', preset,
+            *video_args,
+            '-pix_fmt', 'yuv420p',
+            '-threads', str(threads),
+            '-f', 'mpegts',
+            output
+        ], timeout=config.SEGMENT_TIMEOUT)
+        return time.perf_counter() - started
+
+
+def transcode_in_segments(input_path: str, output_path: str, work_dir: str, preset: str = 'fast',
+                          input_info: Optional[Dict] = None, config=SegmentTranscodeConfig,
+                          video_args: Optional[List[str]] = None, movflags: Optional[str] = None) -> Dict:
+    """
+    Encode input_path to an H.264/AAC MP4 at output_path, video in parallel
+    segments. video_args (libx264 rate control, profile, level, vsync) and
+    movflags default to config.VIDEO_ARGS / config.MOVFLAGS; callers replacing
+    a single-process encode pass that command's values. work_dir must exist
+    and is left for the caller to delete. Returns a report; raises
+    SegmentTranscodeSkipped when the input is too short to split, any other
+    exception when the result is unusable.
+    """
+    video_args = list(video_args if video_args is not None else config.VIDEO_ARGS)
+    movflags = movflags or config.MOVFLAGS
+    started = time.perf_counter()
+    input_info = input_info or probe(input_path)
+    timing = _av_timing(input_info)
+    if not config.ENABLED or config.WORKERS < 2:
+        raise SegmentTranscodeSkipped("parallel transcode disabled")
+    if timing['duration'] < config.MIN_DURATION_SECONDS:
+        raise SegmentTranscodeSkipped(f"{timing['duration']:.0f}s is below {config.MIN_DURATION_SECONDS:.0f}s")
+
+    segment_count = config.WORKERS * config.SEGMENTS_PER_WORKER
+    segment_seconds = max(config.MIN_SEGMENT_SECONDS, timing['duration'] / segment_count)
+    sources = _split(input_path, work_dir, segment_seconds)
+    if len(sources) < 2:
+        raise SegmentTranscodeSkipped("not enough keyframes to split")
+    split_s = time.perf_counter() - started
+
+    threads = max(1, (os.cpu_count() or 1) // config.WORKERS)
+    outputs = [source.replace('source_', 'encoded_').replace('.mkv', '.ts') for source in sources]
+    encode_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=config.WORKERS, thread_name_prefix="SegmentTranscode") as pool:
+        futures = [
+            pool.submit(_encode_piece, source, output, preset, threads, video_args, config)
+            for source, output in zip(sources, outputs)
+        ]
+        piece_seconds = [future.result() for future in futures]
+    encode_s = time.perf_counter() - encode_started
+
+    list_path = os.path.join(work_dir, 'encoded.txt')
+    with open(list_path, 'w') as f:
+        for output in outputs:
+            f.write(f"file '{output}'\n")
+
+    # The pieces start at 0. ffmpeg already shifts the original's audio by the
+    # file's start time, so only video that started after the audio needs delaying.
+    video_delay = timing['video_start'] - min(timing['video_start'], timing.get('audio_start', timing['video_start']))
+    cmd = ['ffmpeg', '-y', '-nostats', '-loglevel', 'error']
+    if video_delay > 0:
+        cmd += ['-itsoffset', f'{video_delay:.6f}']
+    cmd += ['-f', 'concat', '-safe', '0', '-i', list_path]
+    audio = _stream(input_info, 'audio')
+    if audio:
+        cmd += ['-i', input_path, '-map', '0:v:0', '-map', '1:a:0', '-c:v', 'copy']
+        if audio.get('codec_name') == 'aac':
+            cmd += ['-c:a', 'copy']
+        else:
+            cmd += ['-c:a', 'aac', '-ar', '44100', '-ac', '2', '-b:a', config.AUDIO_BITRATE]
+    else:
+        cmd += [
+            '-f', 'lavfi', '-i', 'anullsrc=channel_layout=stereo:sample_rate=44100',
+            '-map', '0:v:0', '-map', '1:a:0', '-c:v', 'copy',
+            '-c:a', 'aac', '-ar', '44100', '-ac', '2', '-b:a', '64k', '-shortest'
+        ]
+    cmd += ['-movflags', movflags, output_path]
+    _run(cmd, timeout=1800)
+
+    # Without input audio only frames and duration are compared; the silent track has nothing to be in sync with
+    report = validate_transcode(input_info, output_path, count_video_frames(input_path), config)
+    report.update({
+        'segments': len(sources),
+        'workers': config.WORKERS,
+        'threads_per_segment': threads,
+        'preset': preset,
+        'split_seconds': round(split_s, 2),
+        'encode_seconds': round(encode_s, 2),
+        'slowest_segment_seconds': round(max(piece_seconds), 2),
+        'total_seconds': round(time.perf_counter() - started, 2),
+    })
+    logger.info(
+        f"✅ Segment transcode: {len(sources)} segments on {config.WORKERS} workers, "
+        f"{timing['duration']:.0f}s of video in {report['total_seconds']:.1f}s"
+    )
+    return report
@@ -0,0 +1,630 @@
+"""
+Recording Supervisor - One child process per active recording
+==============================================================
+
+FixedGoogleMeetRecorder used to run every recording bot on a thread of the
+Django process, each with its own asyncio loop (LiveKitEventLoopManager).
+Concurrent recordings competed with API requests for the GIL, and a bot that
+crashed or hung could leave wedged loops behind in the web process.
+
+Isolation is opt-in. Recordings stay on threads unless
+RECORDING_PROCESS_ISOLATION=True, in which case the recorder hands each
+recording to RecordingSupervisor, which:
+- spawns one process per recording ('spawn' start method: no forked Django,
+  Mongo or LiveKit state). The child runs the bot, the live encode, the
+  one-pass finalize and the processing pipeline.
+- expects a heartbeat every HEARTBEAT_SECONDS on the worker's pipe, carrying
+  the age of the bot loop's last tick. A child that stops sending
+  heartbeats, or whose recording loop stops ticking, for HEARTBEAT_TIMEOUT
+  is wedged, so it is killed.
+- enforces resource limits. The child lowers its priority (NICE) and turns
+  off core dumps. The supervisor kills a child whose RSS exceeds
+  MEMORY_LIMIT_MB; the ffmpeg processes it started count towards that RSS.
+- restarts a crashed or killed child with backoff, up to MAX_RESTARTS. What
+  the restart does depends on how far the recording got:
+    record   - the child rejoins the room and records the next segment into
+               the same work directory; segments are joined at finalize, so
+               a crash loses the seconds until the restart
+    finalize - after a stop, the child only finalizes the segments on disk
+    process  - once the final MP4 is in S3, the child only reruns the
+               processing pipeline
+
+Without RECORDING_SUPERVISOR_ENABLED the supervisor lives in each web worker:
+every worker then has its own supervisor and children (each child runs
+django.setup()), and their state is not shared. Enable isolation together
+with RECORDING_SUPERVISOR_ENABLED=True, where the supervisor runs on its own
+(manage.py run_recording_supervisor), and web workers reach it over
+RECORDING_SUPERVISOR_SOCKET. Every web worker then sees the same recordings,
+and restarting the web server leaves them running.
+
+RPC, framed the same way as the face model server:
+    start(spec) -> {'ok', 'error'}      stop(meeting_id) -> bool
+    status(meeting_id) -> dict | None   list() -> [dict]
+"""
+
+import logging
+import multiprocessing as mp_proc
+import os
+import shutil
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from multiprocessing import connection as mp_connection
+from typing import Dict, List, Optional
+
+from core.FaceAuth.face_model_server import recv_message, send_message
+
+logger = logging.getLogger("recording_supervisor")
+
+
+class SupervisorConfig:
+    """Recording supervisor configuration"""
+    PROCESS_ISOLATION = os.getenv("RECORDING_PROCESS_ISOLATION", "False") == "True"
+    SERVER_ENABLED = os.getenv("RECORDING_SUPERVISOR_ENABLED", "False") == "True"
+    SOCKET_PATH = os.getenv("RECORDING_SUPERVISOR_SOCKET", "/tmp/recording_supervisor.sock")
+    WORK_DIR = os.getenv("RECORDING_WORK_DIR", os.path.join(tempfile.gettempdir(), "recordings"))
+    START_TIMEOUT = float(os.getenv("RECORDING_START_TIMEOUT", 60))
+    HEARTBEAT_SECONDS = 2.0
+    HEARTBEAT_TIMEOUT = float(os.getenv("RECORDING_HEARTBEAT_TIMEOUT", 30))
+    MAX_RESTARTS = int(os.getenv("RECORDING_MAX_RESTARTS", 3))
+    RESTART_BACKOFF_SECONDS = 2.0
+    MEMORY_LIMIT_MB = int(os.getenv("RECORDING_MEMORY_LIMIT_MB", 4096))   # 0 = no limit
+    NICE = int(os.getenv("RECORDING_NICE", 5))
+
+
+# Worker states
+STARTING = 'starting'
+RECORDING = 'recording'
+STOPPING = 'stopping'
+PROCESSING = 'processing'
+RESTARTING = 'restarting'
+DONE = 'done'
+FAILED = 'failed'
+
+# Set in recording worker processes and in the standalone supervisor
+_IN_WORKER = False
+_SERVING = False
+
+
+# ============================================================================
+# WORKER PROCESS
+# ============================================================================
+
+class WorkerChannel:
+    """Child end of a worker pipe: readiness, state, heartbeats and the stop signal"""
+
+    def __init__(self, conn, config=SupervisorConfig):
+        self.conn = conn
+        self.config = config
+        self.stop_event = threading.Event()
+        self.state = STARTING
+        self._last_tick = time.monotonic()
+        self._send_lock = threading.Lock()
+        self._closed = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._listen, name="recording-worker-rpc", daemon=True).start()
+        threading.Thread(target=self._heartbeat_loop, name="recording-worker-heartbeat", daemon=True).start()
+
+    def close(self):
+        self._closed.set()
+
+    def send(self, *message):
+        with self._send_lock:
+            try:
+                self.conn.send(message)
+            except (OSError, EOFError):
+                pass
+
+    def put_nowait(self, item):
+        """result_queue interface: FixedRecordingBot reports (connected, error) here"""
+        ok, error = item
+        if ok:
+            self.state = RECORDING
+            self.tick()
+        self.send('ready', bool(ok), error)
+
+    def tick(self):
+        """Called from the bot's recording loop; its age goes out with every heartbeat"""
+        self._last_tick = time.monotonic()
+
+    def set_state(self, state: str):
+        self.state = state
+        self.send('state', state)
+
+    def _listen(self):
+        while True:
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                # Supervisor is gone; nobody can stop us later, so finish now
+                if not self._closed.is_set():
+                    logger.warning("⚠️ Lost supervisor connection - stopping recording")
+                    self.stop_event.set()
+                return
+            if message and message[0] == 'stop':
+                self.stop_event.set()
+
+    def _heartbeat_loop(self):
+        while not self._closed.wait(self.config.HEARTBEAT_SECONDS):
+            self.send('heartbeat', {
+                'state': self.state,
+                'loop_age': round(time.monotonic() - self._last_tick, 1),
+            })
+
+
+def in_recording_worker() -> bool:
+    return _IN_WORKER
+
+
+def _apply_resource_limits(config=SupervisorConfig):
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        if config.NICE:
+            os.nice(config.NICE)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not apply recording worker limits: {e}")
+
+
+def _worker_main(conn, spec: Dict):
+    """Recording worker process entry point"""
+    global _IN_WORKER
+    _IN_WORKER = True
+    _apply_resource_limits()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SampleDB.settings')
+    import django
+    django.setup()
+
+    channel = WorkerChannel(conn)
+    channel.start()
+    try:
+        from core.livekit_recording.recording_service import fixed_google_meet_recorder
+        result = fixed_google_meet_recorder.run_supervised_recording(spec, channel)
+        channel.send('done', result)
+    except Exception as e:
+        import traceback
+        logger.error(f"❌ Recording worker for {spec.get('meeting_id')} failed: {e}")
+        logger.error(traceback.format_exc())
+        channel.send('error', str(e))
+        channel.close()
+        sys.exit(1)
+    channel.close()
+
+
+# ============================================================================
+# SUPERVISOR
+# ============================================================================
+
+def _process_tree(pid: int):
+    import psutil
+    parent = psutil.Process(pid)
+    return [parent] + parent.children(recursive=True)
+
+
+def _tree_rss_mb(pid: int) -> Optional[float]:
+    """RSS of a worker and its children (ffmpeg), in MB"""
+    try:
+        total = 0
+        for proc in _process_tree(pid):
+            try:
+                total += proc.memory_info().rss
+            except Exception:
+                pass
+        return total / (1024 * 1024)
+    except Exception:
+        return None
+
+
+class _Worker:
+    """Supervisor-side state of one recording"""
+
+    def __init__(self, spec: Dict):
+        self.spec = dict(spec)
+        self.meeting_id = spec['meeting_id']
+        self.process = None
+        self.conn = None
+        self.state = STARTING
+        self.mode = 'record'
+        self.segment = 0
+        self.restarts = 0
+        self.restart_at = None
+        self.started_at = time.time()
+        self.last_heartbeat = time.monotonic()
+        self.heartbeat: Dict = {}
+        self.ready = threading.Event()
+        self.ready_error = None
+        self.stop_requested = False
+        self.error = None
+        self.result = None
+
+    def describe(self) -> Dict:
+        return {
+            "meeting_id": self.meeting_id,
+            "recording_id": self.spec.get('recording_doc_id'),
+            "room_name": self.spec.get('room_name'),
+            "host_user_id": self.spec.get('host_user_id'),
+            "start_time": datetime.fromtimestamp(self.started_at).isoformat(),
+            "state": self.state,
+            "mode": self.mode,
+            "pid": self.process.pid if self.process is not None else None,
+            "segment": self.segment,
+            "restarts": self.restarts,
+            "heartbeat_age": round(time.monotonic() - self.last_heartbeat, 1),
+            "rss_mb": self.heartbeat.get('rss_mb'),
+            "error": self.error,
+        }
+
+
+class RecordingSupervisor:
+    """Spawns, watches and restarts one process per recording"""
+
+    def __init__(self, config=SupervisorConfig):
+        self.config = config
+        self._ctx = mp_proc.get_context('spawn')
+        self._lock = threading.RLock()
+        self.workers: Dict[str, _Worker] = {}
+        self._monitor: Optional[threading.Thread] = None
+
+    # ---------- RPC surface ----------
+
+    def start(self, spec: Dict) -> Dict:
+        """
+        spec: meeting_id, room_url, room_name, recorder_identity, host_user_id,
+        recording_doc_id. Blocks until the bot joined the room or failed to.
+        """
+        meeting_id = spec['meeting_id']
+        with self._lock:
+            existing = self.workers.get(meeting_id)
+            if existing is not None and existing.state not in (DONE, FAILED):
+                return {'ok': False, 'error': "Recording already in progress"}
+            worker = _Worker(spec)
+            worker.spec['work_dir'] = os.path.join(self.config.WORK_DIR, f"{meeting_id}_{int(time.time())}")
+            os.makedirs(worker.spec['work_dir'], exist_ok=True)
+            self.workers[meeting_id] = worker
+            self._spawn(worker)
+        self._ensure_monitor()
+
+        if not worker.ready.wait(self.config.START_TIMEOUT):
+            error = "Recording connection timeout"
+        else:
+            error = worker.ready_error
+        if error:
+            with self._lock:
+                worker.stop_requested = True
+                worker.state = FAILED
+                worker.error = error
+                self._kill(worker)
+                if self.workers.get(meeting_id) is worker:
+                    del self.workers[meeting_id]
+            shutil.rmtree(worker.spec['work_dir'], ignore_errors=True)
+            return {'ok': False, 'error': error}
+        return {'ok': True, 'error': None}
+
+    def stop(self, meeting_id: str) -> bool:
+        """Ask the worker to stop and finalize; False if there is no such recording"""
+        with self._lock:
+            worker = self.workers.get(meeting_id)
+            if worker is None or worker.stop_requested or worker.state in (DONE, FAILED):
+                return False
+            worker.stop_requested = True
+            if worker.state == RESTARTING:
+                # The respawn finalizes the recorded segments instead of rejoining
+                if worker.mode == 'record':
+                    worker.mode = 'finalize'
+            else:
+                worker.state = STOPPING
+                self._send(worker, ('stop',))
+        logger.info(f"🛑 Stop requested for recording worker {meeting_id}")
+        return True
+
+    def status(self, meeting_id: str) -> Optional[Dict]:
+        with self._lock:
+            worker = self.workers.get(meeting_id)
+            return worker.describe() if worker is not None else None
+
+    def list(self) -> List[Dict]:
+        with self._lock:
+            return [worker.describe() for worker in self.workers.values()]
+
+    # ---------- process management ----------
+
+    def _ensure_monitor(self):
+        with self._lock:
+            if self._monitor is None:
+                self._monitor = threading.Thread(target=self._monitor_loop, name="recording-supervisor", daemon=True)
+                self._monitor.start()
+
+    def _spawn(self, worker: _Worker):
+        parent_conn, child_conn = self._ctx.Pipe()
+        spec = dict(worker.spec, mode=worker.mode, segment=worker.segment)
+        # Not daemonic: on shutdown the interpreter waits for workers to finalize
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, spec),
+            name=f"recording-{worker.meeting_id}",
+            daemon=False,
+        )
+        process.start()
+        child_conn.close()
+        worker.process, worker.conn = process, parent_conn
+        worker.last_heartbeat = time.monotonic()
+        worker.heartbeat = {}
+        worker.restart_at = None
+        logger.info(
+            f"🎬 Recording worker {worker.meeting_id} started: pid {process.pid}, "
+            f"mode {worker.mode}, segment {worker.segment}"
+        )
+
+    def _send(self, worker: _Worker, message):
+        try:
+            if worker.conn is not None:
+                worker.conn.send(message)
+        except (OSError, EOFError):
+            pass
+
+    def _kill(self, worker: _Worker):
+        """Kill the worker and the ffmpeg processes it started"""
+        process = worker.process
+        if process is None or not process.is_alive():
+            return
+        try:
+            for proc in reversed(_process_tree(process.pid)):
+                proc.kill()
+        except Exception:
+            process.kill()
+        process.join(timeout=5)
+
+    def _handle_message(self, worker: _Worker, message):
+        kind = message[0]
+        if kind == 'heartbeat':
+            worker.last_heartbeat = time.monotonic()
+            worker.heartbeat = dict(message[1])
+            if worker.process is not None:
+                rss = _tree_rss_mb(worker.process.pid)
+                if rss is not None:
+                    worker.heartbeat['rss_mb'] = round(rss)
+        elif kind == 'ready':
+            ok, error = message[1], message[2]
+            if worker.ready.is_set():
+                # A restarted worker: rejoining failed, so it finalizes what is on disk
+                if not ok:
+                    logger.warning(f"⚠️ Recording worker {worker.meeting_id} could not rejoin: {error}")
+                    worker.stop_requested = True
+                    worker.state = STOPPING
+                elif not worker.stop_requested:
+                    worker.state = RECORDING
+                return
+            worker.ready_error = None if ok else (error or "Recording failed to start")
+            worker.state = RECORDING if ok else FAILED
+            worker.ready.set()
+        elif kind == 'state':
+            worker.state = message[1]
+        elif kind == 'finalized':
+            # Final MP4 is in S3; a restart from here only reruns processing
+            worker.spec['raw_keys'] = list(message[1])
+        elif kind == 'done':
+            worker.result = message[1]
+            worker.state = DONE
+        elif kind == 'error':
+            worker.error = message[1]
+
+    def _drain(self, worker: _Worker):
+        conn = worker.conn
+        if conn is None:
+            return
+        try:
+            while conn.poll():
+                self._handle_message(worker, conn.recv())
+        except (EOFError, OSError):
+            worker.conn = None
+            conn.close()
+
+    def _unhealthy(self, worker: _Worker, now: float) -> Optional[str]:
+        if not worker.ready.is_set():
+            return None     # start() owns the startup timeout
+        silent = now - worker.last_heartbeat
+        if silent > self.config.HEARTBEAT_TIMEOUT:
+            return f"no heartbeat for {silent:.0f}s"
+        loop_age = worker.heartbeat.get('loop_age', 0)
+        recording = worker.state == RECORDING and worker.heartbeat.get('state') == RECORDING
+        if recording and loop_age > self.config.HEARTBEAT_TIMEOUT:
+            return f"recording loop stalled for {loop_age:.0f}s"
+        rss = worker.heartbeat.get('rss_mb')
+        if self.config.MEMORY_LIMIT_MB and rss is not None and rss > self.config.MEMORY_LIMIT_MB:
+            return f"RSS {rss}MB over the {self.config.MEMORY_LIMIT_MB}MB limit"
+        return None
+
+    def _schedule_restart(self, worker: _Worker, reason: str):
+        if worker.restarts >= self.config.MAX_RESTARTS:
+            worker.state = FAILED
+            worker.error = reason
+            del self.workers[worker.meeting_id]
+            logger.error(
+                f"❌ Recording worker {worker.meeting_id} failed ({reason}) after {worker.restarts} restarts; "
+                f"segments kept in {worker.spec['work_dir']}"
+            )
+            return
+
+        worker.restarts += 1
+        if worker.spec.get('raw_keys'):
+            worker.mode = 'process'
+        elif worker.stop_requested:
+            worker.mode = 'finalize'
+        else:
+            worker.segment += 1
+        delay = self.config.RESTART_BACKOFF_SECONDS * 2 ** (worker.restarts - 1)
+        worker.restart_at = time.monotonic() + delay
+        worker.state = RESTARTING
+        worker.process, worker.conn = None, None
+        logger.warning(
+            f"⚠️ Recording worker {worker.meeting_id} {reason} - restart {worker.restarts}/"
+            f"{self.config.MAX_RESTARTS} in {delay:.0f}s (mode {worker.mode}, segment {worker.segment})"
+        )
+
+    def _check_workers(self):
+        now = time.monotonic()
+        with self._lock:
+            for meeting_id, worker in list(self.workers.items()):
+                if worker.state == FAILED:
+                    continue    # a failed start; start() removes it
+                if worker.state == RESTARTING:
+                    if now >= worker.restart_at:
+                        self._spawn(worker)
+                        worker.state = STARTING if worker.mode == 'record' else STOPPING
+                    continue
+
+                process = worker.process
+                if process is None:
+                    continue
+                if not process.is_alive():
+                    self._drain(worker)
+                    process.join(timeout=1)
+                    if worker.conn is not None:
+                        worker.conn.close()
+                        worker.conn = None
+                    if worker.state == DONE and process.exitcode == 0:
+                        logger.info(f"✅ Recording worker {meeting_id} finished: {worker.result}")
+                        del self.workers[meeting_id]
+                        shutil.rmtree(worker.spec['work_dir'], ignore_errors=True)
+                    elif not worker.ready.is_set() or worker.ready_error:
+                        worker.ready_error = worker.error or f"Recording worker exited with {process.exitcode}"
+                        worker.state = FAILED
+                        worker.ready.set()
+                    else:
+                        self._schedule_restart(worker, f"exited with {process.exitcode}")
+                    continue
+
+                reason = self._unhealthy(worker, now)
+                if reason:
+                    logger.error(f"❌ Recording worker {meeting_id} is unhealthy ({reason}), killing it")
+                    self._kill(worker)
+
+    def _monitor_loop(self):
+        while True:
+            try:
+                with self._lock:
+                    conns = {w.conn: w for w in self.workers.values() if w.conn is not None}
+                if conns:
+                    for conn in mp_connection.wait(list(conns), timeout=0.5):
+                        with self._lock:
+                            self._drain(conns[conn])
+                else:
+                    time.sleep(0.5)
+                self._check_workers()
+            except Exception as e:
+                logger.error(f"❌ Recording supervisor monitor error: {e}")
+                time.sleep(1)
+
+    # ---------- standalone server ----------
+
+    def serve_forever(self, socket_path: str = SupervisorConfig.SOCKET_PATH):
+        global _SERVING
+        _SERVING = True
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+        owner = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        header, _ = recv_message(self.request)
+                    except (ConnectionError, OSError):
+                        return
+                    op = header.get('op')
+                    try:
+                        if op == 'start':
+                            send_message(self.request, {'ok': True, 'result': owner.start(header['spec'])})
+                        elif op == 'stop':
+                            send_message(self.request, {'ok': True, 'result': owner.stop(header['meeting_id'])})
+                        elif op == 'status':
+                            send_message(self.request, {'ok': True, 'result': owner.status(header['meeting_id'])})
+                        elif op == 'list':
+                            send_message(self.request, {'ok': True, 'result': owner.list()})
+                        elif op == 'ping':
+                            send_message(self.request, {'ok': True})
+                        else:
+                            send_message(self.request, {'ok': False, 'error': f"unknown op {op}"})
+                    except Exception as e:
+                        send_message(self.request, {'ok': False, 'error': str(e)})
+
+        socketserver.ThreadingUnixStreamServer.daemon_threads = True
+        server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+        os.chmod(socket_path, 0o660)
+        self._ensure_monitor()
+        logger.info(f"✅ Recording supervisor listening on {socket_path}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+class RecordingSupervisorClient:
+    """Same surface as RecordingSupervisor, over the supervisor socket"""
+
+    def __init__(self, socket_path: str = SupervisorConfig.SOCKET_PATH,
+                 timeout: float = SupervisorConfig.START_TIMEOUT + 10):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _request(self, header: Dict):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+                send_message(sock, header)
+                response, _ = recv_message(sock)
+        except (ConnectionError, OSError) as e:
+            raise RuntimeError(f"Recording supervisor unavailable: {e}")
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error', 'recording supervisor error'))
+        return response.get('result')
+
+    def start(self, spec: Dict) -> Dict:
+        return self._request({'op': 'start', 'spec': spec})
+
+    def stop(self, meeting_id: str) -> bool:
+        return self._request({'op': 'stop', 'meeting_id': meeting_id})
+
+    def status(self, meeting_id: str) -> Optional[Dict]:
+        return self._request({'op': 'status', 'meeting_id': meeting_id})
+
+    def list(self) -> List[Dict]:
+        return self._request({'op': 'list'})
+
+
+_supervisor_instance = None
+_supervisor_lock = threading.Lock()
+
+
+def get_recording_supervisor():
+    """
+    Process-wide supervisor: the standalone one's client when
+    RECORDING_SUPERVISOR_ENABLED, an in-process RecordingSupervisor otherwise,
+    or None when recordings run on threads (isolation off, or already inside
+    a recording worker).
+    """
+    global _supervisor_instance
+    if not SupervisorConfig.PROCESS_ISOLATION or _IN_WORKER:
+        return None
+    if _supervisor_instance is None:
+        with _supervisor_lock:
+            if _supervisor_instance is None:
+                if SupervisorConfig.SERVER_ENABLED and not _SERVING:
+                    _supervisor_instance = RecordingSupervisorClient()
+                else:
+                    _supervisor_instance = RecordingSupervisor()
+    return _supervisor_instance
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from datetime import datetime, timedelta
+import logging
+from core.UserDashBoard.analytics_rollups import backfill_analytics_rollups
+from core.utils.date_utils import get_current_ist_datetime
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily user/host analytics rollup tables for a date range'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='Number of days back from today to rebuild (default: 365)',
+        )
+        parser.add_argument(
+            '--start-date',
+            help='First day to rebuild (YYYY-MM-DD), overrides --days',
+        )
+        parser.add_argument(
+            '--end-date',
+            help='Last day to rebuild (YYYY-MM-DD), defaults to today',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['end_date']:
+                end_day = datetime.strptime(options['end_date'], '%Y-%m-%d').date()
+            else:
+                end_day = get_current_ist_datetime().date()
+
+            if options['start_date']:
+                start_day = datetime.strptime(options['start_date'], '%Y-%m-%d').date()
+            else:
+                start_day = end_day - timedelta(days=options['days'])
+
+            self.stdout.write(f'Backfilling analytics rollups from {start_day} to {end_day}...')
+            result = backfill_analytics_rollups(start_day, end_day)
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Days processed: {result['days_processed']}, "
+                    f"user rows: {result['user_rows']}, "
+                    f"host rows: {result['host_rows']}"
+                )
+            )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Error backfilling analytics rollups: {str(e)}'))
+            logging.error(f"Analytics rollup backfill error: {e}")
+            raise
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+import logging
+from core.WebSocketConnection.participant_sessions import (
+    create_participant_sessions_table, backfill_participant_sessions, TBL_PARTICIPANT_SESSIONS
+)
+
+class Command(BaseCommand):
+    help = 'Convert legacy Join_Times/Leave_Times arrays into tbl_Participant_Sessions rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--meeting-id',
+            help='Only backfill participants of this meeting',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Participants per transaction (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            create_participant_sessions_table()
+
+            where = f"NOT EXISTS (SELECT 1 FROM {TBL_PARTICIPANT_SESSIONS} s WHERE s.Participant_ID = p.ID)"
+            params = []
+            if options['meeting_id']:
+                where += " AND p.Meeting_ID = %s"
+                params.append(options['meeting_id'])
+
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT p.ID FROM tbl_Participants p WHERE {where} ORDER BY p.ID", params)
+                participant_ids = [row[0] for row in cursor.fetchall()]
+
+            self.stdout.write(f'Backfilling sessions for {len(participant_ids)} participants...')
+
+            batch_size = options['batch_size']
+            inserted = 0
+            for i in range(0, len(participant_ids), batch_size):
+                with transaction.atomic(), connection.cursor() as cursor:
+                    for participant_id in participant_ids[i:i + batch_size]:
+                        inserted += backfill_participant_sessions(cursor, participant_id)
+
+            self.stdout.write(
+                self.style.SUCCESS(f"Participants processed: {len(participant_ids)}, session rows inserted: {inserted}")
+            )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Error backfilling participant sessions: {str(e)}'))
+            logging.error(f"Participant session backfill error: {e}")
+            raise
@@ -0,0 +1,98 @@
+from django.core.management.base import BaseCommand, CommandError
+import glob
+import os
+import threading
+import time
+import cv2
+from core.AI_Attendance.inference_pool import InProcessInference, VisionInferencePool
+
+class Command(BaseCommand):
+    help = 'Measure attendance vision inference throughput over a folder of sample JPEGs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('folder', help='Folder containing *.jpg / *.jpeg sample frames')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Pool worker processes; 0 benchmarks the in-process path (default: CPU count)',
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=16,
+            help='Simulated concurrent users submitting frames (default: 16)',
+        )
+        parser.add_argument(
+            '--frames-per-user',
+            type=int,
+            default=20,
+            help='Frames each simulated user submits (default: 20)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0.0,
+            help='Seconds between a user\'s frames; 0 submits as fast as results return (default: 0)',
+        )
+
+    def handle(self, *args, **options):
+        paths = sorted(
+            glob.glob(os.path.join(options['folder'], '*.jpg')) +
+            glob.glob(os.path.join(options['folder'], '*.jpeg'))
+        )
+        if not paths:
+            raise CommandError(f"No JPEG files found in {options['folder']}")
+
+        frames = []
+        for path in paths:
+            image = cv2.imread(path)
+            if image is not None:
+                frames.append(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        self.stdout.write(f'Loaded {len(frames)} frames from {options["folder"]}')
+
+        workers = options['workers']
+        backend = VisionInferencePool(workers).start() if workers > 0 else InProcessInference()
+        try:
+            # Warm every graph once so model load time is not counted
+            for i in range(max(1, workers)):
+                backend.infer(f"warmup_{i}", frames[i % len(frames)], timeout=120)
+
+            processed = [0]
+            shed = [0]
+            counter_lock = threading.Lock()
+
+            def simulate_user(user_index):
+                for n in range(options['frames_per_user']):
+                    frame = frames[(user_index + n) % len(frames)]
+                    result = backend.infer(f"bench_{user_index}", frame, timeout=30)
+                    with counter_lock:
+                        if result is None:
+                            shed[0] += 1
+                        else:
+                            processed[0] += 1
+                    if options['interval']:
+                        time.sleep(options['interval'])
+
+            started = time.perf_counter()
+            threads = [threading.Thread(target=simulate_user, args=(u,)) for u in range(options['users'])]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - started
+
+            stats = backend.get_stats()
+            self.stdout.write(self.style.SUCCESS(
+                f"workers={workers} users={options['users']} elapsed={elapsed:.2f}s "
+                f"processed={processed[0]} shed={shed[0]} "
+                f"throughput={processed[0] / elapsed:.1f} frames/s"
+            ))
+            self.stdout.write(
+                f"avg_compute_ms={stats['avg_compute_ms']} avg_queue_ms={stats['avg_queue_ms']} "
+                f"shed_replaced={stats.get('shed_replaced', 0)} shed_stale={stats.get('shed_stale', 0)} "
+                f"shed_overflow={stats.get('shed_overflow', 0)} errors={stats.get('errors', 0)}"
+            )
+        finally:
+            if workers > 0:
+                backend.shutdown()
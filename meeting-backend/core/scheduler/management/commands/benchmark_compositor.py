@@ -0,0 +1,128 @@
+from django.core.management.base import BaseCommand
+import os
+import threading
+import time
+import cv2
+import numpy as np
+from core.livekit_recording.compositor import CompositorConfig, VideoCompositor, LAYOUTS
+
+class Command(BaseCommand):
+    help = 'Drive the recording compositor with synthetic tracks: CPU per composited frame and tile checks per layout'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cameras', type=int, default=6, help='Synthetic camera tracks (default: 6)')
+        parser.add_argument('--fps', type=float, default=24.0, help='Track and output FPS (default: 24)')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per layout (default: 5)')
+        parser.add_argument('--workers', type=int, default=CompositorConfig.WORKERS, help='Scale workers')
+        parser.add_argument('--save-dir', default=None, help='Write one PNG per layout here')
+
+    def _track_frames(self, index, width, height, count=8):
+        """A few RGBA frames per track: solid colour plus a moving bar, like a decoded LiveKit buffer"""
+        rng = np.random.default_rng(index)
+        color = rng.integers(64, 256, 3).astype(np.uint8)
+        frames = []
+        for k in range(count):
+            rgba = np.empty((height, width, 4), dtype=np.uint8)
+            rgba[..., :3] = color
+            rgba[..., 3] = 255
+            x = (k * width // count)
+            rgba[:, x:x + width // 20, :3] = 255 - color
+            frames.append(rgba)
+        # Tile check samples mid-height at 15/16 of the width: never under the bar or the label
+        return frames, tuple(int(c) for c in color[::-1])
+
+    def _decode(self, rgba):
+        return cv2.cvtColor(rgba, cv2.COLOR_RGBA2BGR)
+
+    def _feed(self, compositor, track_id, frames, fps, stop):
+        interval = 1.0 / fps
+        k = 0
+        next_at = time.perf_counter()
+        while not stop.is_set():
+            compositor.submit(track_id, frames[k % len(frames)], self._decode)
+            k += 1
+            next_at += interval
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+
+    def _run_layout(self, layout, options):
+        class Config(CompositorConfig):
+            LAYOUT = layout
+            WORKERS = options['workers']
+
+        started_at = time.perf_counter()
+        compositor = VideoCompositor(clock=lambda: time.perf_counter() - started_at, config=Config)
+        tracks = {}
+        for i in range(options['cameras']):
+            tracks[f'cam{i}'] = (f'user{i}', 'video', *self._track_frames(i, 1280, 720))
+        if layout == 'screen_filmstrip':
+            tracks['screen0'] = ('user0', 'screen_share', *self._track_frames(99, 1920, 1080))
+        for track_id, (participant, source, _, _) in tracks.items():
+            compositor.add_track(track_id, participant, source)
+        if layout == 'speaker':
+            compositor.set_active_speaker('user2')
+
+        compositor.start()
+        compositor.compose()    # apply the layout before frames arrive
+        stop = threading.Event()
+        feeders = [
+            threading.Thread(target=self._feed, args=(compositor, track_id, frames, options['fps'], stop), daemon=True)
+            for track_id, (_, _, frames, _) in tracks.items()
+        ]
+        for feeder in feeders:
+            feeder.start()
+
+        interval = 1.0 / options['fps']
+        frames_out = 0
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        next_at = wall
+        while time.perf_counter() - wall < options['duration']:
+            canvas = compositor.compose()
+            frames_out += 1
+            next_at += interval
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+        cpu_s = time.process_time() - cpu
+        stop.set()
+        for feeder in feeders:
+            feeder.join()
+        compositor.stop()
+
+        stats = compositor.get_stats()
+        failures = []
+        for track_id, (_, _, _, bgr) in tracks.items():
+            state = compositor.tracks[track_id]
+            if state.tile is None:
+                continue
+            tile = state.tile
+            pixel = canvas[tile.y + tile.h // 2, tile.x + tile.w * 15 // 16]
+            letterboxed = tuple(int(c) for c in pixel) == CompositorConfig.BACKGROUND
+            if not letterboxed and np.abs(pixel.astype(int) - np.array(bgr)).max() > 8:
+                failures.append(f'{track_id} tile {tile} shows {tuple(int(c) for c in pixel)}, expected {bgr}')
+            if state.state != 'live':
+                failures.append(f'{track_id} is {state.state}')
+
+        if options['save_dir']:
+            os.makedirs(options['save_dir'], exist_ok=True)
+            cv2.imwrite(os.path.join(options['save_dir'], f'{layout}.png'), canvas)
+
+        scaled = sum(t['frames_scaled'] for t in stats['tracks'].values())
+        dropped = sum(t['frames_dropped'] for t in stats['tracks'].values())
+        visible = sum(1 for t in stats['tracks'].values() if t['tile'])
+        self.stdout.write(
+            f'{layout:17s} {len(tracks)} tracks ({visible} visible) | {frames_out} frames | '
+            f'CPU {cpu_s / max(1, frames_out) * 1000:6.2f} ms/frame incl. scaling | '
+            f'compose avg {stats["avg_compose_ms"]:.2f} ms, max {stats["compose_ms_max"]:.2f} ms | '
+            f'scaled {scaled}, dropped {dropped}'
+        )
+        for failure in failures:
+            self.stdout.write(self.style.ERROR(f'  {failure}'))
+        return not failures
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{options["cameras"]} cameras at {options["fps"]} FPS, {options["workers"]} scale workers, '
+            f'{options["duration"]}s per layout'
+        )
+        ok = all([self._run_layout(layout, options) for layout in LAYOUTS])
+        line = 'All tiles show their own track' if ok else 'Tile check failed'
+        self.stdout.write(self.style.SUCCESS(line) if ok else self.style.ERROR(line))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+import time
+from core.livekit_recording.encoder_registry import EncoderRegistry
+
+class Command(BaseCommand):
+    help = 'Probe ffmpeg encoders, hwaccels and libx264 preset speed, and show the preset each job size would get'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-queue', type=int, default=3, help='Show choices up to this many concurrent encodes (default: 3)')
+
+    def handle(self, *args, **options):
+        registry = EncoderRegistry()
+        started = time.perf_counter()
+        capabilities = registry.capabilities()
+        probe_s = time.perf_counter() - started
+        registry.capabilities(wait_for_benchmark=True)
+        bench_s = time.perf_counter() - started - probe_s
+
+        info = capabilities.to_dict()
+        self.stdout.write(f'Probe {probe_s * 1000:.0f} ms, preset benchmark {bench_s:.1f} s (both once per TTL)')
+        self.stdout.write(f'NVENC usable: {info["nvenc"]} | libx264: {info["libx264"]}')
+        self.stdout.write(f'H.264 encoders: {", ".join(info["h264_encoders"]) or "none"}')
+        self.stdout.write(f'hwaccels: {", ".join(info["hwaccels"]) or "none"}')
+        for preset, fps in info['x264_fps'].items():
+            self.stdout.write(f'  libx264 {preset:10s} {fps:8.1f} fps at 1280x720')
+
+        started = time.perf_counter()
+        for _ in range(1000):
+            registry.capabilities()
+        self.stdout.write(f'Cached lookup: {(time.perf_counter() - started) * 1000:.3f} us per job (was one ffmpeg spawn)')
+
+        for width, height, fps in ((1280, 720, 24), (1920, 1080, 30)):
+            choices = [registry.choose_x264_preset(width, height, fps, queue_depth=depth)
+                       for depth in range(options['max_queue'] + 1)]
+            self.stdout.write(f'{width}x{height}@{fps}: ' + ', '.join(
+                f'{depth} queued -> {preset}' for depth, preset in enumerate(choices)))
+
+        line = 'Encoder capabilities probed' if info['libx264'] or info['nvenc'] else 'No usable H.264 encoder found'
+        self.stdout.write(self.style.SUCCESS(line) if info['libx264'] or info['nvenc'] else self.style.ERROR(line))
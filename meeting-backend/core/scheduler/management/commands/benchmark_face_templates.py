@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+import time
+import numpy as np
+from core.FaceAuth.face_model_shared import SharedFaceModel
+from core.FaceAuth.face_templates import TemplateSet, TemplateIndex
+
+class Command(BaseCommand):
+    help = 'Compare per-template compare_embeddings loop vs vectorized template matching'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Enrolled users (default: 200)')
+        parser.add_argument('--templates', type=int, default=5, help='Stored embeddings per user (default: 5)')
+        parser.add_argument('--queries', type=int, default=2000, help='Live embeddings to verify (default: 2000)')
+        parser.add_argument('--dim', type=int, default=512, help='Embedding dimension (default: 512)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        users, per_user, dim = options['users'], options['templates'], options['dim']
+
+        # Same shape as UnifiedFaceService.get_user_embeddings output
+        stored = {
+            user_id: [
+                {'embedding': rng.standard_normal(dim).astype(np.float32), 'embedding_id': f'{user_id}_{k}'}
+                for k in range(per_user)
+            ]
+            for user_id in range(users)
+        }
+        user_ids = rng.integers(0, users, options['queries']).tolist()
+        queries = np.stack([
+            stored[u][0]['embedding'] + 0.5 * rng.standard_normal(dim).astype(np.float32) for u in user_ids
+        ])
+
+        # Baseline: the old loop, one compare_embeddings call per template
+        started = time.perf_counter()
+        loop_scores = []
+        for query, user_id in zip(queries, user_ids):
+            best = 0.0
+            for entry in stored[user_id]:
+                best = max(best, 1 - SharedFaceModel.compare_embeddings(None, query, entry['embedding']))
+            loop_scores.append(best)
+        loop_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        template_sets = {user_id: TemplateSet.from_embeddings(entries) for user_id, entries in stored.items()}
+        build_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        single_scores = [template_sets[u].best_match(q)[0] for q, u in zip(queries, user_ids)]
+        single_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        batch_scores = TemplateIndex(template_sets).match_batch(queries, user_ids)
+        batch_s = time.perf_counter() - started
+
+        max_diff = max(
+            float(np.max(np.abs(np.array(loop_scores) - np.array(single_scores)))),
+            float(np.max(np.abs(np.array(loop_scores) - batch_scores))),
+        )
+
+        n = len(user_ids)
+        self.stdout.write(f'{n} queries x {per_user} templates/user, {users} users, dim {dim}')
+        self.stdout.write(f'Template build (once per cache load): {build_s * 1000:.1f} ms')
+        for label, seconds in (
+            ('compare_embeddings loop', loop_s),
+            ('TemplateSet.best_match', single_s),
+            ('TemplateIndex.match_batch', batch_s),
+        ):
+            self.stdout.write(
+                f'{label:28s} {seconds * 1000:9.1f} ms total | {seconds / n * 1e6:8.1f} us/query | '
+                f'{loop_s / seconds:6.1f}x'
+            )
+
+        line = f'Max score difference vs loop: {max_diff:.2e}'
+        self.stdout.write(self.style.SUCCESS(line) if max_diff < 1e-4 else self.style.ERROR(line))
@@ -0,0 +1,95 @@
+from django.core.management.base import BaseCommand
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    'core.UserDashBoard.recordings',
+    'core.AI_Attendance.Attendance',
+    'core.FaceAuth.face_auth',
+    'core.FaceAuth.unified_face_service',
+    'core.scheduler.tasks',
+]
+
+HEAVY_MODULES = ['torch', 'transformers', 'openai', 'insightface', 'mediapipe', 'onnxruntime']
+
+# Runs in a fresh interpreter so each module is measured from a cold import
+PROBE = """
+import json, os, sys, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SampleDB.settings')
+os.environ.pop('WARM_MODELS', None)
+import django
+django.setup()
+baseline = set(sys.modules)
+started = time.perf_counter()
+error = None
+try:
+    __import__(sys.argv[1])
+except Exception as e:
+    error = f"{type(e).__name__}: {e}"
+elapsed = time.perf_counter() - started
+heavy = [m for m in json.loads(sys.argv[2]) if m in sys.modules and m not in baseline]
+try:
+    import resource
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+except Exception:
+    rss_mb = None
+print(json.dumps({'seconds': round(elapsed, 3), 'heavy': heavy, 'rss_mb': rss_mb, 'error': error}))
+"""
+
+class Command(BaseCommand):
+    help = 'Measure cold import time and heavy-dependency loading for key modules'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'modules',
+            nargs='*',
+            help='Modules to import (default: recordings, Attendance, face modules, scheduler tasks)',
+        )
+        parser.add_argument(
+            '--max-seconds',
+            type=float,
+            default=None,
+            help='Exit non-zero if any module takes longer than this to import',
+        )
+        parser.add_argument(
+            '--fail-on-heavy',
+            action='store_true',
+            help='Exit non-zero if importing a module loads torch/transformers/openai/insightface/mediapipe',
+        )
+
+    def handle(self, *args, **options):
+        modules = options['modules'] or DEFAULT_MODULES
+        failures = []
+
+        for module in modules:
+            proc = subprocess.run(
+                [sys.executable, '-c', PROBE, module, json.dumps(HEAVY_MODULES)],
+                capture_output=True, text=True, cwd=os.getcwd(),
+            )
+            try:
+                result = json.loads(proc.stdout.strip().splitlines()[-1])
+            except (IndexError, ValueError):
+                self.stdout.write(self.style.ERROR(f"{module}: probe failed\n{proc.stderr[-2000:]}"))
+                failures.append(module)
+                continue
+
+            line = f"{module}: {result['seconds']:.2f}s"
+            if result['rss_mb'] is not None:
+                line += f" | peak RSS {result['rss_mb']:.0f} MB"
+            line += f" | heavy loaded: {', '.join(result['heavy']) or 'none'}"
+            if result['error']:
+                line += f" | import error: {result['error']}"
+
+            too_slow = options['max_seconds'] is not None and result['seconds'] > options['max_seconds']
+            heavy = options['fail_on_heavy'] and result['heavy']
+            if result['error'] or too_slow or heavy:
+                failures.append(module)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+
+        if failures:
+            self.stdout.write(self.style.ERROR(f"Import benchmark failed for: {', '.join(failures)}"))
+            sys.exit(1)
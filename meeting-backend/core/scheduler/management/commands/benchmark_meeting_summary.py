@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+import os
+import random
+import tempfile
+import time
+from core.UserDashBoard.meeting_summarizer import (
+    MeetingSummarizer, StubSummaryBackend, SummaryCache, chunk_segments, get_summary_backend,
+)
+from core.UserDashBoard.recordings import build_summary_prompt
+
+_SPEAKERS = ["Trainer", "Participant 1", "Participant 2", "Participant 3"]
+_TOPICS = ["the Kubernetes deployment", "the Oracle backup job", "the Selenium test suite", "the S3 bucket policy",
+           "the Jenkins pipeline", "the Django settings file", "the Redis cache", "the load balancer"]
+_LINES = ["Now open {t} and check the configuration.", "Run the command again and look at the output of {t}.",
+          "Does anyone have questions about {t}?", "We changed {t} because the old version failed under load.",
+          "Please note the steps for {t}, we will use them in the next session.",
+          "Can you share your screen? I think {t} is not running.", "Yes, that works now."]
+
+class Command(BaseCommand):
+    help = 'Meeting summary: one-shot prompt size vs map-reduce chunks, in-flight calls and cache reuse'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=float, default=120.0, help='Meeting length (default: 120)')
+        parser.add_argument('--backend', default='stub', help='stub (offline, default) or openai')
+        parser.add_argument('--latency', type=float, default=0.5, help='Stub seconds per call (default: 0.5)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _segments(self, rng, minutes):
+        segments, t, speaker, topic = [], 0.0, _SPEAKERS[0], rng.choice(_TOPICS)
+        while t < minutes * 60:
+            if rng.random() < 0.2:
+                speaker = rng.choice(_SPEAKERS)
+            if rng.random() < 0.05:
+                topic = rng.choice(_TOPICS)
+            duration = rng.uniform(2.0, 8.0)
+            segments.append({"start": t, "end": t + duration, "speaker": speaker,
+                             "text": rng.choice(_LINES).format(t=topic)})
+            t += duration + (rng.uniform(2.0, 5.0) if rng.random() < 0.1 else 0.0)
+        return segments
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        segments = self._segments(rng, options['minutes'])
+        transcript = " ".join(seg["text"] for seg in segments)
+        chunks = chunk_segments(segments)
+        self.stdout.write(
+            f'{options["minutes"]:.0f} min meeting: {len(segments)} segments, {len(transcript):,} chars | '
+            f'one-shot prompt {len(build_summary_prompt(transcript)):,} chars vs {len(chunks)} chunks of '
+            f'<= {max(len(c["text"]) for c in chunks):,} chars'
+        )
+
+        if options['backend'] == 'stub':
+            backend = StubSummaryBackend(latency=options['latency'])
+        else:
+            backend = get_summary_backend(options['backend'])
+        with tempfile.TemporaryDirectory() as cache_dir:
+            summarizer = MeetingSummarizer(backend=backend, cache=SummaryCache(os.path.join(cache_dir, 'bench.sqlite3')))
+            for run in ('cold cache', 'warm cache'):
+                started = time.perf_counter()
+                summary, stats = summarizer.summarize(segments, build_summary_prompt, transcript_text=transcript)
+                elapsed = time.perf_counter() - started
+                calls = sum(v for k, v in stats.items() if k.endswith('_calls'))
+                self.stdout.write(
+                    f'{run}: {elapsed:7.2f} s | {calls} model calls (map {stats.get("map_calls", 0)}, '
+                    f'reduce {stats.get("reduce_calls", 0)} over {stats.get("reduce_levels", 0)} levels, '
+                    f'final {stats.get("final_calls", 0)}), {stats.get("cache_hits", 0)} cached, '
+                    f'peak {stats.get("peak_in_flight", 0)} in flight | summary {len(summary):,} chars'
+                )
+            if options['backend'] == 'stub':
+                serial = backend.calls * options['latency']
+                self.stdout.write(self.style.SUCCESS(
+                    f'{backend.calls} calls would take {serial:.1f}s one after another; '
+                    f'the re-run made no model calls'
+                ))
@@ -0,0 +1,95 @@
+from django.core.management.base import BaseCommand
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from core.livekit_recording.segment_transcode import (
+    SegmentTranscodeConfig, count_video_frames, probe, transcode_in_segments, validate_transcode,
+)
+
+class Command(BaseCommand):
+    help = 'Single-process vs segment-parallel libx264 transcode of a generated recording, with output validation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=float, default=10.0, help='Test video length (default: 10)')
+        parser.add_argument('--workers', type=int, default=SegmentTranscodeConfig.WORKERS, help='Parallel segment encodes')
+        parser.add_argument('--preset', default='fast', help='libx264 preset for both runs (default: fast)')
+        parser.add_argument('--audio-offset', type=float, default=0.25,
+                            help='Start the test audio this many seconds after the video, to check sync (default: 0.25)')
+        parser.add_argument('--keep', action='store_true', help='Keep the work directory')
+
+    def _generate(self, path, seconds, audio_offset):
+        """720p24 H.264 with 2s GOPs like the live encoder, plus a tone starting audio_offset in"""
+        subprocess.run([
+            'ffmpeg', '-y', '-nostats', '-loglevel', 'error',
+            '-f', 'lavfi', '-i', f'testsrc2=size=1280x720:rate=24:duration={seconds}',
+            '-itsoffset', str(audio_offset),
+            '-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=48000:duration={seconds - audio_offset}',
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-g', '48', '-pix_fmt', 'yuv420p',
+            '-c:a', 'aac', '-b:a', '128k',
+            path
+        ], check=True)
+
+    def _single(self, source, output, preset, config):
+        subprocess.run([
+            'ffmpeg', '-y', '-nostats', '-loglevel', 'error', '-i', source,
+            '-c:v', 'libx264', '-preset', preset, *config.VIDEO_ARGS, '-pix_fmt', 'yuv420p',
+            '-c:a', 'copy', '-movflags', config.MOVFLAGS, output
+        ], check=True)
+
+    def handle(self, *args, **options):
+        class Config(SegmentTranscodeConfig):
+            WORKERS = options['workers']
+            MIN_DURATION_SECONDS = 0
+
+        work_dir = tempfile.mkdtemp(prefix='segment_transcode_bench_')
+        source = os.path.join(work_dir, 'source.mp4')
+        seconds = options['minutes'] * 60
+        started = time.perf_counter()
+        self._generate(source, seconds, options['audio_offset'])
+        info = probe(source)
+        frames = count_video_frames(source)
+        self.stdout.write(
+            f'Generated {seconds:.0f}s test recording ({frames:,} frames, audio +{options["audio_offset"]}s) '
+            f'in {time.perf_counter() - started:.1f}s | {os.cpu_count()} CPUs, {Config.WORKERS} workers, '
+            f'preset {options["preset"]}'
+        )
+
+        single = os.path.join(work_dir, 'single.mp4')
+        started = time.perf_counter()
+        self._single(source, single, options['preset'], Config)
+        single_s = time.perf_counter() - started
+        validate_transcode(info, single, frames, Config)
+
+        segments_dir = os.path.join(work_dir, 'segments')
+        os.makedirs(segments_dir)
+        parallel = os.path.join(work_dir, 'parallel.mp4')
+        ok = True
+        try:
+            report = transcode_in_segments(source, parallel, segments_dir, options['preset'], info, Config)
+        except Exception as e:
+            ok = False
+            self.stdout.write(self.style.ERROR(f'Parallel transcode failed validation: {e}'))
+
+        self.stdout.write(f'{"single process":16s} {single_s:8.1f} s ({seconds / single_s:5.1f}x real time)')
+        if ok:
+            parallel_s = report['total_seconds']
+            self.stdout.write(
+                f'{"segment parallel":16s} {parallel_s:8.1f} s ({seconds / parallel_s:5.1f}x real time) | '
+                f'{report["segments"]} segments, split {report["split_seconds"]}s, encode {report["encode_seconds"]}s, '
+                f'slowest segment {report["slowest_segment_seconds"]}s'
+            )
+            out = report['output']
+            self.stdout.write(
+                f'Validated: frames {report["frames"][1]:,}/{report["frames"][0]:,}, '
+                f'duration {out["duration"]:.3f}s, A/V offset {out["audio_start"] - out["video_start"]:+.3f}s'
+            )
+            sizes = os.path.getsize(single), os.path.getsize(parallel)
+            self.stdout.write(f'Output size: single {sizes[0] / 1e6:.1f} MB, parallel {sizes[1] / 1e6:.1f} MB')
+            self.stdout.write(self.style.SUCCESS(f'Speedup {single_s / parallel_s:.2f}x'))
+
+        if options['keep']:
+            self.stdout.write(f'Kept {work_dir}')
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand
+import os
+import random
+import tempfile
+import time
+from core.UserDashBoard.subtitle_translation import (
+    TRANSLATION_MODELS, SubtitleTranslator, TranslationCache, torch, transformers,
+)
+
+# Meeting-like sentences: a few fillers repeat all the time, the rest are unique-ish
+_FILLERS = ["Okay.", "Yes.", "Can you hear me?", "Thank you.", "Right.", "Let me share my screen.", "Any questions?"]
+_SUBJECTS = ["the deployment", "this report", "the new dashboard", "our database", "the client", "the release"]
+_VERBS = ["needs to be reviewed", "was updated yesterday", "is running slowly", "will be ready on Friday",
+          "has a few open issues", "should be tested again"]
+_TAILS = ["", " before the next sprint", " so please take a look", " and I will send the details by email",
+          " because the numbers changed after the last meeting and we need to confirm them with the team"]
+
+class Command(BaseCommand):
+    help = 'Subtitle translation throughput: old beam-4 fixed batches vs cached, length-bucketed SubtitleTranslator'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=float, default=60.0, help='Meeting length (default: 60)')
+        parser.add_argument('--langs', default=','.join(TRANSLATION_MODELS), help='Languages (default: all)')
+        parser.add_argument('--legacy-sample', type=int, default=64,
+                            help='Segments to time with the old settings; the total is extrapolated (default: 64)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _segments(self, rng, minutes):
+        segments, t = [], 0.0
+        while t < minutes * 60:
+            if rng.random() < 0.3:
+                text = rng.choice(_FILLERS)
+            else:
+                text = f"{rng.choice(_SUBJECTS).capitalize()} {rng.choice(_VERBS)}{rng.choice(_TAILS)}."
+            duration = rng.uniform(1.5, 6.0)
+            segments.append({"start": t, "end": t + duration, "text": text})
+            t += duration
+        return segments
+
+    def _legacy(self, lang, texts):
+        """The old path: fp32 model, 4 beams, batches of 32 in transcript order"""
+        model_name, target_token = TRANSLATION_MODELS[lang]
+        tokenizer = transformers.MarianTokenizer.from_pretrained(model_name)
+        model = transformers.MarianMTModel.from_pretrained(model_name).eval()
+        if target_token:
+            texts = [f"{target_token} {text}" for text in texts]
+        started = time.perf_counter()
+        for i in range(0, len(texts), 32):
+            inputs = tokenizer(texts[i:i + 32], return_tensors="pt", padding=True, truncation=True, max_length=512)
+            with torch.no_grad():
+                model.generate(**inputs, max_length=512, num_beams=4, early_stopping=True)
+        return time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        segments = self._segments(rng, options['minutes'])
+        texts = [seg["text"] for seg in segments]
+        self.stdout.write(
+            f'{options["minutes"]:.0f} min meeting: {len(segments)} segments, {len(set(texts))} distinct | '
+            f'torch threads {torch.get_num_threads()}, CUDA {torch.cuda.is_available()}'
+        )
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            translator = SubtitleTranslator(cache=TranslationCache(os.path.join(cache_dir, 'bench.sqlite3')))
+            for lang in [l.strip() for l in options['langs'].split(',') if l.strip()]:
+                sample = texts[:options['legacy_sample']]
+                legacy_s = self._legacy(lang, sample) / max(1, len(sample)) * len(texts)
+
+                translator.load_model(lang)     # load time is not part of either run
+                started = time.perf_counter()
+                translator.translate_segments(segments, lang)
+                cold_s = time.perf_counter() - started
+                started = time.perf_counter()
+                translator.translate_segments(segments, lang)
+                warm_s = time.perf_counter() - started
+
+                stats = translator.get_stats()[lang]
+                self.stdout.write(
+                    f'{lang}: old {legacy_s:8.1f} s (extrapolated) | new cold cache {cold_s:6.2f} s '
+                    f'({len(texts) / cold_s:6.0f} seg/s) | warm cache {warm_s:6.3f} s | '
+                    f'padding efficiency {stats["padding_efficiency"] * 100:.0f}%, {translator.profile}'
+                )
+                self.stdout.write(self.style.SUCCESS(f'{lang}: {legacy_s / cold_s:.1f}x faster cold, '
+                                                     f'{legacy_s / max(warm_s, 1e-6):.0f}x warm'))
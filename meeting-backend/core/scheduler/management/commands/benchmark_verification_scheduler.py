@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand
+import asyncio
+import statistics
+import time
+from core.FaceAuth.verification_scheduler import VerificationScheduler, VerificationSchedulerConfig
+
+class Command(BaseCommand):
+    help = 'Compare per-user sleep loops vs the timing-wheel scheduler for continuous verification'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5000, help='Simulated users (default: 5000)')
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=10.0,
+            help='Seconds between a user\'s checks, compressed from 60-300s (default: 10)',
+        )
+        parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run each mode (default: 30)')
+        parser.add_argument(
+            '--check-ms',
+            type=float,
+            default=2.0,
+            help='Simulated async work per check, e.g. frame capture (default: 2)',
+        )
+
+    async def _probe(self, stop_at, lags):
+        """Event loop responsiveness: how late a 10ms sleep wakes up"""
+        while time.monotonic() < stop_at:
+            started = time.monotonic()
+            await asyncio.sleep(0.01)
+            lags.append((time.monotonic() - started - 0.01) * 1000)
+
+    async def _run_loops(self, users, interval, duration, check_s):
+        """Old model: one coroutine per user sleeping on its own interval"""
+        checks = []
+
+        async def user_loop(user_id):
+            while True:
+                await asyncio.sleep(interval)
+                await asyncio.sleep(check_s)
+                checks.append(time.monotonic())
+
+        lags = []
+        stop_at = time.monotonic() + duration
+        tasks = [asyncio.create_task(user_loop(u)) for u in range(users)]
+        await self._probe(stop_at, lags)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return checks, lags
+
+    async def _run_scheduler(self, users, interval, duration, check_s):
+        """New model: all deadlines in one timing wheel"""
+        checks = []
+
+        async def check():
+            await asyncio.sleep(check_s)
+            checks.append(time.monotonic())
+
+        class Config(VerificationSchedulerConfig):
+            MAX_CONCURRENT_CHECKS = users   # measure scheduling, not the concurrency cap
+
+        scheduler = VerificationScheduler(Config)
+        for u in range(users):
+            scheduler.register(u, check, lambda: interval)
+
+        lags = []
+        await self._probe(time.monotonic() + duration, lags)
+        await scheduler.stop()
+        return checks, lags, scheduler.get_stats()
+
+    def _report(self, label, checks, lags, cpu_s, duration):
+        per_second = {}
+        for t in checks:
+            per_second[int(t)] = per_second.get(int(t), 0) + 1
+        burst = max(per_second.values()) if per_second else 0
+        lags = sorted(lags)
+        p99 = lags[int(len(lags) * 0.99) - 1] if lags else 0.0
+        self.stdout.write(
+            f'{label:16s} checks {len(checks):6d} | CPU {cpu_s:6.2f}s ({cpu_s / duration * 100:5.1f}% of one core) | '
+            f'peak checks/s {burst:5d} | loop lag median {statistics.median(lags) if lags else 0:6.2f} ms, '
+            f'p99 {p99:6.2f} ms'
+        )
+
+    def handle(self, *args, **options):
+        users, interval, duration = options['users'], options['interval'], options['duration']
+        check_s = options['check_ms'] / 1000
+        self.stdout.write(f'{users} users, {interval}s interval, {duration}s per mode')
+
+        cpu = time.process_time()
+        checks, lags = asyncio.run(self._run_loops(users, interval, duration, check_s))
+        self._report('per-user loops', checks, lags, time.process_time() - cpu, duration)
+
+        cpu = time.process_time()
+        checks, lags, stats = asyncio.run(self._run_scheduler(users, interval, duration, check_s))
+        self._report('timing wheel', checks, lags, time.process_time() - cpu, duration)
+        self.stdout.write(
+            f'  wheel ticks {stats["ticks"]} | max batch {stats["max_batch"]} | '
+            f'avg tick busy {stats["avg_tick_busy_ms"]} ms | max tick lag {stats["max_tick_lag_ms"]:.1f} ms'
+        )
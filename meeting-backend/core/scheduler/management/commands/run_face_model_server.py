@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.FaceAuth.face_model_server import FaceModelServer, FaceModelServerConfig
+
+
+class Command(BaseCommand):
+    help = 'Run the per-pod face model server (one InsightFace copy shared by all workers)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--socket',
+            default=FaceModelServerConfig.SOCKET_PATH,
+            help=f'Unix socket path (default: {FaceModelServerConfig.SOCKET_PATH})',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f"Starting face model server on {options['socket']}"))
+        FaceModelServer(options['socket']).serve_forever()
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.livekit_recording.supervisor import RecordingSupervisor, SupervisorConfig
+
+
+class Command(BaseCommand):
+    help = 'Run the recording supervisor (one worker process per recording, shared by all web workers)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--socket',
+            default=SupervisorConfig.SOCKET_PATH,
+            help=f'Unix socket path (default: {SupervisorConfig.SOCKET_PATH})',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f"Starting recording supervisor on {options['socket']}"))
+        RecordingSupervisor().serve_forever(options['socket'])
@@ -84,4 +84,46 @@ def process_all_recurring_meetings():
         
     except Exception as e:
         logging.error(f"Combined processing failed: {e}")
-        return {'success': False, 'error': str(e)}
\ No newline at end of file
+        return {'success': False, 'error': str(e)}
+
+
+@shared_task
+def reconcile_livekit_participants_task():
+    """Low-frequency LiveKit reconciliation for active meetings (webhooks handle live joins/leaves)"""
+    try:
+        import json
+        from django.db import connection
+        from core.WebSocketConnection.participants import reconcile_livekit_participants
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT ID FROM tbl_Meetings WHERE Status = 'active'")
+            meeting_ids = [row[0] for row in cursor.fetchall()]
+
+        totals = {'meetings': len(meeting_ids), 'added': 0, 'removed': 0, 'rejoined': 0, 'failed': 0}
+        for meeting_id in meeting_ids:
+            response = reconcile_livekit_participants(str(meeting_id))
+            result = json.loads(response.content)
+            if response.status_code != 200:
+                totals['failed'] += 1
+                continue
+            sync_results = result.get('sync_results', {})
+            for key in ('added', 'removed', 'rejoined'):
+                totals[key] += sync_results.get(key, 0)
+
+        logging.info(f"LiveKit reconciliation completed: {totals}")
+        return totals
+    except Exception as e:
+        logging.error(f"LiveKit reconciliation task failed: {e}")
+        return {'success': False, 'error': str(e)}
+
+@shared_task
+def prefetch_meeting_embeddings_task(meeting_id):
+    """Bulk-load a meeting's face embeddings into the shared Redis store"""
+    try:
+        from core.FaceAuth.embedding_store import get_embedding_store
+        result = get_embedding_store().prefetch_meeting(meeting_id)
+        logging.info(f"Embedding prefetch completed: {result}")
+        return result
+    except Exception as e:
+        logging.error(f"Embedding prefetch task failed for meeting {meeting_id}: {e}")
+        return {'success': False, 'error': str(e)}
@@ -1,3 +1,284 @@
-from django.test import TestCase
+from django.conf import settings
+from django.test import SimpleTestCase
+import json
+import subprocess
+import sys
 
-# Create your tests here.
+HEAVY_MODULES = ['torch', 'transformers', 'insightface', 'mediapipe']
+
+# Fresh interpreter: set up Django and import every URLconf'd view, then report
+# which heavy packages ended up loaded
+IMPORT_PROBE = """
+import json, os, sys
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SampleDB.settings')
+os.environ.pop('WARM_MODELS', None)
+import django
+django.setup()
+import SampleDB.urls
+print(json.dumps([m for m in json.loads(sys.argv[1]) if m in sys.modules]))
+"""
+
+
+class LazyImportTests(SimpleTestCase):
+    def test_app_import_loads_no_heavy_models(self):
+        proc = subprocess.run(
+            [sys.executable, '-c', IMPORT_PROBE, json.dumps(HEAVY_MODULES)],
+            capture_output=True, text=True, cwd=settings.BASE_DIR, timeout=300,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr[-2000:])
+        loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+        self.assertEqual(loaded, [], f"importing the app loaded {', '.join(loaded)}")
+
+
+class MeetingSummarizerTests(SimpleTestCase):
+    def setUp(self):
+        import tempfile
+        from core.UserDashBoard.meeting_summarizer import SummaryCache
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.cache = SummaryCache(f"{self._tmp.name}/summaries.sqlite3")
+
+    def _segments(self, count, speakers=('Trainer',), pause_every=0, length=4.0):
+        segments, t = [], 0.0
+        for i in range(count):
+            if pause_every and i and i % pause_every == 0:
+                t += 5.0
+            segments.append({
+                "start": t, "end": t + length, "speaker": speakers[i % len(speakers)],
+                "text": f"Line {i} about the deployment pipeline and its configuration.",
+            })
+            t += length
+        return segments
+
+    def test_chunks_cut_at_speaker_changes(self):
+        from core.UserDashBoard.meeting_summarizer import chunk_segments
+        # Three-segment turns per speaker
+        segments = self._segments(60, speakers=('Trainer',) * 3 + ('Participant 1',) * 3)
+        chunks = chunk_segments(segments, max_chars=1000, max_seconds=10000)
+        self.assertGreater(len(chunks), 1)
+        index = {seg["start"]: i for i, seg in enumerate(segments)}
+        for chunk in chunks[1:]:
+            first = index[chunk["start"]]
+            self.assertNotEqual(segments[first]["speaker"], segments[first - 1]["speaker"])
+
+    def test_chunks_cut_at_pauses(self):
+        from core.UserDashBoard.meeting_summarizer import chunk_segments
+        segments = self._segments(60, pause_every=4)
+        chunks = chunk_segments(segments, max_chars=1000, max_seconds=10000)
+        self.assertGreater(len(chunks), 1)
+        for previous, chunk in zip(chunks, chunks[1:]):
+            self.assertGreaterEqual(chunk["start"] - previous["end"], 2.0)
+
+    def test_in_flight_calls_stay_under_the_limit(self):
+        from core.UserDashBoard.meeting_summarizer import MeetingSummarizer, StubSummaryBackend
+        backend = StubSummaryBackend(latency=0.02)
+        summarizer = MeetingSummarizer(backend=backend, cache=self.cache, max_in_flight=3)
+        _, stats = summarizer.summarize(self._segments(2000), lambda text: text)
+        self.assertGreater(stats['map_calls'], 3)
+        self.assertLessEqual(stats['peak_in_flight'], 3)
+
+    def test_reduce_terminates_when_every_note_is_at_the_limit(self):
+        import core.UserDashBoard.meeting_summarizer as ms
+        summarizer = ms.MeetingSummarizer(backend=ms.StubSummaryBackend(), cache=self.cache)
+        reduce_chars, ms.SUMMARY_REDUCE_CHARS = ms.SUMMARY_REDUCE_CHARS, 100
+        self.addCleanup(setattr, ms, 'SUMMARY_REDUCE_CHARS', reduce_chars)
+        notes = [" ".join(f"note{i}-{w}" for w in range(40)) for i in range(16)]
+        run = ms._SummaryRun()
+        merged = summarizer._reduce(notes, "0:00:00-1:00:00", run)
+        self.assertTrue(merged)
+        self.assertGreater(run.stats['reduce_levels'], 0)
+
+    def test_rerun_makes_no_backend_calls(self):
+        from core.UserDashBoard.meeting_summarizer import MeetingSummarizer, StubSummaryBackend
+        backend = StubSummaryBackend()
+        summarizer = MeetingSummarizer(backend=backend, cache=self.cache)
+        segments = self._segments(2000)
+        first, first_stats = summarizer.summarize(segments, lambda text: f"Summarize:\n{text}")
+        calls = backend.calls
+        self.assertGreater(calls, 1)
+        second, second_stats = summarizer.summarize(segments, lambda text: f"Summarize:\n{text}")
+        self.assertEqual(backend.calls, calls)
+        self.assertEqual(second, first)
+        self.assertEqual(second_stats['cache_hits'], sum(v for k, v in first_stats.items() if k.endswith('_calls')))
+        self.assertFalse(any(k.endswith('_calls') for k in second_stats))
+
+
+class InferencePoolWorkerDeathTests(SimpleTestCase):
+    def test_worker_killed_mid_dispatch(self):
+        import numpy as np
+        import os
+        import signal
+        import threading
+        import time
+        from core.AI_Attendance.inference_pool import VisionInferencePool, WorkerDied
+
+        class KillDuringWrite(VisionInferencePool):
+            """Kills the target worker after its slot is taken but before the frame is written"""
+            kill_next = True
+            slot_reused_during_write = None
+            written = threading.Event()
+
+            def _write_frame(self, job):
+                if self.kill_next:
+                    self.kill_next = False
+                    os.kill(self._processes[job.worker].pid, signal.SIGKILL)
+                    deadline = time.monotonic() + 10
+                    while self._worker_up[job.worker] and time.monotonic() < deadline:
+                        time.sleep(0.01)
+                    with self._lock:
+                        self.slot_reused_during_write = job.slot in self._free_slots
+                    super()._write_frame(job)
+                    self.written.set()
+                    return
+                super()._write_frame(job)
+
+        pool = KillDuringWrite(1).start()
+        self.addCleanup(pool.shutdown)
+        frame = np.zeros((64, 64, 3), np.uint8)
+
+        with self.assertRaises(WorkerDied):
+            pool.submit('killed', frame).result(timeout=30)
+        # The dead worker's slot must not be handed out while the frame is still being copied into it
+        self.assertTrue(pool.written.wait(timeout=30))
+        self.assertIs(pool.slot_reused_during_write, False)
+
+        # The slot came back exactly once and the respawned worker serves frames
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline and not pool.get_stats()['workers_up']:
+            time.sleep(0.05)
+        self.assertIsNotNone(pool.infer('after', frame, timeout=30))
+        with pool._lock:
+            self.assertEqual(sorted(pool._free_slots), list(range(pool.slot_count)))
+        stats = pool.get_stats()
+        self.assertEqual(stats['worker_deaths'], 1)
+        self.assertEqual(stats['failed_by_worker_death'], 1)
+
+
+class FaceTemplateTests(SimpleTestCase):
+    DIM = 16
+
+    def setUp(self):
+        import numpy as np
+        self.rng = np.random.default_rng(7)
+
+    def _embeddings(self, count, prefix='t'):
+        return [
+            {'embedding': self.rng.normal(size=self.DIM).astype('float32').tolist(), 'embedding_id': f"{prefix}{i}"}
+            for i in range(count)
+        ]
+
+    def _reference(self, query, embedding, method):
+        # compare_embeddings() without loading a model: the method never touches the model
+        from core.FaceAuth.face_model_shared import SharedFaceModel
+        model = object.__new__(SharedFaceModel)
+        return 1.0 - model.compare_embeddings(query, embedding, method=method)
+
+    def test_similarities_match_compare_embeddings(self):
+        from core.FaceAuth.face_templates import TemplateSet
+        embeddings = self._embeddings(6)
+        templates = TemplateSet.from_embeddings(embeddings)
+        query = self.rng.normal(size=self.DIM)
+        for method in ('cosine', 'euclidean'):
+            with self.subTest(method=method):
+                expected = [self._reference(query, e['embedding'], method) for e in embeddings]
+                sims = templates.similarities(query, method)
+                self.assertEqual(len(sims), len(expected))
+                for got, want in zip(sims, expected):
+                    self.assertAlmostEqual(float(got), want, places=4)
+
+    def test_zero_and_wrong_dimension_rows_are_dropped(self):
+        from core.FaceAuth.face_templates import TemplateSet
+        embeddings = self._embeddings(3)
+        embeddings.insert(1, {'embedding': [0.0] * self.DIM, 'embedding_id': 'zero'})
+        embeddings.append({'embedding': [1.0] * (self.DIM + 1), 'embedding_id': 'wide'})
+        embeddings.append({'embedding': [], 'embedding_id': 'empty'})
+        templates = TemplateSet.from_embeddings(embeddings)
+        self.assertEqual(templates.embedding_ids, ['t0', 't1', 't2'])
+        self.assertEqual(templates.matrix.shape, (3, self.DIM))
+        self.assertEqual(len(TemplateSet.from_embeddings([])), 0)
+
+    def test_best_match_floors_at_zero(self):
+        import numpy as np
+        from core.FaceAuth.face_templates import TemplateSet
+        base = self.rng.normal(size=self.DIM)
+        templates = TemplateSet.from_embeddings([
+            {'embedding': base.tolist(), 'embedding_id': 'a'},
+            {'embedding': (base * 2).tolist(), 'embedding_id': 'b'},
+        ])
+        similarity, best_id, sims = templates.best_match(-base)
+        self.assertEqual((similarity, best_id), (0.0, None))
+        self.assertEqual(len(sims), 2)
+
+        similarity, best_id, _ = templates.best_match(base)
+        self.assertAlmostEqual(similarity, 1.0, places=5)
+        self.assertEqual(best_id, 'a')
+        # Wrong-dimension and zero queries never match
+        self.assertEqual(templates.best_match(np.ones(self.DIM + 1))[:2], (0.0, None))
+        self.assertEqual(templates.best_match(np.zeros(self.DIM))[:2], (0.0, None))
+
+    def test_index_matches_naive_loop(self):
+        import numpy as np
+        from core.FaceAuth.face_templates import TemplateIndex, TemplateSet
+        users = {user_id: self._embeddings(count, prefix=f"u{user_id}-") for user_id, count in ((1, 3), (2, 1), (3, 5))}
+        index = TemplateIndex({user_id: TemplateSet.from_embeddings(e) for user_id, e in users.items()})
+        queries = self.rng.normal(size=(8, self.DIM)).astype(np.float32)
+
+        def naive(query, embeddings):
+            return max(self._reference(query, e['embedding'], 'cosine') for e in embeddings)
+
+        scores = index.score_all(queries)
+        self.assertEqual(scores.shape, (8, 3))
+        for i, query in enumerate(queries):
+            for column, user_id in enumerate(index.user_ids):
+                self.assertAlmostEqual(float(scores[i, column]), naive(query, users[user_id]), places=4)
+
+        wanted = [1, 2, 3, 99, 1, 2, 3, 1]
+        matched = index.match_batch(queries, wanted)
+        for i, (query, user_id) in enumerate(zip(queries, wanted)):
+            expected = max(0.0, naive(query, users[user_id])) if user_id in users else 0.0
+            self.assertAlmostEqual(float(matched[i]), expected, places=4)
+
+
+class FrameTimelineTests(SimpleTestCase):
+    def test_out_of_order_add_keeps_timestamps_sorted(self):
+        from core.livekit_recording.frame_index import FrameTimeline
+        timeline = FrameTimeline()
+        for t in (0.0, 0.1, 0.3, 0.2, 0.4, 0.05):
+            timeline.add(t, f"f{t}")
+        self.assertEqual(timeline.timestamps, [0.0, 0.05, 0.1, 0.2, 0.3, 0.4])
+        self.assertEqual(timeline.frames, [f"f{t}" for t in timeline.timestamps])
+        self.assertEqual(timeline.out_of_order, 2)
+        self.assertEqual(timeline.last_real_timestamp, 0.4)
+        self.assertEqual(timeline.nearest(0.21, 0.05), "f0.2")
+
+    def test_placeholders_move_max_timestamp_but_are_never_selected(self):
+        from core.livekit_recording.frame_index import FrameTimeline
+        timeline = FrameTimeline()
+        timeline.add(1.0, "real")
+        timeline.add(1.5, "placeholder", real=False)
+        timeline.add(2.0, "placeholder", real=False)
+        self.assertEqual(timeline.max_timestamp, 2.0)
+        self.assertEqual(timeline.last_real_timestamp, 1.0)
+        self.assertEqual(len(timeline), 1)
+        self.assertIsNone(timeline.nearest(2.0, 0.5))
+        self.assertEqual(timeline.nearest(1.5, 0.5), "real")
+
+    def test_nearest_prefers_the_earlier_frame_on_ties(self):
+        from core.livekit_recording.frame_index import FrameTimeline
+        timeline = FrameTimeline()
+        timeline.add(1.0, "early")
+        timeline.add(2.0, "late")
+        self.assertEqual(timeline.nearest(1.5, 1.0), "early")
+        self.assertEqual(timeline.nearest(1.50001, 1.0), "late")
+        self.assertEqual(timeline.nearest(1.49999, 1.0), "early")
+
+    def test_nearest_tolerance_boundary(self):
+        from core.livekit_recording.frame_index import FrameTimeline
+        timeline = FrameTimeline()
+        timeline.add(1.0, "frame")
+        # Exactly at the tolerance still matches, on either side
+        self.assertEqual(timeline.nearest(1.25, 0.25), "frame")
+        self.assertEqual(timeline.nearest(0.75, 0.25), "frame")
+        self.assertIsNone(timeline.nearest(1.2501, 0.25))
+        self.assertIsNone(timeline.nearest(0.7499, 0.25))
+        self.assertIsNone(FrameTimeline().nearest(1.0, 1.0))
@@ -0,0 +1,174 @@
+"""
+Lazy imports and lazy model registry
+
+Heavy ML dependencies (torch, transformers, openai, insightface, mediapipe)
+used to be imported - and some models constructed - at module import time, so
+every gunicorn worker, Celery process and management command paid for them
+before doing any work. Modules now bind them through lazy_import() /
+lazy_model(); the real import or construction happens on first attribute access.
+
+Inference workers can opt into loading models up front with the WARM_MODELS
+env var (comma separated names from WARMUP_TARGETS, or "all"), which
+CoreConfig.ready() hands to warm_up_from_env().
+"""
+import importlib
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_registry_lock = threading.RLock()
+_load_times = {}        # name -> seconds spent importing / constructing
+_lazy_models = {}       # name -> LazyModel
+
+# Models an inference worker may want loaded before its first request.
+# Values are "module:function" paths so nothing is imported until warm-up runs.
+WARMUP_TARGETS = {
+    'mediapipe': 'core.AI_Attendance.inference_pool:warm_inference_backend',
+    'insightface': 'core.FaceAuth.face_model_shared:get_face_model',
+    'face_auth': 'core.FaceAuth.face_auth:get_face_auth_model',
+    'unified_face_service': 'core.FaceAuth.unified_face_service:get_unified_face_service',
+    'encoders': 'core.livekit_recording.encoder_registry:warm_encoder_registry',
+}
+
+
+def _record(name, started):
+    elapsed = time.perf_counter() - started
+    _load_times[name] = round(elapsed, 3)
+    logger.info(f"📦 Lazy-loaded {name} in {elapsed:.2f}s")
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name, on_load=None):
+        object.__setattr__(self, '_lazy_name', name)
+        object.__setattr__(self, '_lazy_on_load', on_load)
+        object.__setattr__(self, '_lazy_module', None)
+
+    def _load(self):
+        module = object.__getattribute__(self, '_lazy_module')
+        if module is None:
+            with _registry_lock:
+                module = object.__getattribute__(self, '_lazy_module')
+                if module is None:
+                    name = object.__getattribute__(self, '_lazy_name')
+                    started = time.perf_counter()
+                    module = importlib.import_module(name)
+                    on_load = object.__getattribute__(self, '_lazy_on_load')
+                    if on_load:
+                        on_load(module)
+                    object.__setattr__(self, '_lazy_module', module)
+                    _record(name, started)
+        return module
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def __setattr__(self, item, value):
+        setattr(self._load(), item, value)
+
+    def __repr__(self):
+        state = "loaded" if object.__getattribute__(self, '_lazy_module') is not None else "not loaded"
+        return f"<lazy module '{object.__getattribute__(self, '_lazy_name')}' ({state})>"
+
+
+class LazyModel:
+    """
+    Object proxy that calls factory() on first attribute access and caches the
+    result. Proxy-only members are prefixed lazy_ so they don't shadow the model's.
+    """
+
+    def __init__(self, name, factory):
+        object.__setattr__(self, '_lazy_name', name)
+        object.__setattr__(self, '_lazy_factory', factory)
+        object.__setattr__(self, '_lazy_instance', None)
+
+    def lazy_instance(self):
+        instance = object.__getattribute__(self, '_lazy_instance')
+        if instance is None:
+            with _registry_lock:
+                instance = object.__getattribute__(self, '_lazy_instance')
+                if instance is None:
+                    started = time.perf_counter()
+                    instance = object.__getattribute__(self, '_lazy_factory')()
+                    object.__setattr__(self, '_lazy_instance', instance)
+                    _record(object.__getattribute__(self, '_lazy_name'), started)
+        return instance
+
+    @property
+    def lazy_loaded(self):
+        return object.__getattribute__(self, '_lazy_instance') is not None
+
+    def __getattr__(self, item):
+        return getattr(self.lazy_instance(), item)
+
+    def __repr__(self):
+        state = "loaded" if self.lazy_loaded else "not loaded"
+        return f"<lazy model '{object.__getattribute__(self, '_lazy_name')}' ({state})>"
+
+
+def lazy_import(name, on_load=None):
+    """Return a proxy for module `name`; on_load(module) runs once after the real import"""
+    return LazyModule(name, on_load)
+
+
+def lazy_model(name, factory):
+    """Register a lazily constructed model under `name` and return its proxy"""
+    with _registry_lock:
+        model = _lazy_models.get(name)
+        if model is None:
+            model = LazyModel(name, factory)
+            _lazy_models[name] = model
+    return model
+
+
+def _resolve(target):
+    module_name, func_name = target.split(':')
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def warm_up(names):
+    """Load the given WARMUP_TARGETS now; returns {name: seconds or error}"""
+    results = {}
+    for name in names:
+        target = WARMUP_TARGETS.get(name)
+        if not target:
+            logger.warning(f"⚠️ Unknown warm-up target: {name}")
+            continue
+        started = time.perf_counter()
+        try:
+            _resolve(target)()
+            results[name] = round(time.perf_counter() - started, 3)
+            logger.info(f"🔥 Warmed {name} in {results[name]:.2f}s")
+        except Exception as e:
+            results[name] = f"error: {e}"
+            logger.error(f"❌ Warm-up failed for {name}: {e}")
+    return results
+
+
+def warm_up_from_env(background=True):
+    """
+    Warm the models named in WARM_MODELS (unset = nothing, the default for web
+    workers, beat and management commands). Runs on a daemon thread by default
+    so worker boot isn't blocked.
+    """
+    raw = os.getenv("WARM_MODELS", "").strip()
+    if not raw:
+        return None
+    names = list(WARMUP_TARGETS) if raw == "all" else [n.strip() for n in raw.split(",") if n.strip()]
+    if not background:
+        return warm_up(names)
+    threading.Thread(target=warm_up, args=(names,), name="model-warmup", daemon=True).start()
+    return names
+
+
+def get_lazy_load_stats():
+    """What has been loaded so far in this process, and how long each took"""
+    with _registry_lock:
+        return {
+            'load_seconds': dict(_load_times),
+            'models': {name: model.lazy_loaded for name, model in _lazy_models.items()},
+        }
@@ -1309,6 +1309,36 @@ export const meetingsAPI = {
 };
 
 // ==================== ANALYTICS API - COMPLETE FIXED VERSION ====================
+
+// The report PDF endpoints answer 202 with a job ({status_url, download_url})
+// when the report is not cached yet; poll it and fetch the PDF once ready
+const REPORT_POLL_INTERVAL_MS = 2000;
+const REPORT_POLL_TIMEOUT_MS = 10 * 60 * 1000;
+
+const resolveQueuedReport = async (response, headers) => {
+  if (response.status !== 202) {
+    return response;
+  }
+  let job = JSON.parse(await response.data.text()).data;
+  const deadline = Date.now() + REPORT_POLL_TIMEOUT_MS;
+  while (job.status !== "ready") {
+    if (job.status === "failed" || job.status === "not_found") {
+      throw new Error(job.error || "Report not found or no data available");
+    }
+    if (Date.now() > deadline) {
+      throw new Error("Report generation timed out");
+    }
+    await new Promise((resolve) => setTimeout(resolve, REPORT_POLL_INTERVAL_MS));
+    const status = await axios.get(`${API_BASE_URL}${job.status_url}`, { headers });
+    job = status.data.data;
+  }
+  return axios.get(`${API_BASE_URL}${job.download_url}`, {
+    responseType: "blob",
+    headers,
+    timeout: 60000,
+  });
+};
+
 // Replace the analyticsAPI export in your api.js with this code
 
 export const analyticsAPI = {
@@ -1463,20 +1493,21 @@ export const analyticsAPI = {
 
       // CRITICAL: Use axios directly instead of api instance
       // This bypasses the response interceptor that unwraps response.data
-      const response = await axios.get(
-        `${API_BASE_URL}/api/reports/participant/pdf`,
-        {
+      const headers = {
+        Authorization: `Bearer ${token}`,
+        "Content-Type": "application/json",
+      };
+      const response = await resolveQueuedReport(
+        await axios.get(`${API_BASE_URL}/api/reports/participant/pdf`, {
           params,
           responseType: "blob",
-          headers: {
-            Authorization: `Bearer ${token}`,
-            "Content-Type": "application/json",
-          },
+          headers,
           timeout: 60000, // 60 second timeout
           validateStatus: function (status) {
             return status >= 200 && status < 300;
           },
-        }
+        }),
+        headers
       );
 
       console.log("✅ Analytics API: PDF response received:", {
@@ -1600,18 +1631,22 @@ export const analyticsAPI = {
       );
 
       // CRITICAL: Use axios directly instead of api instance
-      const response = await axios.get(`${API_BASE_URL}/api/reports/host/pdf`, {
-        params,
-        responseType: "blob",
-        headers: {
-          Authorization: `Bearer ${token}`,
-          "Content-Type": "application/json",
-        },
-        timeout: 60000,
-        validateStatus: function (status) {
-          return status >= 200 && status < 300;
-        },
-      });
+      const headers = {
+        Authorization: `Bearer ${token}`,
+        "Content-Type": "application/json",
+      };
+      const response = await resolveQueuedReport(
+        await axios.get(`${API_BASE_URL}/api/reports/host/pdf`, {
+          params,
+          responseType: "blob",
+          headers,
+          timeout: 60000,
+          validateStatus: function (status) {
+            return status >= 200 && status < 300;
+          },
+        }),
+        headers
+      );
 
       console.log("✅ Analytics API: PDF response received:", {
         status: response.status,